@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration to add an index on the hash that is stored in the extras of the `DbNode` model."""
+# pylint: disable=invalid-name
+from django.db import migrations
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.46'
+DOWN_REVISION = '1.0.45'
+
+# The key that is used to store the hash in the node extras
+_HASH_EXTRA_KEY = '_aiida_hash'
+
+
+class Migration(migrations.Migration):
+    """Migrate to add an expression index on the hash in the extras of the dbnode table."""
+    dependencies = [
+        ('db', '0045_dbgroup_extras'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE INDEX db_dbnode_extras_aiida_hash_idx ON db_dbnode ((extras ->> '{_HASH_EXTRA_KEY}'));",
+            reverse_sql='DROP INDEX db_dbnode_extras_aiida_hash_idx;'
+        ),
+        upgrade_schema_version(REVISION, DOWN_REVISION),
+    ]
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration to add the `DbLinkClosure` model, which stores the transitive closure of the provenance links."""
+# pylint: disable=invalid-name
+from django.db import migrations, models
+import django.db.models.deletion
+
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.47'
+DOWN_REVISION = '1.0.46'
+
+
+class Migration(migrations.Migration):
+    """Migrate to add the dblinkclosure table."""
+    dependencies = [
+        ('db', '0046_dbnode_extras_hash_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DbLinkClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'ancestor',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='+', to='db.DbNode'
+                    )
+                ),
+                (
+                    'descendant',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='+', to='db.DbNode'
+                    )
+                ),
+            ],
+            options={
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        # The triggers that maintain the table are only installed once the closure is built, but they have to be
+        # dropped together with the table when migrating backwards.
+        migrations.RunSQL(
+            migrations.RunSQL.noop,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS db_dblink_closure_insert ON db_dblink;
+            DROP TRIGGER IF EXISTS db_dblink_closure_delete ON db_dblink;
+            DROP TRIGGER IF EXISTS db_dbnode_closure_delete ON db_dbnode;
+            DROP FUNCTION IF EXISTS db_dblinkclosure_insert_link();
+            DROP FUNCTION IF EXISTS db_dblinkclosure_delete_link();
+            DROP FUNCTION IF EXISTS db_dblinkclosure_delete_node();
+        """
+        ),
+        upgrade_schema_version(REVISION, DOWN_REVISION),
+    ]
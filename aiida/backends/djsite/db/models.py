@@ -180,6 +180,21 @@ class DbLink(m.Model):
         )
 
 
+class DbLinkClosure(m.Model):
+    """Transitive closure of the `input_calc` and `create` links.
+
+    Each row records that a node is an ancestor of another.
+
+    The table is only populated and kept up to date by the database once the closure has been built, see
+    :py:mod:`aiida.manage.database.closure`.
+    """
+    ancestor = m.ForeignKey('DbNode', related_name='+', on_delete=m.CASCADE)
+    descendant = m.ForeignKey('DbNode', related_name='+', on_delete=m.CASCADE)
+
+    class Meta:
+        unique_together = (('ancestor', 'descendant'),)
+
+
 class DbSetting(m.Model):
     """This will store generic settings that should be database-wide."""
     key = m.CharField(max_length=1024, db_index=True, blank=False, unique=True)
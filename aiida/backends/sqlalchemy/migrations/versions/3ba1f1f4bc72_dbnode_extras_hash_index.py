@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=no-member,invalid-name
+"""Migration to add an index on the hash that is stored in the extras of the `DbNode` model.
+
+Revision ID: 3ba1f1f4bc72
+Revises: 0edcdd5a30f0
+Create Date: 2020-11-02 10:12:41.216937
+
+"""
+from alembic import op
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = '3ba1f1f4bc72'
+down_revision = '0edcdd5a30f0'
+branch_labels = None
+depends_on = None
+
+# The key that is used to store the hash in the node extras
+_HASH_EXTRA_KEY = '_aiida_hash'
+
+
+def upgrade():
+    """Upgrade: Add an expression index on the hash in the extras of the 'db_dbnode' table"""
+    op.create_index(
+        'db_dbnode_extras_aiida_hash_idx', 'db_dbnode', [text(f"(extras ->> '{_HASH_EXTRA_KEY}')")], unique=False
+    )
+
+
+def downgrade():
+    """Downgrade: Drop the expression index on the hash in the extras of the 'db_dbnode' table"""
+    op.drop_index('db_dbnode_extras_aiida_hash_idx', table_name='db_dbnode')
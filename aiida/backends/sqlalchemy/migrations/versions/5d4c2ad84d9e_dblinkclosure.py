@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=no-member,invalid-name
+"""Migration to add the `DbLinkClosure` table, which stores the transitive closure of the provenance links.
+
+Revision ID: 5d4c2ad84d9e
+Revises: 3ba1f1f4bc72
+Create Date: 2020-11-09 14:27:03.518219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d4c2ad84d9e'
+down_revision = '3ba1f1f4bc72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade: Create the 'db_dblinkclosure' table."""
+    op.create_table(
+        'db_dblinkclosure',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['db_dbnode.id'], initially='DEFERRED', deferrable=True),
+        sa.ForeignKeyConstraint(['descendant_id'], ['db_dbnode.id'], initially='DEFERRED', deferrable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ancestor_id', 'descendant_id', name='db_dblinkclosure_ancestor_id_descendant_id_key'),
+    )
+    op.create_index(op.f('ix_db_dblinkclosure_ancestor_id'), 'db_dblinkclosure', ['ancestor_id'], unique=False)
+    op.create_index(op.f('ix_db_dblinkclosure_descendant_id'), 'db_dblinkclosure', ['descendant_id'], unique=False)
+
+
+def downgrade():
+    """Downgrade: Drop the 'db_dblinkclosure' table, together with the triggers that maintain it."""
+    op.execute("""
+        DROP TRIGGER IF EXISTS db_dblink_closure_insert ON db_dblink;
+        DROP TRIGGER IF EXISTS db_dblink_closure_delete ON db_dblink;
+        DROP TRIGGER IF EXISTS db_dbnode_closure_delete ON db_dbnode;
+        DROP FUNCTION IF EXISTS db_dblinkclosure_insert_link();
+        DROP FUNCTION IF EXISTS db_dblinkclosure_delete_link();
+        DROP FUNCTION IF EXISTS db_dblinkclosure_delete_node();
+    """)
+    op.drop_index(op.f('ix_db_dblinkclosure_descendant_id'), table_name='db_dblinkclosure')
+    op.drop_index(op.f('ix_db_dblinkclosure_ancestor_id'), table_name='db_dblinkclosure')
+    op.drop_table('db_dblinkclosure')
@@ -12,7 +12,7 @@
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship, backref
-from sqlalchemy.schema import Column
+from sqlalchemy.schema import Column, UniqueConstraint
 from sqlalchemy.types import Integer, String, DateTime, Text
 # Specific to PGSQL. If needed to be agnostic
 # http://docs.sqlalchemy.org/en/rel_0_9/core/custom_types.html?highlight=guid#backend-agnostic-guid-type
@@ -177,3 +177,25 @@ class DbLink(Base):
             self.input.get_simple_name(invalid_result='Unknown node'), self.input.pk,
             self.output.get_simple_name(invalid_result='Unknown node'), self.output.pk
         )
+
+
+class DbLinkClosure(Base):
+    """Class to store the transitive closure of the `input_calc` and `create` links between nodes using SQLA backend.
+
+    Each row records that a node is an ancestor of another node. The table is only populated and kept up to date by
+    the database once the closure has been built, see :py:mod:`aiida.manage.database.closure`.
+    """
+
+    __tablename__ = 'db_dblinkclosure'
+
+    id = Column(Integer, primary_key=True)  # pylint: disable=invalid-name
+    ancestor_id = Column(
+        Integer, ForeignKey('db_dbnode.id', deferrable=True, initially='DEFERRED'), nullable=False, index=True
+    )
+    descendant_id = Column(
+        Integer, ForeignKey('db_dbnode.id', deferrable=True, initially='DEFERRED'), nullable=False, index=True
+    )
+
+    __table_args__ = (
+        UniqueConstraint('ancestor_id', 'descendant_id', name='db_dblinkclosure_ancestor_id_descendant_id_key'),
+    )
@@ -76,6 +76,75 @@ def database_migrate(force):
             echo.echo_success('migration completed')
 
 
+@verdi_database.command('migrate-repository')
+@click.option(
+    '--keep-folders', is_flag=True, help='Do not remove the folder of each node once its contents have been migrated.'
+)
+@options.FORCE()
+def database_migrate_repository(keep_folders, force):
+    """Migrate the file repository to the object store.
+
+    The contents of the folder of each node are moved into a content-addressed, deduplicating object store, which
+    keeps small files in pack files and stores identical files only once. Once the object store has been initialised,
+    all new nodes will store their files in it. The migration can be interrupted and restarted safely.
+    """
+    from aiida.engine.daemon.client import get_daemon_client
+    from aiida.manage.configuration import get_profile
+    from aiida.repository.migration import get_legacy_node_folders, migrate_repository
+
+    client = get_daemon_client()
+    if client.is_daemon_running:
+        echo.echo_critical('Migration aborted, the daemon for the profile is still running.')
+
+    profile = get_profile()
+
+    if not force:
+        echo.echo_warning('Migrating the file repository might take a while and is not reversible.')
+        echo.echo_warning('Make sure you have made a backup of your repository before continuing.')
+        click.confirm(f'Do you want to migrate the repository of profile "{profile.name}"?', abort=True)
+
+    num_nodes = len(get_legacy_node_folders(profile))
+
+    with click.progressbar(length=num_nodes, label='Migrating node folders:') as progress:
+        for _ in migrate_repository(profile, remove_folders=not keep_folders):
+            progress.update(1)
+
+    echo.echo_success(f'migrated the repository folders of {num_nodes} nodes')
+
+
+@verdi_database.command('clean-repository')
+@options.FORCE()
+@decorators.with_dbenv()
+def database_clean_repository(force):
+    """Remove the objects from the object store that are no longer referenced by any node.
+
+    Deleting nodes or replacing the files of a node only removes the references from the node to the objects in the
+    object store, such that it keeps growing until it is cleaned. The space of packed objects is not reclaimed on disk,
+    since the pack files are not rewritten.
+    """
+    from aiida.engine.daemon.client import get_daemon_client
+    from aiida.manage.configuration import get_profile
+    from aiida.repository.container import get_container
+
+    client = get_daemon_client()
+    if client.is_daemon_running:
+        echo.echo_critical('Cleaning aborted, the daemon for the profile is still running.')
+
+    profile = get_profile()
+    container = get_container(profile)
+
+    if container is None:
+        echo.echo_critical('the object store has not been initialised, run `verdi database migrate-repository` first.')
+
+    if not force:
+        echo.echo_warning('Make sure that no other process is using the profile while the object store is cleaned.')
+        click.confirm(f'Do you want to clean the object store of profile "{profile.name}"?', abort=True)
+
+    removed = container.clean()
+
+    echo.echo_success(f'removed {removed} unreferenced objects from the object store')
+
+
 @verdi_database.group('integrity')
 def verdi_database_integrity():
     """Check the integrity of the database and fix potential issues."""
@@ -176,3 +245,50 @@ def detect_invalid_nodes():
         echo.echo_success('no integrity violations detected')
     else:
         echo.echo_critical('one or more integrity violations detected')
+
+
+@verdi_database.group('closure')
+def verdi_database_closure():
+    """Manage the transitive closure of the provenance graph, used to speed up ancestor and descendant queries."""
+
+
+@verdi_database_closure.command('build')
+@decorators.with_dbenv()
+def closure_build():
+    """Build the closure and keep it up to date from now on.
+
+    Once built, the closure is used by queries that pass the `closure` traversal option to the `QueryBuilder`.
+    An existing closure is rebuilt from scratch. Links cannot be added while the closure is being built.
+    """
+    from aiida.manage.database.closure import build_closure
+
+    try:
+        count = build_closure()
+    except exceptions.IntegrityError as exception:
+        echo.echo_critical(str(exception))
+    else:
+        echo.echo_success(f'built the closure with {count} pairs of ancestors and descendants')
+
+
+@verdi_database_closure.command('verify')
+@decorators.with_dbenv()
+def closure_verify():
+    """Verify that the closure corresponds to the links in the database."""
+    from aiida.manage.database.closure import verify_closure
+
+    try:
+        verify_closure()
+    except exceptions.IntegrityError as exception:
+        echo.echo_critical(str(exception))
+    else:
+        echo.echo_success('the closure is consistent with the links in the database')
+
+
+@verdi_database_closure.command('drop')
+@decorators.with_dbenv()
+def closure_drop():
+    """Drop the closure and stop keeping it up to date."""
+    from aiida.manage.database.closure import drop_closure
+
+    drop_closure()
+    echo.echo_success('dropped the closure')
@@ -161,16 +161,23 @@ def create(
 def migrate(input_file, output_file, force, silent, in_place, archive_format, version):
     # pylint: disable=too-many-locals,too-many-statements,too-many-branches
     """Migrate an export archive to a more recent format version."""
+    from distutils.version import StrictVersion
     import tarfile
     import zipfile
 
     from aiida.common import json
     from aiida.common.folders import SandboxFolder
     from aiida.tools.importexport import migration, extract_zip, extract_tar, ArchiveMigrationError, EXPORT_VERSION
+    from aiida.tools.importexport.common.archive import read_data, write_data
 
     if version is None:
         version = EXPORT_VERSION
 
+    try:
+        StrictVersion(version)
+    except ValueError:
+        echo.echo_critical(f'invalid archive format version `{version}`')
+
     if in_place:
         if output_file:
             echo.echo_critical('output file specified together with --in-place flag')
@@ -194,15 +201,14 @@ def migrate(input_file, output_file, force, silent, in_place, archive_format, ve
             echo.echo_critical('invalid file format, expected either a zip archive or gzipped tarball')
 
         try:
-            with open(folder.get_abs_path('data.json'), 'r', encoding='utf8') as fhandle:
-                data = json.load(fhandle)
+            data = read_data(folder)
             with open(folder.get_abs_path('metadata.json'), 'r', encoding='utf8') as fhandle:
                 metadata = json.load(fhandle)
-        except IOError:
-            echo.echo_critical(f'export archive does not contain the required file {fhandle.filename}')
+        except IOError as exception:
+            echo.echo_critical(f'export archive does not contain the required file {exception.filename}')
 
         old_version = migration.verify_metadata_version(metadata)
-        if version <= old_version:
+        if StrictVersion(version) <= StrictVersion(old_version):
             echo.echo_success(f'nothing to be done - archive already at version {old_version} >= {version}')
             return
 
@@ -211,8 +217,7 @@ def migrate(input_file, output_file, force, silent, in_place, archive_format, ve
         except ArchiveMigrationError as exception:
             echo.echo_critical(str(exception))
 
-        with open(folder.get_abs_path('data.json'), 'wb') as fhandle:
-            json.dump(data, fhandle, indent=4)
+        write_data(folder, metadata, data)
 
         with open(folder.get_abs_path('metadata.json'), 'wb') as fhandle:
             json.dump(metadata, fhandle)
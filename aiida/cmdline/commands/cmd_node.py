@@ -278,6 +278,104 @@ def extras(nodes, keys, fmt, identifier, raw):
     echo_node_dict(nodes, keys, fmt, identifier, raw, use_attrs=False)
 
 
+def parse_extra(value, require_dict=False):
+    """Parse a `KEY=VALUE` command line value into the key and the value, which is parsed as JSON if possible.
+
+    :param value: the string to parse
+    :param require_dict: if True, the value should be a JSON object
+    :return: tuple of the key and the parsed value
+    :raises click.BadParameter: if the string does not have the expected format
+    """
+    import json
+
+    key, separator, content = value.partition('=')
+
+    if not key or not separator:
+        raise click.BadParameter(f'`{value}` is not of the form KEY=VALUE')
+
+    try:
+        content = json.loads(content)
+    except ValueError:
+        if require_dict:
+            raise click.BadParameter(f'the value of `{value}` is not a valid JSON object')
+
+    if require_dict and not isinstance(content, dict):
+        raise click.BadParameter(f'the value of `{value}` is not a JSON object')
+
+    return key, content
+
+
+@verdi_node.command('set-extras')
+@arguments.NODES()
+@click.option(
+    '-e',
+    '--entry-point',
+    type=PluginParamType(group=('aiida.calculations', 'aiida.data', 'aiida.workflows'), load=True),
+    default=None,
+    help='Update all nodes that are class or sub class of the class identified by this entry point.'
+)
+@click.option(
+    '-s',
+    '--set',
+    'values',
+    multiple=True,
+    metavar='KEY=VALUE',
+    help='Set the extra KEY to VALUE, which is parsed as JSON if possible and used as a string otherwise.'
+)
+@click.option(
+    '-m',
+    '--merge',
+    multiple=True,
+    metavar='KEY=OBJECT',
+    help='Merge the JSON object OBJECT into the dictionary stored in the extra KEY.'
+)
+@click.option('-d', '--delete', 'keys', multiple=True, metavar='KEY', help='Delete the extra KEY, if it exists.')
+@options.FORCE()
+@with_dbenv()
+def node_set_extras(nodes, entry_point, values, merge, keys, force):
+    """Set, merge or delete extras of many nodes at once.
+
+    The nodes are either given by their identifiers or selected by their class with the entry point option, in which
+    case the NODES, if given, are restricted to those of that class. The extras of all nodes are updated with a single
+    database statement, instead of one per node.
+    """
+    from aiida.orm import Node, QueryBuilder
+
+    if not nodes and entry_point is None:
+        echo.echo_critical('specify the NODES to update and/or an entry point to select them')
+
+    if not (values or merge or keys):
+        echo.echo_critical('specify at least one extra to set, merge or delete')
+
+    try:
+        values = dict(parse_extra(value) for value in values)
+        merge = dict(parse_extra(value, require_dict=True) for value in merge)
+    except click.BadParameter as exception:
+        echo.echo_critical(str(exception))
+
+    if nodes:
+        selection = [node.pk for node in nodes if entry_point is None or isinstance(node, entry_point)]
+        count = len(selection)
+    else:
+        selection = QueryBuilder().append(entry_point, project='id')
+        count = selection.count()
+
+    if not count:
+        echo.echo_critical('no matching nodes found')
+
+    if not force:
+        click.confirm(f'Are you sure you want to update the extras of {count} nodes?', abort=True)
+
+    collection = Node.objects  # pylint: disable=no-member
+
+    try:
+        count = collection.set_extras_many(selection, extras=values, keys=keys, merge=merge)
+    except (exceptions.ValidationError, ValueError) as exception:
+        echo.echo_critical(str(exception))
+
+    echo.echo_success(f'updated the extras of {count} nodes')
+
+
 @verdi_node.command()
 @arguments.NODES()
 @click.option('-d', '--depth', 'depth', default=1, help='Show children of nodes up to given depth')
@@ -331,14 +429,39 @@ def node_delete(nodes, dry_run, verbose, force, **kwargs):
     default=None,
     help='Only include nodes that are class or sub class of the class identified by this entry point.'
 )
+@click.option(
+    '-p',
+    '--processes',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of worker processes used to compute the hashes. By default, the number of CPUs is used.'
+)
+@click.option(
+    '-b',
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help='Number of nodes whose hashes are computed and stored together.'
+)
+@click.option(
+    '--resume/--no-resume',
+    default=True,
+    show_default=True,
+    help='Resume from where a previous run for the same entry point was interrupted.'
+)
 @options.FORCE()
 @with_dbenv()
-def rehash(nodes, entry_point, force):
+def rehash(nodes, entry_point, processes, batch_size, resume, force):
     """Recompute the hash for nodes in the database.
 
     The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class.
+    The hashes are computed in parallel and stored in batches. If all nodes of a class are rehashed, the progress is
+    recorded after each batch, such that an interrupted run can be resumed by running the same command again.
     """
-    from aiida.orm import Data, ProcessNode, QueryBuilder
+    import time
+    from aiida.manage.database.rehash import count_nodes, get_rehash_checkpoint, rehash_nodes
+    from aiida.orm import Data, ProcessNode
 
     if not force:
         echo.echo_warning('This command will recompute and overwrite the hashes of all nodes.')
@@ -359,22 +482,78 @@ def rehash(nodes, entry_point, force):
         entry_point = (Data, ProcessNode)
 
     if nodes:
-        to_hash = [(node,) for node in nodes if isinstance(node, entry_point)]
-        num_nodes = len(to_hash)
+        pks = [node.pk for node in nodes if isinstance(node, entry_point)]
+        start = None
     else:
-        builder = QueryBuilder()
-        builder.append(entry_point, tag='node')
-        to_hash = builder.all()
-        num_nodes = builder.count()
+        pks = None
+        start = get_rehash_checkpoint(entry_point) if resume else None
 
-    if not to_hash:
+    num_nodes = count_nodes(entry_point, pks=pks, start=start)
+
+    if not num_nodes:
         echo.echo_critical('no matching nodes found')
 
-    with click.progressbar(to_hash, label='Rehashing Nodes:') as iter_hash:
-        for node, in iter_hash:
-            node.rehash()
+    if start is not None:
+        echo.echo_info(f'resuming from the checkpoint of a previous run, after node with pk {start}')
+
+    time_start = time.monotonic()
+
+    with click.progressbar(length=num_nodes, label='Rehashing Nodes:') as progress:
+        for count in rehash_nodes(entry_point, pks=pks, batch_size=batch_size, max_workers=processes, resume=resume):
+            progress.label = f'Rehashing Nodes ({(progress.pos + count) / (time.monotonic() - time_start):.1f}/s):'
+            progress.update(count)
+
+    duration = time.monotonic() - time_start
+    echo.echo_success(f'{num_nodes} nodes re-hashed in {duration:.1f} seconds ({num_nodes / duration:.1f} nodes/s).')
+
+
+@verdi_node.command('caching-statistics')
+@click.option(
+    '--reset',
+    is_flag=True,
+    help='Delete the recorded statistics after showing them. Processes that are still running will record theirs again.'
+)
+@with_dbenv()
+def caching_statistics(reset):
+    """Show statistics on the effectiveness of caching.
+
+    The statistics are combined over all processes of the profile, including the daemon workers, which record them at
+    the interval set by the `caching.statistics.interval` option. For each process type, or node type for other nodes,
+    the number of cache hits and misses is shown, together with the average time spent on looking up a cache source,
+    computing a hash and storing a node, and the number of repository files that were reused from cache sources.
+    """
+    from aiida.manage.caching_statistics import delete_caching_statistics, load_caching_statistics
+
+    statistics = load_caching_statistics()
+
+    if not statistics:
+        echo.echo_info('no caching statistics have been recorded')
+        return
+
+    def average(total, count):
+        return f'{1000 * total / count:.2f}' if count else '-'
+
+    headers = ['Identifier', 'Hits', 'Misses', 'Hit rate', 'Lookup [ms]', 'Hash [ms]', 'Store [ms]', 'Reused files']
+    table = []
 
-    echo.echo_success(f'{num_nodes} nodes re-hashed.')
+    for identifier, counters in sorted(statistics.items()):
+        lookups = counters['hits'] + counters['misses']
+        table.append([
+            identifier,
+            counters['hits'],
+            counters['misses'],
+            f"{100 * counters['hits'] / lookups:.1f}%" if lookups else '-',
+            average(counters['lookup_time'], lookups),
+            average(counters['hash_time'], counters['hashes']),
+            average(counters['store_time'], counters['stores']),
+            counters['hit_files'],
+        ])
+
+    echo.echo(tabulate.tabulate(table, headers=headers))
+
+    if reset:
+        delete_caching_statistics()
+        echo.echo_success('deleted the recorded caching statistics')
 
 
 @verdi_node.group('graph')
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Dictionaries and lists that share their nested values with another container until these are accessed.
+
+These containers are used to return the attributes and extras of stored entities. Returning a deep copy of a large
+nested value is expensive, even if the caller only reads a few of its items. Instead, `copy_on_write` returns a shallow
+copy of the outermost container only. Nested dictionaries and lists are wrapped in the same way the first time they
+are accessed, such that each container that can be reached through the returned value is owned by the caller and can
+be freely mutated, without ever affecting the original value.
+
+The containers are subclasses of `dict` and `list`, such that they can be used wherever the plain types are expected.
+"""
+import yaml
+
+__all__ = ('CopyOnWriteDict', 'CopyOnWriteList', 'copy_on_write')
+
+
+def copy_on_write(value):
+    """Return a copy of the given value that only copies nested dictionaries and lists when they are accessed.
+
+    :param value: any value, only instances of exactly `dict` and `list` are wrapped
+    :return: a `CopyOnWriteDict` or `CopyOnWriteList` if the value is a dictionary or list, the value itself otherwise
+    """
+    if type(value) is dict:  # pylint: disable=unidiomatic-typecheck
+        return CopyOnWriteDict(value)
+
+    if type(value) is list:  # pylint: disable=unidiomatic-typecheck
+        return CopyOnWriteList(value)
+
+    return value
+
+
+class CopyOnWriteDict(dict):
+    """Dictionary that wraps its nested dictionaries and lists with `copy_on_write` when they are accessed.
+
+    The wrapped value replaces the original one in this dictionary, such that subsequent accesses return the same
+    object and mutations of it are retained.
+    """
+
+    __slots__ = ()
+
+    def _wrap(self, key, value):
+        """Return the wrapped value and store it under the given key if it had to be wrapped."""
+        wrapped = copy_on_write(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def _wrap_all(self):
+        """Wrap all the values of this dictionary."""
+        for key, value in list(dict.items(self)):
+            self._wrap(key, value)
+
+    def __getitem__(self, key):
+        return self._wrap(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # Overriding the iterator forces ``dict(instance)`` and ``{**instance}`` to go through ``__getitem__``, such
+        # that the nested values of the original are never exposed directly.
+        return iter(dict.keys(self))
+
+    def __or__(self, other):
+        merged = dict(self)
+        merged.update(other)
+        return merged
+
+    def __ror__(self, other):
+        merged = dict(other)
+        merged.update(self)
+        return merged
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key, *args):
+        return copy_on_write(dict.pop(self, key, *args))
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        return key, copy_on_write(value)
+
+    def values(self):
+        self._wrap_all()
+        return dict.values(self)
+
+    def items(self):
+        self._wrap_all()
+        return dict.items(self)
+
+    def copy(self):
+        return CopyOnWriteDict(self)
+
+
+class CopyOnWriteList(list):
+    """List that wraps its nested dictionaries and lists with `copy_on_write` when they are accessed.
+
+    The wrapped value replaces the original one in this list, such that subsequent accesses return the same object and
+    mutations of it are retained.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CopyOnWriteList(list.__getitem__(self, index))
+
+        value = list.__getitem__(self, index)
+        wrapped = copy_on_write(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        index = 0
+        while index < len(self):
+            yield self[index]
+            index += 1
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __add__(self, other):
+        return list(self) + other
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __mul__(self, other):
+        return list(self) * other
+
+    __rmul__ = __mul__
+
+    def pop(self, index=-1):
+        return copy_on_write(list.pop(self, index))
+
+    def copy(self):
+        return CopyOnWriteList(self)
+
+
+# Represent the containers as plain mappings and sequences, otherwise ``yaml.dump`` adds python specific tags and
+# ``yaml.safe_dump`` refuses to represent them altogether.
+for _dumper in (yaml.Dumper, yaml.SafeDumper):
+    yaml.add_representer(CopyOnWriteDict, yaml.representer.SafeRepresenter.represent_dict, Dumper=_dumper)
+    yaml.add_representer(CopyOnWriteList, yaml.representer.SafeRepresenter.represent_list, Dumper=_dumper)
@@ -27,6 +27,55 @@ CALC_JOB_DRY_RUN_BASE_PATH = 'submit_test'
 VALID_SECTIONS = ['node']
 
 
+def link_or_copy_file(src, dest):
+    """Create a hardlink at `dest` to the file at `src`, falling back to a copy if linking is not possible.
+
+    Linking fails for example when source and destination are on different file systems.
+
+    :param src: absolute path of the source file
+    :param dest: absolute path of the destination
+    """
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def link_or_copy_tree(src, dest):
+    """Recreate the directory tree at `src` at `dest`, where files are hardlinked instead of copied where possible.
+
+    This makes the copy independent of the size of the files. Files that are hardlinked share their content, so they
+    should be unshared with `unshare_file` before being modified in place.
+
+    :param src: absolute path of the source directory
+    :param dest: absolute path of the destination directory, which should not yet exist
+    """
+    shutil.copytree(src, dest, copy_function=link_or_copy_file)
+
+
+def unshare_file(filepath, keep_content=True):
+    """Replace the file at the given path by a private copy if its content is shared through hardlinks.
+
+    :param filepath: absolute path of the file, which does not have to exist
+    :param keep_content: if False, the shared file is simply removed, which suffices if it is about to be overwritten
+    """
+    try:
+        if os.stat(filepath).st_nlink <= 1:
+            return
+    except FileNotFoundError:
+        return
+
+    if not keep_content:
+        os.remove(filepath)
+        return
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filepath), delete=False) as handle:
+        copy = handle.name
+
+    shutil.copy2(filepath, copy)
+    os.replace(copy, filepath)
+
+
 class Folder:
     """
     A class to manage generic folders, avoiding to get out of
@@ -224,6 +273,8 @@ class Folder:
         if 'b' in mode:
             encoding = None
 
+        unshare_file(filepath, keep_content=False)
+
         with open(filepath, mode=mode, encoding=encoding) as handle:
             shutil.copyfileobj(filelike, handle)
 
@@ -282,7 +333,12 @@ class Folder:
         if 'b' in mode:
             encoding = None
 
-        return open(self.get_abs_path(name, check_existence=check_existence), mode, encoding=encoding)
+        filepath = self.get_abs_path(name, check_existence=check_existence)
+
+        if any(character in mode for character in 'wa+'):
+            unshare_file(filepath, keep_content='w' not in mode)
+
+        return open(filepath, mode, encoding=encoding)
 
     @property
     def abspath(self):
@@ -11,10 +11,13 @@
 import datetime
 import hashlib
 import numbers
+import os
 import random
+import threading
 import time
 import uuid
 from collections import abc, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import singledispatch
 from itertools import chain
 from operator import itemgetter
@@ -39,6 +42,25 @@ HASHING_KEY = 'HashingKey'
 # The key that is used to store the hash in the node extras
 _HASH_EXTRA_KEY = '_aiida_hash'
 
+# The key that is used to store the checksums of the objects in the repository in the node extras
+_CHECKSUMS_EXTRA_KEY = '_aiida_checksums'
+
+# Size in bytes of the chunks in which the content of files is read when computing their digest
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of file content digests that are kept in the cache
+FILE_DIGEST_CACHE_SIZE = 10000
+
+# Coarsest timestamp resolution of the supported file systems in seconds: the digests of files that were modified
+# within this interval of the current time are not cached, since a further write may not change their timestamps
+FILE_TIMESTAMP_RESOLUTION = 2
+
+# Folders with at least this many files have the digests of their files computed by a pool of threads
+FOLDER_HASH_PARALLEL_THRESHOLD = 16
+
+# Maximum number of threads used to compute the digests of files in a folder
+FOLDER_HASH_MAX_WORKERS = 8
+
 ###################################################################
 # THE FOLLOWING WAS TAKEN FROM DJANGO BUT IT CAN BE EASILY REPLACED
 ###################################################################
@@ -257,27 +279,219 @@ def _(folder, **kwargs):
     """
     Hash the content of a Folder object. The name of the folder itself is actually ignored
     :param ignored_folder_content: list of filenames to be ignored for the hashing
+    :param max_workers: maximum number of threads used to compute the digests of the files. By default, a pool of
+        threads is only used for folders with many files. Pass 1 to always compute the digests serially.
     """
 
     ignored_folder_content = kwargs.get('ignored_folder_content', [])
 
     def folder_digests(subfolder):
-        """traverses the given folder and yields digests for the contained objects"""
+        """traverses the given folder and yields digests for the contained objects
+
+        For files, the absolute path is yielded in place of the digest of its content, which is computed afterwards.
+        """
         for name, isfile in sorted(subfolder.get_content_list(only_paths=False), key=itemgetter(0)):
             if name in ignored_folder_content:
                 continue
 
             if isfile:
                 yield _single_digest('fname', name.encode('utf-8'))
-                with subfolder.open(name, mode='rb') as fhandle:
-                    yield _single_digest('fcontent', fhandle.read())
+                yield subfolder.get_abs_path(name)
             else:
                 yield _single_digest('dir(', name.encode('utf-8'))
                 for digest in folder_digests(subfolder.get_subfolder(name)):
                     yield digest
                 yield _END_DIGEST
 
-    return [_single_digest('folder')] + list(folder_digests(folder))
+    digests = list(folder_digests(folder))
+    filepaths = [digest for digest in digests if isinstance(digest, str)]
+    file_digests = dict(zip(filepaths, get_file_digests(filepaths, max_workers=kwargs.get('max_workers', None))))
+
+    return [_single_digest('folder')] + [file_digests.get(digest, digest) for digest in digests]
+
+
+class FolderChecksums:
+    """Listing of the contents of a folder together with the checksums of its files.
+
+    The hash of an instance is identical to that of the `Folder` it describes, but is computed without reading the
+    content of any file. The checksums are the hexadecimal digests as returned by `compute_file_digest`.
+    """
+
+    def __init__(self, checksums):
+        """Construct a new instance.
+
+        :param checksums: dictionary mapping the relative path of each file and directory, using forward slashes as
+            separator, to the checksum of the file or `None` for directories
+        """
+        self.checksums = checksums
+
+    def get_tree(self):
+        """Return the contents as a nested dictionary, where directories are dictionaries and files are checksums.
+
+        :return: nested dictionary of the contents
+        """
+        tree = {}
+
+        for path, checksum in self.checksums.items():
+            *dirnames, name = path.split('/')
+            directory = tree
+
+            for dirname in dirnames:
+                directory = directory.setdefault(dirname, {})
+
+            if checksum is None:
+                directory.setdefault(name, {})
+            else:
+                directory[name] = checksum
+
+        return tree
+
+
+@_make_hash.register(FolderChecksums)
+def _(folder_checksums, **kwargs):
+    """
+    Hash the contents of a folder from the checksums of its files, yielding the same digests as for the Folder object
+    :param ignored_folder_content: list of filenames to be ignored for the hashing
+    """
+
+    ignored_folder_content = kwargs.get('ignored_folder_content', [])
+
+    def folder_digests(directory):
+        """traverses the given nested dictionary and yields digests for the contained objects"""
+        for name, entry in sorted(directory.items(), key=itemgetter(0)):
+            if name in ignored_folder_content:
+                continue
+
+            if isinstance(entry, dict):
+                yield _single_digest('dir(', name.encode('utf-8'))
+                for digest in folder_digests(entry):
+                    yield digest
+                yield _END_DIGEST
+            else:
+                yield _single_digest('fname', name.encode('utf-8'))
+                yield bytes.fromhex(entry)
+
+    return [_single_digest('folder')] + list(folder_digests(folder_checksums.get_tree()))
+
+
+class DigestReader:
+    """Wrapper around a binary filelike object that computes the digest of the content that is read through it.
+
+    The digest is identical to the one returned by `compute_file_digest` for a file with the same content.
+    """
+
+    def __init__(self, handle):
+        self._handle = handle
+        self._digest = get_file_hasher()
+
+    def read(self, size=-1):
+        """Read and return at most `size` bytes from the wrapped handle, updating the digest."""
+        data = self._handle.read(size)
+        self._digest.update(data)
+        return data
+
+    def hexdigest(self):
+        """Return the hexadecimal digest of the content that has been read so far."""
+        return self._digest.hexdigest()
+
+
+class FileDigestCache:
+    """Bounded cache of file content digests, evicting the least recently used entries.
+
+    Files are identified by their device and inode and are considered unchanged as long as their size, modification
+    time and status change time are the same, such that files that have not changed are never read twice. Since moving
+    a file within a file system does not change its inode, this includes files that are moved from a sandbox into the
+    repository.
+
+    A file that is rewritten with the same size within a single tick of the file system clock keeps its timestamps.
+    The digests of files whose timestamps are within `FILE_TIMESTAMP_RESOLUTION` of the current time are therefore
+    computed but not cached.
+    """
+
+    def __init__(self, maxsize=FILE_DIGEST_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_digest(self, filepath):
+        """Return the digest of the content of the file at the given path.
+
+        :param filepath: absolute path of the file
+        :return: the digest as bytes
+        """
+        stat = os.stat(filepath)
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+        with self._lock:
+            try:
+                self._digests.move_to_end(key)
+                return self._digests[key]
+            except KeyError:
+                pass
+
+        digest = compute_file_digest(filepath)
+
+        if time.time() - max(stat.st_mtime, stat.st_ctime) < FILE_TIMESTAMP_RESOLUTION:
+            return digest
+
+        with self._lock:
+            self._digests[key] = digest
+            if len(self._digests) > self._maxsize:
+                self._digests.popitem(last=False)
+
+        return digest
+
+    def clear(self):
+        """Remove all digests from the cache."""
+        with self._lock:
+            self._digests.clear()
+
+
+_FILE_DIGEST_CACHE = FileDigestCache()
+
+
+def get_file_hasher():
+    """Return a new hash object for the content of a file, see `compute_file_digest`."""
+    return hashlib.blake2b(person=b'fcontent', node_depth=0, **BLAKE2B_OPTIONS)
+
+
+def compute_file_digest(filepath):
+    """Compute the digest of the content of the file at the given path, reading it in chunks of bounded size.
+
+    The digest is identical to that of `_single_digest('fcontent', content)`.
+
+    :param filepath: absolute path of the file
+    :return: the digest as bytes
+    """
+    digest = get_file_hasher()
+
+    with open(filepath, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+def get_file_digests(filepaths, max_workers=None):
+    """Return the digests of the content of the files at the given paths, using the cache of file digests.
+
+    :param filepaths: list of absolute file paths
+    :param max_workers: maximum number of threads to use. By default, a pool of threads is used only if the number of
+        files is at least `FOLDER_HASH_PARALLEL_THRESHOLD`.
+    :return: list of digests in the same order as the file paths
+    """
+    if max_workers is None:
+        if len(filepaths) >= FOLDER_HASH_PARALLEL_THRESHOLD:
+            max_workers = min(FOLDER_HASH_MAX_WORKERS, os.cpu_count() or 1)
+        else:
+            max_workers = 1
+
+    if max_workers <= 1 or len(filepaths) <= 1:
+        return [_FILE_DIGEST_CACHE.get_digest(filepath) for filepath in filepaths]
+
+    # Computing the digest releases the GIL for all but the smallest chunks, so threads give a real speedup
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_FILE_DIGEST_CACHE.get_digest, filepaths))
 
 
 def float_to_text(value, sig):
@@ -15,6 +15,7 @@ import keyword
 from enum import Enum
 from collections import namedtuple
 from contextlib import contextmanager, suppress
+from functools import lru_cache
 
 import yaml
 from wrapt import decorator
@@ -35,6 +36,9 @@ class ConfigKeys(Enum):
     DISABLED = 'disabled'
 
 
+# Maximum number of identifiers for which the resolved decision of `get_use_cache` is memoised
+USE_CACHE_MEMO_SIZE = 1024
+
 DEFAULT_CONFIG = {
     ConfigKeys.DEFAULT.value: False,
     ConfigKeys.ENABLED.value: [],
@@ -104,6 +108,12 @@ def configure(config_file=None):
     global _CONFIG
     _CONFIG.clear()
     _CONFIG.update(_get_config(config_file=config_file))
+    _clear_use_cache_memo()
+
+
+def _clear_use_cache_memo():
+    """Clear the memoised decisions of `get_use_cache`, which has to be called whenever the configuration changes."""
+    _get_use_cache.cache_clear()
 
 
 @decorator
@@ -126,9 +136,20 @@ def get_use_cache(*, identifier=None):
     """
     type_check(identifier, str, allow_none=True)
 
-    if identifier is not None:
-        type_check(identifier, str)
+    return _get_use_cache(identifier)
 
+
+@lru_cache(maxsize=USE_CACHE_MEMO_SIZE)
+def _get_use_cache(identifier):
+    """Return whether the caching mechanism should be used for the given process type, see `get_use_cache`.
+
+    The decision for each identifier is memoised, since resolving it requires matching all patterns of the
+    configuration. The memo is cleared by `_clear_use_cache_memo` whenever the configuration changes.
+
+    :param identifier: Process type string of the node
+    :return: boolean, True if caching is enabled, False otherwise
+    """
+    if identifier is not None:
         enable_matches = [
             pattern for pattern in _CONFIG[ConfigKeys.ENABLED.value]
             if _match_wildcard(string=identifier, pattern=pattern)
@@ -182,9 +203,12 @@ def _reset_config():
     # pylint: disable=global-statement
     global _CONFIG
     config_copy = copy.deepcopy(_CONFIG)
-    yield
-    _CONFIG.clear()
-    _CONFIG.update(config_copy)
+    try:
+        yield
+    finally:
+        _CONFIG.clear()
+        _CONFIG.update(config_copy)
+        _clear_use_cache_memo()
 
 
 @contextmanager
@@ -207,6 +231,7 @@ def enable_caching(*, identifier=None):
             _CONFIG[ConfigKeys.ENABLED.value].append(identifier)
             with suppress(ValueError):
                 _CONFIG[ConfigKeys.DISABLED.value].remove(identifier)
+        _clear_use_cache_memo()
         yield
 
 
@@ -230,6 +255,7 @@ def disable_caching(*, identifier=None):
             _CONFIG[ConfigKeys.DISABLED.value].append(identifier)
             with suppress(ValueError):
                 _CONFIG[ConfigKeys.ENABLED.value].remove(identifier)
+        _clear_use_cache_memo()
         yield
 
 
@@ -238,8 +264,13 @@ def _match_wildcard(*, string, pattern):
     Helper function to check whether a given name matches a pattern
     which can contain '*' wildcards.
     """
-    regexp = '.*'.join(re.escape(part) for part in pattern.split('*'))
-    return re.fullmatch(pattern=regexp, string=string) is not None
+    return _compile_wildcard(pattern).fullmatch(string) is not None
+
+
+@lru_cache(maxsize=USE_CACHE_MEMO_SIZE)
+def _compile_wildcard(pattern):
+    """Return the compiled regular expression for a pattern which can contain '*' wildcards."""
+    return re.compile('.*'.join(re.escape(part) for part in pattern.split('*')))
 
 
 def _validate_identifier_pattern(*, identifier):
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Statistics on the effectiveness of the caching mechanism.
+
+Each process collects counters and timers per identifier, which is the process type of a process node or the node type
+of any other node. The statistics of the current process are returned by `get_caching_statistics`. If enabled through
+the `caching.statistics.interval` option, each process also regularly records its statistics in a file in the
+configuration directory, such that the combined statistics of all processes of a profile, including the daemon
+workers, can be retrieved with `load_caching_statistics`. The files are kept until they are deleted with
+`delete_caching_statistics`.
+"""
+import atexit
+import collections
+import json
+import os
+import threading
+import time
+import uuid
+
+__all__ = (
+    'get_caching_statistics', 'reset_caching_statistics', 'flush_caching_statistics', 'load_caching_statistics',
+    'delete_caching_statistics'
+)
+
+# Name of the directory in the configuration directory in which the statistics of the processes are recorded
+CACHING_STATISTICS_DIRNAME = 'caching_statistics'
+
+# Counters that are collected for each identifier, with the durations in seconds
+COUNTERS = (
+    'hashes',  # number of hashes computed
+    'hash_time',  # time spent computing hashes
+    'hits',  # number of cache lookups that found a valid cache source
+    'misses',  # number of cache lookups that did not find a valid cache source
+    'lookup_time',  # time spent looking up cache sources, including the computation of the hash
+    'hit_time',  # time spent storing nodes from a cache source
+    'hit_files',  # number of repository files of the cache sources, as recorded in their checksums
+    'stores',  # number of nodes stored
+    'store_time',  # time spent storing nodes, including the lookup of a cache source
+)
+
+
+class CachingStatistics:
+    """Counters and timers of the caching mechanism, collected per identifier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = collections.defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self._filepath = None
+        self._filepath_pid = None
+        self._interval = None
+        self._last_flush = None
+
+    def record(self, identifier, **increments):
+        """Increment the counters of the given identifier.
+
+        :param identifier: the process type or node type
+        :param increments: the value by which to increment each counter, see `COUNTERS`
+        """
+        with self._lock:
+            counters = self._counters[identifier]
+            for key, value in increments.items():
+                counters[key] += value
+
+        self._flush_if_due()
+
+    def as_dict(self):
+        """Return a copy of the counters.
+
+        :return: dictionary mapping each identifier onto a dictionary of its counters
+        """
+        with self._lock:
+            return {identifier: dict(counters) for identifier, counters in self._counters.items()}
+
+    def reset(self):
+        """Reset all counters to zero."""
+        with self._lock:
+            self._counters.clear()
+
+    def flush(self):
+        """Record the counters in the statistics file of this process, if recording is enabled.
+
+        The file is replaced atomically, such that it can be read while the process is running.
+        """
+        filepath = self._get_filepath()
+
+        if filepath is None:
+            return
+
+        self._last_flush = time.monotonic()
+        content = {'pid': os.getpid(), 'updated': time.time(), 'statistics': self.as_dict()}
+
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(f'{filepath}.tmp', 'w', encoding='utf8') as handle:
+            json.dump(content, handle)
+        os.replace(f'{filepath}.tmp', filepath)
+
+    def _flush_if_due(self):
+        """Record the counters if the configured interval has passed since they were last recorded."""
+        if self._interval is None:
+            self._interval = get_statistics_interval()
+            self._last_flush = time.monotonic()
+
+            if self._interval > 0:
+                atexit.register(self.flush)
+
+        if self._interval > 0 and time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+
+    def _get_filepath(self):
+        """Return the path of the statistics file of this process or None if statistics should not be recorded."""
+        if self._filepath is None or self._filepath_pid != os.getpid():
+            dirpath = get_statistics_dirpath()
+
+            if dirpath is None or get_statistics_interval() <= 0:
+                return None
+
+            # A random identifier is used instead of the process id, which may be reused by another process later on. A
+            # forked process gets a new file, such that it does not overwrite the file of its parent.
+            self._filepath = os.path.join(dirpath, f'{uuid.uuid4().hex}.json')
+            self._filepath_pid = os.getpid()
+
+        return self._filepath
+
+
+_STATISTICS = CachingStatistics()
+
+
+def get_statistics_interval():
+    """Return the interval in seconds at which the statistics are recorded, where zero means they are never recorded."""
+    from aiida.manage.configuration import get_config_option
+    return get_config_option('caching.statistics.interval') or 0
+
+
+def get_statistics_dirpath(profile=None):
+    """Return the absolute path of the directory in which the statistics of the processes of a profile are recorded.
+
+    :param profile: the profile, by default the currently loaded profile
+    :return: the absolute path or None if no profile is loaded
+    """
+    from aiida.common import exceptions
+    from aiida.manage.configuration import get_config, get_profile
+
+    profile = profile or get_profile()
+
+    if profile is None:
+        return None
+
+    try:
+        config = get_config()
+    except exceptions.ConfigurationError:
+        return None
+
+    return os.path.join(config.dirpath, CACHING_STATISTICS_DIRNAME, profile.name)
+
+
+def record_caching_statistics(identifier, **increments):
+    """Increment the caching counters of the given identifier in the current process.
+
+    :param identifier: the process type or node type
+    :param increments: the value by which to increment each counter, see `COUNTERS`
+    """
+    _STATISTICS.record(identifier, **increments)
+
+
+def get_caching_statistics():
+    """Return the caching statistics of the current process.
+
+    :return: dictionary mapping each identifier onto a dictionary of its counters, see `COUNTERS`
+    """
+    return _STATISTICS.as_dict()
+
+
+def reset_caching_statistics():
+    """Reset the caching statistics of the current process."""
+    _STATISTICS.reset()
+
+
+def flush_caching_statistics():
+    """Record the caching statistics of the current process now, instead of waiting for the configured interval."""
+    _STATISTICS.flush()
+
+
+def load_caching_statistics(profile=None):
+    """Return the combined caching statistics recorded by all processes of a profile.
+
+    The statistics of running processes are included up to the last time they were recorded.
+
+    :param profile: the profile, by default the currently loaded profile
+    :return: dictionary mapping each identifier onto a dictionary of its counters, see `COUNTERS`
+    """
+    dirpath = get_statistics_dirpath(profile)
+    combined = {}
+
+    if dirpath is None or not os.path.isdir(dirpath):
+        return combined
+
+    for filename in os.listdir(dirpath):
+        if not filename.endswith('.json'):
+            continue
+
+        try:
+            with open(os.path.join(dirpath, filename), 'r', encoding='utf8') as handle:
+                statistics = json.load(handle)['statistics']
+        except (OSError, ValueError, KeyError):
+            continue
+
+        for identifier, counters in statistics.items():
+            totals = combined.setdefault(identifier, dict.fromkeys(COUNTERS, 0))
+            for key in COUNTERS:
+                totals[key] += counters.get(key, 0)
+
+    return combined
+
+
+def delete_caching_statistics(profile=None):
+    """Delete the caching statistics recorded by all processes of a profile.
+
+    :param profile: the profile, by default the currently loaded profile
+    """
+    dirpath = get_statistics_dirpath(profile)
+
+    if dirpath is None or not os.path.isdir(dirpath):
+        return
+
+    for filename in os.listdir(dirpath):
+        try:
+            os.remove(os.path.join(dirpath, filename))
+        except FileNotFoundError:
+            pass
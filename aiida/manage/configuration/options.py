@@ -65,6 +65,26 @@ CONFIG_OPTIONS = {
         '(1GB) when creating large numbers of database records in one go.',
         'global_only': False,
     },
+    'caching.statistics.interval': {
+        'key': 'caching_statistics_interval',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': 0,
+        'description':
+        'The interval in seconds at which each process records its caching statistics, such that they can be shown by '
+        '`verdi node caching-statistics`. Statistics are not recorded if the value is zero, which is the default.',
+        'global_only': False,
+    },
+    'repository.memory_threshold': {
+        'key': 'repository_memory_threshold',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': 64 * 1024,
+        'description':
+        'Objects smaller than this number of bytes that are written to the repository of an unstored node are kept in '
+        'memory until the node is stored, instead of being written to a sandbox folder. Set to zero to disable.',
+        'global_only': False,
+    },
     'verdi.shell.auto_import': {
         'key': 'verdi_shell_auto_import',
         'valid_type': 'string',
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Functions to build, verify and drop the transitive closure of the provenance graph.
+
+The closure is stored in the `db_dblinkclosure` table, which contains a row for each pair of nodes where the first is
+an ancestor of the second, following `input_calc` and `create` links like the `with_ancestors` and `with_descendants`
+relationships of the `QueryBuilder`. The table is empty unless the closure has been built with :func:`build_closure`,
+which populates it and installs triggers that keep it up to date as links are added or deleted. Once built, queries for
+ancestors and descendants can use it through the `closure` traversal option of :meth:`aiida.orm.QueryBuilder.append`
+instead of walking the graph recursively.
+"""
+from aiida.common import exceptions
+from aiida.common.links import LinkType
+from aiida.manage.manager import get_manager
+
+__all__ = ('build_closure', 'drop_closure', 'get_closure_discrepancies', 'is_closure_enabled', 'verify_closure')
+
+# The closure relies on `INSERT ... ON CONFLICT`, which was introduced in PostgreSQL 9.5
+MINIMUM_SERVER_VERSION = 90500
+
+# The name of the trigger that maintains the closure when links are inserted, whose existence marks the closure as built
+CLOSURE_TRIGGER = 'db_dblink_closure_insert'
+
+CLOSURE_LINK_TYPES = ', '.join(f"'{link_type.value}'" for link_type in (LinkType.CREATE, LinkType.INPUT_CALC))
+
+# Select all pairs of nodes where the first is an ancestor of the second, computed from the links
+SELECT_CLOSURE = f"""
+WITH RECURSIVE closure(ancestor_id, descendant_id) AS (
+    SELECT input_id, output_id FROM db_dblink WHERE type IN ({CLOSURE_LINK_TYPES})
+    UNION
+    SELECT closure.ancestor_id, link.output_id FROM closure
+    JOIN db_dblink AS link ON link.input_id = closure.descendant_id
+    WHERE link.type IN ({CLOSURE_LINK_TYPES})
+)
+SELECT ancestor_id, descendant_id FROM closure
+"""
+
+# When a link is added, all ancestors of its input, including the input itself, become ancestors of all descendants of
+# its output, including the output itself.
+#
+# When a link is deleted, the same pairs are removed and those that are still connected are added back: a pair is still
+# connected if there is another link from a node reachable from the ancestor, that is not among the descendants, to a
+# node that reaches the descendant. The trigger runs before the link is deleted, such that links deleted by the same
+# statement are processed one at a time and the closure is exact for the links that remain at each step.
+CREATE_CLOSURE_TRIGGERS = f"""
+CREATE OR REPLACE FUNCTION db_dblinkclosure_insert_link() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO db_dblinkclosure (ancestor_id, descendant_id)
+    SELECT ancestors.id, descendants.id
+    FROM (
+        SELECT NEW.input_id AS id
+        UNION SELECT ancestor_id FROM db_dblinkclosure WHERE descendant_id = NEW.input_id
+    ) AS ancestors
+    CROSS JOIN (
+        SELECT NEW.output_id AS id
+        UNION SELECT descendant_id FROM db_dblinkclosure WHERE ancestor_id = NEW.output_id
+    ) AS descendants
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION db_dblinkclosure_delete_link() RETURNS TRIGGER AS $$
+BEGIN
+    WITH ancestors AS (
+        SELECT OLD.input_id AS id
+        UNION SELECT ancestor_id FROM db_dblinkclosure WHERE descendant_id = OLD.input_id
+    ), descendants AS (
+        SELECT OLD.output_id AS id
+        UNION SELECT descendant_id FROM db_dblinkclosure WHERE ancestor_id = OLD.output_id
+    )
+    DELETE FROM db_dblinkclosure AS closure USING ancestors, descendants
+    WHERE closure.ancestor_id = ancestors.id AND closure.descendant_id = descendants.id;
+
+    WITH ancestors AS (
+        SELECT OLD.input_id AS id
+        UNION SELECT ancestor_id FROM db_dblinkclosure WHERE descendant_id = OLD.input_id
+    ), descendants AS (
+        SELECT OLD.output_id AS id
+        UNION SELECT descendant_id FROM db_dblinkclosure WHERE ancestor_id = OLD.output_id
+    )
+    INSERT INTO db_dblinkclosure (ancestor_id, descendant_id)
+    SELECT DISTINCT ancestors.id, descendants.id
+    FROM db_dblink AS link
+    JOIN ancestors ON (
+        ancestors.id = link.input_id OR EXISTS (
+            SELECT 1 FROM db_dblinkclosure WHERE ancestor_id = ancestors.id AND descendant_id = link.input_id
+        )
+    )
+    JOIN descendants ON (
+        descendants.id = link.output_id OR EXISTS (
+            SELECT 1 FROM db_dblinkclosure WHERE ancestor_id = link.output_id AND descendant_id = descendants.id
+        )
+    )
+    WHERE link.id <> OLD.id
+    AND link.type IN ({CLOSURE_LINK_TYPES})
+    AND link.output_id IN (SELECT id FROM descendants)
+    AND link.input_id NOT IN (SELECT id FROM descendants)
+    ON CONFLICT DO NOTHING;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION db_dblinkclosure_delete_node() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM db_dblinkclosure WHERE ancestor_id = OLD.id OR descendant_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {CLOSURE_TRIGGER} AFTER INSERT ON db_dblink
+FOR EACH ROW WHEN (NEW.type IN ({CLOSURE_LINK_TYPES})) EXECUTE PROCEDURE db_dblinkclosure_insert_link();
+
+CREATE TRIGGER db_dblink_closure_delete BEFORE DELETE ON db_dblink
+FOR EACH ROW WHEN (OLD.type IN ({CLOSURE_LINK_TYPES})) EXECUTE PROCEDURE db_dblinkclosure_delete_link();
+
+CREATE TRIGGER db_dbnode_closure_delete AFTER DELETE ON db_dbnode
+FOR EACH ROW EXECUTE PROCEDURE db_dblinkclosure_delete_node();
+"""
+
+DROP_CLOSURE_TRIGGERS = f"""
+DROP TRIGGER IF EXISTS {CLOSURE_TRIGGER} ON db_dblink;
+DROP TRIGGER IF EXISTS db_dblink_closure_delete ON db_dblink;
+DROP TRIGGER IF EXISTS db_dbnode_closure_delete ON db_dbnode;
+DROP FUNCTION IF EXISTS db_dblinkclosure_insert_link();
+DROP FUNCTION IF EXISTS db_dblinkclosure_delete_link();
+DROP FUNCTION IF EXISTS db_dblinkclosure_delete_node();
+"""
+
+
+def execute_statements(statements):
+    """Execute the given SQL statements in a single transaction of the session of the current backend.
+
+    :param statements: a string with one or more SQL statements
+    :return: the result of the last statement
+    """
+    session = get_manager().get_backend().get_session()
+
+    try:
+        result = session.execute(statements)
+        rows = result.fetchall() if result.returns_rows else None
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return rows
+
+
+def is_closure_enabled():
+    """Return whether the closure has been built and is maintained by the database.
+
+    :return: boolean, True if the triggers that maintain the closure are installed
+    """
+    query = f"SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{CLOSURE_TRIGGER}')"
+    return execute_statements(query)[0][0]
+
+
+def build_closure():
+    """Populate the closure table from the links in the database and install the triggers that keep it up to date.
+
+    Any existing closure is rebuilt from scratch. Links cannot be added while the closure is being built.
+
+    :return: the number of pairs of ancestors and descendants in the closure
+    :raises `~aiida.common.exceptions.IntegrityError`: if the PostgreSQL server is too old to maintain the closure
+    """
+    server_version = execute_statements('SHOW server_version_num')[0][0]
+
+    if int(server_version) < MINIMUM_SERVER_VERSION:
+        raise exceptions.IntegrityError(
+            f'the closure requires PostgreSQL 9.5 or higher but the server version is {server_version}'
+        )
+
+    return execute_statements(
+        'LOCK TABLE db_dblink IN SHARE ROW EXCLUSIVE MODE;' + DROP_CLOSURE_TRIGGERS +
+        'TRUNCATE db_dblinkclosure;' + CREATE_CLOSURE_TRIGGERS +
+        f'INSERT INTO db_dblinkclosure (ancestor_id, descendant_id) {SELECT_CLOSURE};' +
+        'SELECT COUNT(*) FROM db_dblinkclosure;'
+    )[0][0]
+
+
+def drop_closure():
+    """Remove the triggers that maintain the closure and empty the closure table."""
+    execute_statements(DROP_CLOSURE_TRIGGERS + 'TRUNCATE db_dblinkclosure;')
+
+
+def get_closure_discrepancies():
+    """Compare the closure table with the closure computed from the links in the database.
+
+    :return: tuple with the number of pairs that are missing from the table and the number of pairs in the table that
+        do not correspond to an ancestor and one of its descendants
+    """
+    query = f"""
+        WITH expected AS ({SELECT_CLOSURE})
+        SELECT
+            (SELECT COUNT(*) FROM (
+                SELECT * FROM expected
+                EXCEPT SELECT ancestor_id, descendant_id FROM db_dblinkclosure
+            ) AS missing),
+            (SELECT COUNT(*) FROM (
+                SELECT ancestor_id, descendant_id FROM db_dblinkclosure
+                EXCEPT SELECT * FROM expected
+            ) AS spurious)
+    """
+    missing, spurious = execute_statements(query)[0]
+    return missing, spurious
+
+
+def verify_closure():
+    """Check whether the closure table corresponds to the links in the database.
+
+    :raises `~aiida.common.exceptions.IntegrityError`: if the closure has not been built or is inconsistent
+    """
+    if not is_closure_enabled():
+        raise exceptions.IntegrityError('the closure has not been built: run `verdi database closure build`')
+
+    missing, spurious = get_closure_discrepancies()
+
+    if missing or spurious:
+        raise exceptions.IntegrityError(
+            f'the closure is missing {missing} and contains {spurious} spurious pairs of ancestors and descendants: '
+            'run `verdi database closure build` to rebuild it'
+        )
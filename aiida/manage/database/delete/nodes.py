@@ -8,9 +8,26 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 """Function to delete nodes from the database."""
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import uuid as uuid_module
 
 import click
+
 from aiida.cmdline.utils import echo
+from aiida.common.exceptions import NotExistent
+
+# Key of the setting that records the nodes of a deletion, such that an interrupted deletion can be completed. The ids
+# and UUIDs of the nodes are recorded in separate settings per batch, whose keys start with this key as well.
+DELETE_CHECKPOINT_KEY = 'node|delete|checkpoint'
+DELETE_CHECKPOINT_DESCRIPTION = 'The batches of the nodes of a deletion that has not been completed.'
+DELETE_CHECKPOINT_BATCH_DESCRIPTION = 'The ids and UUIDs of a batch of nodes of a deletion that has not been completed.'
+
+# Number of nodes whose rows are deleted from the database in a single transaction
+DELETE_BATCH_SIZE = 10000
+
+# Maximum number of threads that erase the repository folders of the deleted nodes
+DELETE_MAX_WORKERS = 8
 
 
 def delete_nodes(pks, verbosity=0, dry_run=False, force=False, **kwargs):
@@ -35,6 +52,10 @@ def delete_nodes(pks, verbosity=0, dry_run=False, force=False, **kwargs):
     nodes will be deleted as well, and then any CALC node that may have those as
     inputs, and so on.
 
+    The nodes are deleted in batches, each in its own transaction, after which their files are removed from the
+    repository. The nodes to delete are recorded beforehand, such that if the deletion is interrupted, it is completed
+    by the next call of this function that is not a dry run.
+
     :param pks: a list of the PKs of the nodes to delete
     :param bool force: do not ask for confirmation to delete nodes.
     :param int verbosity: 0 prints nothing,
@@ -50,16 +71,26 @@ def delete_nodes(pks, verbosity=0, dry_run=False, force=False, **kwargs):
         Do not ask for confirmation to delete nodes.
     """
     # pylint: disable=too-many-arguments,too-many-branches,too-many-locals,too-many-statements
-    from aiida.backends.utils import delete_nodes_and_connections
-    from aiida.common import exceptions
-    from aiida.orm import Node, QueryBuilder, load_node
+    from aiida.orm import Node, QueryBuilder
     from aiida.tools.graph.graph_traversers import get_nodes_delete
 
+    checkpoint = get_delete_checkpoint()
+
+    if checkpoint is not None:
+        if dry_run:
+            echo.echo_warning(f'a previous deletion of {checkpoint["count"]} nodes was interrupted')
+        else:
+            echo.echo_warning(f'completing a previous deletion of {checkpoint["count"]} nodes that was interrupted')
+            if not resume_deletion(checkpoint, verbosity=verbosity, force=force):
+                echo.echo('Exiting without deleting')
+                return
+
+    builder = QueryBuilder().append(Node, filters={'id': {'in': pks}}, project='id')
+    existing_pks = set(builder.all(flat=True)) if pks else set()
+
     starting_pks = []
     for pk in pks:
-        try:
-            load_node(pk)
-        except exceptions.NotExistent:
+        if pk not in existing_pks:
             echo.echo_warning(f'warning: node with pk<{pk}> does not exist, skipping')
         else:
             starting_pks.append(pk)
@@ -79,13 +110,8 @@ def delete_nodes(pks, verbosity=0, dry_run=False, force=False, **kwargs):
             )
         )
         if verbosity > 1:
-            builder = QueryBuilder().append(
-                Node, filters={'id': {
-                    'in': pks_set_to_delete
-                }}, project=('uuid', 'id', 'node_type', 'label')
-            )
             echo.echo(f"The nodes I {'would' if dry_run else 'will'} delete:")
-            for uuid, pk, type_string, label in builder.iterall():
+            for uuid, pk, type_string, label in iter_nodes(pks_set_to_delete, ('uuid', 'id', 'node_type', 'label')):
                 try:
                     short_type_string = type_string.split('.')[-2]
                 except IndexError:
@@ -98,29 +124,272 @@ def delete_nodes(pks, verbosity=0, dry_run=False, force=False, **kwargs):
         return
 
     # Asking for user confirmation here
-    if force:
-        pass
-    else:
-        echo.echo_warning(f'YOU ARE ABOUT TO DELETE {len(pks_set_to_delete)} NODES! THIS CANNOT BE UNDONE!')
-        if not click.confirm('Shall I continue?'):
-            echo.echo('Exiting without deleting')
-            return
+    if not force and not confirm_deletion(len(pks_set_to_delete)):
+        echo.echo('Exiting without deleting')
+        return
 
-    # Recover the list of folders to delete before actually deleting the nodes. I will delete the folders only later,
-    # so that if there is a problem during the deletion of the nodes in the DB, I don't delete the folders
-    repositories = [load_node(pk)._repository for pk in pks_set_to_delete]  # pylint: disable=protected-access
+    start_deletion(pks_set_to_delete, rules=kwargs, verbosity=verbosity)
 
-    if verbosity > 0:
-        echo.echo('Starting node deletion...')
-    delete_nodes_and_connections(pks_set_to_delete)
 
-    if verbosity > 0:
-        echo.echo('Nodes deleted from database, deleting files from the repository now...')
+def confirm_deletion(count):
+    """Ask the user to confirm the deletion of the given number of nodes.
+
+    :param count: the number of nodes that will be deleted
+    :return: True if the user confirmed, False otherwise
+    """
+    echo.echo_warning(f'YOU ARE ABOUT TO DELETE {count} NODES! THIS CANNOT BE UNDONE!')
+    return click.confirm('Shall I continue?')
+
+
+def resume_deletion(checkpoint, verbosity=0, force=False):
+    """Complete a deletion that was interrupted.
+
+    The nodes to delete are determined again from the recorded nodes that still exist, with the same traversal rules,
+    since nodes may have been linked to them in the mean time. The files of the recorded nodes that have already been
+    deleted from the database are erased as well.
+
+    :param checkpoint: the checkpoint of the deletion, as returned by `get_delete_checkpoint`
+    :param int verbosity: 0 prints nothing, otherwise the progress is shown
+    :param bool force: do not ask for confirmation to delete nodes
+    :return: False if the user did not confirm the deletion, True otherwise
+    """
+    from aiida.tools.graph.graph_traversers import get_nodes_delete
+
+    recorded = dict(iter_delete_checkpoint(checkpoint))
+    existing_pks = [pk for pk, in iter_nodes(recorded, ('id',))]
+    pks_set_to_delete = get_nodes_delete(existing_pks, **checkpoint['rules'])['nodes'] if existing_pks else set()
+
+    if pks_set_to_delete and not force and not confirm_deletion(len(pks_set_to_delete)):
+        return False
+
+    deleted = {pk: uuid for pk, uuid in recorded.items() if pk not in pks_set_to_delete}
+    start_deletion(pks_set_to_delete, rules=checkpoint['rules'], verbosity=verbosity, deleted=deleted)
 
-    # If we are here, we managed to delete the entries from the DB.
-    # I can now delete the folders
-    for repository in repositories:
-        repository.erase(force=True)
+    return True
+
+
+def start_deletion(pks, rules=None, verbosity=0, deleted=None):
+    """Record the given nodes in the checkpoint and delete them.
+
+    :param pks: collection of the ids of the nodes to delete
+    :param rules: the graph traversal rules with which the nodes were determined, to be recorded in the checkpoint
+    :param int verbosity: 0 prints nothing, otherwise the progress is shown
+    :param deleted: optional dictionary mapping the ids onto the UUIDs of nodes that are no longer in the database, but
+        whose files may still have to be erased from the repository
+    """
+    # Recover the UUIDs, which determine the repository folders, before actually deleting the nodes. The folders of each
+    # batch are deleted only later, so that if there is a problem during the deletion of the nodes in the DB, they are
+    # not deleted.
+    recorded = dict(deleted or {})
+    recorded.update(iter_nodes(pks, ('id', 'uuid')))
+
+    set_delete_checkpoint(list(recorded.keys()), list(recorded.values()), rules)
+    complete_deletion(verbosity=verbosity)
+
+
+def complete_deletion(verbosity=0, max_workers=None):
+    """Delete the nodes recorded in the checkpoint from the database and their files from the repository.
+
+    The nodes are deleted batch by batch, each in its own transaction, after which the files of the batch are erased
+    and the batch is removed from the checkpoint. Finally the checkpoint itself is removed. An interrupted deletion
+    can therefore be completed by calling this function again.
+
+    :param int verbosity: 0 prints nothing, otherwise the progress is shown
+    :param max_workers: the maximum number of threads that erase repository folders
+    """
+    from aiida.backends.utils import delete_nodes_and_connections
+    from aiida.manage.manager import get_manager
+
+    checkpoint = get_delete_checkpoint()
+
+    if checkpoint is None:
+        return
+
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+
+    # `contextlib.suppress` provides an empty context, which can be replaced with `contextlib.nullcontext` after we drop
+    # support for python 3.6
+    progressbar = click.progressbar(length=checkpoint['count'], label='Deleting nodes:')
+
+    with progressbar if verbosity > 0 else contextlib.suppress() as progress:
+        for key, batch in iter_delete_checkpoint_batches(checkpoint):
+            delete_nodes_and_connections(batch['pks'])
+            # If we are here, we managed to delete the entries from the DB. The folders can now be deleted.
+            erase_repositories(batch['uuids'], max_workers=max_workers)
+            settings_manager.delete(key)
+
+            if progress is not None:
+                progress.update(len(batch['pks']))
+
+    delete_delete_checkpoint()
 
     if verbosity > 0:
         echo.echo('Deletion completed.')
+
+
+def iter_nodes(pks, project, batch_size=DELETE_BATCH_SIZE):
+    """Iterate over the projections of the nodes with the given ids that exist, querying them in batches.
+
+    The ids are filtered in batches, such that the size of the query does not grow with the number of nodes.
+
+    :param pks: collection of node ids
+    :param project: the projections of each node, passed to the `QueryBuilder`
+    :param batch_size: the number of nodes that are queried at once
+    :return: generator of the lists of projections of the nodes
+    """
+    from aiida.orm import Node, QueryBuilder
+
+    pks = sorted(pks)
+
+    for index in range(0, len(pks), batch_size):
+        builder = QueryBuilder().append(Node, filters={'id': {'in': pks[index:index + batch_size]}}, project=project)
+        yield from builder.iterall(batch_size=batch_size)
+
+
+def erase_repositories(uuids, max_workers=None):
+    """Erase the repositories of the nodes with the given UUIDs, which should no longer exist in the database.
+
+    The virtual hierarchies of the nodes in the object store are removed in a single transaction. Repository folders
+    that were not migrated to the object store are removed by a pool of threads, since removing them is bound by the
+    file system rather than by the interpreter.
+
+    :param uuids: list of node UUIDs
+    :param max_workers: the maximum number of threads, by default `DELETE_MAX_WORKERS`
+    """
+    from aiida.common.folders import RepositoryFolder
+    from aiida.orm.utils._repository import Repository
+    from aiida.repository.container import get_container
+
+    container = get_container()
+
+    if container is not None:
+        container.delete_hierarchies(uuids)
+
+    def erase_folder(uuid):
+        folder = RepositoryFolder(section=Repository._section_name, uuid=uuid)  # pylint: disable=protected-access
+        if folder.exists():
+            folder.erase()
+
+    with ThreadPoolExecutor(max_workers=max_workers or DELETE_MAX_WORKERS) as executor:
+        for _ in executor.map(erase_folder, uuids):
+            pass
+
+
+def get_delete_checkpoint():
+    """Return the checkpoint of a deletion that was interrupted.
+
+    :return: dictionary with the `count` of the nodes, the `rules` with which they were determined, and the
+        `identifier` and number of `batches` with which the nodes are recorded, or None if there is no checkpoint
+    """
+    from aiida.manage.manager import get_manager
+
+    try:
+        return get_manager().get_backend_manager().get_settings_manager().get(DELETE_CHECKPOINT_KEY).value
+    except NotExistent:
+        return None
+
+
+def iter_delete_checkpoint(checkpoint):
+    """Iterate over the nodes recorded in a checkpoint that have not been deleted yet.
+
+    :param checkpoint: the checkpoint, as returned by `get_delete_checkpoint`
+    :return: generator of tuples of the id and UUID of each node
+    """
+    for _, batch in iter_delete_checkpoint_batches(checkpoint):
+        yield from zip(batch['pks'], batch['uuids'])
+
+
+def iter_delete_checkpoint_batches(checkpoint):
+    """Iterate over the batches of nodes recorded in a checkpoint that have not been deleted yet.
+
+    :param checkpoint: the checkpoint, as returned by `get_delete_checkpoint`
+    :return: generator of tuples of the key of the setting of each batch and the batch, a dictionary with the lists of
+        the `pks` and the `uuids` of its nodes
+    """
+    from aiida.manage.manager import get_manager
+
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+
+    for key in get_delete_checkpoint_batch_keys(checkpoint):
+        try:
+            yield key, settings_manager.get(key).value
+        except NotExistent:
+            continue
+
+
+def get_delete_checkpoint_batch_keys(checkpoint):
+    """Return the keys of the settings that record the batches of nodes of a checkpoint.
+
+    :param checkpoint: the checkpoint, as returned by `get_delete_checkpoint`
+    :return: list of keys
+    """
+    return [f'{DELETE_CHECKPOINT_KEY}|{checkpoint["identifier"]}|{index}' for index in range(checkpoint['batches'])]
+
+
+def set_delete_checkpoint(pks, uuids, rules=None, batch_size=DELETE_BATCH_SIZE):
+    """Record the nodes of a deletion that is about to start, replacing any existing checkpoint.
+
+    The nodes are recorded in a setting per batch, such that no single setting grows with the number of nodes. The
+    batches of a new checkpoint are recorded under a new identifier before the checkpoint itself is replaced, such that
+    an interruption leaves either the existing or the new checkpoint.
+
+    :param pks: list of the ids of the nodes
+    :param uuids: list of the UUIDs of the nodes
+    :param rules: the graph traversal rules with which the nodes were determined
+    :param batch_size: the number of nodes per batch
+    """
+    from aiida.manage.manager import get_manager
+
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+    previous = get_delete_checkpoint()
+    checkpoint = {
+        'identifier': uuid_module.uuid4().hex,
+        'batches': (len(pks) + batch_size - 1) // batch_size,
+        'count': len(pks),
+        'rules': dict(rules or {}),
+    }
+
+    for index, key in enumerate(get_delete_checkpoint_batch_keys(checkpoint)):
+        batch = {
+            'pks': list(pks[index * batch_size:(index + 1) * batch_size]),
+            'uuids': list(uuids[index * batch_size:(index + 1) * batch_size]),
+        }
+        settings_manager.set(key, batch, DELETE_CHECKPOINT_BATCH_DESCRIPTION)
+
+    settings_manager.set(DELETE_CHECKPOINT_KEY, checkpoint, DELETE_CHECKPOINT_DESCRIPTION)
+
+    if previous is not None:
+        delete_delete_checkpoint_batches(previous)
+
+
+def delete_delete_checkpoint():
+    """Delete the checkpoint of an unfinished deletion, if it exists, together with the batches it records."""
+    from aiida.manage.manager import get_manager
+
+    checkpoint = get_delete_checkpoint()
+
+    if checkpoint is None:
+        return
+
+    delete_delete_checkpoint_batches(checkpoint)
+
+    try:
+        get_manager().get_backend_manager().get_settings_manager().delete(DELETE_CHECKPOINT_KEY)
+    except NotExistent:
+        pass
+
+
+def delete_delete_checkpoint_batches(checkpoint):
+    """Delete the settings that record the batches of nodes of a checkpoint, if they exist.
+
+    :param checkpoint: the checkpoint, as returned by `get_delete_checkpoint`
+    """
+    from aiida.manage.manager import get_manager
+
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+
+    for key in get_delete_checkpoint_batch_keys(checkpoint):
+        try:
+            settings_manager.delete(key)
+        except NotExistent:
+            pass
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Functions to recompute the hashes of the nodes in the database."""
+from itertools import chain
+import multiprocessing
+
+from aiida.common.exceptions import NotExistent
+from aiida.common.hashing import _CHECKSUMS_EXTRA_KEY, _HASH_EXTRA_KEY
+
+__all__ = ('rehash_nodes', 'get_rehash_checkpoint', 'delete_rehash_checkpoint')
+
+# Key of the setting that records the id of the last node that was rehashed, such that an interrupted run can resume
+REHASH_CHECKPOINT_KEY = 'node|rehash|checkpoint'
+REHASH_CHECKPOINT_DESCRIPTION = 'The id of the last node whose hash was recomputed by an unfinished rehash.'
+
+# Default number of nodes whose hashes are computed and written to the database together
+REHASH_BATCH_SIZE = 1000
+
+# Number of chunks into which each batch is split per worker process, such that the work is spread evenly
+REHASH_CHUNKS_PER_WORKER = 4
+
+# Database connections inherited by a worker process from its parent, see `initialize_worker`
+_INHERITED_CONNECTIONS = []
+
+
+def get_entry_point_identifier(entry_point):
+    """Return a string that identifies the classes of nodes that are rehashed, to validate the checkpoint.
+
+    :param entry_point: a node class or tuple of node classes
+    :return: string identifier
+    """
+    classes = entry_point if isinstance(entry_point, tuple) else (entry_point,)
+    return ','.join(sorted(f'{cls.__module__}.{cls.__name__}' for cls in classes))
+
+
+def get_rehash_checkpoint(entry_point):
+    """Return the id of the last node that was rehashed by an unfinished run for the given classes of nodes.
+
+    :param entry_point: a node class or tuple of node classes
+    :return: the node id or None if there is no checkpoint for these classes
+    """
+    from aiida.manage.manager import get_manager
+
+    try:
+        checkpoint = get_manager().get_backend_manager().get_settings_manager().get(REHASH_CHECKPOINT_KEY).value
+    except NotExistent:
+        return None
+
+    if checkpoint.get('entry_point') != get_entry_point_identifier(entry_point):
+        return None
+
+    return checkpoint.get('pk', None)
+
+
+def set_rehash_checkpoint(entry_point, pk):
+    """Record the id of the last node that was rehashed for the given classes of nodes.
+
+    :param entry_point: a node class or tuple of node classes
+    :param pk: the node id
+    """
+    from aiida.manage.manager import get_manager
+
+    checkpoint = {'entry_point': get_entry_point_identifier(entry_point), 'pk': pk}
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+    settings_manager.set(REHASH_CHECKPOINT_KEY, checkpoint, REHASH_CHECKPOINT_DESCRIPTION)
+
+
+def delete_rehash_checkpoint():
+    """Delete the checkpoint of an unfinished rehash, if it exists."""
+    from aiida.manage.manager import get_manager
+
+    try:
+        get_manager().get_backend_manager().get_settings_manager().delete(REHASH_CHECKPOINT_KEY)
+    except NotExistent:
+        pass
+
+
+def initialize_worker():
+    """Give a worker process forked from this process its own connections to the database.
+
+    The connections inherited from the parent process are detached, such that new ones are opened upon first use. They
+    are kept referenced rather than closed, since closing them would also terminate them for the parent process.
+    """
+    from aiida.backends import BACKEND_DJANGO
+    from aiida.manage.configuration import get_profile
+
+    # Both backends keep an engine and a session factory of SqlAlchemy, which the Django backend uses for queries only
+    if get_profile().database_backend == BACKEND_DJANGO:
+        from django.db import connections
+        from aiida.backends import djsite as backend_module
+
+        for connection in connections.all():
+            _INHERITED_CONNECTIONS.append(connection.connection)
+            connection.connection = None
+    else:
+        from aiida.backends import sqlalchemy as backend_module
+
+    _INHERITED_CONNECTIONS.extend([backend_module.ENGINE, backend_module.SESSION_FACTORY])
+    backend_module.ENGINE = None
+    backend_module.SESSION_FACTORY = None
+
+
+def compute_hashes(pks):
+    """Return the hashes of the nodes with the given ids and the checksums of their repositories, if not yet recorded.
+
+    The nodes are loaded and their repositories are read in the calling process, which is a worker process when the
+    hashes are computed in parallel. The checksums of the objects in a repository are only computed if they were not
+    recorded for the node, in which case the hash is computed from them without reading the files a second time.
+
+    :param pks: list of node ids
+    :return: list of tuples of the hash and the checksums in the same order as the node ids, where the hash is None if
+        it could not be computed and the checksums are None if they were already recorded or could not be computed
+    """
+    from aiida.orm import Node, QueryBuilder
+
+    builder = QueryBuilder()
+    builder.append(Node, filters={'id': {'in': pks}}, project='*')
+    nodes = {node.pk: node for node, in builder.iterall()}
+    results = []
+
+    for pk in pks:
+        repository = nodes[pk]._repository  # pylint: disable=protected-access
+        checksums = None
+
+        if repository.get_checksums() is None:
+            try:
+                checksums = repository.compute_checksums()
+            except (IOError, OSError):
+                repository.set_checksums(None)
+
+        results.append((nodes[pk].get_hash(), checksums))
+
+    return results
+
+
+def get_node_filters(pks=None, start=None):
+    """Return the query filters for the nodes to rehash.
+
+    :param pks: optional list of node ids to restrict to
+    :param start: optional node id, only nodes with a larger id are included
+    :return: dictionary of filters for the `QueryBuilder`
+    """
+    filters = []
+
+    if start is not None:
+        filters.append({'id': {'>': start}})
+
+    if pks is not None:
+        filters.append({'id': {'in': pks}})
+
+    return {'and': filters} if filters else {}
+
+
+def iter_node_batches(entry_point, pks=None, start=None, batch_size=REHASH_BATCH_SIZE):
+    """Return an iterator over batches of node ids in ascending order, retrieving only one batch at a time.
+
+    :param entry_point: a node class or tuple of node classes
+    :param pks: optional list of node ids to restrict to
+    :param start: optional node id, only nodes with a larger id are returned
+    :param batch_size: the number of node ids in each batch
+    :return: generator of lists of node ids
+    """
+    from aiida.orm import QueryBuilder
+
+    while True:
+        builder = QueryBuilder()
+        builder.append(entry_point, filters=get_node_filters(pks, start), project='id', tag='node')
+        builder.order_by({'node': {'id': 'asc'}}).limit(batch_size)
+        batch = [pk for pk, in builder.iterall()]
+
+        if not batch:
+            return
+
+        yield batch
+        start = batch[-1]
+
+
+def count_nodes(entry_point, pks=None, start=None):
+    """Return the number of nodes that `iter_node_batches` will return.
+
+    :param entry_point: a node class or tuple of node classes
+    :param pks: optional list of node ids to restrict to
+    :param start: optional node id, only nodes with a larger id are counted
+    :return: the number of nodes
+    """
+    from aiida.orm import QueryBuilder
+
+    builder = QueryBuilder()
+    builder.append(entry_point, filters=get_node_filters(pks, start))
+
+    return builder.count()
+
+
+def rehash_nodes(entry_point, pks=None, batch_size=REHASH_BATCH_SIZE, max_workers=None, resume=True):
+    """Recompute and store the hashes of the nodes of the given classes.
+
+    The nodes are processed in batches in order of their id. The ids of each batch are divided over a pool of worker
+    processes, each of which loads its nodes, reads their repositories and computes their hashes. The hashes of the
+    batch are then written to the database in a single statement. The checksums of the objects in the repositories of
+    nodes for which these had not been recorded, for example nodes stored before checksums were recorded at all, are
+    written in a second statement, such that subsequent hashes no longer require reading the files. Unless a list of
+    node ids is given, a checkpoint is recorded after each batch, such that a run that is interrupted resumes from the
+    last completed batch. The checkpoint is removed once all nodes have been rehashed.
+
+    .. note:: the worker processes are forked from this process, such that they inherit the loaded profile.
+
+    :param entry_point: a node class or tuple of node classes
+    :param pks: optional list of node ids to restrict to, in which case no checkpoint is used
+    :param batch_size: the number of nodes that are rehashed together
+    :param max_workers: the number of worker processes, by default the number of CPUs. With a value of one, the hashes
+        are computed in this process.
+    :param resume: boolean, if True, resume from the checkpoint of a previous run for the same classes of nodes
+    :return: generator yielding the number of nodes that were rehashed after each batch
+    :raises ValueError: if the number of worker processes is smaller than one
+    """
+    from aiida.manage.manager import get_manager
+
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f'the number of worker processes should be at least one, got {max_workers}')
+
+    backend = get_manager().get_backend()
+    use_checkpoint = pks is None
+    start = get_rehash_checkpoint(entry_point) if use_checkpoint and resume else None
+    num_workers = max_workers or multiprocessing.cpu_count()
+    pool = multiprocessing.get_context('fork').Pool(num_workers, initialize_worker) if num_workers > 1 else None
+
+    try:
+        for batch in iter_node_batches(entry_point, pks=pks, start=start, batch_size=batch_size):
+            if pool is not None:
+                size = -(-len(batch) // (num_workers * REHASH_CHUNKS_PER_WORKER))
+                chunks = [batch[index:index + size] for index in range(0, len(batch), size)]
+                results = list(chain.from_iterable(pool.imap(compute_hashes, chunks)))
+            else:
+                results = compute_hashes(batch)
+
+            hashes = {pk: node_hash for pk, (node_hash, _) in zip(batch, results)}
+            checksums = {pk: node_checksums for pk, (_, node_checksums) in zip(batch, results) if node_checksums}
+
+            backend.nodes.set_extra_values(_HASH_EXTRA_KEY, hashes)
+            backend.nodes.set_extra_values(_CHECKSUMS_EXTRA_KEY, checksums)
+
+            if use_checkpoint:
+                set_rehash_checkpoint(entry_point, batch[-1])
+
+            yield len(batch)
+
+        if use_checkpoint:
+            delete_rehash_checkpoint()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
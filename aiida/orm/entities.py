@@ -10,11 +10,11 @@
 """Module for all common top level AiiDA entity classes and methods"""
 import typing
 import abc
-import copy
 
 from plumpy.base.utils import super_check, call_with_super_check
 
 from aiida.common import datastructures, exceptions
+from aiida.common.copy_on_write import copy_on_write
 from aiida.common.lang import classproperty, type_check
 from aiida.manage.manager import get_manager
 
@@ -313,17 +313,16 @@ class EntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the attributes on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attributes will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you
-            only need the keys or some values, use the iterators `attributes_keys` and `attributes_items`, or the
-            getters `get_attribute` and `get_attribute_many` instead.
+            attributes will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. The copy is cheap, since nested dictionaries and lists are only copied once they
+            are accessed, see `aiida.common.copy_on_write`.
 
         :return: the attributes as a dictionary
         """
         attributes = self.backend_entity.attributes
 
         if self.is_stored:
-            attributes = copy.deepcopy(attributes)
+            attributes = copy_on_write(attributes)
 
         return attributes
 
@@ -333,8 +332,8 @@ class EntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return a reference of the attribute on the database model,
             meaning that changes on the returned value (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attribute will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods.
+            attribute will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. Nested dictionaries and lists are only copied once they are accessed.
 
         :param key: name of the attribute
         :param default: return this value instead of raising if the attribute does not exist
@@ -349,7 +348,7 @@ class EntityAttributesMixin(abc.ABC):
             attribute = default
 
         if self.is_stored:
-            attribute = copy.deepcopy(attribute)
+            attribute = copy_on_write(attribute)
 
         return attribute
 
@@ -359,10 +358,9 @@ class EntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the attributes on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attributes will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you
-            only need the keys or some values, use the iterators `attributes_keys` and `attributes_items`, or the
-            getters `get_attribute` and `get_attribute_many` instead.
+            attributes will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. The copy is cheap, since nested dictionaries and lists are only copied once they
+            are accessed, see `aiida.common.copy_on_write`.
 
         :param keys: a list of attribute names
         :return: a list of attribute values
@@ -371,7 +369,7 @@ class EntityAttributesMixin(abc.ABC):
         attributes = self.backend_entity.get_attribute_many(keys)
 
         if self.is_stored:
-            attributes = copy.deepcopy(attributes)
+            attributes = copy_on_write(attributes)
 
         return attributes
 
@@ -472,17 +470,16 @@ class EntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the extras on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extras will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you only need the keys
-            or some values, use the iterators `extras_keys` and `extras_items`, or the getters `get_extra` and
-            `get_extra_many` instead.
+            extras will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. The copy is cheap, since nested dictionaries and lists are only copied once they are accessed,
+            see `aiida.common.copy_on_write`.
 
         :return: the extras as a dictionary
         """
         extras = self.backend_entity.extras
 
         if self.is_stored:
-            extras = copy.deepcopy(extras)
+            extras = copy_on_write(extras)
 
         return extras
 
@@ -492,8 +489,8 @@ class EntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return a reference of the extra on the database model,
             meaning that changes on the returned value (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extra will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods.
+            extra will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. Nested dictionaries and lists are only copied once they are accessed.
 
         :param key: name of the extra
         :param default: return this value instead of raising if the attribute does not exist
@@ -508,7 +505,7 @@ class EntityExtrasMixin(abc.ABC):
             extra = default
 
         if self.is_stored:
-            extra = copy.deepcopy(extra)
+            extra = copy_on_write(extra)
 
         return extra
 
@@ -518,10 +515,9 @@ class EntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the extras on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extras will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you only need the keys
-            or some values, use the iterators `extras_keys` and `extras_items`, or the getters `get_extra` and
-            `get_extra_many` instead.
+            extras will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. The copy is cheap, since nested dictionaries and lists are only copied once they are accessed,
+            see `aiida.common.copy_on_write`.
 
         :param keys: a list of extra names
         :return: a list of extra values
@@ -530,7 +526,7 @@ class EntityExtrasMixin(abc.ABC):
         extras = self.backend_entity.get_extra_many(keys)
 
         if self.is_stored:
-            extras = copy.deepcopy(extras)
+            extras = copy_on_write(extras)
 
         return extras
 
@@ -10,6 +10,7 @@
 """AiiDA Group entites"""
 from abc import ABCMeta
 from enum import Enum
+import functools
 import warnings
 
 from aiida.common import exceptions
@@ -24,11 +25,14 @@ from . import users
 __all__ = ('Group', 'GroupTypeString', 'AutoGroup', 'ImportGroup', 'UpfFamily')
 
 
+@functools.lru_cache(maxsize=None)
 def load_group_class(type_string):
     """Load the sub class of `Group` that corresponds to the given `type_string`.
 
     .. note:: will fall back on `aiida.orm.groups.Group` if `type_string` cannot be resolved to loadable entry point.
 
+    The result is cached per type string, see `aiida.plugins.entry_point.clear_entry_point_cache` to clear it.
+
     :param type_string: the entry point name of the `Group` sub class
     :return: sub class of `Group` registered through an entry point
     """
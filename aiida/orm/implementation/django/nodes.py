@@ -11,11 +11,15 @@
 
 # pylint: disable=import-error,no-name-in-module
 from datetime import datetime
+import json
+
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction, IntegrityError
+from django.db import connection, transaction, IntegrityError
 
 from aiida.backends.djsite.db import models
 from aiida.common import exceptions
+from aiida.common.hashing import _HASH_EXTRA_KEY
 from aiida.common.lang import type_check
 from aiida.orm.implementation.utils import clean_value
 
@@ -25,6 +29,14 @@ from . import utils as dj_utils
 from .computers import DjangoComputer
 from .users import DjangoUser
 
+# Statement to set an extra of many nodes at once, with the values of the extra passed as serialized JSON
+SET_EXTRA_VALUES_STATEMENT = """
+UPDATE db_dbnode
+SET extras = jsonb_set(COALESCE(extras, '{}'::jsonb), ARRAY[%s::text], data.value::jsonb)
+FROM unnest(%s::integer[], %s::text[]) AS data(id, value)
+WHERE db_dbnode.id = data.id
+"""
+
 
 class DjangoNode(entities.DjangoModelEntity[models.DbNode], BackendNode):
     """Django Node backend entity"""
@@ -216,6 +228,16 @@ class DjangoNode(entities.DjangoModelEntity[models.DbNode], BackendNode):
 
         return self
 
+    def reset_stored_state(self):
+        """Put the node back in the unstored state, because the transaction in which it was stored is rolled back.
+
+        The values of the fields are kept, such that the node can be stored again.
+        """
+        dbmodel = self.dbmodel
+        dbmodel.pk = None
+        dbmodel._state.adding = True  # pylint: disable=protected-access
+        dbmodel._state.db = None  # pylint: disable=protected-access
+
 
 class DjangoNodeCollection(BackendNodeCollection):
     """The collection of Node entries."""
@@ -241,3 +263,99 @@ class DjangoNodeCollection(BackendNodeCollection):
             models.DbNode.objects.filter(pk=pk).delete()  # pylint: disable=no-member
         except ObjectDoesNotExist:
             raise exceptions.NotExistent(f"Node with pk '{pk}' not found") from ObjectDoesNotExist
+
+    def get_ids_by_hash(self, node_hashes):
+        """Return the ids of the nodes with the given combinations of node type and hash.
+
+        :param node_hashes: iterable of tuples of node type and hash
+        :return: dictionary mapping each tuple of node type and hash that matched onto the list of ids of the nodes with
+            that node type and hash, in ascending order
+        """
+        node_hashes = set(node_hashes)
+
+        if not node_hashes:
+            return {}
+
+        # The `KeyTextTransform` compiles to `extras ->> '_aiida_hash'`, which is the expression of the index
+        node_hash = KeyTextTransform(_HASH_EXTRA_KEY, 'extras')
+        queryset = models.DbNode.objects.annotate(node_hash=node_hash).filter(  # pylint: disable=no-member
+            node_hash__in={value for _, value in node_hashes},
+            node_type__in={node_type for node_type, _ in node_hashes}
+        ).order_by('id').values_list('id', 'node_type', 'node_hash')
+
+        result = {}
+
+        for pk, node_type, value in queryset:
+            if (node_type, value) in node_hashes:
+                result.setdefault((node_type, value), []).append(pk)
+
+        return result
+
+    def set_extra_values(self, key, values):
+        """Set the extra with the given key of many stored nodes, each to its own value, in a single statement.
+
+        :param key: the key of the extra
+        :param values: dictionary mapping the id of each node onto the value of the extra
+        """
+        if not values:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SET_EXTRA_VALUES_STATEMENT,
+                [key, list(values.keys()), [json.dumps(clean_value(value)) for value in values.values()]]
+            )
+
+    def store_many(self, nodes, links=None, with_transaction=True):
+        """Store many unstored nodes, and the links between them, with multi-row insert statements.
+
+        :param nodes: list of unstored `DjangoNode` instances
+        :param links: optional list of tuples of the source node, target node, link type and link label of the links to
+            add, where the target node is one of `nodes` and the source node is either stored or one of `nodes`
+        :param with_transaction: if False, do not use a transaction because the caller will already have opened one.
+        :raise aiida.common.UniquenessError: if one of the links violates a uniqueness constraint
+        """
+        import contextlib
+        from aiida.backends.djsite.db.models import suppress_auto_now
+        from aiida.common import timezone
+        from aiida.manage.configuration import get_config_option
+
+        batch_size = get_config_option('db.batch_size')
+        now = timezone.now()
+
+        for node in nodes:
+            type_check(node, DjangoNode)
+            # Set the modification time explicitly, such that those of imported nodes can be kept, as in `store`
+            node.dbmodel.mtime = node.dbmodel.mtime or now
+
+        with transaction.atomic() if with_transaction else contextlib.suppress():
+            with suppress_auto_now([(models.DbNode, ['mtime'])]):
+                # On PostgreSQL, `bulk_create` sets the primary keys of the model instances, which are needed for links
+                models.DbNode.objects.bulk_create([node.dbmodel for node in nodes], batch_size=batch_size)
+
+            if links:
+                try:
+                    with transaction.atomic():
+                        models.DbLink.objects.bulk_create([
+                            models.DbLink(input_id=source.id, output_id=target.id, label=label, type=link_type.value)
+                            for source, target, link_type, label in links
+                        ], batch_size=batch_size)
+                except IntegrityError as exception:
+                    raise exceptions.UniquenessError(f'failed to create the links: {exception}') from exception
+
+    def set_extras_many(self, nodes, extras=None, keys=None, merge=None):
+        """Apply a patch to the extras of many stored nodes in a single statement.
+
+        The statement is executed through the SqlAlchemy session that is also used by the query builder, such that the
+        nodes can be selected by a subquery.
+
+        :param nodes: a list of node ids or a `QueryBuilder` instance that projects nodes or their ids
+        :param extras: optional dictionary of extras to set, replacing the current values
+        :param keys: optional list of keys of extras to delete, where keys that do not exist are ignored
+        :param merge: optional dictionary of dictionaries to merge into the current values of the extras, where current
+            values that are not dictionaries are replaced
+        :return: the number of nodes that were updated
+        """
+        from aiida.orm.implementation.sql.extras import patch_extras
+        model = models.DbNode.sa  # pylint: disable=no-member
+        return patch_extras(self.backend.get_session(), model, nodes, extras=extras, keys=keys, merge=merge)
@@ -74,6 +74,10 @@ class DjangoQueryBuilder(BackendQueryBuilder):
     def Link(self):
         return models.DbLink.sa
 
+    @property
+    def LinkClosure(self):
+        return models.DbLinkClosure.sa
+
     @property
     def Computer(self):
         return models.DbComputer.sa
@@ -8,6 +8,7 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 """Utilities for the implementation of the Django backend."""
+import json
 
 # pylint: disable=import-error,no-name-in-module
 from django.db import transaction, IntegrityError
@@ -129,6 +130,67 @@ class ModelWrapper:
             except IntegrityError as exception:
                 raise exceptions.IntegrityError(str(exception))
 
+    def _update_json(self, field, values=None, keys=None):
+        """Update top-level keys of a JSON field of the saved model, without rewriting the entire field.
+
+        The keys are deleted with the JSONB `-` operator and the values are merged with the `||` operator, such that the
+        size of the statement scales with the size of the change instead of the size of the field. The `mtime` of the
+        model, if it has one, is updated as well, as it would be by `_flush`.
+
+        :param field: the name of the JSONB model field
+        :param values: optional dictionary with the values of the keys to set, which should already be cleaned
+        :param keys: optional list of keys to delete
+        :return: boolean, False if one of the `keys` does not exist, in which case nothing is changed, True otherwise
+        """
+        from django.db import connection
+        from aiida.common import timezone
+
+        column = f"COALESCE({field}, '{{}}'::jsonb)"
+        conditions = ['id = %s']
+        assignments = []
+        parameters = []
+
+        if keys:
+            column = f'({column} - %s::text[])'
+            conditions.append(f'{field} ?& %s::text[]')
+            parameters.append(list(keys))
+
+        if values:
+            column = f'({column} || %s::jsonb)'
+            parameters.append(json.dumps(values))
+
+        assignments.append(f'{field} = {column}')
+
+        if self._is_model_field('mtime'):
+            mtime = timezone.now()
+            assignments.append('mtime = %s')
+            parameters.append(mtime)
+
+        parameters.append(self._model.pk)
+
+        if keys:
+            parameters.append(list(keys))
+
+        table = self._model._meta.db_table  # pylint: disable=protected-access
+        statement = f"UPDATE {table} SET {', '.join(assignments)} WHERE {' AND '.join(conditions)} RETURNING id"
+
+        with connection.cursor() as cursor:
+            cursor.execute(statement, parameters)
+            if cursor.fetchone() is None:
+                return False
+
+        # Apply the same change to the model instance, which is cheaper than refreshing the entire field
+        current = getattr(self._model, field)
+        if current is not None:
+            for key in keys or ():
+                current.pop(key, None)
+            current.update(values or {})
+
+        if self._is_model_field('mtime'):
+            self._model.mtime = mtime
+
+        return True
+
     def _ensure_model_uptodate(self, fields=None):
         """Refresh all fields of the wrapped model instance by fetching the current state of the database instance.
 
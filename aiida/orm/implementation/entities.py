@@ -77,6 +77,16 @@ class BackendEntity(abc.ABC):
         if self._dbmodel.is_saved():
             self._dbmodel._flush(fields)  # pylint: disable=protected-access
 
+    def _update_json(self, field, values=None, keys=None):
+        """Update top-level keys of a JSON field of the stored entity with a partial update of the field.
+
+        :param field: the name of the JSON field, `attributes` or `extras`
+        :param values: optional dictionary with the values of the keys to set, which should already be cleaned
+        :param keys: optional list of keys to delete
+        :return: boolean, False if one of the `keys` does not exist, in which case nothing is changed, True otherwise
+        """
+        return self._dbmodel._update_json(field, values=values, keys=keys)  # pylint: disable=protected-access
+
 
 class BackendCollection(typing.Generic[EntityType]):
     """Container class that represents a collection of entries of a particular backend entity."""
@@ -128,10 +138,9 @@ class BackendEntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the attributes on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attributes will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you
-            only need the keys or some values, use the iterators `attributes_keys` and `attributes_items`, or the
-            getters `get_attribute` and `get_attribute_many` instead.
+            attributes will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. The copy is cheap, since nested dictionaries and lists are only copied once they
+            are accessed, see `aiida.common.copy_on_write`.
 
         :return: the attributes as a dictionary
         """
@@ -143,8 +152,8 @@ class BackendEntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return a reference of the attribute on the database model,
             meaning that changes on the returned value (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attribute will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods.
+            attribute will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. Nested dictionaries and lists are only copied once they are accessed.
 
         :param key: name of the attribute
         :return: the value of the attribute
@@ -161,10 +170,9 @@ class BackendEntityAttributesMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the attributes on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            attributes will be a deep copy and mutations of the database attributes will have to go through the
-            appropriate set methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you
-            only need the keys or some values, use the iterators `attributes_keys` and `attributes_items`, or the
-            getters `get_attribute` and `get_attribute_many` instead.
+            attributes will be a copy and mutations of the database attributes will have to go through the
+            appropriate set methods. The copy is cheap, since nested dictionaries and lists are only copied once they
+            are accessed, see `aiida.common.copy_on_write`.
 
         :param keys: a list of attribute names
         :return: a list of attribute values
@@ -184,10 +192,10 @@ class BackendEntityAttributesMixin(abc.ABC):
         validate_attribute_extra_key(key)
 
         if self.is_stored:
-            value = clean_value(value)
-
-        self._dbmodel.attributes[key] = value
-        self._flush_if_stored({'attributes'})
+            # Only the changed key is sent to the database, instead of the entire attributes of the entity
+            self._update_json('attributes', values={key: clean_value(value)})
+        else:
+            self._dbmodel.attributes[key] = value
 
     def set_attribute_many(self, attributes):
         """Set multiple attributes.
@@ -200,13 +208,11 @@ class BackendEntityAttributesMixin(abc.ABC):
             validate_attribute_extra_key(key)
 
         if self.is_stored:
-            attributes = {key: clean_value(value) for key, value in attributes.items()}
+            self._update_json('attributes', values={key: clean_value(value) for key, value in attributes.items()})
+            return
 
         for key, value in attributes.items():
-            # We need to use `self.dbmodel` without the underscore, because otherwise the second iteration will refetch
-            # what is in the database and we lose the initial changes.
             self.dbmodel.attributes[key] = value
-        self._flush_if_stored({'attributes'})
 
     def reset_attributes(self, attributes):
         """Reset the attributes.
@@ -231,11 +237,13 @@ class BackendEntityAttributesMixin(abc.ABC):
         :raises AttributeError: if the attribute does not exist
         """
         try:
-            self._dbmodel.attributes.pop(key)
+            if self.is_stored:
+                if not self._update_json('attributes', keys=[key]):
+                    raise KeyError(key)
+            else:
+                self._dbmodel.attributes.pop(key)
         except KeyError as exception:
             raise AttributeError(f'attribute `{exception}` does not exist') from exception
-        else:
-            self._flush_if_stored({'attributes'})
 
     def delete_attribute_many(self, keys):
         """Delete multiple attributes.
@@ -243,6 +251,13 @@ class BackendEntityAttributesMixin(abc.ABC):
         :param keys: names of the attributes to delete
         :raises AttributeError: if at least one of the attribute does not exist
         """
+        keys = list(keys)
+
+        # For a stored entity, the keys are deleted only if they all exist, such that the attributes only need to be
+        # fetched to determine which keys are missing for the error message
+        if self.is_stored and self._update_json('attributes', keys=keys):
+            return
+
         non_existing_keys = [key for key in keys if key not in self._dbmodel.attributes]
 
         if non_existing_keys:
@@ -286,6 +301,10 @@ class BackendEntityAttributesMixin(abc.ABC):
     def _flush_if_stored(self, fields):
         """Flush the fields"""
 
+    @abc.abstractmethod
+    def _update_json(self, field, values=None, keys=None):
+        """Update top-level keys of a JSON field of the stored entity with a partial update of the field."""
+
 
 class BackendEntityExtrasMixin(abc.ABC):
     """Mixin class that adds all methods for the extras column to a backend entity"""
@@ -297,10 +316,9 @@ class BackendEntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the extras on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extras will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you only need the keys
-            or some values, use the iterators `extras_keys` and `extras_items`, or the getters `get_extra` and
-            `get_extra_many` instead.
+            extras will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. The copy is cheap, since nested dictionaries and lists are only copied once they are accessed,
+            see `aiida.common.copy_on_write`.
 
         :return: the extras as a dictionary
         """
@@ -312,8 +330,8 @@ class BackendEntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return a reference of the extra on the database model,
             meaning that changes on the returned value (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extra will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods.
+            extra will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. Nested dictionaries and lists are only copied once they are accessed.
 
         :param key: name of the extra
         :return: the value of the extra
@@ -330,10 +348,9 @@ class BackendEntityExtrasMixin(abc.ABC):
         .. warning:: While the entity is unstored, this will return references of the extras on the database model,
             meaning that changes on the returned values (if they are mutable themselves, e.g. a list or dictionary) will
             automatically be reflected on the database model as well. As soon as the entity is stored, the returned
-            extras will be a deep copy and mutations of the database extras will have to go through the appropriate set
-            methods. Therefore, once stored, retrieving a deep copy can be a heavy operation. If you only need the keys
-            or some values, use the iterators `extras_keys` and `extras_items`, or the getters `get_extra` and
-            `get_extra_many` instead.
+            extras will be a copy and mutations of the database extras will have to go through the appropriate set
+            methods. The copy is cheap, since nested dictionaries and lists are only copied once they are accessed,
+            see `aiida.common.copy_on_write`.
 
         :param keys: a list of extra names
         :return: a list of extra values
@@ -350,10 +367,10 @@ class BackendEntityExtrasMixin(abc.ABC):
         validate_attribute_extra_key(key)
 
         if self.is_stored:
-            value = clean_value(value)
-
-        self._dbmodel.extras[key] = value
-        self._flush_if_stored({'extras'})
+            # Only the changed key is sent to the database, instead of the entire extras of the entity
+            self._update_json('extras', values={key: clean_value(value)})
+        else:
+            self._dbmodel.extras[key] = value
 
     def set_extra_many(self, extras):
         """Set multiple extras.
@@ -366,13 +383,12 @@ class BackendEntityExtrasMixin(abc.ABC):
             validate_attribute_extra_key(key)
 
         if self.is_stored:
-            extras = {key: clean_value(value) for key, value in extras.items()}
+            self._update_json('extras', values={key: clean_value(value) for key, value in extras.items()})
+            return
 
         for key, value in extras.items():
             self.dbmodel.extras[key] = value
 
-        self._flush_if_stored({'extras'})
-
     def reset_extras(self, extras):
         """Reset the extras.
 
@@ -396,11 +412,13 @@ class BackendEntityExtrasMixin(abc.ABC):
         :raises AttributeError: if the extra does not exist
         """
         try:
-            self._dbmodel.extras.pop(key)
+            if self.is_stored:
+                if not self._update_json('extras', keys=[key]):
+                    raise KeyError(key)
+            else:
+                self._dbmodel.extras.pop(key)
         except KeyError as exception:
             raise AttributeError(f'extra `{exception}` does not exist') from exception
-        else:
-            self._flush_if_stored({'extras'})
 
     def delete_extra_many(self, keys):
         """Delete multiple extras.
@@ -408,6 +426,13 @@ class BackendEntityExtrasMixin(abc.ABC):
         :param keys: names of the extras to delete
         :raises AttributeError: if at least one of the extra does not exist
         """
+        keys = list(keys)
+
+        # For a stored entity, the keys are deleted only if they all exist, such that the extras only need to be
+        # fetched to determine which keys are missing for the error message
+        if self.is_stored and self._update_json('extras', keys=keys):
+            return
+
         non_existing_keys = [key for key in keys if key not in self._dbmodel.extras]
 
         if non_existing_keys:
@@ -450,3 +475,7 @@ class BackendEntityExtrasMixin(abc.ABC):
     @abc.abstractmethod
     def _flush_if_stored(self, fields):
         """Flush the fields"""
+
+    @abc.abstractmethod
+    def _update_json(self, field, values=None, keys=None):
+        """Update top-level keys of a JSON field of the stored entity with a partial update of the field."""
@@ -165,6 +165,14 @@ class BackendNode(BackendEntity, BackendEntityExtrasMixin, BackendEntityAttribut
         :param clean: boolean, if True, will clean the attributes and extras before attempting to store
         """
 
+    @abc.abstractmethod
+    def reset_stored_state(self):
+        """Put the node back in the unstored state, because the transaction in which it was stored is rolled back.
+
+        This should be called before the transaction is rolled back. The values of the fields are kept, such that the
+        node can be stored again.
+        """
+
 
 class BackendNodeCollection(BackendCollection[BackendNode]):
     """The collection of `BackendNode` entries."""
@@ -184,3 +192,57 @@ class BackendNodeCollection(BackendCollection[BackendNode]):
 
         :param pk: id of the node to delete
         """
+
+    @abc.abstractmethod
+    def get_ids_by_hash(self, node_hashes):
+        """Return the ids of the nodes with the given combinations of node type and hash.
+
+        Only the ids are projected and the hash is matched through the expression index on the hash in the extras, such
+        that the hashes of many nodes can be resolved in a single query.
+
+        :param node_hashes: iterable of tuples of node type and hash
+        :return: dictionary mapping each tuple of node type and hash that matched onto the list of ids of the nodes with
+            that node type and hash, in ascending order
+        """
+
+    @abc.abstractmethod
+    def set_extra_values(self, key, values):
+        """Set the extra with the given key of many stored nodes, each to its own value, in a single statement.
+
+        .. note:: the change is written directly to the database, so instances of the nodes that have already been
+            loaded will not reflect the new values.
+
+        :param key: the key of the extra
+        :param values: dictionary mapping the id of each node onto the value of the extra
+        """
+
+    @abc.abstractmethod
+    def store_many(self, nodes, links=None, with_transaction=True):
+        """Store many unstored nodes, and the links between them, with multi-row insert statements.
+
+        The values of the nodes are stored as they are: they are not cleaned first.
+
+        :param nodes: list of unstored `BackendNode` instances
+        :param links: optional list of tuples of the source node, target node, link type and link label of the links to
+            add, where the target node is one of `nodes` and the source node is either stored or one of `nodes`
+        :param with_transaction: if False, do not use a transaction because the caller will already have opened one.
+        :raise aiida.common.UniquenessError: if one of the links violates a uniqueness constraint
+        """
+
+    @abc.abstractmethod
+    def set_extras_many(self, nodes, extras=None, keys=None, merge=None):
+        """Apply a patch to the extras of many stored nodes in a single statement.
+
+        The keys are deleted first, after which the extras are set and finally the dictionaries are merged. The values
+        should already be cleaned and the keys to set, delete and merge should not overlap.
+
+        .. note:: the change is written directly to the database, so instances of the nodes that have already been
+            loaded will not reflect the new values.
+
+        :param nodes: a list of node ids or a `QueryBuilder` instance that projects nodes or their ids
+        :param extras: optional dictionary of extras to set, replacing the current values
+        :param keys: optional list of keys of extras to delete, where keys that do not exist are ignored
+        :param merge: optional dictionary of dictionaries to merge into the current values of the extras, where current
+            values that are not dictionaries are replaced
+        :return: the number of nodes that were updated
+        """
@@ -62,6 +62,12 @@ class BackendQueryBuilder:
         A property, decorated with @property. Returns the implementation for the DbLink
         """
 
+    @abc.abstractproperty
+    def LinkClosure(self):
+        """
+        A property, decorated with @property. Returns the implementation for the DbLinkClosure
+        """
+
     @abc.abstractproperty
     def Computer(self):
         """
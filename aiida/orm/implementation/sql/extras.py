@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Set-based updates of the extras of many entities, shared by the SQL backends.
+
+Both backends expose their tables through SqlAlchemy models, which are also used by their query builders, such that the
+entities to update can be selected by a subquery generated from a `QueryBuilder`.
+"""
+import json
+
+# pylint: disable=import-error,no-name-in-module
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
+
+from aiida.common import timezone
+
+# Expression for the extras of an entity after applying a patch, which deletes keys, sets extras and merges dictionaries
+PATCH_EXTRAS_EXPRESSION = """
+(COALESCE(extras, CAST('{}' AS jsonb)) - CAST(:patch_keys AS text[])) || CAST(:patch_extras AS jsonb) || COALESCE((
+    SELECT jsonb_object_agg(patch.key, CASE
+        WHEN jsonb_typeof(extras -> patch.key) = 'object' THEN (extras -> patch.key) || patch.value
+        ELSE patch.value
+    END)
+    FROM jsonb_each(CAST(:patch_merge AS jsonb)) AS patch
+), CAST('{}' AS jsonb))
+"""
+
+
+def get_ids_query(querybuilder, model):
+    """Return a query for the ids of the entities projected by a query builder, such that it can be used as subquery.
+
+    :param querybuilder: a `QueryBuilder` instance that projects a single entity of the given model, or its id
+    :param model: the SqlAlchemy model class of the projected entity
+    :return: a SqlAlchemy `Query` instance that selects the ids of the projected entities
+    :raise ValueError: if the query builder does not project a single entity of the given model, or its id
+    """
+    from sqlalchemy import inspect
+
+    query = querybuilder.get_query()
+    descriptions = query.column_descriptions
+    entity = descriptions[0]['entity'] if len(descriptions) == 1 else None
+
+    if entity is None or inspect(entity).mapper.class_ is not model:
+        raise ValueError(f'the query builder should project a single `{model.__name__}` entity or its id')
+
+    return query.with_entities(entity.id)
+
+
+def patch_extras(session, model, entities, extras=None, keys=None, merge=None):
+    """Apply a patch to the extras of many stored entities in a single statement and commit it.
+
+    The keys are deleted first, after which the extras are set and finally the dictionaries are merged. The values
+    should already be cleaned and the keys to set, delete and merge should not overlap.
+
+    :param session: the SqlAlchemy session in which to execute the statement
+    :param model: the SqlAlchemy model class of the entities, whose table should have an `extras` column
+    :param entities: a list of entity ids or a `QueryBuilder` instance that projects the entities or their ids
+    :param extras: optional dictionary of extras to set, replacing the current values
+    :param keys: optional list of keys of extras to delete, where keys that do not exist are ignored
+    :param merge: optional dictionary of dictionaries to merge into the current values of the extras, where current
+        values that are not dictionaries are replaced
+    :return: the number of entities that were updated
+    """
+    from aiida.orm import QueryBuilder
+
+    table = model.__table__
+
+    if isinstance(entities, QueryBuilder):
+        condition = table.c.id.in_(get_ids_query(entities, model).subquery())
+    else:
+        condition = text(f'{table.name}.id = ANY(CAST(:patch_ids AS integer[]))').bindparams(patch_ids=list(entities))
+
+    values = {
+        'extras':
+        text(PATCH_EXTRAS_EXPRESSION).bindparams(
+            patch_keys=list(keys or []), patch_extras=json.dumps(extras or {}), patch_merge=json.dumps(merge or {})
+        )
+    }
+
+    if 'mtime' in table.c:
+        values['mtime'] = timezone.now()
+
+    try:
+        result = session.execute(table.update().where(condition).values(**values))
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        raise
+
+    return result.rowcount
@@ -11,12 +11,16 @@
 
 # pylint: disable=no-name-in-module,import-error
 from datetime import datetime
+import json
+
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
 
 from aiida.backends.sqlalchemy import get_scoped_session
 from aiida.backends.sqlalchemy.models import node as models
 from aiida.common import exceptions
+from aiida.common.hashing import _HASH_EXTRA_KEY
 from aiida.common.lang import type_check
 from aiida.orm.implementation.utils import clean_value
 
@@ -26,6 +30,14 @@ from . import utils as sqla_utils
 from .computers import SqlaComputer
 from .users import SqlaUser
 
+# Statement to set an extra of many nodes at once, with the values of the extra passed as serialized JSON
+SET_EXTRA_VALUES_STATEMENT = """
+UPDATE db_dbnode
+SET extras = jsonb_set(COALESCE(extras, CAST('{}' AS jsonb)), ARRAY[CAST(:key AS text)], CAST(data.value AS jsonb))
+FROM unnest(CAST(:ids AS integer[]), CAST(:values AS text[])) AS data(id, value)
+WHERE db_dbnode.id = data.id
+"""
+
 
 class SqlaNode(entities.SqlaModelEntity[models.DbNode], BackendNode):
     """SQLA Node backend entity"""
@@ -219,6 +231,23 @@ class SqlaNode(entities.SqlaModelEntity[models.DbNode], BackendNode):
 
         return self
 
+    def reset_stored_state(self):
+        """Put the node back in the unstored state, because the transaction in which it was stored is rolled back.
+
+        This should be called before the transaction is rolled back, since that expires the model instances in the
+        session. The values of the fields are kept, such that the node can be stored again.
+        """
+        from sqlalchemy.orm import make_transient
+
+        session = get_scoped_session()
+        dbmodel = self.dbmodel
+
+        if dbmodel in session:
+            session.expunge(dbmodel)
+
+        make_transient(dbmodel)
+        dbmodel.id = None
+
 
 class SqlaNodeCollection(BackendNodeCollection):
     """The collection of Node entries."""
@@ -249,3 +278,148 @@ class SqlaNodeCollection(BackendNodeCollection):
             session.commit()
         except NoResultFound:
             raise exceptions.NotExistent(f"Node with pk '{pk}' not found") from NoResultFound
+
+    def get_ids_by_hash(self, node_hashes):
+        """Return the ids of the nodes with the given combinations of node type and hash.
+
+        :param node_hashes: iterable of tuples of node type and hash
+        :return: dictionary mapping each tuple of node type and hash that matched onto the list of ids of the nodes with
+            that node type and hash, in ascending order
+        """
+        node_hashes = set(node_hashes)
+
+        if not node_hashes:
+            return {}
+
+        session = get_scoped_session()
+        node_hash = models.DbNode.extras[_HASH_EXTRA_KEY].astext
+        query = session.query(models.DbNode.id, models.DbNode.node_type, node_hash).filter(
+            node_hash.in_({value for _, value in node_hashes}),
+            models.DbNode.node_type.in_({node_type for node_type, _ in node_hashes})
+        ).order_by(models.DbNode.id)
+
+        result = {}
+
+        for pk, node_type, value in query:
+            if (node_type, value) in node_hashes:
+                result.setdefault((node_type, value), []).append(pk)
+
+        return result
+
+    def set_extra_values(self, key, values):
+        """Set the extra with the given key of many stored nodes, each to its own value, in a single statement.
+
+        :param key: the key of the extra
+        :param values: dictionary mapping the id of each node onto the value of the extra
+        """
+        if not values:
+            return
+
+        session = get_scoped_session()
+        statement = text(SET_EXTRA_VALUES_STATEMENT)
+        session.execute(
+            statement, {
+                'key': key,
+                'ids': list(values.keys()),
+                'values': [json.dumps(clean_value(value)) for value in values.values()]
+            }
+        )
+        session.commit()
+
+    def store_many(self, nodes, links=None, with_transaction=True):
+        """Store many unstored nodes, and the links between them, with multi-row insert statements.
+
+        The rows are inserted through the core API, after which the model instances are attached to the session as if
+        they had been loaded from the database.
+
+        :param nodes: list of unstored `SqlaNode` instances
+        :param links: optional list of tuples of the source node, target node, link type and link label of the links to
+            add, where the target node is one of `nodes` and the source node is either stored or one of `nodes`
+        :param with_transaction: if False, do not use a transaction because the caller will already have opened one.
+        :raise aiida.common.UniquenessError: if one of the links violates a uniqueness constraint
+        """
+        from sqlalchemy import insert
+        from sqlalchemy.exc import IntegrityError
+        from sqlalchemy.orm import make_transient_to_detached
+        from aiida.common import timezone
+        from aiida.manage.configuration import get_config_option
+
+        session = get_scoped_session()
+        batch_size = get_config_option('db.batch_size')
+        table = models.DbNode.__table__
+        now = timezone.now()
+        rows = []
+
+        for node in nodes:
+            type_check(node, SqlaNode)
+            dbmodel = node.dbmodel
+
+            # Make sure the session does not flush the model instance itself, when executing the insert statements
+            if dbmodel in session:
+                session.expunge(dbmodel)
+
+            rows.append({
+                'uuid': dbmodel.uuid,
+                'node_type': dbmodel.node_type,
+                'process_type': dbmodel.process_type,
+                'label': dbmodel.label,
+                'description': dbmodel.description,
+                'ctime': dbmodel.ctime,
+                'mtime': dbmodel.mtime or now,
+                'attributes': dbmodel.attributes,
+                'extras': dbmodel.extras,
+                'dbcomputer_id': dbmodel.dbcomputer.id if dbmodel.dbcomputer is not None else None,
+                'user_id': dbmodel.user.id,
+            })
+
+        ids = {}
+
+        try:
+            for index in range(0, len(rows), batch_size):
+                statement = insert(table).values(rows[index:index + batch_size]).returning(table.c.uuid, table.c.id)
+                ids.update((str(uuid), pk) for uuid, pk in session.execute(statement))
+
+            def get_id(node):
+                return node.id if node.is_stored else ids[str(node.dbmodel.uuid)]
+
+            if links:
+                values = [{
+                    'input_id': get_id(source),
+                    'output_id': get_id(target),
+                    'label': label,
+                    'type': link_type.value
+                } for source, target, link_type, label in links]
+
+                try:
+                    with session.begin_nested():
+                        for index in range(0, len(values), batch_size):
+                            session.execute(insert(models.DbLink.__table__).values(values[index:index + batch_size]))
+                except IntegrityError as exception:
+                    raise exceptions.UniquenessError(f'failed to create the links: {exception}') from exception
+
+            if with_transaction:
+                session.commit()
+        except Exception:
+            if with_transaction:
+                session.rollback()
+            raise
+
+        for node, row in zip(nodes, rows):
+            dbmodel = node.dbmodel
+            dbmodel.id = ids[str(dbmodel.uuid)]
+            dbmodel.mtime = row['mtime']
+            make_transient_to_detached(dbmodel)
+            session.add(dbmodel)
+
+    def set_extras_many(self, nodes, extras=None, keys=None, merge=None):
+        """Apply a patch to the extras of many stored nodes in a single statement.
+
+        :param nodes: a list of node ids or a `QueryBuilder` instance that projects nodes or their ids
+        :param extras: optional dictionary of extras to set, replacing the current values
+        :param keys: optional list of keys of extras to delete, where keys that do not exist are ignored
+        :param merge: optional dictionary of dictionaries to merge into the current values of the extras, where current
+            values that are not dictionaries are replaced
+        :return: the number of nodes that were updated
+        """
+        from aiida.orm.implementation.sql.extras import patch_extras
+        return patch_extras(get_scoped_session(), models.DbNode, nodes, extras=extras, keys=keys, merge=merge)
@@ -83,6 +83,11 @@ class SqlaQueryBuilder(BackendQueryBuilder):
         import aiida.backends.sqlalchemy.models.node
         return aiida.backends.sqlalchemy.models.node.DbLink
 
+    @property
+    def LinkClosure(self):
+        import aiida.backends.sqlalchemy.models.node
+        return aiida.backends.sqlalchemy.models.node.DbLinkClosure
+
     @property
     def Computer(self):
         import aiida.backends.sqlalchemy.models.computer
@@ -10,6 +10,7 @@
 """Utilities for the implementation of the SqlAlchemy backend."""
 
 import contextlib
+import json
 
 # pylint: disable=import-error,no-name-in-module
 from sqlalchemy import inspect
@@ -130,6 +131,58 @@ class ModelWrapper:
 
             self.save()
 
+    def _update_json(self, field, values=None, keys=None):
+        """Update top-level keys of a JSON field of the saved model, without rewriting the entire field.
+
+        The keys are deleted with the JSONB `-` operator and the values are merged with the `||` operator, such that the
+        size of the statement scales with the size of the change instead of the size of the field. The `mtime` of the
+        model, if it has one, is updated as well, as it would be by `_flush`.
+
+        .. note:: If one is currently in a transaction, the change is not committed.
+
+        :param field: the name of the JSONB model field
+        :param values: optional dictionary with the values of the keys to set, which should already be cleaned
+        :param keys: optional list of keys to delete
+        :return: boolean, False if one of the `keys` does not exist, in which case nothing is changed, True otherwise
+        """
+        from sqlalchemy.sql import text
+        from aiida.common import timezone
+
+        session = get_scoped_session()
+        column = f"COALESCE({field}, CAST('{{}}' AS jsonb))"
+        conditions = ['id = :id']
+        assignments = []
+        parameters = {'id': self._model.id}
+
+        if keys:
+            column = f'({column} - CAST(:keys AS text[]))'
+            conditions.append(f'{field} ?& CAST(:keys AS text[])')
+            parameters['keys'] = list(keys)
+
+        if values:
+            column = f'({column} || CAST(:values AS jsonb))'
+            parameters['values'] = json.dumps(values)
+
+        assignments.append(f'{field} = {column}')
+
+        if self._is_model_field('mtime'):
+            assignments.append('mtime = :mtime')
+            parameters['mtime'] = timezone.now()
+
+        table = self._model.__table__.name
+        statement = f"UPDATE {table} SET {', '.join(assignments)} WHERE {' AND '.join(conditions)} RETURNING id"
+
+        if session.execute(text(statement), parameters).first() is None:
+            return False
+
+        if not self._in_transaction():
+            session.commit()
+
+        # The field has been changed in the database directly, so the loaded value of the model instance is outdated
+        session.expire(self._model, attribute_names=[name for name in (field, 'mtime') if self._is_model_field(name)])
+
+        return True
+
     def _ensure_model_uptodate(self, fields=None):
         """Refresh all fields of the wrapped model instance by fetching the current state of the database instance.
 
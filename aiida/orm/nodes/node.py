@@ -9,15 +9,20 @@
 ###########################################################################
 # pylint: disable=too-many-lines,too-many-arguments
 """Package for node ORM classes."""
+import collections
+import contextlib
 import importlib
+from itertools import chain
+import time
 import warnings
 
 from aiida.common import exceptions
 from aiida.common.escaping import sql_string_match
-from aiida.common.hashing import make_hash, _HASH_EXTRA_KEY
+from aiida.common.hashing import make_hash, _CHECKSUMS_EXTRA_KEY, _HASH_EXTRA_KEY
 from aiida.common.lang import classproperty, type_check
 from aiida.common.links import LinkType
 from aiida.common.warnings import AiidaDeprecationWarning
+from aiida.manage.caching_statistics import record_caching_statistics
 from aiida.manage.manager import get_manager
 from aiida.orm.utils.links import LinkManager, LinkTriple
 from aiida.orm.utils._repository import Repository
@@ -31,7 +36,7 @@ from ..entities import Collection as EntityCollection
 from ..querybuilder import QueryBuilder
 from ..users import User
 
-__all__ = ('Node',)
+__all__ = ('Node', 'store_many')
 
 _NO_DEFAULT = tuple()
 
@@ -123,6 +128,79 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             self._backend.nodes.delete(node_id)
             repository.erase(force=True)
 
+        def get_same_nodes(self, nodes):
+            """Return for each of the given nodes a stored node from which it can be cached.
+
+            This is the batched equivalent of `Node._get_same_node`: the hashes of all nodes are resolved in a single
+            query and the first candidate of each node is loaded in a single query. Further candidates are only loaded
+            if the first one is not a valid cache.
+
+            .. note:: just as when storing a node, the values of unstored nodes are cleaned before computing the hash.
+
+            :param nodes: list of nodes
+            :return: list with for each node a stored node with the same hash that is a valid cache, or None
+            """
+            # pylint: disable=protected-access
+            node_hashes = []
+
+            for node in nodes:
+                if not node.is_stored:
+                    node._backend_entity.clean_values()
+
+                node_hash = node._get_hash() if node._cachable else None
+                node_hashes.append((node.node_type, node_hash) if node_hash else None)
+
+            matches = self._backend.nodes.get_ids_by_hash(key for key in node_hashes if key is not None)
+            candidates = Node._load_nodes([pks[0] for pks in matches.values()])
+            same_nodes = []
+
+            for key in node_hashes:
+                pks = matches.get(key, [])
+                nodes_identical = chain([candidates[pks[0]]] if pks else [], Node._iter_nodes(pks[1:]))
+                same_nodes.append(next((node for node in nodes_identical if node.is_valid_cache), None))
+
+            return same_nodes
+
+        def set_extras_many(self, nodes, extras=None, keys=None, merge=None):
+            """Apply a patch to the extras of many stored nodes, with a single statement instead of one per node.
+
+            The keys are deleted first, after which the extras are set and finally the dictionaries are merged.
+
+            .. note:: the change is written directly to the database, so instances of the nodes that have already been
+                loaded will not reflect the new values.
+
+            :param nodes: a `QueryBuilder` instance that projects nodes or their ids, or an iterable of nodes or ids
+            :param extras: optional dictionary of extras to set, replacing the current values
+            :param keys: optional list of keys of extras to delete, where keys that do not exist are ignored
+            :param merge: optional dictionary of dictionaries to merge into the current values of the extras, where
+                current values that are not dictionaries are replaced
+            :return: the number of nodes that were updated
+            :raise aiida.common.ValidationError: if one of the keys or values is invalid
+            :raise ValueError: if a key is both deleted, set and/or merged
+            """
+            from aiida.orm.implementation.utils import clean_value, validate_attribute_extra_key
+
+            extras = clean_value(dict(extras or {}))
+            merge = clean_value(dict(merge or {}))
+            keys = list(keys or [])
+
+            for key in chain(extras, merge):
+                validate_attribute_extra_key(key)
+
+            for key, value in merge.items():
+                if not isinstance(value, dict):
+                    raise exceptions.ValidationError(f'the value to merge into extra `{key}` is not a dictionary')
+
+            overlapping = (set(extras) & set(merge)) | (set(keys) & (set(extras) | set(merge)))
+
+            if overlapping:
+                raise ValueError(f"keys `{', '.join(sorted(overlapping))}` can only be either deleted, set or merged")
+
+            if not isinstance(nodes, QueryBuilder):
+                nodes = [node.pk if isinstance(node, Node) else node for node in nodes]
+
+            return self._backend.nodes.set_extras_many(nodes, extras=extras, keys=keys, merge=merge)
+
     # This will be set by the metaclass call
     _logger = None
 
@@ -200,6 +278,9 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
         # Calls the initialisation from the RepositoryMixin
         self._repository = Repository(uuid=self.uuid, is_stored=self.is_stored, base_path=self._repository_base_path)
 
+        if self.is_stored:
+            self._repository.set_checksums(self.get_extra(_CHECKSUMS_EXTRA_KEY, None))
+
     def _validate(self):
         """Check if the attributes and files retrieved from the database are valid.
 
@@ -536,6 +617,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             path = key
 
         self._repository.put_object_from_tree(filepath, path, contents_only, force)
+        self._update_repository_checksums()
 
     def put_object_from_file(self, filepath, path=None, mode=None, encoding=None, force=False, key=None):
         """Store a new object under `path` with contents of the file located at `filepath` on this file system.
@@ -590,6 +672,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             raise TypeError("put_object_from_file() missing 1 required positional argument: 'path'")
 
         self._repository.put_object_from_file(filepath, path, mode, encoding, force)
+        self._update_repository_checksums()
 
     def put_object_from_filelike(self, handle, path=None, mode='w', encoding='utf8', force=False, key=None):
         """Store a new object under `path` with contents of filelike object `handle`.
@@ -627,6 +710,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             raise TypeError("put_object_from_filelike() missing 1 required positional argument: 'path'")
 
         self._repository.put_object_from_filelike(handle, path, mode, encoding, force)
+        self._update_repository_checksums()
 
     def delete_object(self, path=None, force=False, key=None):
         """Delete the object from the repository.
@@ -660,6 +744,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             raise TypeError("delete_object() missing 1 required positional argument: 'path'")
 
         self._repository.delete_object(path, force)
+        self._update_repository_checksums()
 
     def add_comment(self, content, user=None):
         """Add a new comment.
@@ -943,6 +1028,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             )
 
         if not self.is_stored:
+            start = time.perf_counter()
 
             # Call `validate_storability` directly and not in `_validate` in case sub class forgets to call the super.
             self.validate_storability()
@@ -971,6 +1057,8 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
                 group = autogroup.CURRENT_AUTOGROUP.get_or_create_group()
                 group.add_nodes(self)
 
+            record_caching_statistics(self._caching_identifier, stores=1, store_time=time.perf_counter() - start)
+
         return self
 
     def _store(self, with_transaction=True, clean=True):
@@ -994,9 +1082,26 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
 
         self._incoming_cache = list()
         self._backend_entity.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        self._update_repository_checksums()
 
         return self
 
+    def _update_repository_checksums(self):
+        """Persist the checksums of the objects in the repository of a stored node in its extras.
+
+        The checksums allow the hash of the repository contents to be computed without reading them. They are only
+        stored for nodes with a non-empty repository and are removed if they are no longer known.
+        """
+        if not self.is_stored:
+            return
+
+        checksums = self._repository.get_checksums()
+
+        if checksums:
+            self._backend_entity.set_extra(_CHECKSUMS_EXTRA_KEY, checksums)
+        elif _CHECKSUMS_EXTRA_KEY in self._backend_entity.extras:
+            self._backend_entity.delete_extra(_CHECKSUMS_EXTRA_KEY)
+
     def verify_are_parents_stored(self):
         """Verify that all `parent` nodes are already stored.
 
@@ -1013,6 +1118,8 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
         from aiida.orm.utils.mixins import Sealable
         assert self.node_type == cache_node.node_type
 
+        start = time.perf_counter()
+
         # Make sure the node doesn't have any RETURN links
         if cache_node.get_outgoing(link_type=LinkType.RETURN).all():
             raise ValueError('Cannot use cache from nodes with RETURN links.')
@@ -1024,17 +1131,22 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             if key != Sealable.SEALED_KEY:
                 self.set_attribute(key, value)
 
-        # The erase() removes the current content of the sandbox folder.
-        # If this was not done, the content of the sandbox folder could
-        # become mangled when copying over the content of the cache
-        # source repository folder.
-        self._repository.erase()
-        self.put_object_from_tree(cache_node._repository._get_base_folder().abspath)  # pylint: disable=protected-access
+        # Cloning replaces the current content of the sandbox folder, sharing the file content of the cache source
+        # instead of copying it, such that the cost of a cache hit does not scale with the size of the repository.
+        self._repository.clone(cache_node._repository)  # pylint: disable=protected-access
 
         self._store(with_transaction=with_transaction, clean=False)
         self._add_outputs_from_cache(cache_node)
         self.set_extra('_aiida_cached_from', cache_node.uuid)
 
+        # The files are counted from the checksums that were loaded with the cache source, instead of walking its files
+        checksums = cache_node._repository.get_checksums() or {}  # pylint: disable=protected-access
+        record_caching_statistics(
+            self._caching_identifier,
+            hit_time=time.perf_counter() - start,
+            hit_files=sum(1 for checksum in checksums.values() if checksum is not None)
+        )
+
     def _add_outputs_from_cache(self, cache_node):
         """Replicate the output links and nodes from the cached node onto this node."""
         for entry in cache_node.get_outgoing(link_type=LinkType.CREATE):
@@ -1055,11 +1167,15 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
 
         This will always work, even before storing.
         """
+        start = time.perf_counter()
+
         try:
             return make_hash(self._get_objects_to_hash(), **kwargs)
         except Exception:  # pylint: disable=broad-except
             if not ignore_errors:
                 raise
+        finally:
+            record_caching_statistics(self._caching_identifier, hashes=1, hash_time=time.perf_counter() - start)
 
     def _get_objects_to_hash(self):
         """Return a list of objects which should be included in the hash."""
@@ -1070,7 +1186,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
                 for key, val in self.attributes_items()
                 if key not in self._hash_ignored_attributes and key not in self._updatable_attributes  # pylint: disable=unsupported-membership-test
             },
-            self._repository._get_base_folder(),  # pylint: disable=protected-access
+            self._repository.get_hashable(),
             self.computer.uuid if self.computer is not None else None
         ]
         return objects
@@ -1110,10 +1226,29 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
         Note: this should be only called on stored nodes, or internally from .store() since it first calls
         clean_value() on the attributes to normalise them.
         """
+        start = time.perf_counter()
+
         try:
-            return next(self._iter_all_same_nodes(allow_before_store=True))
+            same_node = next(self._iter_all_same_nodes(allow_before_store=True))
         except StopIteration:
-            return None
+            same_node = None
+
+        record_caching_statistics(
+            self._caching_identifier,
+            hits=int(same_node is not None),
+            misses=int(same_node is None),
+            lookup_time=time.perf_counter() - start
+        )
+
+        return same_node
+
+    @property
+    def _caching_identifier(self):
+        """Return the identifier under which the caching statistics of this node are collected.
+
+        :return: the process type for process nodes and the node type otherwise
+        """
+        return self.process_type or self.node_type
 
     def get_all_same_nodes(self):
         """Return a list of stored nodes which match the type and hash of the current node.
@@ -1139,12 +1274,35 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
         if not node_hash or not self._cachable:
             return iter(())
 
-        builder = QueryBuilder()
-        builder.append(self.__class__, filters={'extras._aiida_hash': node_hash}, project='*', subclassing=False)
-        nodes_identical = (n[0] for n in builder.iterall())
+        # Only the ids are retrieved through the index on the hash, the nodes themselves are loaded one at a time
+        pks = self.backend.nodes.get_ids_by_hash([(self.node_type, node_hash)]).get((self.node_type, node_hash), [])
+        nodes_identical = self._iter_nodes(pks)
 
         return (node for node in nodes_identical if node.is_valid_cache)
 
+    @staticmethod
+    def _iter_nodes(pks):
+        """Return an iterator over the nodes with the given ids, loading each node only when it is reached.
+
+        :param pks: list of node ids
+        """
+        return (Node._load_nodes([pk])[pk] for pk in pks)
+
+    @staticmethod
+    def _load_nodes(pks):
+        """Load the nodes with the given ids in a single query.
+
+        :param pks: list of node ids
+        :return: dictionary mapping the id onto the loaded node
+        """
+        if not pks:
+            return {}
+
+        builder = QueryBuilder()
+        builder.append(Node, filters={'id': {'in': list(pks)}}, project='*')
+
+        return {node.pk: node for node, in builder.iterall()}
+
     @property
     def is_valid_cache(self):
         """Hook to exclude certain `Node` instances from being considered a valid cache."""
@@ -1251,3 +1409,169 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
                 'type': 'str'
             }
         }
+
+
+def store_many(nodes, with_transaction=True):
+    """Store many nodes, together with their incoming links, using a few multi-row statements instead of one per node.
+
+    The nodes are validated as in `Node.store` and are then stored in generations, where each generation consists of
+    the nodes whose parents are stored or belong to an earlier generation. This allows the hash of each node, which may
+    depend on the hashes of its inputs, to be computed before the node is inserted, such that the hash and repository
+    checksums are written as part of the inserted rows. The nodes and links of each generation are inserted with a
+    single multi-row statement each.
+
+    .. note:: the caching mechanism is not used: the nodes are always stored as new nodes. Use `Node.store` for nodes
+        that should be able to be created from the cache.
+
+    .. note:: nodes of classes that override `Node.store`, for example to set attributes right before being stored,
+        are stored individually, such that the override is honoured, but in the same transaction as the others.
+
+    If storing any of the nodes fails, the nodes that were already stored in the transaction are put back in the
+    unstored state, with their files back in the sandbox folders, such that they can be stored again.
+
+    :param nodes: iterable of nodes, where nodes that are already stored are ignored
+    :param with_transaction: if False, do not use a transaction because the caller will already have opened one.
+    :return: the list of nodes
+    :raise aiida.common.ModificationNotAllowed: if the source node of an incoming link is neither stored nor one of the
+        nodes, or if the incoming links of the nodes form a cycle
+    """
+    # pylint: disable=protected-access
+    nodes = list(nodes)
+
+    for node in nodes:
+        type_check(node, Node)
+
+    # Deduplicate by identity, since unstored nodes are not hashable by their database identity
+    unstored = list({id(node): node for node in nodes if not node.is_stored}.values())
+
+    if not unstored:
+        return nodes
+
+    for node in unstored:
+        node.validate_storability()
+        node._validate()
+
+    # Plan all the generations before storing anything, such that invalid links are detected before any node is stored
+    generations = []
+    planned = set()
+    remaining = unstored
+    batch = {id(node) for node in unstored}
+
+    while remaining:
+        generation = []
+
+        for node in remaining:
+            sources = [link_triple.node for link_triple in node._incoming_cache if not link_triple.node.is_stored]
+
+            for source in sources:
+                if id(source) not in batch:
+                    raise exceptions.ModificationNotAllowed(
+                        f'Cannot store because source node {source} of an incoming link of {node} is not stored and '
+                        'is not one of the nodes to be stored'
+                    )
+
+            if all(id(source) in planned for source in sources):
+                generation.append(node)
+
+        if not generation:
+            raise exceptions.ModificationNotAllowed('Cannot store because the incoming links of the nodes form a cycle')
+
+        generations.append(generation)
+        planned.update(id(node) for node in generation)
+        remaining = [node for node in remaining if id(node) not in planned]
+
+    start = time.perf_counter()
+    backend = unstored[0].backend
+    incoming = {id(node): list(node._incoming_cache) for node in unstored}
+    inserted = []
+    flushed = []
+
+    with backend.transaction() if with_transaction else contextlib.suppress():
+        for generation in generations:
+            first = len(flushed)
+
+            try:
+                inserted.extend(_store_generation(generation, backend, flushed))
+            except Exception:
+                # Put back the nodes before the transaction is rolled back, including those of earlier generations if
+                # the transaction is ours. The nodes of earlier generations are otherwise left to the caller.
+                _reset_stored_nodes(flushed if with_transaction else flushed[first:], incoming)
+                raise
+
+    # Set up autogrouping used by verdi run, in a single operation for all nodes
+    if autogroup.CURRENT_AUTOGROUP is not None:
+        grouped = [node for node in inserted if autogroup.CURRENT_AUTOGROUP.is_to_be_grouped(node)]
+        if grouped:
+            autogroup.CURRENT_AUTOGROUP.get_or_create_group().add_nodes(grouped)
+
+    duration = time.perf_counter() - start
+    for identifier, count in collections.Counter(node._caching_identifier for node in unstored).items():
+        record_caching_statistics(identifier, stores=count, store_time=duration * count / len(unstored))
+
+    return nodes
+
+
+def _store_generation(nodes, backend, flushed):
+    """Store nodes whose sources of incoming links are all stored, with a single insert statement for the nodes.
+
+    :param nodes: list of unstored nodes
+    :param backend: the backend in which to store the nodes
+    :param flushed: list to which each node is appended once its repository has been stored, such that the caller can
+        put it back with `_reset_stored_nodes` if the transaction is rolled back
+    :return: the list of nodes that were inserted in bulk, excluding those that were stored individually
+    """
+    # pylint: disable=protected-access
+    bulk = []
+
+    for node in nodes:
+        if type(node).store is not Node.store:
+            try:
+                node.store(with_transaction=False)
+            except Exception:
+                # `Node._store` already put back the repository, but the row of the node may have been written
+                node._backend_entity.reset_stored_state()
+                raise
+            flushed.append(node)
+        else:
+            bulk.append(node)
+
+    for node in bulk:
+        node._backend_entity.clean_values()
+
+        # As in `Node._store`, the repository is stored first, such that there won't be an incomplete node in the
+        # database if this fails. The hash and checksums are set on the unstored node, to be inserted with the row.
+        node._repository.store()
+        flushed.append(node)
+
+        node._backend_entity.set_extra(_HASH_EXTRA_KEY, node._get_hash())
+        checksums = node._repository.get_checksums()
+
+        if checksums:
+            node._backend_entity.set_extra(_CHECKSUMS_EXTRA_KEY, checksums)
+
+    links = [(link_triple.node._backend_entity, node._backend_entity, link_triple.link_type, link_triple.link_label)
+             for node in bulk
+             for link_triple in node._incoming_cache]
+
+    backend.nodes.store_many([node._backend_entity for node in bulk], links, with_transaction=False)
+
+    for node in bulk:
+        node._incoming_cache = list()
+
+    return bulk
+
+
+def _reset_stored_nodes(nodes, incoming):
+    """Put back nodes that were stored in a transaction that is being rolled back, such that they can be stored again.
+
+    The files are moved back into the sandbox folders of the repositories, the database rows of the nodes are
+    discarded and the incoming links are restored.
+
+    :param nodes: list of nodes whose repository has been stored
+    :param incoming: dictionary mapping the identity of each node onto the list of its incoming link triples
+    """
+    # pylint: disable=protected-access
+    for node in nodes:
+        node._repository.restore()
+        node._backend_entity.reset_stored_state()
+        node._incoming_cache = incoming[id(node)]
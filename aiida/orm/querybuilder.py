@@ -22,11 +22,13 @@ when instantiated by the user.
 from inspect import isclass as inspect_isclass
 import copy
 import logging
+import math
 import warnings
 
-from sqlalchemy import and_, or_, not_, func as sa_func, select, join
+from sqlalchemy import and_, or_, not_, func as sa_func, select, join, exists, tuple_
 from sqlalchemy.types import Integer
 from sqlalchemy.orm import aliased
+from sqlalchemy.sql import table as sa_table, column as sa_column
 from sqlalchemy.sql.expression import cast as type_cast
 from sqlalchemy.dialects.postgresql import array
 
@@ -363,6 +365,9 @@ class QueryBuilder:
         :param order_by:
             How to order the results. As the 2 above, can be set also at later stage,
             check :func:`QueryBuilder.order_by` for more information.
+        :param list after:
+            Only return the results that come after the row with these values of the ordered properties.
+            Details in :func:`QueryBuilder.after`.
 
         """
         backend = backend or get_manager().get_backend()
@@ -460,10 +465,13 @@ class QueryBuilder:
         if order_spec:
             self.order_by(order_spec)
 
+        # The results can start after a given row of the ordered results, as an alternative to the offset
+        self.after(kwargs.pop('after', None))
+
         # I've gone through all the keywords, popping each item
         # If kwargs is not empty, there is a problem:
         if kwargs:
-            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by')
+            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by', 'after')
             raise InputValidationError(
                 'Received additional keywords: {}'
                 '\nwhich I cannot process'
@@ -592,6 +600,7 @@ class QueryBuilder:
         edge_filters=None,
         edge_project=None,
         outerjoin=False,
+        traversal=None,
         **kwargs
     ):
         """
@@ -636,6 +645,25 @@ class QueryBuilder:
             The filters to apply on the edge. Also here, details in :meth:`.add_filter`.
         :param str edge_project:
             The project from the edges. API-details in :meth:`.add_projection`.
+        :param dict traversal:
+            Only for vertices joined with `with_ancestors` or `with_descendants`: options that restrict the recursive
+            traversal of the provenance graph. These are applied while the graph is walked, such that branches that
+            cannot contribute to the results are not expanded. The following keys are supported:
+
+            * `link_types`: the link types to follow, by default `create` and `input_calc`. When other link types are
+              followed, the graph can contain cycles, so a walk never revisits a node on its path.
+            * `filters`: filters on the nodes through which the graph is traversed, which includes the nodes that are
+              returned. A walk does not continue through nodes that do not match these filters.
+            * `distinct`: if True, a node that is reached through multiple walks of the same depth is only returned
+              once, instead of once for every walk. Has no effect if the `path` of the edge is filtered or projected.
+            * `closure`: if True, the ancestors or descendants are looked up in the transitive closure of the graph
+              that is maintained by the database once it has been built with `verdi database closure build`, instead
+              of walking the graph. Each node is returned once and the edge has no `depth` or `path`, so this option
+              cannot be combined with the other options or with filters and projections on those. As long as the
+              closure has not been built, the graph is walked instead.
+
+            A filter on the `depth` of the edge, like `edge_filters={'depth': {'<=': 2}}`, is always also applied
+            while walking the graph, such that it is not expanded beyond that depth.
 
         A small usage example how this can be invoked::
 
@@ -833,6 +861,9 @@ class QueryBuilder:
                 joining_keyword = 'with_incoming'
                 joining_value = self._path[-1]['tag']
 
+            if traversal is not None:
+                traversal = self._process_traversal(traversal, joining_keyword)
+
         except Exception as exception:
             if self._debug:
                 print('DEBUG: Exception caught in append (part joining), cleaning up')
@@ -911,8 +942,55 @@ class QueryBuilder:
             )
         )
 
+        if traversal is not None:
+            self._path[-1]['traversal'] = traversal
+
         return self
 
+    def _process_traversal(self, traversal, joining_keyword):
+        """Validate the traversal options of a vertex and convert them to a json-compatible dictionary.
+
+        :param traversal: the traversal options, see :meth:`.append`
+        :param joining_keyword: the joining keyword of the vertex
+        :return: the processed traversal options
+        :raises InputValidationError: if the options are invalid
+        """
+        if joining_keyword not in ('with_ancestors', 'with_descendants', 'ancestor_of', 'descendant_of'):
+            raise InputValidationError('traversal options can only be used with `with_ancestors` or `with_descendants`')
+
+        if not isinstance(traversal, dict):
+            raise InputValidationError('traversal options have to be passed as a dictionary')
+
+        valid_keys = ('link_types', 'filters', 'distinct', 'closure')
+        unknown_keys = set(traversal.keys()) - set(valid_keys)
+
+        if unknown_keys:
+            raise InputValidationError(f'unknown traversal options {unknown_keys}, valid options are: {valid_keys}')
+
+        processed = {}
+
+        if traversal.get('link_types') is not None:
+            link_types = traversal['link_types']
+            if isinstance(link_types, (str, LinkType)):
+                link_types = [link_types]
+            try:
+                processed['link_types'] = sorted({LinkType(link_type).value for link_type in link_types})
+            except (TypeError, ValueError) as exception:
+                raise InputValidationError(f'invalid link types in traversal options: {exception}')
+
+        if traversal.get('filters') is not None:
+            processed['filters'] = self._process_filters(traversal['filters'])
+
+        if traversal.get('distinct', False):
+            processed['distinct'] = True
+
+        if traversal.get('closure', False):
+            if 'link_types' in processed or 'filters' in processed:
+                raise InputValidationError('the `closure` traversal option cannot be combined with other options')
+            processed['closure'] = True
+
+        return processed
+
     def order_by(self, order_by):
         """
         Set the entity to order by
@@ -1331,6 +1409,32 @@ class QueryBuilder:
         self._offset = offset
         return self
 
+    def after(self, values):
+        """
+        Only return the results that come after the row with the given values of the properties that are ordered by.
+
+        This implements keyset pagination: instead of skipping the results of the previous pages with an offset,
+        which the database has to compute and discard, the query continues from the last row of the previous page,
+        such that each page costs the same. The ordering must be unique and the ordered properties must not be null,
+        which is easiest guaranteed by ordering by the `id` last::
+
+            qb = QueryBuilder().append(Node, tag='node', project=['ctime', 'id'])
+            qb.order_by({'node': [{'ctime': 'desc'}, 'id']}).limit(100)
+            page = qb.all()
+            while page:
+                qb.after(page[-1])
+                page = qb.all()
+
+        :param values: list with a value for each of the ordered properties, in the order of the `order_by`, or None to
+            start from the first result
+        """
+        if values is not None:
+            if not isinstance(values, (tuple, list)):
+                raise InputValidationError('after has to be a list of values, or None')
+            values = list(values)
+        self._after = values
+        return self
+
     def _build_filters(self, alias, filter_spec):
         """
         Recurse through the filter specification and apply filter operations.
@@ -1456,18 +1560,105 @@ class QueryBuilder:
         ).join(entity_to_join, aliased_edge.input_id == entity_to_join.id, isouter=isouterjoin)
         return aliased_edge
 
-    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    @staticmethod
+    def _get_max_depth(edge_filters):
+        """Return the maximum depth of the walks that can match the given filters on the edge of a recursive join.
+
+        Only the filters on the `depth` that bound it from above are considered, either directly or within an `and`.
+
+        :param edge_filters: the filters on the edge
+        :return: the maximum depth as an integer, or None if the filters do not bound the depth
         """
-        joining descendants using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
+        bounds = []
+
+        for key, value in edge_filters.items():
+            if key == 'and':
+                bounds.extend(QueryBuilder._get_max_depth(sub_filters) for sub_filters in value)
+                continue
+
+            if key != 'depth':
+                continue
+
+            if not isinstance(value, dict):
+                value = {'==': value}
+
+            for operator, operand in value.items():
+                try:
+                    if operator in ('==', '<='):
+                        bounds.append(math.floor(operand))
+                    elif operator == '<':
+                        bounds.append(math.ceil(operand) - 1)
+                    elif operator == 'in':
+                        bounds.append(math.floor(max(operand)))
+                except (TypeError, ValueError):
+                    continue
+
+        bounds = [bound for bound in bounds if bound is not None]
+
+        return min(bounds) if bounds else None
+
+    def _get_closure(self, recursive, edge_filters, expand_path):
+        """Return the pairs of ancestors and descendants from the closure table, or from the recursive walk as long as
+        the closure has not been built.
+
+        Whether the closure has been built is checked by the query itself, such that the same query remains valid when
+        the closure is built or dropped later. The branch that does not apply is skipped by the database.
+
+        :param recursive: the aliased recursive walk of the graph
+        :param edge_filters: the filters on the edge
+        :param expand_path: whether the path of the edge is filtered or projected
+        :return: the aliased pairs of ancestors and descendants
+        :raises InputValidationError: if the edge is filtered on its depth or path, which the closure does not store
         """
+        from aiida.manage.database.closure import CLOSURE_TRIGGER
+
+        if edge_filters or expand_path:
+            raise InputValidationError(
+                'the edge of a vertex joined with the `closure` traversal option cannot be filtered and has no path'
+            )
+
+        closure = self._impl.LinkClosure
+        pg_trigger = sa_table('pg_trigger', sa_column('tgname'))
+        enabled = exists().where(pg_trigger.c.tgname == CLOSURE_TRIGGER)
 
+        from_closure = select([closure.ancestor_id.label('ancestor_id'),
+                               closure.descendant_id.label('descendant_id')]).where(enabled)
+        from_walk = select([recursive.c.ancestor_id, recursive.c.descendant_id]).where(not_(enabled)).distinct()
+
+        return from_closure.union_all(from_walk).alias()
+
+    def _join_descendants_recursive(
+        self,
+        joined_entity,
+        entity_to_join,
+        isouterjoin,
+        filter_dict,
+        expand_path=False,
+        edge_filters=None,
+        traversal=None
+    ):
+        """
+        joining descendants using the recursive functionality
+
+        The depth limit, the link types and the filters of the traversal are applied in the recursive term, such that
+        the walk is not expanded beyond them, see :meth:`.append`.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
         self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
 
+        traversal = traversal or {}
+        max_depth = self._get_max_depth(edge_filters or {})
+        link_types = traversal.get('link_types', (LinkType.CREATE.value, LinkType.INPUT_CALC.value))
+        # Only input and create links are guaranteed to form an acyclic graph, otherwise the path is used to prune
+        # cycles
+        prune_cycles = not set(link_types).issubset({LinkType.CREATE.value, LinkType.INPUT_CALC.value})
+        track_path = expand_path or prune_cycles
+
         link1 = aliased(self._impl.Link)
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
+        node2 = aliased(self._impl.Node)
+        node3 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
 
         selection_walk_list = [
@@ -1475,15 +1666,19 @@ class QueryBuilder:
             link1.output_id.label('descendant_id'),
             type_cast(0, Integer).label('depth'),
         ]
-        if expand_path:
+        if track_path:
             selection_walk_list.append(array((link1.input_id, link1.output_id)).label('path'))
 
-        walk = select(selection_walk_list).select_from(join(node1, link1, link1.input_id == node1.id)).where(
-            and_(
-                in_recursive_filters,  # I apply filters for speed here
-                link1.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value))  # I follow input and create links
-            )
-        ).cte(recursive=True)
+        walk_from = join(node1, link1, link1.input_id == node1.id)
+        walk_conditions = [
+            in_recursive_filters,  # I apply filters for speed here
+            link1.type.in_(link_types)  # By default, I follow input and create links
+        ]
+        if 'filters' in traversal:
+            walk_from = walk_from.join(node2, link1.output_id == node2.id)
+            walk_conditions.append(self._build_filters(node2, traversal['filters']))
+
+        walk = select(selection_walk_list).select_from(walk_from).where(and_(*walk_conditions)).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
@@ -1492,20 +1687,28 @@ class QueryBuilder:
             link2.output_id.label('descendant_id'),
             (aliased_walk.c.depth + type_cast(1, Integer)).label('current_depth')
         ]
-        if expand_path:
+        if track_path:
             selection_union_list.append((aliased_walk.c.path + array((link2.output_id,))).label('path'))
 
-        descendants_recursive = aliased(
-            aliased_walk.union_all(
-                select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.input_id == aliased_walk.c.descendant_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-            )
-        )  # .alias()
+        union_from = join(aliased_walk, link2, link2.input_id == aliased_walk.c.descendant_id)
+        union_conditions = [link2.type.in_(link_types)]
+        if 'filters' in traversal:
+            union_from = union_from.join(node3, link2.output_id == node3.id)
+            union_conditions.append(self._build_filters(node3, traversal['filters']))
+        if max_depth is not None:
+            union_conditions.append(aliased_walk.c.depth < max_depth)
+        if prune_cycles:
+            union_conditions.append(not_(aliased_walk.c.path.any(link2.output_id)))
+
+        union_select = select(selection_union_list).select_from(union_from).where(and_(*union_conditions))
+
+        if traversal.get('distinct', False) and not track_path:
+            descendants_recursive = aliased(aliased_walk.union(union_select))
+        else:
+            descendants_recursive = aliased(aliased_walk.union_all(union_select))
+
+        if traversal.get('closure', False):
+            descendants_recursive = self._get_closure(descendants_recursive, edge_filters, expand_path)
 
         self._query = self._query.join(descendants_recursive,
                                        descendants_recursive.c.ancestor_id == joined_entity.id).join(
@@ -1515,18 +1718,38 @@ class QueryBuilder:
                                        )
         return descendants_recursive.c
 
-    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_ancestors_recursive(
+        self,
+        joined_entity,
+        entity_to_join,
+        isouterjoin,
+        filter_dict,
+        expand_path=False,
+        edge_filters=None,
+        traversal=None
+    ):
         """
         joining ancestors using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
 
+        The depth limit, the link types and the filters of the traversal are applied in the recursive term, such that
+        the walk is not expanded beyond them, see :meth:`.append`.
         """
+        # pylint: disable=too-many-arguments,too-many-locals
         self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
 
+        traversal = traversal or {}
+        max_depth = self._get_max_depth(edge_filters or {})
+        link_types = traversal.get('link_types', (LinkType.CREATE.value, LinkType.INPUT_CALC.value))
+        # Only input and create links are guaranteed to form an acyclic graph, otherwise the path is used to prune
+        # cycles
+        prune_cycles = not set(link_types).issubset({LinkType.CREATE.value, LinkType.INPUT_CALC.value})
+        track_path = expand_path or prune_cycles
+
         link1 = aliased(self._impl.Link)
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
+        node2 = aliased(self._impl.Node)
+        node3 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
 
         selection_walk_list = [
@@ -1534,12 +1757,16 @@ class QueryBuilder:
             link1.output_id.label('descendant_id'),
             type_cast(0, Integer).label('depth'),
         ]
-        if expand_path:
+        if track_path:
             selection_walk_list.append(array((link1.output_id, link1.input_id)).label('path'))
 
-        walk = select(selection_walk_list).select_from(join(node1, link1, link1.output_id == node1.id)).where(
-            and_(in_recursive_filters, link1.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-        ).cte(recursive=True)
+        walk_from = join(node1, link1, link1.output_id == node1.id)
+        walk_conditions = [in_recursive_filters, link1.type.in_(link_types)]
+        if 'filters' in traversal:
+            walk_from = walk_from.join(node2, link1.input_id == node2.id)
+            walk_conditions.append(self._build_filters(node2, traversal['filters']))
+
+        walk = select(selection_walk_list).select_from(walk_from).where(and_(*walk_conditions)).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
@@ -1548,21 +1775,29 @@ class QueryBuilder:
             aliased_walk.c.descendant_id.label('descendant_id'),
             (aliased_walk.c.depth + type_cast(1, Integer)).label('current_depth'),
         ]
-        if expand_path:
+        if track_path:
             selection_union_list.append((aliased_walk.c.path + array((link2.input_id,))).label('path'))
 
-        ancestors_recursive = aliased(
-            aliased_walk.union_all(
-                select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.output_id == aliased_walk.c.ancestor_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-                # I can't follow RETURN or CALL links
-            )
-        )
+        union_from = join(aliased_walk, link2, link2.output_id == aliased_walk.c.ancestor_id)
+        # By default, I can't follow RETURN or CALL links
+        union_conditions = [link2.type.in_(link_types)]
+        if 'filters' in traversal:
+            union_from = union_from.join(node3, link2.input_id == node3.id)
+            union_conditions.append(self._build_filters(node3, traversal['filters']))
+        if max_depth is not None:
+            union_conditions.append(aliased_walk.c.depth < max_depth)
+        if prune_cycles:
+            union_conditions.append(not_(aliased_walk.c.path.any(link2.input_id)))
+
+        union_select = select(selection_union_list).select_from(union_from).where(and_(*union_conditions))
+
+        if traversal.get('distinct', False) and not track_path:
+            ancestors_recursive = aliased(aliased_walk.union(union_select))
+        else:
+            ancestors_recursive = aliased(aliased_walk.union_all(union_select))
+
+        if traversal.get('closure', False):
+            ancestors_recursive = self._get_closure(ancestors_recursive, edge_filters, expand_path)
 
         self._query = self._query.join(ancestors_recursive,
                                        ancestors_recursive.c.descendant_id == joined_entity.id).join(
@@ -1861,6 +2096,7 @@ class QueryBuilder:
             'order_by': self._order_by,
             'limit': self._limit,
             'offset': self._offset,
+            'after': self._after,
         })
 
     def __deepcopy__(self, memo):
@@ -1886,10 +2122,67 @@ class QueryBuilder:
             entity = entity.desc()
         self._query = self._query.order_by(entity)
 
+    def _build_after(self):
+        """
+        Build the condition that selects the rows after the row with the values set by :meth:`.after`
+
+        If all properties are ordered in the same direction, the condition is a single comparison of row values, which
+        can be resolved with an index on those properties.
+        """
+        entities = []
+        for order_spec in self._order_by:
+            for tag, entity_list in order_spec.items():
+                alias = self.tag_to_alias_map[tag]
+                for entitydict in entity_list:
+                    for entitytag, entityspec in entitydict.items():
+                        column_name = entitytag.split('.')[0]
+                        attrpath = entitytag.split('.')[1:]
+                        entity = self._get_projectable_entity(alias, column_name, attrpath, **entityspec)
+                        entities.append((entity, entityspec.get('order', 'asc')))
+
+        if len(entities) != len(self._after):
+            raise InputValidationError(
+                f'after got {len(self._after)} values but the results are ordered by {len(entities)} properties'
+            )
+
+        def is_after(entity, order, value):
+            return entity > value if order == 'asc' else entity < value
+
+        if len({order for _, order in entities}) == 1:
+            order = entities[0][1]
+            return is_after(tuple_(*[entity for entity, _ in entities]), order, tuple_(*self._after))
+
+        # The rows after are those that are equal in the first properties and come after in the next one
+        conditions = []
+        for index, (entity, order) in enumerate(entities):
+            equal = [previous == value for (previous, _), value in zip(entities[:index], self._after)]
+            conditions.append(and_(*equal, is_after(entity, order, self._after[index])))
+        return or_(*conditions)
+
     def _build(self):
         """
         build the query and return a sqlalchemy.Query instance
         """
+        self._build_query()
+
+        ######################## AFTER #################################
+        if self._after is not None:
+            self._query = self._query.filter(self._build_after())
+
+        # LIMIT ################################
+        if self._limit is not None:
+            self._query = self._query.limit(self._limit)
+
+        ######################## OFFSET ################################
+        if self._offset is not None:
+            self._query = self._query.offset(self._offset)
+
+        return self._query
+
+    def _build_query(self):
+        """
+        build the query without keyset condition, limit and offset and return a sqlalchemy.Query instance
+        """
         # pylint: disable=too-many-branches
 
         # Starting the query by receiving a session
@@ -1918,7 +2211,13 @@ class QueryBuilder:
                 expand_path = ((self._filters[edge_tag].get('path', None) is not None) or
                                any(['path' in d.keys() for d in self._projections[edge_tag]]))
                 aliased_edge = connection_func(
-                    toconnectwith, alias, isouterjoin=isouterjoin, filter_dict=filter_dict, expand_path=expand_path
+                    toconnectwith,
+                    alias,
+                    isouterjoin=isouterjoin,
+                    filter_dict=filter_dict,
+                    expand_path=expand_path,
+                    edge_filters=self._filters[edge_tag],
+                    traversal=verticespec.get('traversal')
                 )
             else:
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin)
@@ -1984,14 +2283,6 @@ class QueryBuilder:
                     for entitytag, entityspec in entitydict.items():
                         self._build_order(alias, entitytag, entityspec)
 
-        # LIMIT ################################
-        if self._limit is not None:
-            self._query = self._query.limit(self._limit)
-
-        ######################## OFFSET ################################
-        if self._offset is not None:
-            self._query = self._query.offset(self._offset)
-
         ################ LAST BUT NOT LEAST ############################
         # pop the entity that I added to start the query
         self._query._entities.pop(0)  # pylint: disable=protected-access
@@ -13,18 +13,33 @@
     This module has been deprecated and will be removed in `v2.0.0`.
 
 """
+import io
 import os
 import warnings
 
 from aiida.common import exceptions
-from aiida.common.folders import RepositoryFolder, SandboxFolder
+from aiida.common.folders import RepositoryFolder, SandboxFolder, link_or_copy_tree, unshare_file
+from aiida.common.hashing import DigestReader, FolderChecksums, get_file_digests, get_file_hasher
 from aiida.common.warnings import AiidaDeprecationWarning
+from aiida.manage.configuration import get_config_option
 from aiida.repository import File, FileType
+from aiida.repository.container import get_container, join_path, normalize_path, split_path
 
 
 class Repository:
     """Class that represents the repository of a `Node` instance.
 
+    If the file repository of the profile has been migrated to the content-addressed object store, the contents of
+    stored nodes are kept in its `~aiida.repository.container.Container` instead of a folder per node. Nodes whose
+    folder has not yet been migrated keep being served from that folder.
+
+    The checksum of each object is recorded when it is written, such that the hash of the contents can be computed
+    without reading them again, see `get_hashable`.
+
+    The sandbox folder of an unstored node is only created when it is needed. Until then, objects that are smaller than
+    the `repository.memory_threshold` option are kept in memory and are written directly to the permanent repository
+    when the node is stored. Any operation that requires the sandbox folder first writes these objects to it.
+
         .. deprecated:: 1.4.0
             This class has been deprecated and will be removed in `v2.0.0`.
     """
@@ -36,13 +51,22 @@ class Repository:
         self._is_stored = is_stored
         self._base_path = base_path
         self._temp_folder = None
+        self._materialized_folder = None
+        self._clone_source = None
+        self._checksums = None if is_stored else {}
+        self._objects = {}
         self._repo_folder = RepositoryFolder(section=self._section_name, uuid=uuid)
+        self._container_instance = None
+        self._container_resolved = False
 
     def __del__(self):
         """Clean the sandboxfolder if it was instantiated."""
         if getattr(self, '_temp_folder', None) is not None:
             self._temp_folder.erase()
 
+        if getattr(self, '_materialized_folder', None) is not None:
+            self._materialized_folder.erase()
+
     def validate_mutability(self):
         """Raise if the repository is immutable.
 
@@ -68,6 +92,24 @@ class Repository:
         :param key: fully qualified identifier for the object within the repository
         :return: a list of `File` named tuples representing the objects present in directory with the given key
         """
+        if self._is_in_container():
+            path = self._get_object_path(key)
+            exists, hashkey = self._container.get_entry(self._repo_folder.uuid, path)
+
+            if key and not exists:
+                raise FileNotFoundError(f'object {key} does not exist')
+
+            if hashkey is not None:
+                raise NotADirectoryError(f'object {key} is not a directory')
+
+            return [
+                File(name, FileType.DIRECTORY if hashkey is None else FileType.FILE)
+                for name, hashkey in self._container.list_directory(self._repo_folder.uuid, path)
+            ]
+
+        if self._is_in_memory():
+            return self._list_objects_in_memory(key)
+
         folder = self._get_base_folder()
 
         if key:
@@ -97,7 +139,20 @@ class Repository:
         :param key: fully qualified identifier for the object within the repository
         :param mode: the mode under which to open the handle
         """
-        return open(self._get_base_folder().get_abs_path(key), mode=mode)
+        if self._is_in_container():
+            return self._open_from_container(key, mode)
+
+        if self._is_in_memory() and not any(character in mode for character in 'wax+'):
+            return self._open_from_memory(key, mode)
+
+        filepath = self._get_base_folder().get_abs_path(key)
+
+        if any(character in mode for character in 'wa+'):
+            unshare_file(filepath, keep_content='w' not in mode)
+            # The content written through the handle cannot be tracked, so the checksums are no longer known
+            self._checksums = None
+
+        return open(filepath, mode=mode)
 
     def get_object(self, key):
         """Return the object identified by key.
@@ -113,6 +168,25 @@ class Repository:
         except ValueError:
             directory, filename = None, key
 
+        if self._is_in_container():
+            exists, hashkey = self._container.get_entry(self._repo_folder.uuid, self._get_object_path(key))
+
+            if not exists:
+                raise IOError(f'object {key} does not exist')
+
+            return File(filename, FileType.DIRECTORY if hashkey is None else FileType.FILE)
+
+        if self._is_in_memory():
+            path = normalize_path(key)
+
+            if path in self._objects:
+                return File(filename, FileType.FILE)
+
+            if any(entry.startswith(f'{path}/') for entry in self._objects):
+                return File(filename, FileType.DIRECTORY)
+
+            raise IOError(f'object {key} does not exist')
+
         folder = self._get_base_folder()
 
         if directory:
@@ -157,16 +231,42 @@ class Repository:
         if not os.path.isabs(path):
             raise ValueError('the `path` must be an absolute path')
 
+        if self._is_in_container():
+            target = self._get_object_path(key)
+
+            if not contents_only:
+                target = join_path(target, os.path.basename(path.rstrip(os.sep)))
+
+            entries = self._container.add_objects_from_tree(path)
+            self._container.set_hierarchy(self._repo_folder.uuid, entries, target)
+            self._clear_materialized_folder()
+            self._record_directory_checksum(key)
+
+            # The entries are merged into the existing hierarchy, so existing checksums are not discarded
+            sources = [os.path.join(path, entry) for entry in os.listdir(path)] if contents_only else [path]
+            for source in sources:
+                self._record_tree_checksums(source, join_path(normalize_path(key or ''), os.path.basename(source)))
+            return
+
         folder = self._get_base_folder()
 
         if key:
             folder = folder.get_subfolder(key, create=True)
+            self._record_directory_checksum(key)
 
-        if contents_only:
-            for entry in os.listdir(path):
-                folder.insert_path(os.path.join(path, entry))
-        else:
-            folder.insert_path(path)
+        sources = [os.path.join(path, entry) for entry in os.listdir(path)] if contents_only else [path]
+
+        for source in sources:
+            name = os.path.basename(source.rstrip(os.sep))
+            relpath = join_path(normalize_path(key or ''), name)
+
+            # An existing directory with the same name causes the source to be inserted inside it, see `insert_path`
+            if os.path.isdir(folder.get_abs_path(name)):
+                relpath = join_path(relpath, name)
+
+            folder.insert_path(source)
+            self._discard_checksums(relpath)
+            self._record_tree_checksums(source, relpath)
 
     def put_object_from_file(self, path, key, mode=None, encoding=None, force=False):
         """Store a new object under `key` with contents of the file located at `path` on this file system.
@@ -222,13 +322,49 @@ class Repository:
 
         self.validate_object_key(key)
 
+        if self._is_in_container():
+            if 'b' not in mode:
+                content = handle.read()
+                handle = io.BytesIO(content.encode(encoding or 'utf8') if isinstance(content, str) else content)
+
+            handle = DigestReader(handle)
+            hashkey = self._container.add_object(handle)
+            self._container.set_hierarchy(self._repo_folder.uuid, {self._get_object_path(key): hashkey})
+            self._clear_materialized_folder()
+            self._record_checksum(key, handle.hexdigest())
+            return
+
+        if self._is_in_memory() and self._can_keep_in_memory(key):
+            threshold = get_config_option('repository.memory_threshold') or 0
+            content = handle.read(threshold + 1) if threshold > 0 else None
+
+            # Only content of the type that matches the mode is kept, such that errors are raised as if writing to disk
+            if content is not None and len(content) <= threshold and isinstance(content, bytes) == ('b' in mode):
+                content = content if 'b' in mode else content.encode(encoding or 'utf8')
+                self._objects[normalize_path(key)] = content
+                digest = get_file_hasher()
+                digest.update(content)
+                self._record_checksum(key, digest.hexdigest())
+                return
+
+            if content:
+                handle = PrefixedReader(content, handle)
+
         folder = self._get_base_folder()
+        filename = key
 
-        while os.sep in key:
-            basepath, key = key.split(os.sep, 1)
+        while os.sep in filename:
+            basepath, filename = filename.split(os.sep, 1)
             folder = folder.get_subfolder(basepath, create=True)
 
-        folder.create_file_from_filelike(handle, key, mode=mode, encoding=encoding)
+        if 'b' in mode:
+            handle = DigestReader(handle)
+            folder.create_file_from_filelike(handle, filename, mode=mode, encoding=encoding)
+            self._record_checksum(key, handle.hexdigest())
+        else:
+            # In text mode the bytes that are written depend on the encoding, so the checksum is computed from the file
+            filepath = folder.create_file_from_filelike(handle, filename, mode=mode, encoding=encoding)
+            self._record_checksum(key, get_file_digests([filepath])[0].hex())
 
     def delete_object(self, key, force=False):
         """Delete the object from the repository.
@@ -245,7 +381,27 @@ class Repository:
 
         self.validate_object_key(key)
 
-        self._get_base_folder().remove_path(key)
+        if self._is_in_container():
+            path = self._get_object_path(key)
+
+            if not self._container.get_entry(self._repo_folder.uuid, path)[0]:
+                raise OSError(f'{key} does not exist within the repository')
+
+            self._container.delete_hierarchy(self._repo_folder.uuid, path)
+            self._clear_materialized_folder()
+        elif self._is_in_memory():
+            path = normalize_path(key)
+            entries = [entry for entry in self._objects if entry == path or entry.startswith(f'{path}/')]
+
+            if not entries:
+                raise OSError(f'{key} does not exist within the repository')
+
+            for entry in entries:
+                del self._objects[entry]
+        else:
+            self._get_base_folder().remove_path(key)
+
+        self._discard_checksums(key)
 
     def erase(self, force=False):
         """Delete the repository folder.
@@ -259,14 +415,34 @@ class Repository:
         if not force:
             self.validate_mutability()
 
-        self._get_base_folder().erase()
+        if self._is_in_container():
+            self._container.delete_hierarchy(self._repo_folder.uuid, self._get_object_path(None))
+            self._clear_materialized_folder()
+        elif not self._is_in_memory():
+            self._get_base_folder().erase()
+
+        self._objects = {}
+        self._checksums = {}
 
     def store(self):
         """Store the contents of the sandbox folder into the repository folder."""
         if self._is_stored:
             raise exceptions.ModificationNotAllowed('repository is already stored')
 
-        self._repo_folder.replace_with_folder(self._get_temp_folder().abspath, move=True, overwrite=True)
+        if self._clone_source is not None:
+            self._container.copy_hierarchy(self._clone_source, self._repo_folder.uuid)
+            self._clone_source = None
+        elif self._temp_folder is None:
+            self._store_objects()
+        elif self._container is not None:
+            temp_folder = self._get_temp_folder()
+            # The paths in the sandbox folder already start with the base path, so it must not be applied again
+            entries = self._container.add_objects_from_tree(temp_folder.abspath)
+            self._container.set_hierarchy(self._repo_folder.uuid, entries)
+            temp_folder.erase()
+        else:
+            self._repo_folder.replace_with_folder(self._get_temp_folder().abspath, move=True, overwrite=True)
+
         self._is_stored = True
 
     def restore(self):
@@ -274,15 +450,244 @@ class Repository:
         if not self._is_stored:
             raise exceptions.ModificationNotAllowed('repository is not yet stored')
 
-        self._temp_folder.replace_with_folder(self._repo_folder.abspath, move=True, overwrite=True)
+        if self._is_in_container():
+            self._container.export_hierarchy(self._repo_folder.uuid, self._get_temp_folder().abspath)
+            self._container.delete_hierarchy(self._repo_folder.uuid)
+            self._clear_materialized_folder()
+        else:
+            self._get_temp_folder().replace_with_folder(self._repo_folder.abspath, move=True, overwrite=True)
+
         self._is_stored = False
 
+    def clone(self, repository):
+        """Replace the contents of this repository with those of another repository without copying file content.
+
+        If the other repository lives in the object store, only its virtual hierarchy will be copied when this
+        repository is stored. The objects themselves are shared by key. Otherwise, the files of the other repository
+        are hardlinked into the sandbox of this repository, falling back to a copy if that is not possible.
+
+        .. note:: in the object store the entire repository of the other node is cloned, not just its base path.
+
+        :param repository: the `Repository` instance to clone
+        :raises aiida.common.ModificationNotAllowed: if this repository is already stored
+        """
+        self.validate_mutability()
+
+        if self._temp_folder is not None:
+            self._temp_folder.erase(create_empty_folder=True)
+
+        self._objects = {}
+        self._clone_source = None
+        self._checksums = repository.get_checksums()
+
+        if self._container is not None and repository._is_in_container():  # pylint: disable=protected-access
+            # Materialization of the clone is deferred until the sandbox is actually needed, see `_get_temp_folder`
+            self._clone_source = repository._repo_folder.uuid  # pylint: disable=protected-access
+            return
+
+        folder = self._get_base_folder()
+        folder.erase()
+        link_or_copy_tree(repository._get_base_folder().abspath, folder.abspath)  # pylint: disable=protected-access
+
+    def get_checksums(self):
+        """Return the checksums of the objects in this repository, as recorded when they were written.
+
+        :return: dictionary mapping the relative path of each file and directory, using forward slashes as separator,
+            to the hexadecimal digest of the content of the file or `None` for directories. Returns `None` if the
+            checksums are not known, for example because the repository was modified through an open file handle.
+        """
+        if self._checksums is None:
+            return None
+
+        return dict(self._checksums)
+
+    def set_checksums(self, checksums):
+        """Set the checksums of the objects in this repository, for example as persisted for a stored node.
+
+        :param checksums: dictionary of checksums as returned by `get_checksums`, or `None` if they are not known
+        """
+        self._checksums = None if checksums is None else dict(checksums)
+
+    def compute_checksums(self):
+        """Compute the checksums of the objects in this repository by reading their content, unless they are known.
+
+        This allows the checksums to be recorded for the repository of a node that was stored before they were
+        persisted, or whose repository was modified through an open file handle.
+
+        :return: the checksums as returned by `get_checksums`
+        """
+        if self._checksums is None:
+            self._checksums = {}
+            dirpath = self._get_base_folder().abspath
+
+            if os.path.isdir(dirpath):
+                for name in os.listdir(dirpath):
+                    self._record_tree_checksums(os.path.join(dirpath, name), name)
+
+        return self.get_checksums()
+
+    def get_hashable(self):
+        """Return an object representing the contents of this repository that can be passed to `make_hash`.
+
+        If the checksums of the objects are known, the hash is computed from those without reading any file content.
+        Otherwise the base folder is returned, whose hash is identical but requires reading all files.
+
+        :return: a `FolderChecksums` instance or the base `Folder`
+        """
+        if self._checksums is not None:
+            return FolderChecksums(self._checksums)
+
+        return self._get_base_folder()
+
+    def exists(self):
+        """Return whether the repository of the stored node exists.
+
+        Once the object store has been initialised, the repository of every stored node exists. A node without any
+        files simply has no entries in the virtual hierarchy.
+
+        :return: True if the stored node has a repository folder or if the object store has been initialised
+        """
+        if self._repo_folder.exists():
+            return True
+
+        return self._container is not None
+
+    def get_size(self):
+        """Return the total size in bytes of the files in the repository.
+
+        :return: the size in bytes, where files that are stored only once in the object store are counted for every path
+        """
+        if self._is_in_container():
+            hierarchy = self._container.get_hierarchy(self._repo_folder.uuid, self._get_object_path(None))
+            return sum(self._container.get_object_size(key) for key in hierarchy.values() if key is not None)
+
+        if self._is_in_memory():
+            return sum(len(content) for content in self._objects.values())
+
+        return sum(
+            os.path.getsize(os.path.join(dirpath, filename))
+            for dirpath, _, filenames in os.walk(self._get_base_folder().abspath)
+            for filename in filenames
+        )
+
+    def copy_to_folder(self, folder):
+        """Copy the contents of the base folder of the repository into the given folder.
+
+        Objects in the object store are streamed into the folder one by one, instead of first writing a copy of the
+        entire repository to disk.
+
+        :param folder: the target folder, either a `Folder` or any object implementing its `insert_path`, `create`,
+            `get_subfolder` and `create_file_from_filelike` methods, such as the `ZipFolder` of the export archive
+        """
+        if not self._is_in_container():
+            folder.insert_path(src=self._get_base_folder().abspath, dest_name=os.curdir)
+            return
+
+        folder.create()
+        hierarchy = self._container.get_hierarchy(self._repo_folder.uuid, self._get_object_path(None))
+
+        for path, hashkey in sorted(hierarchy.items()):
+            if hashkey is None:
+                folder.get_subfolder(path, create=True)
+                continue
+
+            parent, name = split_path(path)
+            target = folder.get_subfolder(parent, create=True) if parent else folder
+
+            with self._container.open_object(hashkey) as handle:
+                target.create_file_from_filelike(handle, name, mode='wb')
+
+    def replace_with_tree(self, dirpath, move=False):
+        """Replace the contents of the stored repository with the contents of the directory at the given path.
+
+        :param dirpath: absolute path of the source directory
+        :param move: if True, the source directory is moved instead of copied when the repository uses a folder
+        """
+        if self._container is not None and not self._repo_folder.exists():
+            self._container.delete_hierarchy(self._repo_folder.uuid)
+            entries = self._container.add_objects_from_tree(dirpath)
+            self._container.set_hierarchy(self._repo_folder.uuid, entries)
+            self._clear_materialized_folder()
+        else:
+            self._repo_folder.replace_with_folder(dirpath, move=move, overwrite=True)
+
+    def _record_checksum(self, key, checksum):
+        """Record the checksum of the file with the given key, replacing any existing object with the same key.
+
+        :param key: fully qualified identifier for the object within the repository
+        :param checksum: the hexadecimal digest of the content of the file
+        """
+        if self._checksums is None:
+            return
+
+        path = normalize_path(key)
+        self._discard_checksums(path)
+        self._record_directory_checksum(split_path(path)[0])
+        self._checksums[path] = checksum
+
+    def _record_directory_checksum(self, key):
+        """Record the directory with the given key and its parent directories, which have no checksum.
+
+        :param key: fully qualified identifier for the directory within the repository
+        """
+        if self._checksums is None:
+            return
+
+        path = normalize_path(key or '')
+
+        while path:
+            self._checksums[path] = None
+            path = split_path(path)[0]
+
+    def _record_tree_checksums(self, source, key):
+        """Record the checksums of a file or directory that has been copied into the repository.
+
+        :param source: absolute path of the source file or directory
+        :param key: fully qualified identifier within the repository of the copied file or directory
+        """
+        if self._checksums is None:
+            return
+
+        path = normalize_path(key)
+        self._record_directory_checksum(split_path(path)[0])
+        filepaths = {}
+
+        if os.path.isdir(source):
+            self._checksums[path] = None
+            for root, dirnames, filenames in os.walk(source):
+                relroot = join_path(path, normalize_path(os.path.relpath(root, source)))
+                for dirname in dirnames:
+                    self._checksums[join_path(relroot, dirname)] = None
+                for filename in filenames:
+                    filepaths[join_path(relroot, filename)] = os.path.join(root, filename)
+        else:
+            filepaths[path] = source
+
+        for relpath, checksum in zip(filepaths, get_file_digests(list(filepaths.values()))):
+            self._checksums[relpath] = checksum.hex()
+
+    def _discard_checksums(self, key):
+        """Remove the checksums of the object with the given key and, if it is a directory, all of its contents.
+
+        :param key: fully qualified identifier for the object within the repository
+        """
+        if self._checksums is None:
+            return
+
+        path = normalize_path(key)
+        prefix = f'{path}/'
+
+        for entry in [entry for entry in self._checksums if entry == path or entry.startswith(prefix)]:
+            del self._checksums[entry]
+
     def _get_base_folder(self):
         """Return the base sub folder in the repository.
 
         :return: a Folder object.
         """
-        if self._is_stored:
+        if self._is_in_container():
+            folder = self._get_materialized_folder()
+        elif self._is_stored:
             folder = self._repo_folder
         else:
             folder = self._get_temp_folder()
@@ -300,5 +705,217 @@ class Repository:
         """
         if self._temp_folder is None:
             self._temp_folder = SandboxFolder()
+            self._write_objects(self._temp_folder)
+
+        if self._clone_source is not None:
+            clone_source, self._clone_source = self._clone_source, None
+            self._container.export_hierarchy(clone_source, self._temp_folder.abspath)
 
         return self._temp_folder
+
+    def _is_in_memory(self):
+        """Return whether the contents of this repository are kept in memory, because it has no sandbox folder yet."""
+        return not self._is_stored and self._temp_folder is None and self._clone_source is None
+
+    def _can_keep_in_memory(self, key):
+        """Return whether an object with the given key can be kept in memory.
+
+        This is not the case if the key would replace a directory or if one of its parents is a file, such that writing
+        it to the sandbox folder raises the appropriate exception.
+
+        :param key: fully qualified identifier for the object within the repository
+        """
+        path = normalize_path(key or '')
+
+        if not path or any(entry.startswith(f'{path}/') for entry in self._objects):
+            return False
+
+        parent = split_path(path)[0]
+
+        while parent:
+            if parent in self._objects:
+                return False
+            parent = split_path(parent)[0]
+
+        return True
+
+    def _list_objects_in_memory(self, key):
+        """Return a list of the objects kept in memory in the directory with the given key, see `list_objects`.
+
+        :param key: fully qualified identifier for the directory within the repository
+        """
+        path = normalize_path(key or '')
+        prefix = f'{path}/' if path else ''
+
+        if path in self._objects:
+            raise NotADirectoryError(f'object {key} is not a directory')
+
+        objects = {}
+
+        for entry in self._objects:
+            if entry.startswith(prefix):
+                name, _, remainder = entry[len(prefix):].partition('/')
+                objects[name] = FileType.DIRECTORY if remainder else FileType.FILE
+
+        if path and not objects:
+            raise FileNotFoundError(f'object {key} does not exist')
+
+        return [File(name, file_type) for name, file_type in sorted(objects.items())]
+
+    def _open_from_memory(self, key, mode):
+        """Open a read-only handle to an object kept in memory.
+
+        :param key: fully qualified identifier for the object within the repository
+        :param mode: the mode under which to open the handle
+        """
+        path = normalize_path(key or '')
+
+        try:
+            handle = io.BytesIO(self._objects[path])
+        except KeyError:
+            if any(entry.startswith(f'{path}/') for entry in self._objects):
+                raise IsADirectoryError(f'object {key} is a directory')
+            raise FileNotFoundError(f'object {key} does not exist')
+
+        if 'b' in mode:
+            return handle
+
+        return io.TextIOWrapper(handle)
+
+    def _write_objects(self, folder):
+        """Write the objects kept in memory to the given folder, after which they are no longer kept in memory.
+
+        :param folder: the `Folder` that is the root of the repository, to which the base path is appended
+        """
+        if not self._objects:
+            return
+
+        if self._base_path is not None:
+            folder = folder.get_subfolder(self._base_path, create=True, reset_limit=True)
+
+        for path, content in self._objects.items():
+            dirname, filename = split_path(path)
+            subfolder = folder.get_subfolder(os.path.join(*dirname.split('/')), create=True) if dirname else folder
+            subfolder.create_file_from_filelike(io.BytesIO(content), filename, mode='wb')
+
+        self._objects = {}
+
+    def _store_objects(self):
+        """Write the objects kept in memory directly to the object store or the repository folder of the node."""
+        if self._container is None:
+            self._repo_folder.erase()
+            self._repo_folder.create()
+            self._write_objects(self._repo_folder)
+            return
+
+        entries = {}
+
+        for path in self._objects:
+            parent = split_path(self._get_object_path(path))[0]
+            while parent:
+                entries[parent] = None
+                parent = split_path(parent)[0]
+
+        entries.update(
+            self._container.add_objects({
+                self._get_object_path(path): content for path, content in self._objects.items()
+            })
+        )
+
+        if entries:
+            self._container.set_hierarchy(self._repo_folder.uuid, entries)
+
+        self._objects = {}
+
+    @property
+    def _container(self):
+        """Return the object store container or None if it has not been initialised.
+
+        The container is only looked up the first time it is needed, which is when the repository is stored or when
+        the stored repository is accessed, such that constructing a node does not touch the file system.
+        """
+        if not self._container_resolved:
+            self._container_instance = get_container()
+            self._container_resolved = True
+
+        return self._container_instance
+
+    def _is_in_container(self):
+        """Return whether the contents of this repository live in the object store.
+
+        This is the case for stored nodes when the object store has been initialised, unless the node still has a
+        repository folder that has not yet been migrated.
+        """
+        return self._is_stored and self._container is not None and not self._repo_folder.exists()
+
+    def _get_object_path(self, key):
+        """Return the path in the virtual hierarchy of the object with the given key, including the base path.
+
+        :param key: fully qualified identifier for the object within the repository
+        """
+        return join_path(normalize_path(self._base_path or ''), normalize_path(key or ''))
+
+    def _open_from_container(self, key, mode):
+        """Open a read-only handle to an object stored in the object store.
+
+        :param key: fully qualified identifier for the object within the repository
+        :param mode: the mode under which to open the handle
+        :raises aiida.common.ModificationNotAllowed: if a mode other than reading is requested
+        """
+        if any(character in mode for character in 'wax+'):
+            raise exceptions.ModificationNotAllowed('objects of a stored repository can only be opened for reading')
+
+        exists, hashkey = self._container.get_entry(self._repo_folder.uuid, self._get_object_path(key))
+
+        if not exists:
+            raise FileNotFoundError(f'object {key} does not exist')
+
+        if hashkey is None:
+            raise IsADirectoryError(f'object {key} is a directory')
+
+        handle = self._container.open_object(hashkey)
+
+        if 'b' in mode:
+            return handle
+
+        return io.TextIOWrapper(handle)
+
+    def _get_materialized_folder(self):
+        """Return a sandbox folder with a copy of the contents of the object store for this repository.
+
+        This is only used to support code that requires an actual folder on disk. Changes made to this folder are not
+        persisted in the object store.
+
+        :return: a SandboxFolder object
+        """
+        if self._materialized_folder is None:
+            self._materialized_folder = SandboxFolder()
+            self._container.export_hierarchy(self._repo_folder.uuid, self._materialized_folder.abspath)
+
+        return self._materialized_folder
+
+    def _clear_materialized_folder(self):
+        """Erase the materialized copy of the object store contents, since it has gone out of date."""
+        if self._materialized_folder is not None:
+            self._materialized_folder.erase()
+            self._materialized_folder = None
+
+
+class PrefixedReader:
+    """Read-only filelike object that returns content already read from a handle, followed by the rest of the handle."""
+
+    def __init__(self, prefix, handle):
+        self._prefix = prefix
+        self._handle = handle
+
+    def read(self, size=-1):
+        """Read and return at most `size` bytes or characters, or everything that remains if `size` is negative."""
+        if not self._prefix:
+            return self._handle.read(size)
+
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._handle.read(), self._prefix[:0]
+        else:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+
+        return data
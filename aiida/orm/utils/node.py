@@ -9,6 +9,7 @@
 ###########################################################################
 """Utilities to operate on `Node` classes."""
 from abc import ABCMeta
+import functools
 import logging
 
 import warnings
@@ -24,10 +25,15 @@ __all__ = (
 )
 
 
+@functools.lru_cache(maxsize=None)
 def load_node_class(type_string):
     """
     Return the `Node` sub class that corresponds to the given type string.
 
+    The result is cached per type string, since this is called for every node that is loaded from the database, such
+    that a warning for an unknown type string is also only emitted once. The cache is cleared by
+    `aiida.plugins.entry_point.clear_entry_point_cache`.
+
     :param type_string: the `type` string of the node
     :return: a sub class of `Node`
     """
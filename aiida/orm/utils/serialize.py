@@ -22,6 +22,7 @@ from plumpy.utils import AttributesFrozendict
 
 from aiida import orm
 from aiida.common import AttributeDict
+from aiida.common.copy_on_write import CopyOnWriteDict, CopyOnWriteList
 
 _NODE_TAG = '!aiida_node'
 _GROUP_TAG = '!aiida_group'
@@ -199,6 +200,8 @@ yaml.add_constructor(_PLUMPY_BUNDLE, bundle_constructor, Loader=AiiDALoader)
 yaml.add_constructor(_NODE_TAG, node_constructor, Loader=AiiDALoader)
 yaml.add_constructor(_GROUP_TAG, group_constructor, Loader=AiiDALoader)
 yaml.add_constructor(_COMPUTER_TAG, computer_constructor, Loader=AiiDALoader)
+yaml.add_representer(CopyOnWriteDict, yaml.representer.SafeRepresenter.represent_dict, Dumper=AiiDADumper)
+yaml.add_representer(CopyOnWriteList, yaml.representer.SafeRepresenter.represent_list, Dumper=AiiDADumper)
 
 
 def serialize(data, encoding=None):
@@ -234,6 +234,24 @@ def get_entry_point_names(group, sort=True):
     return entry_point_names
 
 
+def clear_entry_point_cache():
+    """Clear the caches of the registered entry points and of the classes that are loaded through them.
+
+    This needs to be called if the registered entry points change while the interpreter is running, for example after
+    installing a plugin package and running `reentry scan`.
+    """
+    from aiida.orm.groups import load_group_class
+    from aiida.orm.utils.node import load_node_class
+
+    functions = (
+        get_entry_points, get_entry_point, get_entry_point_class_index, is_registered_entry_point, load_node_class,
+        load_group_class
+    )
+
+    for function in functions:
+        function.cache_clear()
+
+
 @functools.lru_cache(maxsize=None)
 def get_entry_points(group):
     """
@@ -281,17 +299,27 @@ def get_entry_point_from_class(class_module, class_name):
     :param class_name: name of the class
     :return: a tuple of the corresponding group and entry point or None if not found
     """
-    for group in ENTRYPOINT_MANAGER.get_entry_map().keys():
-        for entry_point in ENTRYPOINT_MANAGER.iter_entry_points(group):
+    return get_entry_point_class_index().get((class_module, class_name), (None, None))
 
-            if entry_point.module_name != class_module:
-                continue
 
+@functools.lru_cache(maxsize=None)
+def get_entry_point_class_index():
+    """
+    Return an index of all registered entry points by the module and name of the class that they point to
+
+    The index is built by scanning all entry points once and is cached until `clear_entry_point_cache` is called. If
+    the same class is registered by multiple entry points, the first one that is encountered is indexed.
+
+    :return: a dictionary mapping a tuple of class module and name onto a tuple of the entry point group and entry point
+    """
+    index = {}
+
+    for group in ENTRYPOINT_MANAGER.get_entry_map().keys():
+        for entry_point in ENTRYPOINT_MANAGER.iter_entry_points(group):
             for entry_point_class_name in entry_point.attrs:
-                if entry_point_class_name == class_name:
-                    return group, entry_point
+                index.setdefault((entry_point.module_name, entry_point_class_name), (group, entry_point))
 
-    return None, None
+    return index
 
 
 def get_entry_point_string_from_class(class_module, class_name):  # pylint: disable=invalid-name
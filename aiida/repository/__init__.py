@@ -10,5 +10,6 @@
 """Module with resources dealing with the file repository."""
 # pylint: disable=undefined-variable
 from .common import *
+from .container import *
 
-__all__ = (common.__all__)
+__all__ = (common.__all__ + container.__all__)
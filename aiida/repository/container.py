@@ -0,0 +1,720 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Content-addressed, deduplicating object store for the file repository of nodes.
+
+Objects are keyed by the SHA-256 hexdigest of their content, such that identical files are only ever stored once.
+Objects smaller than the configured pack threshold are appended to a small number of pack files, larger objects are
+written as loose files, sharded on the first two characters of their key. The file hierarchy of each node is purely
+virtual: it is a set of rows in an SQLite index, mapping the relative paths of a node to object keys.
+
+The layout of the container on disk is::
+
+    container/
+        config.json     # the parameters with which the container was initialised
+        index.sqlite    # the index of packed objects and the virtual hierarchies of the nodes
+        loose/ab/cdef…  # loose objects
+        packs/0         # pack files of small objects
+        sandbox/        # scratch space for objects that are being written
+
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+__all__ = ('Container', 'get_container')
+
+CONTAINER_DIRNAME = 'container'
+CONTAINER_VERSION = 1
+
+# Objects smaller than this number of bytes are stored in pack files
+DEFAULT_PACK_THRESHOLD = 4 * 1024 * 1024
+# A new pack file is started once the current one exceeds this number of bytes
+DEFAULT_PACK_SIZE_TARGET = 4 * 1024 * 1024 * 1024
+# Buffer size used when streaming content in and out of the container
+CHUNK_SIZE = 64 * 1024
+# Number of bytes of small objects that are buffered before being flushed to a pack file in a single transaction
+PACK_FLUSH_SIZE = 64 * 1024 * 1024
+
+SEPARATOR = '/'
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS packed ('
+    'hashkey TEXT PRIMARY KEY, pack_id INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS hierarchy ('
+    'uuid TEXT NOT NULL, parent TEXT NOT NULL, name TEXT NOT NULL, hashkey TEXT, PRIMARY KEY (uuid, parent, name))',
+    'CREATE INDEX IF NOT EXISTS hierarchy_hashkey ON hierarchy (hashkey)',
+)
+
+# Clause matching all rows whose parent is a given directory or one of its descendants
+DESCENDANTS_CLAUSE = "(parent = ? OR parent LIKE ? ESCAPE '\\')"
+
+_CONTAINERS = {}
+
+
+def get_container(profile=None):
+    """Return the object store container of the given profile, if it has been initialised.
+
+    :param profile: the profile whose container to return, by default the currently loaded profile
+    :return: the `Container` or None if the repository of the profile still uses a folder per node
+    """
+    from aiida.manage.configuration import get_profile
+
+    profile = profile or get_profile()
+    path = os.path.join(profile.repository_path, CONTAINER_DIRNAME)
+
+    try:
+        return _CONTAINERS[path]
+    except KeyError:
+        pass
+
+    container = Container(path)
+
+    # Only an initialised container is cached, such that a repository that is migrated later on, possibly by another
+    # process, is picked up by long-lived processes as well.
+    if not container.is_initialised:
+        return None
+
+    _CONTAINERS[path] = container
+
+    return container
+
+
+def split_path(path):
+    """Split a relative path in the virtual hierarchy into its parent and name.
+
+    :param path: relative path, using either the OS or the container separator
+    :return: tuple of parent and name, where the parent of a top level object is the empty string
+    """
+    path = normalize_path(path)
+
+    if SEPARATOR in path:
+        return tuple(path.rsplit(SEPARATOR, 1))
+
+    return '', path
+
+
+def join_path(*parts):
+    """Join parts of a path in the virtual hierarchy, ignoring empty parts."""
+    return SEPARATOR.join(part for part in parts if part)
+
+
+def normalize_path(path):
+    """Normalize a relative path to the separator used in the virtual hierarchy.
+
+    :param path: relative path
+    :return: the normalized path without leading or trailing separators
+    :raises ValueError: if the path is absolute or tries to escape the hierarchy
+    """
+    if not path:
+        return ''
+
+    if os.path.isabs(path):
+        raise ValueError(f'the path `{path}` must be a relative path')
+
+    parts = [part for part in path.replace(os.sep, SEPARATOR).split(SEPARATOR) if part not in ('', os.curdir)]
+
+    if os.pardir in parts:
+        raise ValueError(f'the path `{path}` cannot contain `{os.pardir}`')
+
+    return SEPARATOR.join(parts)
+
+
+class Container:
+    """Content-addressed, deduplicating object store with a virtual file hierarchy per node."""
+
+    def __init__(self, folder):
+        """Construct a new container instance for the given folder.
+
+        :param folder: absolute path of the folder of the container, which does not have to exist yet
+        """
+        self._folder = os.path.abspath(folder)
+        self._config = None
+        self._connection = None
+        self._connection_pid = None
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f'<Container: {self._folder}>'
+
+    @property
+    def folder(self):
+        """Return the absolute path of the folder of the container."""
+        return self._folder
+
+    @property
+    def is_initialised(self):
+        """Return whether the container has been initialised."""
+        return os.path.isfile(self._get_config_path())
+
+    @property
+    def pack_threshold(self):
+        """Return the size in bytes below which objects are stored in pack files."""
+        return self._get_config()['pack_threshold']
+
+    @property
+    def pack_size_target(self):
+        """Return the size in bytes above which a new pack file is started."""
+        return self._get_config()['pack_size_target']
+
+    def init_container(self, pack_threshold=DEFAULT_PACK_THRESHOLD, pack_size_target=DEFAULT_PACK_SIZE_TARGET):
+        """Initialise the container on disk.
+
+        :param pack_threshold: objects smaller than this number of bytes are stored in pack files
+        :param pack_size_target: a new pack file is started once the current one exceeds this number of bytes
+        :raises FileExistsError: if the container was already initialised
+        """
+        if self.is_initialised:
+            raise FileExistsError(f'the container at `{self._folder}` has already been initialised')
+
+        for dirname in ('loose', 'packs', 'sandbox'):
+            os.makedirs(os.path.join(self._folder, dirname), exist_ok=True)
+
+        with self._transaction() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+
+        config = {
+            'container_version': CONTAINER_VERSION,
+            'pack_threshold': pack_threshold,
+            'pack_size_target': pack_size_target,
+        }
+
+        # The configuration file is written last, since its existence marks the container as initialised
+        with open(self._get_config_path(), 'w', encoding='utf8') as handle:
+            json.dump(config, handle, indent=4)
+
+        self._config = config
+        _CONTAINERS[self._folder] = self
+
+    def add_object(self, handle):
+        """Add the content of a binary filelike object to the container.
+
+        :param handle: binary filelike object
+        :return: the key of the object
+        """
+        key, content = self._write_object(handle)
+
+        if content is not None:
+            self._write_packed({key: content})
+
+        return key
+
+    def add_objects(self, contents):
+        """Add the given contents to the container, appending the small objects to the pack file in one transaction.
+
+        :param contents: dictionary mapping arbitrary names onto the content of each object as bytes
+        :return: dictionary mapping the same names onto the object keys
+        """
+        keys = {}
+        pending = {}
+
+        for name, content in contents.items():
+            key, packed = self._write_object(io.BytesIO(content))
+            keys[name] = key
+
+            if packed is not None:
+                pending[key] = packed
+
+        if pending:
+            self._write_packed(pending)
+
+        return keys
+
+    def add_object_from_file(self, filepath):
+        """Add the content of the file at the given path to the container.
+
+        :param filepath: absolute path of the file
+        :return: the key of the object
+        """
+        with open(filepath, 'rb') as handle:
+            return self.add_object(handle)
+
+    def add_objects_from_tree(self, dirpath):
+        """Add all the files in the directory at the given path to the container.
+
+        Small objects are collected and appended to the pack file in as few transactions as possible.
+
+        :param dirpath: absolute path of the directory
+        :return: a dictionary mapping the relative path of each file and directory to its object key, where the key of
+            directories is `None`
+        """
+        entries = {}
+        pending = {}
+        pending_size = 0
+
+        for root, dirnames, filenames in os.walk(dirpath):
+            relroot = normalize_path(os.path.relpath(root, dirpath))
+
+            for dirname in dirnames:
+                entries[join_path(relroot, dirname)] = None
+
+            for filename in filenames:
+                with open(os.path.join(root, filename), 'rb') as handle:
+                    key, content = self._write_object(handle)
+
+                entries[join_path(relroot, filename)] = key
+
+                if content is not None and key not in pending:
+                    pending[key] = content
+                    pending_size += len(content)
+
+                if pending_size > PACK_FLUSH_SIZE:
+                    self._write_packed(pending)
+                    pending = {}
+                    pending_size = 0
+
+        if pending:
+            self._write_packed(pending)
+
+        return entries
+
+    def has_object(self, key):
+        """Return whether the object with the given key exists in the container.
+
+        :param key: the object key
+        """
+        if os.path.isfile(self._get_loose_path(key)):
+            return True
+
+        with self._transaction() as cursor:
+            cursor.execute('SELECT 1 FROM packed WHERE hashkey = ?', (key,))
+            return cursor.fetchone() is not None
+
+    def open_object(self, key):
+        """Return a binary read-only handle to the content of the object with the given key.
+
+        :param key: the object key
+        :raises FileNotFoundError: if the object does not exist
+        """
+        try:
+            return open(self._get_loose_path(key), 'rb')
+        except FileNotFoundError:
+            pass
+
+        with self._transaction() as cursor:
+            cursor.execute('SELECT pack_id, offset, length FROM packed WHERE hashkey = ?', (key,))
+            row = cursor.fetchone()
+
+        if row is None:
+            raise FileNotFoundError(f'object with key `{key}` does not exist')
+
+        pack_id, offset, length = row
+
+        with open(self._get_pack_path(pack_id), 'rb') as handle:
+            handle.seek(offset)
+            return io.BytesIO(handle.read(length))
+
+    def get_object_size(self, key):
+        """Return the size in bytes of the object with the given key.
+
+        :param key: the object key
+        :raises FileNotFoundError: if the object does not exist
+        """
+        try:
+            return os.path.getsize(self._get_loose_path(key))
+        except FileNotFoundError:
+            pass
+
+        with self._transaction() as cursor:
+            cursor.execute('SELECT length FROM packed WHERE hashkey = ?', (key,))
+            row = cursor.fetchone()
+
+        if row is None:
+            raise FileNotFoundError(f'object with key `{key}` does not exist')
+
+        return row[0]
+
+    def get_object_content(self, key):
+        """Return the content of the object with the given key.
+
+        :param key: the object key
+        :return: the content as bytes
+        """
+        with self.open_object(key) as handle:
+            return handle.read()
+
+    def has_hierarchy(self, uuid):
+        """Return whether the node with the given UUID has any entries in the virtual hierarchy."""
+        with self._transaction() as cursor:
+            cursor.execute('SELECT 1 FROM hierarchy WHERE uuid = ? LIMIT 1', (uuid,))
+            return cursor.fetchone() is not None
+
+    def get_hierarchy(self, uuid, path=''):
+        """Return the virtual hierarchy of the node with the given UUID.
+
+        :param uuid: the UUID of the node
+        :param path: optional relative path of a directory to which to restrict the hierarchy
+        :return: dictionary mapping relative paths onto object keys, where the key of directories is `None`. If `path`
+            is specified, the returned paths are relative to it.
+        """
+        path = normalize_path(path)
+        hierarchy = {}
+
+        with self._transaction() as cursor:
+            if path:
+                cursor.execute(
+                    f'SELECT parent, name, hashkey FROM hierarchy WHERE uuid = ? AND {DESCENDANTS_CLAUSE}',
+                    (uuid, path, f'{_escape_like(path)}{SEPARATOR}%')
+                )
+            else:
+                cursor.execute('SELECT parent, name, hashkey FROM hierarchy WHERE uuid = ?', (uuid,))
+
+            for parent, name, key in cursor.fetchall():
+                hierarchy[join_path(parent[len(path):].lstrip(SEPARATOR), name)] = key
+
+        return hierarchy
+
+    def get_entry(self, uuid, path):
+        """Return the entry of the virtual hierarchy of a node at the given path.
+
+        :param uuid: the UUID of the node
+        :param path: the relative path of the entry
+        :return: a tuple of a boolean, which is True if the entry exists, and the object key, which is `None` for
+            directories. The root of the hierarchy always exists and is a directory.
+        """
+        parent, name = split_path(path)
+
+        if not name:
+            return True, None
+
+        with self._transaction() as cursor:
+            cursor.execute(
+                'SELECT hashkey FROM hierarchy WHERE uuid = ? AND parent = ? AND name = ?', (uuid, parent, name)
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return False, None
+
+        return True, row[0]
+
+    def list_directory(self, uuid, path=''):
+        """Return the contents of a directory in the virtual hierarchy of a node.
+
+        :param uuid: the UUID of the node
+        :param path: the relative path of the directory
+        :return: list of tuples of the name and the object key of the entries, where the key of directories is `None`
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                'SELECT name, hashkey FROM hierarchy WHERE uuid = ? AND parent = ? ORDER BY name',
+                (uuid, normalize_path(path))
+            )
+            return cursor.fetchall()
+
+    def set_hierarchy(self, uuid, entries, path=''):
+        """Add entries to the virtual hierarchy of a node, replacing existing entries with the same path.
+
+        The directory `path` and the missing parent directories of the entries are added automatically.
+
+        :param uuid: the UUID of the node
+        :param entries: dictionary mapping relative paths onto object keys, where the key of directories is `None`
+        :param path: optional relative path of the directory into which the entries are added
+        """
+        path = normalize_path(path)
+        rows = {}
+
+        if path:
+            rows[split_path(path)] = None
+
+        for relpath, key in entries.items():
+            parent, name = split_path(join_path(path, normalize_path(relpath)))
+            if name:
+                rows[(parent, name)] = key
+
+        for parent, _ in list(rows):
+            while parent:
+                grandparent, name = split_path(parent)
+                rows.setdefault((grandparent, name), None)
+                parent = grandparent
+
+        with self._transaction() as cursor:
+            cursor.executemany(
+                'INSERT OR REPLACE INTO hierarchy (uuid, parent, name, hashkey) VALUES (?, ?, ?, ?)',
+                [(uuid, parent, name, key) for (parent, name), key in rows.items()]
+            )
+
+    def copy_hierarchy(self, source, target):
+        """Copy the virtual hierarchy of one node onto another, replacing the hierarchy of the target.
+
+        No object content is copied, since the objects are shared by key.
+
+        :param source: the UUID of the source node
+        :param target: the UUID of the target node
+        """
+        with self._transaction() as cursor:
+            cursor.execute('DELETE FROM hierarchy WHERE uuid = ?', (target,))
+            cursor.execute(
+                'INSERT INTO hierarchy (uuid, parent, name, hashkey) '
+                'SELECT ?, parent, name, hashkey FROM hierarchy WHERE uuid = ?', (target, source)
+            )
+
+    def delete_hierarchy(self, uuid, path=''):
+        """Delete the virtual hierarchy of a node.
+
+        The objects themselves are not deleted, even if they are no longer referenced. Use `clean` to remove those.
+
+        :param uuid: the UUID of the node
+        :param path: optional relative path to which to restrict the deletion, including its descendants
+        """
+        path = normalize_path(path)
+
+        with self._transaction() as cursor:
+            if not path:
+                cursor.execute('DELETE FROM hierarchy WHERE uuid = ?', (uuid,))
+                return
+
+            parent, name = split_path(path)
+            cursor.execute('DELETE FROM hierarchy WHERE uuid = ? AND parent = ? AND name = ?', (uuid, parent, name))
+            cursor.execute(
+                f'DELETE FROM hierarchy WHERE uuid = ? AND {DESCENDANTS_CLAUSE}',
+                (uuid, path, f'{_escape_like(path)}{SEPARATOR}%')
+            )
+
+    def delete_hierarchies(self, uuids):
+        """Delete the virtual hierarchies of the nodes with the given UUIDs in a single transaction.
+
+        :param uuids: iterable of node UUIDs, for which hierarchies that do not exist are ignored
+        """
+        with self._transaction() as cursor:
+            cursor.executemany('DELETE FROM hierarchy WHERE uuid = ?', ((uuid,) for uuid in uuids))
+
+    def export_hierarchy(self, uuid, dirpath, path=''):
+        """Write the virtual hierarchy of a node as actual files and directories to the given directory.
+
+        :param uuid: the UUID of the node
+        :param dirpath: absolute path of the target directory, which will be created if it does not exist
+        :param path: optional relative path of a directory to which to restrict the export
+        """
+        os.makedirs(dirpath, exist_ok=True)
+
+        for relpath, key in sorted(self.get_hierarchy(uuid, path).items()):
+            filepath = os.path.join(dirpath, *relpath.split(SEPARATOR))
+
+            if key is None:
+                os.makedirs(filepath, exist_ok=True)
+                continue
+
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+            with self.open_object(key) as source, open(filepath, 'wb') as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+    def clean(self):
+        """Remove all objects that are no longer referenced by any node hierarchy.
+
+        .. warning:: this should only be called when no other process is writing to the container, since objects
+            that have just been added but whose hierarchy has not yet been written would otherwise be removed.
+
+        Pack files are not rewritten, so the space of unreferenced packed objects is not reclaimed on disk.
+
+        :return: the number of removed objects
+        """
+        with self._transaction() as cursor:
+            cursor.execute('SELECT DISTINCT hashkey FROM hierarchy WHERE hashkey IS NOT NULL')
+            referenced = {row[0] for row in cursor.fetchall()}
+
+            cursor.execute('SELECT hashkey FROM packed')
+            unreferenced = [(row[0],) for row in cursor.fetchall() if row[0] not in referenced]
+            cursor.executemany('DELETE FROM packed WHERE hashkey = ?', unreferenced)
+
+        count = len(unreferenced)
+
+        for root, _, filenames in os.walk(os.path.join(self._folder, 'loose')):
+            for filename in filenames:
+                key = os.path.basename(root) + filename
+                if key not in referenced:
+                    os.remove(os.path.join(root, filename))
+                    count += 1
+
+        return count
+
+    def count_objects(self):
+        """Return the number of objects in the container.
+
+        :return: dictionary with the number of `loose` and `packed` objects
+        """
+        loose = sum(len(filenames) for _, _, filenames in os.walk(os.path.join(self._folder, 'loose')))
+
+        with self._transaction() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM packed')
+            packed = cursor.fetchone()[0]
+
+        return {'loose': loose, 'packed': packed}
+
+    def _get_config_path(self):
+        return os.path.join(self._folder, 'config.json')
+
+    def _get_config(self):
+        """Return the configuration of the container, reading it from disk the first time."""
+        if self._config is None:
+            with open(self._get_config_path(), 'r', encoding='utf8') as handle:
+                self._config = json.load(handle)
+
+        return self._config
+
+    def _get_loose_path(self, key):
+        return os.path.join(self._folder, 'loose', key[:2], key[2:])
+
+    def _get_pack_path(self, pack_id):
+        return os.path.join(self._folder, 'packs', str(pack_id))
+
+    def _get_connection(self):
+        """Return the connection to the SQLite index, opening a new one if this is a new (forked) process."""
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(
+                os.path.join(self._folder, 'index.sqlite'), timeout=60, isolation_level=None, check_same_thread=False
+            )
+            self._connection = connection
+            self._connection_pid = os.getpid()
+
+        return self._connection
+
+    @contextlib.contextmanager
+    def _transaction(self, exclusive=False):
+        """Context manager that yields a cursor within a transaction that is committed when exiting.
+
+        :param exclusive: if True, take the write lock of the database immediately, which serialises writers across
+            processes. This is required when appending to pack files.
+        """
+        with self._lock:
+            cursor = self._get_connection().cursor()
+            cursor.execute('BEGIN IMMEDIATE' if exclusive else 'BEGIN')
+            try:
+                yield cursor
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            else:
+                cursor.execute('COMMIT')
+            finally:
+                cursor.close()
+
+    def _write_object(self, handle):
+        """Stream the content of the handle, writing it as a loose object if it is not small enough to be packed.
+
+        :param handle: binary filelike object
+        :return: tuple of the object key and, if the object is small enough to be packed, its content. If the content
+            is None, the object has been written as a loose object.
+        """
+        hasher = hashlib.sha256()
+        buffer = io.BytesIO()
+        threshold = self.pack_threshold
+        temporary = None
+
+        try:
+            while True:
+                chunk = handle.read(CHUNK_SIZE)
+
+                if not chunk:
+                    break
+
+                hasher.update(chunk)
+
+                if temporary is None:
+                    buffer.write(chunk)
+
+                    if buffer.tell() >= threshold:
+                        temporary = tempfile.NamedTemporaryFile(dir=os.path.join(self._folder, 'sandbox'), delete=False)
+                        temporary.write(buffer.getvalue())
+                        buffer = None
+                else:
+                    temporary.write(chunk)
+
+            key = hasher.hexdigest()
+
+            if temporary is None:
+                return key, buffer.getvalue()
+
+            temporary.close()
+            filepath = self._get_loose_path(key)
+
+            if os.path.exists(filepath):
+                os.remove(temporary.name)
+            else:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                os.replace(temporary.name, filepath)
+
+            return key, None
+        except Exception:
+            if temporary is not None:
+                temporary.close()
+                with contextlib.suppress(OSError):
+                    os.remove(temporary.name)
+            raise
+
+    def _write_packed(self, objects):
+        """Append the given small objects to the current pack file and add them to the index.
+
+        Objects that already exist in the container are skipped.
+
+        :param objects: dictionary mapping object keys onto their content
+        """
+        with self._transaction(exclusive=True) as cursor:
+            keys = list(objects)
+            existing = set()
+
+            # SQLite limits the number of bound parameters, so query the existing keys in batches
+            for index in range(0, len(keys), 500):
+                batch = keys[index:index + 500]
+                cursor.execute(
+                    f"SELECT hashkey FROM packed WHERE hashkey IN ({', '.join('?' * len(batch))})", batch
+                )
+                existing.update(row[0] for row in cursor.fetchall())
+
+            missing = [key for key in keys if key not in existing and not os.path.isfile(self._get_loose_path(key))]
+
+            if not missing:
+                return
+
+            pack_id = self._get_current_pack_id()
+            rows = []
+
+            with open(self._get_pack_path(pack_id), 'ab') as handle:
+                offset = handle.tell()
+
+                for key in missing:
+                    content = objects[key]
+                    handle.write(content)
+                    rows.append((key, pack_id, offset, len(content)))
+                    offset += len(content)
+
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            cursor.executemany('INSERT INTO packed (hashkey, pack_id, offset, length) VALUES (?, ?, ?, ?)', rows)
+
+    def _get_current_pack_id(self):
+        """Return the identifier of the pack file to append to, which is the last one unless it has grown too large.
+
+        .. note:: this should only be called while holding the exclusive write lock of the index.
+        """
+        pack_ids = [int(name) for name in os.listdir(os.path.join(self._folder, 'packs')) if name.isdigit()]
+
+        if not pack_ids:
+            return 0
+
+        pack_id = max(pack_ids)
+
+        if os.path.getsize(self._get_pack_path(pack_id)) >= self.pack_size_target:
+            return pack_id + 1
+
+        return pack_id
+
+
+def _escape_like(value):
+    """Escape the wildcard characters of the SQL `LIKE` operator in the given value."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
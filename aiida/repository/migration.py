@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration of the file repository from a folder per node to the content-addressed object store."""
+import os
+import shutil
+
+from .container import CONTAINER_DIRNAME, Container
+
+__all__ = ('get_legacy_node_folders', 'migrate_repository')
+
+# Relative path of the sharded node folders within the repository of a profile, see `RepositoryFolder`
+LEGACY_NODE_FOLDER = os.path.join('repository', 'node')
+
+
+def get_legacy_node_folders(profile):
+    """Return the node folders of the legacy file repository of the given profile.
+
+    The node folders are sharded on the UUID, with a depth of two levels of two characters each.
+
+    :param profile: the profile
+    :return: list of tuples of the node UUID and the absolute path of its folder
+    """
+    basepath = os.path.join(profile.repository_path, LEGACY_NODE_FOLDER)
+    folders = []
+
+    if not os.path.isdir(basepath):
+        return folders
+
+    for first in sorted(os.listdir(basepath)):
+        for second in sorted(os.listdir(os.path.join(basepath, first))):
+            for rest in sorted(os.listdir(os.path.join(basepath, first, second))):
+                folders.append((f'{first}{second}{rest}', os.path.join(basepath, first, second, rest)))
+
+    return folders
+
+
+def migrate_repository(profile, remove_folders=True):
+    """Migrate the folder per node of the file repository of the given profile to the object store.
+
+    The object store is initialised if it does not yet exist. After that, all newly stored nodes will write their
+    contents to the object store. The migration can safely be interrupted and restarted, since nodes whose folder has
+    not yet been migrated continue to be served from their folder. The daemon should not be running during migration.
+
+    :param profile: the profile whose repository to migrate
+    :param remove_folders: boolean, if True, remove the folder of each node once its contents have been migrated
+    :return: generator yielding the UUID of each node that has been migrated
+    """
+    container = Container(os.path.join(profile.repository_path, CONTAINER_DIRNAME))
+
+    if not container.is_initialised:
+        container.init_container()
+
+    for uuid, folder in get_legacy_node_folders(profile):
+        entries = container.add_objects_from_tree(folder)
+        container.delete_hierarchy(uuid)
+        container.set_hierarchy(uuid, entries)
+
+        if remove_folders:
+            shutil.rmtree(folder)
+
+            # Clean up the shard directories that have become empty
+            for parent in (os.path.dirname(folder), os.path.dirname(os.path.dirname(folder))):
+                if not os.listdir(parent):
+                    os.rmdir(parent)
+
+        yield uuid
@@ -8,8 +8,11 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 """ Util methods """
+import base64
 from datetime import datetime, timedelta
+import json
 import urllib.parse
+from uuid import UUID
 
 from flask import jsonify
 from flask.json import JSONEncoder
@@ -237,7 +240,14 @@ class Utils:
         return (resource_type, page, node_id, query_type)
 
     def validate_request(
-        self, limit=None, offset=None, perpage=None, page=None, query_type=None, is_querystring_defined=False
+        self,
+        limit=None,
+        offset=None,
+        perpage=None,
+        page=None,
+        query_type=None,
+        is_querystring_defined=False,
+        after=None
     ):
         # pylint: disable=fixme,no-self-use,too-many-arguments,too-many-branches
         """
@@ -264,6 +274,9 @@ class Utils:
         # 4. No querystring if query type = projectable_properties'
         if query_type in ('projectable_properties',) and is_querystring_defined:
             raise RestInputValidationError('projectable_properties requests do not allow specifying a query string')
+        # 5. a cursor replaces the offset and the page
+        if after is not None and (offset is not None or page is not None):
+            raise RestValidationError('after key is incompatible with offset and with requesting a specific page')
 
     def paginate(self, page, perpage, total_count):
         """
@@ -330,13 +343,14 @@ class Utils:
 
         return (limit, offset, rel_pages)
 
-    def build_headers(self, rel_pages=None, url=None, total_count=None):
+    def build_headers(self, rel_pages=None, url=None, total_count=None, next_cursor=None):
         """
         Construct the header dictionary for an HTTP response. It includes related
         pages, total count of results (before pagination).
 
         :param rel_pages: a dictionary defining related pages (first, prev, next, last)
         :param url: (string) the full url, i.e. the url that the client uses to get Rest resources
+        :param next_cursor: (string) the cursor to pass as `after` to get the results after the returned ones
         """
 
         ## Type validation
@@ -400,6 +414,11 @@ class Utils:
             else:
                 pass
 
+        # set the cursor to the next results
+        if next_cursor is not None:
+            headers['X-Next-Cursor'] = next_cursor
+            expose_header.append('X-Next-Cursor')
+
         # to expose header access in cross-domain requests
         headers['Access-Control-Expose-Headers'] = ','.join(expose_header)
 
@@ -497,6 +516,7 @@ class Utils:
         orderby = []
         limit = None
         offset = None
+        after = None
         perpage = None
         filename = None
         download_format = None
@@ -535,6 +555,8 @@ class Utils:
             raise RestInputValidationError('You cannot specify limit more than once')
         if 'offset' in field_counts.keys() and field_counts['offset'] > 1:
             raise RestInputValidationError('You cannot specify offset more than once')
+        if 'after' in field_counts.keys() and field_counts['after'] > 1:
+            raise RestInputValidationError('You cannot specify after more than once')
         if 'perpage' in field_counts.keys() and field_counts['perpage'] > 1:
             raise RestInputValidationError('You cannot specify perpage more than once')
         if 'orderby' in field_counts.keys() and field_counts['orderby'] > 1:
@@ -572,6 +594,8 @@ class Utils:
                     offset = field[2]
                 else:
                     raise RestInputValidationError("only assignment operator '=' is permitted after 'offset'")
+            elif field[0] == 'after':
+                after = field[2]
             elif field[0] == 'perpage':
                 if field[1] == '=':
                     perpage = field[2]
@@ -678,7 +702,7 @@ class Utils:
 
         return (
             limit, offset, perpage, orderby, filters, download_format, download, filename, tree_in_limit,
-            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type
+            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type, after
         )
 
     def parse_query_string(self, query_string):
@@ -691,7 +715,7 @@ class Utils:
         """
 
         from pyparsing import Word, alphas, nums, alphanums, printables, \
-            ZeroOrMore, OneOrMore, Suppress, Optional, Literal, Group, \
+            ZeroOrMore, OneOrMore, Suppress, Optional, Literal, Keyword, Group, \
             QuotedString, Combine, \
             StringStart as SS, StringEnd as SE, \
             WordEnd as WE, \
@@ -795,7 +819,9 @@ class Utils:
         single_field = Group(key + operator + value)
         list_field = Group(key + (Literal('=in=') | Literal('=notin=')) + value_list)
         orderby_field = Group(key + Literal('=') + value_list)
-        field = (list_field | orderby_field | single_field)
+        # The cursor is an opaque token, see `encode_cursor`
+        after_field = Group(Keyword('after') + Literal('=') + Word(f'{alphanums}-_'))
+        field = (after_field | list_field | orderby_field | single_field)
 
         # Fields separator
         separator = Suppress(Literal('&'))
@@ -830,6 +856,46 @@ class Utils:
         return self.build_translator_parameters(field_list)
 
 
+def encode_cursor(order, values):
+    """Return an opaque token that marks the position after a row of results, for keyset pagination.
+
+    :param order: list of tuples of the ordered properties and their direction, either 'asc' or 'desc'
+    :param values: list with the value of each ordered property in the row
+    :return: the token as a url-safe string
+    """
+    encoded_values = []
+    for value in values:
+        if isinstance(value, datetime):
+            value = {'datetime': value.isoformat()}
+        elif isinstance(value, UUID):
+            value = str(value)
+        encoded_values.append(value)
+
+    payload = json.dumps({'order': [list(item) for item in order], 'values': encoded_values})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the ordering and the values that are encoded in a token created by `encode_cursor`.
+
+    :param token: the token
+    :return: tuple of the list of tuples of the ordered properties and their direction, and the list of values
+    :raises RestInputValidationError: if the token is invalid
+    """
+    from dateutil import parser as dtparser
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8'))
+        order = [tuple(item) for item in payload['order']]
+        values = [
+            dtparser.parse(value['datetime']) if isinstance(value, dict) else value for value in payload['values']
+        ]
+    except (ValueError, KeyError, TypeError):
+        raise RestInputValidationError('the value of after is not a valid cursor')
+
+    return order, values
+
+
 def list_routes():
     """List available routes"""
     from flask import current_app
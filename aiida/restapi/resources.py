@@ -148,7 +148,7 @@ class BaseResource(Resource):
         # pylint: disable=unused-variable
         (
             limit, offset, perpage, orderby, filters, download_format, download, filename, tree_in_limit,
-            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type
+            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type, after
         ) = self.utils.parse_query_string(query_string)
 
         ## Validate request
@@ -158,7 +158,8 @@ class BaseResource(Resource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string))
+            is_querystring_defined=(bool(query_string)),
+            after=after
         )
 
         ## Treat the projectable_properties case which does not imply access to the DataBase
@@ -181,14 +182,20 @@ class BaseResource(Resource):
             if page is not None:
                 (limit, offset, rel_pages) = self.utils.paginate(page, perpage, total_count)
                 self.trans.set_limit_offset(limit=limit, offset=offset)
-                headers = self.utils.build_headers(rel_pages=rel_pages, url=request.url, total_count=total_count)
             else:
-                self.trans.set_limit_offset(limit=limit, offset=offset)
-                headers = self.utils.build_headers(url=request.url, total_count=total_count)
+                rel_pages = None
+                self.trans.set_limit_offset(limit=limit, offset=offset, after=after)
 
             ## Retrieve results
             results = self.trans.get_results()
 
+            headers = self.utils.build_headers(
+                rel_pages=rel_pages,
+                url=request.url,
+                total_count=total_count,
+                next_cursor=self.trans.get_next_cursor()
+            )
+
         ## Build response and return it
         data = dict(
             method=request.method,
@@ -235,7 +242,7 @@ class Node(BaseResource):
 
         (
             limit, offset, perpage, orderby, filters, download_format, download, filename, tree_in_limit,
-            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type
+            tree_out_limit, attributes, attributes_filter, extras, extras_filter, full_type, after
         ) = self.utils.parse_query_string(query_string)
 
         ## Validate request
@@ -245,7 +252,8 @@ class Node(BaseResource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string))
+            is_querystring_defined=(bool(query_string)),
+            after=after
         )
 
         ## Treat the projectable properties case which does not imply access to the DataBase
@@ -308,10 +316,15 @@ class Node(BaseResource):
                 ## Retrieve results
                 results = self.trans.get_results()
 
-                headers = self.utils.build_headers(rel_pages=rel_pages, url=request.url, total_count=total_count)
+                headers = self.utils.build_headers(
+                    rel_pages=rel_pages,
+                    url=request.url,
+                    total_count=total_count,
+                    next_cursor=self.trans.get_next_cursor()
+                )
             else:
 
-                self.trans.set_limit_offset(limit=limit, offset=offset)
+                self.trans.set_limit_offset(limit=limit, offset=offset, after=after)
                 ## Retrieve results
                 results = self.trans.get_results()
 
@@ -333,7 +346,9 @@ class Node(BaseResource):
 
                     results = results['download']['data']
 
-                headers = self.utils.build_headers(url=request.url, total_count=total_count)
+                headers = self.utils.build_headers(
+                    url=request.url, total_count=total_count, next_cursor=self.trans.get_next_cursor()
+                )
 
             if attributes_filter is not None and attributes:
                 for node in results['nodes']:
@@ -13,7 +13,7 @@ from aiida.common.exceptions import InputValidationError, InvalidOperation
 from aiida.orm.querybuilder import QueryBuilder
 from aiida.restapi.common.exceptions import RestValidationError, \
     RestInputValidationError
-from aiida.restapi.common.utils import PK_DBSYNONYM
+from aiida.restapi.common.utils import PK_DBSYNONYM, decode_cursor, encode_cursor
 
 
 class BaseTranslator:
@@ -40,6 +40,8 @@ class BaseTranslator:
     _is_qb_initialized = False
     _is_id_query = None
     _total_count = None
+    _limit = None
+    _next_cursor = None
 
     def __init__(self, **kwargs):
         """
@@ -357,12 +359,13 @@ class BaseTranslator:
         """
         return self._query_help
 
-    def set_limit_offset(self, limit=None, offset=None):
+    def set_limit_offset(self, limit=None, offset=None, after=None):
         """
         sets limits and offset directly to the query_builder object
 
         :param limit:
         :param offset:
+        :param after: cursor returned with a previous page of results, to continue after its last result
         :return:
         """
 
@@ -389,15 +392,38 @@ class BaseTranslator:
         if self._is_qb_initialized:
             if limit is not None:
                 self.qbobj.limit(limit)
+                self._limit = limit
             else:
                 pass
             if offset is not None:
                 self.qbobj.offset(offset)
             else:
                 pass
+            if after is not None:
+                order, values = decode_cursor(after)
+                if order != self.get_cursor_order():
+                    raise RestInputValidationError('the cursor passed as after was created for a different ordering')
+                self.qbobj.after(values)
         else:
             raise InvalidOperation('query builder object has not been initialized.')
 
+    def get_cursor_order(self):
+        """
+        Returns the ordered properties of the results with their direction, on which the cursors are based.
+
+        :return: list of tuples of property and direction
+        """
+        return list(self._query_help['order_by'].get(self._result_type, {}).items())
+
+    def get_next_cursor(self):
+        """
+        Returns the cursor to pass as `after` to get the results after the last retrieved one, such that pages of
+        results can be requested without an offset, which the database would have to skip over for every page.
+
+        :return: the cursor, or None if the last page has been retrieved or the ordered properties are not returned
+        """
+        return self._next_cursor
+
     def get_formatted_result(self, label):
         """
         Runs the query and retrieves results tagged as "label".
@@ -412,6 +438,7 @@ class BaseTranslator:
             raise InvalidOperation('query builder object has not been initialized.')
 
         results = []
+        self._next_cursor = None
         if self._total_count > 0:
             for res in self.qbobj.dict():
                 tmp = res[label]
@@ -423,6 +450,14 @@ class BaseTranslator:
                     tmp['link_label'] = res[f'{self.__label__}--{label}']['label']
                 results.append(tmp)
 
+        # A full page may be followed by more results, which start after the last one
+        order = self.get_cursor_order()
+        if order and self._limit is not None and len(results) == self._limit:
+            try:
+                self._next_cursor = encode_cursor(order, [results[-1][prop] for prop, _ in order])
+            except (KeyError, TypeError):
+                pass
+
         # TODO think how to make it less hardcoded
         if self._result_type == 'with_outgoing':
             result = {'incoming': results}
@@ -12,6 +12,8 @@
 from abc import ABCMeta, abstractmethod
 from collections import namedtuple
 
+import numpy as np
+
 from aiida import orm
 from aiida.orm.utils.links import LinkQuadruple
 
@@ -20,6 +22,34 @@ VALID_ENTITY_CLASSES = (orm.Node, orm.Group)
 GroupNodeEdge = namedtuple('GroupNodeEdge', ['node_id', 'group_id'])
 
 
+class StringIndex():
+    """Bidirectional map between strings and the integers that represent them in compact edge sets.
+
+    The strings of the edges, such as link types and labels, are drawn from a small vocabulary, so storing each of them
+    once and an integer per edge is much smaller than storing a string per edge.
+    """
+
+    def __init__(self):
+        self._indices = {}
+        self._strings = []
+
+    def get_index(self, string):
+        """Return the integer that represents the given string, assigning a new one if the string is not known yet."""
+        try:
+            return self._indices[string]
+        except KeyError:
+            self._strings.append(string)
+            self._indices[string] = len(self._strings) - 1
+            return self._indices[string]
+
+    def get_string(self, index):
+        """Return the string that is represented by the given integer."""
+        return self._strings[index]
+
+
+STRING_INDEX = StringIndex()
+
+
 class AbstractSetContainer(metaclass=ABCMeta):
     """Abstract Class
 
@@ -33,12 +63,21 @@ class AbstractSetContainer(metaclass=ABCMeta):
     The underlying Python-class is **set**, which means that adding
     an instance to an AiidaEntitySet that is already contained by it
     will not create a duplicate.
+
+    Compact instances store the keys in a sorted numpy array without duplicates
+    instead, which takes a fraction of the memory of a set for large numbers of
+    entities and on which unions, differences and membership tests are vectorised.
+    The `keyset` of a compact instance is converted to a set when it is accessed.
     """
 
-    def __init__(self):
-        """Initialization method"""
+    def __init__(self, compact=False):
+        """Initialization method
+
+        :param bool compact: whether to store the keys in a numpy array instead of a set.
+        """
         super().__init__()
-        self._keyset = None
+        self._compact = compact
+        self._keys = None
         self._additional_identifiers = ()
 
     @abstractmethod
@@ -65,14 +104,48 @@ class AbstractSetContainer(metaclass=ABCMeta):
             by the container).
         """
 
+    @abstractmethod
+    def _encode_keys(self, keys):
+        """Utility function
+
+        Convert keys, as stored in the keyset, to the sorted numpy array without
+        duplicates that is stored by compact instances.
+
+        :param keys: an iterable of keys.
+        """
+
+    @abstractmethod
+    def _decode_keys(self, keyarray):
+        """Utility function
+
+        Convert a numpy array of keys of a compact instance to the keys as they are
+        stored in the keyset.
+
+        :param keyarray: a numpy array as returned by `_encode_keys`.
+        """
+
     @abstractmethod
     def get_template(self):
         """Create new instance with the same defining attributes."""
 
+    @property
+    def compact(self):
+        """Whether the keys are stored in a numpy array instead of a set"""
+        return self._compact
+
     @property
     def keyset(self):
         """Set containing the keys of the entities"""
-        return self._keyset
+        if self._compact and self._keys is not None:
+            return set(self._decode_keys(self._keys))
+        return self._keys
+
+    @property
+    def keyarray(self):
+        """Sorted numpy array containing the encoded keys of the entities"""
+        if self._compact:
+            return self._keys
+        return self._encode_keys(self._keys)
 
     @property
     def additional_identifiers(self):
@@ -95,41 +168,65 @@ class AbstractSetContainer(metaclass=ABCMeta):
         if not valid_type:
             raise ValueError('keyset must be assigned a set or None')
 
-        self._keyset = inpset
+        if self._compact and inpset is not None:
+            self._keys = self._encode_keys(inpset)
+        else:
+            self._keys = inpset
+
+    def _union(self, other):
+        """Return the keys of the union of self and other, stored like those of self."""
+        if self._compact:
+            return np.union1d(self._keys, other.keyarray)
+        return self._keys.union(other.keyset)
+
+    def _difference(self, other):
+        """Return the keys of the difference of self and other, stored like those of self."""
+        if self._compact:
+            return np.setdiff1d(self._keys, other.keyarray, assume_unique=True)
+        return self._keys.difference(other.keyset)
 
     def __add__(self, other):
         """Addition (return = self + other): defined as the set union"""
         self._check_self_and_other(other)
         new = self.get_template()
-        new.keyset = self.keyset.union(other.keyset)
+        new._keys = self._union(other)  # pylint: disable=protected-access
         return new
 
     def __iadd__(self, other):
         """Addition inplace (self += other)"""
         self._check_self_and_other(other)
-        self.keyset = self.keyset.union(other.keyset)
+        self._keys = self._union(other)
         return self
 
     def __sub__(self, other):
         """Subtraction (return = self - other): defined as the set-difference"""
         self._check_self_and_other(other)
         new = self.get_template()
-        new.keyset = self.keyset.difference(other.keyset)
+        new._keys = self._difference(other)  # pylint: disable=protected-access
         return new
 
     def __isub__(self, other):
         """Subtraction inplace (self -= other)"""
         self._check_self_and_other(other)
-        self.keyset = self.keyset.difference(other.keyset)
+        self._keys = self._difference(other)
         return self
 
     def __len__(self):
-        return len(self.keyset)
+        return len(self._keys)
+
+    def __contains__(self, key):
+        if not self._compact:
+            return key in self._keys
+        key = self._encode_keys([key])[0]
+        index = np.searchsorted(self._keys, key)
+        return bool(index < len(self._keys) and self._keys[index] == key)
 
     def __repr__(self):
         return f"{{{','.join(map(str, self.keyset))}}}"
 
     def __eq__(self, other):
+        if self._compact and other.compact:
+            return np.array_equal(self._keys, other.keyarray)
         return self.keyset == other.keyset
 
     def __ne__(self, other):
@@ -143,7 +240,10 @@ class AbstractSetContainer(metaclass=ABCMeta):
             by the EntitySet. Must be an AiiDA instance (Node or Group) or
             an appropriate identifier (ID).
         """
-        self.keyset = set(map(self._check_input_for_set, new_entitites))
+        if self._compact:
+            self._keys = self._encode_keys(map(self._check_input_for_set, new_entitites))
+        else:
+            self._keys = set(map(self._check_input_for_set, new_entitites))
 
     def add_entities(self, new_entitites):
         """
@@ -151,12 +251,15 @@ class AbstractSetContainer(metaclass=ABCMeta):
 
         :param new_entities: an iterable of new entities to add.
         """
-        self.keyset = self.keyset.union(list(map(self._check_input_for_set, new_entitites)))
+        if self._compact:
+            self._keys = np.union1d(self._keys, self._encode_keys(map(self._check_input_for_set, new_entitites)))
+        else:
+            self._keys = self._keys.union(list(map(self._check_input_for_set, new_entitites)))
 
     def copy(self):
         """Create new instance with the same defining attributes and the same keyset."""
         new = self.get_template()
-        new.keyset = self.keyset.copy()
+        new._keys = self._keys.copy()  # pylint: disable=protected-access
         return new
 
     def empty(self):
@@ -170,12 +273,13 @@ class AiidaEntitySet(AbstractSetContainer):
     This class is used to store `graph nodes` (aidda nodes or aiida groups).
     """
 
-    def __init__(self, aiida_cls):
+    def __init__(self, aiida_cls, compact=False):
         """Initialization method
 
         :param aiida_cls: a valid AiiDA ORM class (Node or Group supported).
+        :param bool compact: whether to store the ids in a numpy array instead of a set.
         """
-        super().__init__()
+        super().__init__(compact=compact)
         if not aiida_cls in VALID_ENTITY_CLASSES:
             raise TypeError(f'aiida_cls has to be among:{VALID_ENTITY_CLASSES}')
         self._aiida_cls = aiida_cls
@@ -207,8 +311,14 @@ class AiidaEntitySet(AbstractSetContainer):
             'matches the identifier you defined ({})'.format(input_for_set, self._identifier_type)
         )
 
+    def _encode_keys(self, keys):
+        return np.unique(np.fromiter(keys, dtype=np.int64))
+
+    def _decode_keys(self, keyarray):
+        return keyarray.tolist()
+
     def get_template(self):
-        return AiidaEntitySet(aiida_cls=self.aiida_cls)
+        return AiidaEntitySet(aiida_cls=self.aiida_cls, compact=self.compact)
 
     @property
     def identifier(self):
@@ -243,21 +353,21 @@ class DirectedEdgeSet(AbstractSetContainer):
     This class is used to store `graph edges` (aidda nodes or aiida groups).
     """
 
-    def __init__(self, aiida_cls_to, aiida_cls_from):
+    def __init__(self, aiida_cls_to, aiida_cls_from, compact=False):
         """Initialization method
 
         The classes that the link connects must be provided.
 
         :param aiida_cls_to: a valid AiiDA ORM class (Node or Group supported).
         :param aiida_cls_from: a valid AiiDA ORM class (Node supported).
+        :param bool compact: whether to store the edges in a numpy structured array instead of a set.
         """
-        super().__init__()
+        super().__init__(compact=compact)
         for aiida_cls in (aiida_cls_to, aiida_cls_from):
             if not aiida_cls in VALID_ENTITY_CLASSES:
                 raise TypeError(f'aiida_cls has to be among:{VALID_ENTITY_CLASSES}')
         self._aiida_cls_to = aiida_cls_to
         self._aiida_cls_from = aiida_cls_from
-        self.keyset = set()
 
         # I need to get the identifiers for the edge. For now, these should be hardcoded
         if aiida_cls_from is orm.Node:
@@ -266,14 +376,21 @@ class DirectedEdgeSet(AbstractSetContainer):
                 self._edge_identifiers = (('edge', 'input_id'), ('edge', 'output_id'), ('edge', 'type'),
                                           ('edge', 'label'))
                 self._edge_namedtuple = LinkQuadruple
+                self._edge_strings = (False, False, True, True)
             elif aiida_cls_to is orm.Group:
                 self._edge_identifiers = (('nodes', 'id'), ('groups', 'id'))
                 self._edge_namedtuple = GroupNodeEdge
+                self._edge_strings = (False, False)
             else:
                 raise TypeError(f'Unexpted types aiida_cls_from={aiida_cls_from} and aiida_cls_to={aiida_cls_to}')
         else:
             raise TypeError(f'Unexpted types aiida_cls_from={aiida_cls_from} and aiida_cls_to={aiida_cls_to}')
 
+        # In compact instances, the identifiers that are strings are stored as their index in the `STRING_INDEX`
+        self._edge_dtype = np.dtype([(field, np.int32 if is_string else np.int64)
+                                     for field, is_string in zip(self._edge_namedtuple._fields, self._edge_strings)])
+        self.keyset = set()
+
     def _check_self_and_other(self, other):
         if not isinstance(other, DirectedEdgeSet):
             raise TypeError('Other class is not an instance of AiidaEntitySet')
@@ -294,8 +411,26 @@ class DirectedEdgeSet(AbstractSetContainer):
             raise ValueError(f'tuple passed has len = {inputs_len}, but there are {inside_len} identifiers')
         return input_for_set
 
+    def _encode_keys(self, keys):
+        rows = [
+            tuple(STRING_INDEX.get_index(value) if is_string else value
+                  for value, is_string in zip(key, self._edge_strings))
+            for key in keys
+        ]
+        return np.unique(np.array(rows, dtype=self._edge_dtype))
+
+    def _decode_keys(self, keyarray):
+        return [
+            self._edge_namedtuple(
+                *(STRING_INDEX.get_string(value) if is_string else value
+                  for value, is_string in zip(row, self._edge_strings))
+            ) for row in keyarray.tolist()
+        ]
+
     def get_template(self):
-        return DirectedEdgeSet(aiida_cls_to=self.aiida_cls_to, aiida_cls_from=self.aiida_cls_from)
+        return DirectedEdgeSet(
+            aiida_cls_to=self.aiida_cls_to, aiida_cls_from=self.aiida_cls_from, compact=self.compact
+        )
 
     @property
     def aiida_cls_to(self):
@@ -326,7 +461,7 @@ class Basket():
     and one EdgeSet for Node-Node edges (links) and one for Group-Node connections.
     """
 
-    def __init__(self, nodes=None, groups=None, nodes_nodes=None, groups_nodes=None):
+    def __init__(self, nodes=None, groups=None, nodes_nodes=None, groups_nodes=None, compact=False):
         """Initialization method
 
         During initialization of the basket, both the sets of nodes and the set of
@@ -336,16 +471,18 @@ class Basket():
 
         :param nodes: AiiDA nodes provided in an acceptable way.
         :param groups: AiiDA groups provided in an acceptable way.
+        :param bool compact: whether the sets that are created by the basket, rather than
+            provided, store their keys in numpy arrays instead of sets.
         """
 
         def get_check_set_entity_set(input_object, keyword, aiida_class):
 
             if input_object is None:
-                output_set = AiidaEntitySet(aiida_class)
+                output_set = AiidaEntitySet(aiida_class, compact=compact)
                 return output_set
 
             if isinstance(input_object, (list, tuple, set)):
-                output_set = AiidaEntitySet(aiida_class)
+                output_set = AiidaEntitySet(aiida_class, compact=compact)
                 output_set.set_entities(input_object)
                 return output_set
 
@@ -363,7 +500,7 @@ class Basket():
 
         def get_check_set_directed_edge_set(var, keyword, cls_from, cls_to):
             if var is None:
-                return DirectedEdgeSet(aiida_cls_to=cls_to, aiida_cls_from=cls_from)
+                return DirectedEdgeSet(aiida_cls_to=cls_to, aiida_cls_from=cls_from, compact=compact)
             if isinstance(var, DirectedEdgeSet):
                 if var.aiida_cls_from is not cls_from:
                     raise TypeError(f'{keyword} has to  have {cls_from} as aiida_cls_from')
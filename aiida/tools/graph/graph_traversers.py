@@ -12,6 +12,12 @@
 from numpy import inf
 from aiida.common.links import GraphTraversalRules, LinkType
 
+# Number of starting nodes above which `traverse_graph` expands the graph in the database by default
+DATABASE_ENGINE_THRESHOLD = 10000
+
+# Name of the temporary table in which the database engine of `traverse_graph` keeps the visited nodes
+VISITED_TABLE = 'traverse_graph_visited'
+
 
 def get_nodes_delete(starting_pks, get_links=False, **kwargs):
     """
@@ -154,7 +160,9 @@ def validate_traversal_rules(ruleset=GraphTraversalRules.DEFAULT, **kwargs):
     return valid_output
 
 
-def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_forward=(), links_backward=()):
+def traverse_graph(
+    starting_pks, max_iterations=None, get_links=False, links_forward=(), links_backward=(), engine=None
+):
     """
     This function will return the set of all nodes that can be connected
     to a list of initial nodes through any sequence of specified links.
@@ -178,8 +186,15 @@ def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_for
     :type links_backward: aiida.common.links.LinkType
     :param links_backward:
         List with all the links that should be traversed in the backward direction.
+
+    :type engine: str or None
+    :param engine:
+        'python' to expand the graph with the rules of :mod:`aiida.tools.graph.age_rules`, which collect the nodes
+        in Python, or 'database' to expand it with SQL statements that keep the visited nodes in a temporary table,
+        such that only the final sets of nodes and links are transferred. The default, None, selects 'database' if
+        there are more than `DATABASE_ENGINE_THRESHOLD` starting nodes.
     """
-    # pylint: disable=too-many-locals,too-many-statements,too-many-branches
+    # pylint: disable=too-many-locals,too-many-statements,too-many-branches,too-many-arguments
     from aiida import orm
     from aiida.tools.graph.age_entities import Basket
     from aiida.tools.graph.age_rules import UpdateRule, RuleSequence, RuleSaveWalkers, RuleSetWalkers
@@ -190,6 +205,9 @@ def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_for
     elif not (isinstance(max_iterations, int) or max_iterations is inf):
         raise TypeError('Max_iterations has to be an integer or infinity')
 
+    if engine not in (None, 'python', 'database'):
+        raise ValueError(f"engine has to be 'python', 'database' or None, but it is: {engine}")
+
     linktype_list = []
     for linktype in links_forward:
         if not isinstance(linktype, LinkType):
@@ -218,6 +236,14 @@ def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_for
         raise TypeError(f'one of the starting_pks is not of type int:\n {starting_pks}')
     operational_set = set(starting_pks)
 
+    if engine is None:
+        engine = 'database' if len(operational_set) > DATABASE_ENGINE_THRESHOLD else 'python'
+
+    if engine == 'database':
+        return _traverse_graph_database(
+            operational_set, max_iterations, get_links, filters_forwards['type']['in'], filters_backwards['type']['in']
+        )
+
     query_nodes = orm.QueryBuilder()
     query_nodes.append(orm.Node, project=['id'], filters={'id': {'in': operational_set}})
     existing_pks = set(query_nodes.all(flat=True))
@@ -228,7 +254,9 @@ def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_for
         )
 
     rules = []
-    basket = Basket(nodes=operational_set)
+    # The sets of the basket, and all those derived from it by the rules, are stored in numpy arrays which take a
+    # fraction of the memory of Python sets. They are only converted to sets for the output.
+    basket = Basket(nodes=operational_set, compact=True)
 
     # When max_iterations is finite, the order of traversal may affect the result
     # (its not the same to first go backwards and then forwards than vice-versa)
@@ -270,3 +298,100 @@ def traverse_graph(starting_pks, max_iterations=None, get_links=False, links_for
         output['links'] = results['nodes_nodes'].keyset
 
     return output
+
+
+def _traverse_graph_database(starting_pks, max_iterations, get_links, types_forward, types_backward):
+    """
+    Traverse the graph like :func:`traverse_graph`, keeping the visited nodes in a temporary table of the database.
+
+    Each iteration is a single statement that inserts the nodes that are linked to the nodes found in the previous
+    iteration and that were not visited yet, so the nodes are not transferred until the traversal is complete. The
+    table is created within a savepoint of the current transaction, which is rolled back if the traversal fails.
+
+    :param starting_pks: set with the pks of the starting nodes
+    :param max_iterations: the number of iterations, which may be infinity
+    :param bool get_links: whether to also return the links that were traversed
+    :param types_forward: list with the values of the link types that are traversed in the forward direction
+    :param types_backward: list with the values of the link types that are traversed in the backward direction
+    """
+    from sqlalchemy import text
+    from aiida.common import exceptions
+    from aiida.manage.manager import get_manager
+    from aiida.orm.utils.links import LinkQuadruple
+
+    session = get_manager().get_backend().get_session()
+    types = {'forward': list(types_forward), 'backward': list(types_backward)}
+
+    # The nodes that are linked to the nodes at the given depth and that have not been visited yet. As the statement
+    # only sees the rows of the table as they were before it started, the nodes it inserts are not expanded further.
+    expand = text(
+        f"""
+        INSERT INTO {VISITED_TABLE} (id, depth)
+        SELECT link.output_id, :depth + 1 FROM db_dblink AS link
+        JOIN {VISITED_TABLE} AS walker ON walker.id = link.input_id
+        WHERE walker.depth = :depth AND link.type = ANY(CAST(:forward AS varchar[]))
+        UNION
+        SELECT link.input_id, :depth + 1 FROM db_dblink AS link
+        JOIN {VISITED_TABLE} AS walker ON walker.id = link.output_id
+        WHERE walker.depth = :depth AND link.type = ANY(CAST(:backward AS varchar[]))
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+    # The links that were followed from the nodes that were expanded, including those to nodes visited before
+    select_links = text(
+        f"""
+        SELECT link.input_id, link.output_id, link.type, link.label FROM db_dblink AS link
+        JOIN {VISITED_TABLE} AS walker ON walker.id = link.input_id
+        WHERE walker.depth <= :depth AND link.type = ANY(CAST(:forward AS varchar[]))
+        UNION
+        SELECT link.input_id, link.output_id, link.type, link.label FROM db_dblink AS link
+        JOIN {VISITED_TABLE} AS walker ON walker.id = link.output_id
+        WHERE walker.depth <= :depth AND link.type = ANY(CAST(:backward AS varchar[]))
+        """
+    )
+
+    with session.begin_nested():
+        create = f'CREATE TEMPORARY TABLE {VISITED_TABLE} (id integer PRIMARY KEY, depth integer NOT NULL)'
+        session.execute(text(create))
+        session.execute(text(f'CREATE INDEX ON {VISITED_TABLE} (depth)'))
+        session.execute(
+            text(f'INSERT INTO {VISITED_TABLE} (id, depth) SELECT id, 0 FROM unnest(CAST(:pks AS integer[])) AS id'),
+            {'pks': list(starting_pks)}
+        )
+        # Temporary tables are not analyzed automatically, without statistics the planner assumes a small table
+        session.execute(text(f'ANALYZE {VISITED_TABLE}'))
+
+        missing_pks = session.execute(
+            text(
+                f'SELECT visited.id FROM {VISITED_TABLE} AS visited '
+                'LEFT JOIN db_dbnode AS node ON node.id = visited.id WHERE node.id IS NULL'
+            )
+        ).fetchall()
+        if missing_pks:
+            raise exceptions.NotExistent(
+                'The following pks are not in the database and must be pruned before this   call: {}'.format(
+                    {pk for pk, in missing_pks}
+                )
+            )
+
+        depth = 0
+        expanded_depth = -1
+        while depth < max_iterations:
+            inserted = session.execute(expand, {'depth': depth, **types}).rowcount
+            expanded_depth = depth
+            if not inserted:
+                break
+            depth += 1
+
+        output = {}
+        output['nodes'] = {pk for pk, in session.execute(text(f'SELECT id FROM {VISITED_TABLE}'))}
+        output['links'] = None
+        if get_links:
+            output['links'] = {
+                LinkQuadruple(*row) for row in session.execute(select_links, {'depth': expanded_depth, **types})
+            }
+
+        session.execute(text(f'DROP TABLE {VISITED_TABLE}'))
+
+    return output
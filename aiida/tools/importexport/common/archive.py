@@ -10,22 +10,31 @@
 # pylint: disable=too-many-branches
 """Utility functions and classes to interact with AiiDA export archives."""
 
+import contextlib
+from distutils.version import StrictVersion
+import io
 import os
+import sqlite3
 import sys
 import tarfile
 import zipfile
+import zlib
 
 from wrapt import decorator
 
 from aiida.common import json
-from aiida.common.exceptions import ContentNotExistent, InvalidOperation
+from aiida.common.exceptions import ContentNotExistent, InvalidOperation, NotExistent
 from aiida.common.folders import SandboxFolder
 
-from aiida.tools.importexport.common.config import NODES_EXPORT_SUBFOLDER
+from aiida.tools.importexport.common.config import (
+    COMPUTER_ENTITY_NAME, DATA_FILENAME, DATA_LINES_VERSION, GROUP_ENTITY_NAME, LEGACY_DATA_FILENAME, NODE_ENTITY_NAME,
+    NODES_EXPORT_SUBFOLDER, USER_ENTITY_NAME
+)
 from aiida.tools.importexport.common.exceptions import CorruptArchive
 from aiida.tools.importexport.common.progress_bar import get_progress_bar, close_progress_bar
+from aiida.tools.importexport.common.utils import export_shard_uuid
 
-__all__ = ('Archive', 'extract_zip', 'extract_tar', 'extract_tree')
+__all__ = ('Archive', 'ArchiveReader', 'extract_zip', 'extract_tar', 'extract_tree')
 
 
 class Archive:
@@ -33,14 +42,16 @@ class Archive:
 
     The main usage should be to construct the class with the filepath of the export archive as an argument.
     The contents will be lazily unpacked into a sand box folder which is constructed upon entering the instance
-    within a context and which will be automatically cleaned upon leaving that context. Example::
+    within a context and which will be automatically cleaned upon leaving that context. The meta data and the data of
+    zip archives and archive directories are read directly through an :class:`ArchiveReader`, without unpacking the
+    archive. Example::
 
         with Archive('/some/path/archive.aiida') as archive:
             archive.version
 
     """
 
-    FILENAME_DATA = 'data.json'
+    FILENAME_DATA = DATA_FILENAME
     FILENAME_METADATA = 'metadata.json'
 
     def __init__(self, filepath, silent=True):
@@ -50,14 +61,19 @@ class Archive:
         self._unpacked = False
         self._data = None
         self._meta_data = None
+        self._reader = None
 
     def __enter__(self):
         """Instantiate a SandboxFolder into which the archive can be lazily unpacked."""
         self._folder = SandboxFolder()
+        if os.path.isdir(self.filepath) or zipfile.is_zipfile(self.filepath):
+            self._reader = ArchiveReader(self.filepath)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Clean the sandbox folder if it was instatiated."""
+        if self._reader:
+            self._reader.close()
         if self.folder:
             self.folder.erase()
 
@@ -118,7 +134,7 @@ class Archive:
         :return: dictionary with contents of data file
         """
         if self._data is None:
-            self._data = self._read_json_file(self.FILENAME_DATA)
+            self._data = self._reader.data if self._reader else self._read_data()
 
         return self._data
 
@@ -130,7 +146,10 @@ class Archive:
         :return: dictionary with contents of meta data file
         """
         if self._meta_data is None:
-            self._meta_data = self._read_json_file(self.FILENAME_METADATA)
+            if self._reader:
+                self._meta_data = self._reader.metadata
+            else:
+                self._meta_data = self._read_json_file(self.FILENAME_METADATA)
 
         return self._meta_data
 
@@ -162,6 +181,9 @@ class Archive:
 
         :return: a dictionary with basic details
         """
+        if self._data is None and self._reader:
+            return self._reader.get_data_statistics()
+
         export_data = self.data.get('export_data', {})
         links_data = self.data.get('links_uuid', {})
 
@@ -221,6 +243,529 @@ class Archive:
         with open(self.folder.get_abs_path(filename), 'r', encoding='utf8') as fhandle:
             return json.load(fhandle)
 
+    @ensure_within_context
+    @ensure_unpacked
+    def _read_data(self):
+        """Read the database content from the unpacked archive contents, in either data file layout.
+
+        :return: a dictionary with the database content
+        """
+        return read_data(self.folder)
+
+
+class ArchiveReader:
+    """Utility class to read the contents of an export archive without unpacking it.
+
+    The archive can be either a zip file or a directory. The metadata and the data file are read directly from the
+    archive and the central directory of the zip file serves as an index of the repository files of the nodes, such
+    that the files of a single node can be listed, opened or extracted on demand. Upon the first lookup of a node, the
+    data file is streamed once into a temporary SQLite database that is indexed by node UUID, after which the fields,
+    attributes and extras of any node are retrieved without loading the entire data file in memory. Example::
+
+        with ArchiveReader('/some/path/archive.aiida') as reader:
+            reader.version_format
+            reader.get_node_attributes(uuid)
+
+    .. note:: the members of a tar file cannot be accessed randomly, so tar archives have to be unpacked with the
+        :class:`Archive` instead.
+    """
+
+    FILENAME_METADATA = 'metadata.json'
+
+    def __init__(self, filepath):
+        """Construct a new instance.
+
+        :param filepath: the filepath of the zip file or of the directory of the archive
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the archive is neither a zip file nor
+            a directory, or if the zip file is corrupt or empty
+        """
+        self._filepath = filepath
+        self._zipfile = None
+
+        if os.path.isdir(filepath):
+            pass
+        elif zipfile.is_zipfile(filepath):
+            with self._raise_corrupt_archive():
+                self._zipfile = zipfile.ZipFile(filepath, 'r', allowZip64=True)
+
+            if not self._zipfile.namelist():
+                self._zipfile.close()
+                raise CorruptArchive('no files detected in archive')
+        else:
+            raise CorruptArchive(f'the archive {filepath} is neither a zip file nor a directory')
+
+        self._metadata = None
+        self._members = None
+        self._index_folder = None
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the archive and remove the node index, if it was created."""
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+        if self._index_folder is not None:
+            self._index_folder.erase()
+            self._index_folder = None
+
+        if self._zipfile is not None:
+            self._zipfile.close()
+
+    @property
+    def filepath(self):
+        """Return the filepath of the archive
+
+        :return: the archive filepath
+        """
+        return self._filepath
+
+    @property
+    def metadata(self):
+        """Return the loaded content of the meta data file
+
+        :return: dictionary with contents of meta data file
+        """
+        if self._metadata is None:
+            with self._raise_corrupt_archive(), self._open_member(self.FILENAME_METADATA) as fhandle:
+                try:
+                    self._metadata = json.load(fhandle)
+                except ValueError:
+                    raise CorruptArchive(f'invalid JSON in `{self.FILENAME_METADATA}`')
+
+        return self._metadata
+
+    @property
+    def version_format(self):
+        """Return the version of the archive format.
+
+        :return: version number
+        """
+        return self.metadata['export_version']
+
+    @property
+    def data_filename(self):
+        """Return the name of the data file of the archive, which depends on the version of the archive format."""
+        if self._zipfile is None:
+            exists = os.path.isfile(os.path.join(self.filepath, LEGACY_DATA_FILENAME))
+        else:
+            exists = LEGACY_DATA_FILENAME in self._zipfile.NameToInfo
+
+        return LEGACY_DATA_FILENAME if exists else DATA_FILENAME
+
+    @property
+    def data(self):
+        """Return the loaded content of the data file
+
+        .. note:: this loads the entire database content in memory. Use :meth:`iter_records` or the node lookups to
+            access the content one record at a time.
+
+        :return: dictionary with contents of data file
+        """
+        return load_data_records(self.iter_records())
+
+    def iter_records(self):
+        """Return the records of the data file, streamed from the archive.
+
+        For archives older than version 0.10, the legacy data file is loaded in its entirety and its content is
+        returned as records.
+
+        :return: generator of records, each a list of the section name followed by the keys and the value of the record
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the data file contains an invalid
+            record
+        """
+        with self._raise_corrupt_archive():
+            with io.TextIOWrapper(self._open_member(self.data_filename), encoding='utf8') as fhandle:
+                if self.data_filename == DATA_FILENAME:
+                    yield from parse_data_lines(fhandle)
+                else:
+                    try:
+                        data = json.load(fhandle)
+                    except ValueError:
+                        raise CorruptArchive(f'invalid JSON in `{LEGACY_DATA_FILENAME}`')
+                    yield from iter_data_records(data)
+
+    def get_data_statistics(self):
+        """Return dictionary with statistics about data content, i.e. how many entries of each entity type it contains.
+
+        :return: a dictionary with basic details
+        """
+        statistics = {'computers': 0, 'groups': 0, 'links': 0, 'nodes': 0, 'users': 0}
+        entity_keys = {
+            COMPUTER_ENTITY_NAME: 'computers',
+            GROUP_ENTITY_NAME: 'groups',
+            NODE_ENTITY_NAME: 'nodes',
+            USER_ENTITY_NAME: 'users',
+        }
+
+        for section, *keys in self.iter_records():
+            if section == 'links_uuid':
+                statistics['links'] += 1
+            elif section == 'export_data' and keys[0] in entity_keys:
+                statistics[entity_keys[keys[0]]] += 1
+
+        return statistics
+
+    def get_node(self, uuid):
+        """Return the pk and the fields of the node with the given UUID, as exported in the archive.
+
+        :param uuid: the UUID of the node
+        :return: tuple of the pk of the node in the archive and the dictionary with its fields
+        :raises `~aiida.common.exceptions.NotExistent`: if the archive contains no node with the given UUID
+        """
+        row = self._get_index().execute('SELECT pk, fields FROM nodes WHERE uuid = ?', (uuid,)).fetchone()
+
+        if row is None:
+            raise NotExistent(f'the archive contains no node with UUID<{uuid}>')
+
+        return row[0], json.loads(row[1])
+
+    def get_node_attributes(self, uuid):
+        """Return the attributes of the node with the given UUID.
+
+        :param uuid: the UUID of the node
+        :return: dictionary with the attributes of the node
+        :raises `~aiida.common.exceptions.NotExistent`: if the archive contains no node with the given UUID
+        """
+        return self._get_node_data('node_attributes', uuid)
+
+    def get_node_extras(self, uuid):
+        """Return the extras of the node with the given UUID.
+
+        :param uuid: the UUID of the node
+        :return: dictionary with the extras of the node
+        :raises `~aiida.common.exceptions.NotExistent`: if the archive contains no node with the given UUID
+        """
+        return self._get_node_data('node_extras', uuid)
+
+    def list_repository(self, uuid):
+        """Return the relative paths of the repository files of the node with the given UUID.
+
+        :param uuid: the UUID of the node
+        :return: sorted list of file paths, relative to the repository of the node and separated by forward slashes
+        """
+        prefix = self._get_repository_prefix(uuid)
+
+        if self._zipfile is None:
+            dirpath = os.path.join(self.filepath, prefix)
+            return sorted(
+                os.path.relpath(os.path.join(root, filename), dirpath).replace(os.sep, '/')
+                for root, _, filenames in os.walk(dirpath)
+                for filename in filenames
+            )
+
+        return sorted(
+            member.filename[len(prefix):] for member in self._get_repository_members(uuid) if not member.is_dir()
+        )
+
+    def open_repository_file(self, uuid, path):
+        """Open a repository file of the node with the given UUID for reading in binary mode.
+
+        :param uuid: the UUID of the node
+        :param path: the path of the file, relative to the repository of the node and separated by forward slashes
+        :return: a binary file handle
+        :raises `~aiida.common.exceptions.NotExistent`: if the node has no repository file with the given path
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the zip file is corrupt
+        """
+        with self._raise_corrupt_archive():
+            try:
+                return self._open_member(self._get_repository_prefix(uuid) + path)
+            except CorruptArchive:
+                raise NotExistent(f'the archive contains no file `{path}` for the node with UUID<{uuid}>')
+
+    def extract_repository(self, uuid, folder):
+        """Extract the repository files of the node with the given UUID into a folder.
+
+        The files are extracted in the same layout as in the archive, i.e. in the sharded subfolder of the nodes export
+        subfolder, such that only the files of this node are written to disk. Nothing is extracted if the node has no
+        repository files.
+
+        :param uuid: the UUID of the node
+        :param folder: the folder into which the files are extracted
+        :type folder: :py:class:`~aiida.common.folders.Folder`
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the zip file is corrupt
+        """
+        if self._zipfile is None:
+            subfolder = os.path.join(NODES_EXPORT_SUBFOLDER, export_shard_uuid(uuid))
+            dirpath = os.path.abspath(os.path.join(self.filepath, subfolder))
+            if os.path.isdir(dirpath):
+                folder.get_subfolder(subfolder).replace_with_folder(dirpath, move=False, overwrite=True)
+            return
+
+        with self._raise_corrupt_archive():
+            for member in self._get_repository_members(uuid):
+                self._zipfile.extract(member, path=folder.abspath)
+
+    def extract_data(self, folder, silent=True):
+        """Extract the meta data file and the data file into a folder.
+
+        :param folder: the folder into which the files are extracted
+        :type folder: :py:class:`~aiida.common.folders.Folder`
+        :param silent: suppress the progress bar
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the archive misses either file or if
+            the zip file is corrupt
+        """
+        close_progress_bar(leave=False)
+        filenames = [self.FILENAME_METADATA, self.data_filename]
+        file_iterator = get_progress_bar(iterable=filenames, leave=False, disable=silent)
+
+        with self._raise_corrupt_archive():
+            for filename in file_iterator:
+                update_description(filename, file_iterator)
+
+                with self._open_member(filename) as fhandle:
+                    folder.create_file_from_filelike(fhandle, filename, mode='wb')
+
+        close_progress_bar(leave=False)
+
+    @contextlib.contextmanager
+    def _raise_corrupt_archive(self):
+        """Context manager that raises `CorruptArchive` for the errors of reading a corrupt zip file."""
+        try:
+            yield
+        except (zipfile.BadZipfile, zlib.error, EOFError) as exception:
+            raise CorruptArchive(f'the archive {self.filepath} is corrupt: {exception}') from exception
+
+    def _open_member(self, name):
+        """Open a file of the archive for reading in binary mode.
+
+        :param name: the path of the file within the archive, separated by forward slashes
+        :return: a binary file handle
+        :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the archive does not contain the file
+        """
+        try:
+            if self._zipfile is None:
+                return open(os.path.join(self.filepath, name), 'rb')
+            return self._zipfile.open(name)
+        except (KeyError, FileNotFoundError, IsADirectoryError):
+            raise CorruptArchive(f'required file `{name}` is not included')
+
+    @staticmethod
+    def _get_repository_prefix(uuid):
+        """Return the path of the repository folder of the node with the given UUID within the archive."""
+        return '/'.join([NODES_EXPORT_SUBFOLDER, export_shard_uuid(uuid).replace(os.sep, '/'), ''])
+
+    def _get_repository_members(self, uuid):
+        """Return the zip members of the repository folder of the node with the given UUID.
+
+        Upon the first call, the members listed in the central directory of the zip file are grouped by node, such that
+        the members of each node are found in constant time.
+        """
+        if self._members is None:
+            self._members = {}
+            for member in self._zipfile.infolist():
+                parts = member.filename.split('/', 4)
+                if parts[0] == NODES_EXPORT_SUBFOLDER and len(parts) == 5:
+                    self._members.setdefault('/'.join(parts[:4] + ['']), []).append(member)
+
+        return self._members.get(self._get_repository_prefix(uuid), [])
+
+    def _get_node_data(self, section, uuid):
+        """Return the value of the given section of the data file for the node with the given UUID."""
+        pk, _ = self.get_node(uuid)
+        query = 'SELECT value FROM node_data WHERE section = ? AND pk = ?'
+        row = self._get_index().execute(query, (section, pk)).fetchone()
+
+        if row is None:
+            return {}
+
+        return json.loads(row[0])
+
+    def _get_index(self):
+        """Return the connection to the node index, streaming the data file into it upon the first call."""
+        if self._index is None:
+            self._index_folder = SandboxFolder(sandbox_in_repo=False)
+            index = sqlite3.connect(self._index_folder.get_abs_path('index.sqlite'))
+            index.execute('CREATE TABLE nodes (uuid TEXT PRIMARY KEY, pk INTEGER, fields TEXT)')
+            index.execute('CREATE TABLE node_data (section TEXT, pk INTEGER, value TEXT, PRIMARY KEY (section, pk))')
+
+            with index:
+                for section, *keys, value in self.iter_records():
+                    if section == 'export_data' and keys[0] == NODE_ENTITY_NAME:
+                        row = (value['uuid'], int(keys[1]), json.dumps(value))
+                        index.execute('INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)', row)
+                    elif section in ['node_attributes', 'node_extras']:
+                        row = (section, int(keys[0]), json.dumps(value))
+                        index.execute('INSERT OR REPLACE INTO node_data VALUES (?, ?, ?)', row)
+
+            self._index = index
+
+        return self._index
+
+
+class DataFileWriter:
+    """Write the database content of an export archive to the data file, one record at a time.
+
+    Each line of the data file is a JSON list, whose first element is the name of the section of the legacy
+    ``data.json`` layout to which the record belongs, followed by the keys and the value of the record:
+
+    * ``["export_data", <entity name>, <pk>, <fields>]``
+    * ``["node_attributes", <pk>, <attributes>]``
+    * ``["node_extras", <pk>, <extras>]``
+    * ``["links_uuid", <link>]``
+    * ``["groups_uuid", <group uuid>, <node uuid>]``
+
+    Since records are independent, they can be written while the database is being queried, without ever keeping the
+    entire content in memory.
+    """
+
+    def __init__(self, fhandle):
+        """Construct a new instance.
+
+        :param fhandle: a handle, opened for writing text, to which the records are written
+        """
+        self._fhandle = fhandle
+
+    def write_entity(self, entity_name, pk, fields):
+        """Write the fields of a database entry of the given entity."""
+        self._write('export_data', entity_name, int(pk), fields)
+
+    def write_node_attributes(self, pk, attributes):
+        """Write the attributes of the node with the given pk."""
+        self._write('node_attributes', int(pk), attributes)
+
+    def write_node_extras(self, pk, extras):
+        """Write the extras of the node with the given pk."""
+        self._write('node_extras', int(pk), extras)
+
+    def write_link(self, link):
+        """Write a link, as a dictionary with the keys `input`, `output`, `label` and `type`."""
+        self._write('links_uuid', link)
+
+    def write_group_node(self, group_uuid, node_uuid):
+        """Write the membership of the node with the given UUID to the group with the given UUID."""
+        self._write('groups_uuid', group_uuid, node_uuid)
+
+    def write_data(self, data):
+        """Write all the records of the database content in the legacy dictionary layout.
+
+        :param data: dictionary with the database content, as returned by :func:`read_data`
+        """
+        for record in iter_data_records(data):
+            self._write(*record)
+
+    def _write(self, *record):
+        self._fhandle.write(json.dumps(record) + '\n')
+
+
+def read_data(folder):
+    """Return the database content of an unpacked export archive.
+
+    Archives as of version 0.10 contain a data file with one JSON record per line, as written by the
+    :class:`DataFileWriter`. Older archives contain a single JSON object in ``data.json``. In both cases, the content is
+    returned as a dictionary in the legacy layout, with the keys `export_data`, `node_attributes`, `node_extras`,
+    `links_uuid` and `groups_uuid`.
+
+    :param folder: the folder in which the archive is unpacked
+    :return: dictionary with the database content
+    :raises IOError: if the folder contains no data file
+    :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the data file contains an invalid record
+    """
+    filepath = folder.get_abs_path(DATA_FILENAME)
+
+    if not os.path.isfile(filepath):
+        with open(folder.get_abs_path(LEGACY_DATA_FILENAME), 'r', encoding='utf8') as fhandle:
+            return json.load(fhandle)
+
+    with open(filepath, 'r', encoding='utf8') as fhandle:
+        return load_data_records(parse_data_lines(fhandle))
+
+
+def parse_data_lines(lines):
+    """Parse the lines of a data file into records.
+
+    :param lines: iterable over the lines of the data file
+    :return: generator of records, each a list of the section name followed by the keys and the value of the record
+    :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if a line is not a valid record
+    """
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise CorruptArchive(f'invalid record in {DATA_FILENAME}: {line.strip()}')
+
+        if not isinstance(record, list) or len(record) < 2:
+            raise CorruptArchive(f'invalid record in {DATA_FILENAME}: {line.strip()}')
+
+        yield record
+
+
+def iter_data_records(data):
+    """Return the records of the database content in the legacy dictionary layout, as written to the data file.
+
+    :param data: dictionary with the database content, as returned by :func:`read_data`
+    :return: generator of records, each a tuple of the section name followed by the keys and the value of the record
+    """
+    for entity_name, entries in data.get('export_data', {}).items():
+        for pk, fields in entries.items():
+            yield 'export_data', entity_name, int(pk), fields
+
+    for section in ['node_attributes', 'node_extras']:
+        for pk, value in data.get(section, {}).items():
+            yield section, int(pk), value
+
+    for link in data.get('links_uuid', []):
+        yield 'links_uuid', link
+
+    for group_uuid, node_uuids in data.get('groups_uuid', {}).items():
+        for node_uuid in node_uuids:
+            yield 'groups_uuid', group_uuid, node_uuid
+
+
+def load_data_records(records):
+    """Return the database content in the legacy dictionary layout, built from the records of a data file.
+
+    :param records: iterable over the records, as returned by :func:`parse_data_lines`
+    :return: dictionary with the database content
+    :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if a record does not belong to a known section
+    """
+    data = {'export_data': {}, 'node_attributes': {}, 'node_extras': {}, 'links_uuid': [], 'groups_uuid': {}}
+
+    for record in records:
+        try:
+            section, *keys, value = record
+            if section == 'export_data':
+                data[section].setdefault(keys[0], {})[str(keys[1])] = value
+            elif section == 'groups_uuid':
+                data[section].setdefault(keys[0], []).append(value)
+            elif section == 'links_uuid':
+                data[section].append(value)
+            else:
+                data[section][str(keys[0])] = value
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise CorruptArchive(f'invalid record in {DATA_FILENAME}: {record}')
+
+    return data
+
+
+def write_data(folder, metadata, data):
+    """Write the database content to the data file of an unpacked archive, in the layout of its export version.
+
+    The data file of the other layout is removed, if present, such that an archive that is migrated to version 0.10
+    contains only the new data file.
+
+    :param folder: the folder in which the archive is unpacked
+    :param metadata: the content of the metadata.json file of the archive
+    :param data: dictionary with the database content
+    """
+    if StrictVersion(metadata['export_version']) < StrictVersion(DATA_LINES_VERSION):
+        filename, obsolete = LEGACY_DATA_FILENAME, DATA_FILENAME
+        with open(folder.get_abs_path(filename), 'wb') as fhandle:
+            json.dump(data, fhandle, indent=4)
+    else:
+        filename, obsolete = DATA_FILENAME, LEGACY_DATA_FILENAME
+        with open(folder.get_abs_path(filename), 'w', encoding='utf8') as fhandle:
+            DataFileWriter(fhandle).write_data(data)
+
+    if os.path.isfile(folder.get_abs_path(obsolete)):
+        os.remove(folder.get_abs_path(obsolete))
+
 
 def update_description(path, refresh: bool = False):
     """Update description for a progress bar given path
@@ -254,15 +799,19 @@ def get_file_iterator(file_handle, folderpath, silent=True, **kwargs):  # pylint
     :return: List of filenames in the archive, wrapped in the `tqdm` progress bar.
     :rtype: `tqdm.tqdm`
     """
-    json_files = {'metadata.json', 'data.json'}
-
     if isinstance(file_handle, tarfile.TarFile):
         file_format = 'tar'
+        filenames = set(file_handle.getnames())
     elif isinstance(file_handle, zipfile.ZipFile):
         file_format = 'zip'
+        filenames = set(file_handle.namelist())
     else:
         raise TypeError('Can only handle Tar or Zip files.')
 
+    # Archives contain either data file, depending on their version
+    data_filename = LEGACY_DATA_FILENAME if LEGACY_DATA_FILENAME in filenames else DATA_FILENAME
+    json_files = {'metadata.json', data_filename}
+
     close_progress_bar(leave=False)
     file_iterator = get_progress_bar(iterable=json_files, leave=False, disable=silent)
 
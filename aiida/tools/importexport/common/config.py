@@ -14,7 +14,16 @@ from aiida.orm import Computer, Group, Node, User, Log, Comment
 __all__ = ('EXPORT_VERSION',)
 
 # Current export version
-EXPORT_VERSION = '0.9'
+EXPORT_VERSION = '0.10'
+
+# The export version from which on the database content is stored as one JSON record per line
+DATA_LINES_VERSION = '0.10'
+
+# The name of the file with the database content, with one JSON record per line
+DATA_FILENAME = 'data.jsonl'
+
+# The name of the file with the database content as a single JSON object, used by archives before `DATA_LINES_VERSION`
+LEGACY_DATA_FILENAME = 'data.json'
 
 DUPL_SUFFIX = ' (Imported #{})'
 
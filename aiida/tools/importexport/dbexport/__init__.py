@@ -17,13 +17,14 @@ import time
 from aiida import get_version, orm
 from aiida.common import json
 from aiida.common.exceptions import LicensingException
-from aiida.common.folders import RepositoryFolder, SandboxFolder, Folder
+from aiida.common.folders import SandboxFolder, Folder
 from aiida.common.lang import type_check
 from aiida.common.log import override_log_formatter, LOG_LEVEL_REPORT
 from aiida.orm.utils._repository import Repository
 
 from aiida.tools.importexport.common import exceptions, get_progress_bar, close_progress_bar
-from aiida.tools.importexport.common.config import EXPORT_VERSION, NODES_EXPORT_SUBFOLDER
+from aiida.tools.importexport.common.archive import DataFileWriter
+from aiida.tools.importexport.common.config import DATA_FILENAME, EXPORT_VERSION, NODES_EXPORT_SUBFOLDER
 from aiida.tools.importexport.common.config import (
     NODE_ENTITY_NAME, GROUP_ENTITY_NAME, COMPUTER_ENTITY_NAME, LOG_ENTITY_NAME, COMMENT_ENTITY_NAME
 )
@@ -443,14 +444,6 @@ def export_tree(
     else:
         node_pk_2_uuid_mapping = {}
 
-    # The set of tuples now has to be transformed to a list of dicts
-    links_uuid = [{
-        'input': node_pk_2_uuid_mapping[link.source_id],
-        'output': node_pk_2_uuid_mapping[link.target_id],
-        'label': link.link_label,
-        'type': link.link_type
-    } for link in traverse_output['links']]
-
     progress_bar.update()
 
     # Progress bar initialization - Entities
@@ -548,135 +541,143 @@ def export_tree(
     ############################################################
     EXPORT_LOGGER.debug('GATHERING DATABASE ENTRIES...')
 
-    if entries_to_add:
-        progress_bar = get_progress_bar(total=len(entries_to_add), disable=silent)
-
-    export_data = defaultdict(dict)
-    entity_separator = '_'
-    for entity_name, partial_query in entries_to_add.items():
-
-        progress_bar.set_description_str(f'Exporting {entity_name}s', refresh=False)
-        progress_bar.update()
-
-        foreign_fields = {k: v for k, v in all_fields_info[entity_name].items() if 'requires' in v}
-
-        for value in foreign_fields.values():
-            ref_model_name = value['requires']
-            fill_in_query(partial_query, entity_name, ref_model_name, [entity_name], entity_separator)
-
-        for temp_d in partial_query.iterdict():
-            for key in temp_d:
-                # Get current entity
-                current_entity = key.split(entity_separator)[-1]
-
-                # This is a empty result of an outer join.
-                # It should not be taken into account.
-                if temp_d[key]['id'] is None:
-                    continue
-
-                export_data[current_entity].update({
-                    temp_d[key]['id']:
-                    serialize_dict(
-                        temp_d[key], remove_fields=['id'], rename_fields=model_fields_to_file_fields[current_entity]
-                    )
-                })
-
-    # Close progress up until this point in order to print properly
-    close_progress_bar(leave=False)
-
-    #######################################
-    # Manually manage attributes and extras
-    #######################################
-    # Pointer. Renaming, since Nodes have now technically been retrieved and "stored"
-    all_node_pks = node_ids_to_be_exported
-
-    model_data = sum(len(model_data) for model_data in export_data.values())
-    if not model_data:
+    if not any(partial_query.count() for partial_query in entries_to_add.values()):
         EXPORT_LOGGER.log(msg='Nothing to store, exiting...', level=LOG_LEVEL_REPORT)
         return
-    EXPORT_LOGGER.log(
-        msg=f'Exporting a total of {model_data} database entries, of which {len(all_node_pks)} are Nodes.',
-        level=LOG_LEVEL_REPORT
-    )
 
-    # Instantiate new progress bar
-    progress_bar = get_progress_bar(total=1, leave=False, disable=silent)
-
-    # ATTRIBUTES and EXTRAS
-    EXPORT_LOGGER.debug('GATHERING NODE ATTRIBUTES AND EXTRAS...')
-    node_attributes = {}
-    node_extras = {}
+    # Pointer. Renaming, since Nodes will now technically be retrieved and "stored"
+    all_node_pks = node_ids_to_be_exported
 
-    # Another QueryBuilder query to get the attributes and extras. TODO: See if this can be optimized
+    #######################################
+    # Check for unsealed ProcessNodes
+    #######################################
     if all_node_pks:
-        all_nodes_query = orm.QueryBuilder().append(
-            orm.Node, filters={'id': {
-                'in': all_node_pks
-            }}, project=['id', 'attributes', 'extras']
-        )
+        builder = orm.QueryBuilder().append(orm.ProcessNode, filters={'id': {'in': all_node_pks}}, project='id')
+        check_process_nodes_sealed(set(builder.all(flat=True)))
 
-        progress_bar = get_progress_bar(total=all_nodes_query.count(), disable=silent)
-        progress_bar.set_description_str('Exporting Attributes and Extras', refresh=False)
+    ######################################
+    # Now collecting and storing
+    ######################################
+    # subfolder inside the export package
+    nodesubfolder = folder.get_subfolder(NODES_EXPORT_SUBFOLDER, create=True, reset_limit=True)
+
+    EXPORT_LOGGER.debug('ADDING DATA TO EXPORT ARCHIVE...')
 
-        for node_pk, attributes, extras in all_nodes_query.iterall():
+    # The records are written to the data file while the queries are being iterated over, such that the content of the
+    # database never has to be held in memory in its entirety.
+    # N.B. We're really calling zipfolder.open (if exporting a zipfile)
+    with folder.open(DATA_FILENAME, mode='w') as fhandle:
+        writer = DataFileWriter(fhandle)
+
+        for link in traverse_output['links']:
+            writer.write_link({
+                'input': node_pk_2_uuid_mapping[link.source_id],
+                'output': node_pk_2_uuid_mapping[link.target_id],
+                'label': link.link_label,
+                'type': link.link_type
+            })
+
+        if entries_to_add:
+            progress_bar = get_progress_bar(total=len(entries_to_add), disable=silent)
+
+        # The pks of the written entries per entity, since an entry is returned for every entry that refers to it. The
+        # nodes are not tracked: each is returned once by their own query and they are only referred to if exported.
+        written_pks = defaultdict(set)
+        model_data = 0
+        entity_separator = '_'
+        for entity_name, partial_query in entries_to_add.items():
+
+            progress_bar.set_description_str(f'Exporting {entity_name}s', refresh=False)
             progress_bar.update()
 
-            node_attributes[str(node_pk)] = attributes
-            node_extras[str(node_pk)] = extras
+            foreign_fields = {k: v for k, v in all_fields_info[entity_name].items() if 'requires' in v}
+
+            for value in foreign_fields.values():
+                ref_model_name = value['requires']
+                fill_in_query(partial_query, entity_name, ref_model_name, [entity_name], entity_separator)
+
+            for temp_d in partial_query.iterdict():
+                for key in temp_d:
+                    # Get current entity
+                    current_entity = key.split(entity_separator)[-1]
+                    entry_pk = temp_d[key]['id']
+
+                    # This is a empty result of an outer join.
+                    # It should not be taken into account.
+                    if entry_pk is None:
+                        continue
+
+                    if current_entity == NODE_ENTITY_NAME:
+                        if entity_name != NODE_ENTITY_NAME:
+                            continue
+                    elif entry_pk in written_pks[current_entity]:
+                        continue
+                    else:
+                        written_pks[current_entity].add(entry_pk)
+
+                    writer.write_entity(
+                        current_entity, entry_pk,
+                        serialize_dict(
+                            temp_d[key], remove_fields=['id'], rename_fields=model_fields_to_file_fields[current_entity]
+                        )
+                    )
+                    model_data += 1
 
-    EXPORT_LOGGER.debug('GATHERING GROUP ELEMENTS...')
-    groups_uuid = defaultdict(list)
-    # If a group is in the exported data, we export the group/node correlation
-    if GROUP_ENTITY_NAME in export_data:
-        group_uuids_with_node_uuids = orm.QueryBuilder().append(
-            orm.Group, filters={
-                'id': {
-                    'in': export_data[GROUP_ENTITY_NAME]
-                }
-            }, project='uuid', tag='groups'
-        ).append(orm.Node, project='uuid', with_group='groups')
+        # Close progress up until this point in order to print properly
+        close_progress_bar(leave=False)
 
-        # This part is _only_ for the progress bar
-        total_node_uuids_for_groups = group_uuids_with_node_uuids.count()
-        if total_node_uuids_for_groups:
-            progress_bar = get_progress_bar(total=total_node_uuids_for_groups, disable=silent)
-            progress_bar.set_description_str('Exporting Groups ...', refresh=False)
+        EXPORT_LOGGER.log(
+            msg=f'Exporting a total of {model_data} database entries, of which {len(all_node_pks)} are Nodes.',
+            level=LOG_LEVEL_REPORT
+        )
 
-        for group_uuid, node_uuid in group_uuids_with_node_uuids.iterall():
-            progress_bar.update()
+        #######################################
+        # Manually manage attributes and extras
+        #######################################
+        # Instantiate new progress bar
+        progress_bar = get_progress_bar(total=1, leave=False, disable=silent)
+
+        # ATTRIBUTES and EXTRAS
+        EXPORT_LOGGER.debug('GATHERING NODE ATTRIBUTES AND EXTRAS...')
+
+        # Another QueryBuilder query to get the attributes and extras. TODO: See if this can be optimized
+        if all_node_pks:
+            all_nodes_query = orm.QueryBuilder().append(
+                orm.Node, filters={'id': {
+                    'in': all_node_pks
+                }}, project=['id', 'attributes', 'extras']
+            )
 
-            groups_uuid[group_uuid].append(node_uuid)
+            progress_bar = get_progress_bar(total=all_nodes_query.count(), disable=silent)
+            progress_bar.set_description_str('Exporting Attributes and Extras', refresh=False)
 
-    #######################################
-    # Final check for unsealed ProcessNodes
-    #######################################
-    process_nodes = set()
-    for node_pk, content in export_data.get(NODE_ENTITY_NAME, {}).items():
-        if content['node_type'].startswith('process.'):
-            process_nodes.add(node_pk)
+            for node_pk, attributes, extras in all_nodes_query.iterall():
+                progress_bar.update()
 
-    check_process_nodes_sealed(process_nodes)
+                writer.write_node_attributes(node_pk, attributes)
+                writer.write_node_extras(node_pk, extras)
 
-    ######################################
-    # Now collecting and storing
-    ######################################
-    # subfolder inside the export package
-    nodesubfolder = folder.get_subfolder(NODES_EXPORT_SUBFOLDER, create=True, reset_limit=True)
+        EXPORT_LOGGER.debug('GATHERING GROUP ELEMENTS...')
+        # If a group is in the exported data, we export the group/node correlation
+        if written_pks[GROUP_ENTITY_NAME]:
+            group_uuids_with_node_uuids = orm.QueryBuilder().append(
+                orm.Group, filters={
+                    'id': {
+                        'in': written_pks[GROUP_ENTITY_NAME]
+                    }
+                }, project='uuid', tag='groups'
+            ).append(orm.Node, project='uuid', with_group='groups')
 
-    EXPORT_LOGGER.debug('ADDING DATA TO EXPORT ARCHIVE...')
+            # This part is _only_ for the progress bar
+            total_node_uuids_for_groups = group_uuids_with_node_uuids.count()
+            if total_node_uuids_for_groups:
+                progress_bar = get_progress_bar(total=total_node_uuids_for_groups, disable=silent)
+                progress_bar.set_description_str('Exporting Groups ...', refresh=False)
 
-    data = {
-        'node_attributes': node_attributes,
-        'node_extras': node_extras,
-        'export_data': export_data,
-        'links_uuid': links_uuid,
-        'groups_uuid': groups_uuid
-    }
+            for group_uuid, node_uuid in group_uuids_with_node_uuids.iterall():
+                progress_bar.update()
 
-    # N.B. We're really calling zipfolder.open (if exporting a zipfile)
-    with folder.open('data.json', mode='w') as fhandle:
-        # fhandle.write(json.dumps(data, cls=UUIDEncoder))
-        fhandle.write(json.dumps(data))
+                writer.write_group_node(group_uuid, node_uuid)
 
     # Turn sets into lists to be able to export them as JSON metadata.
     for entity, entity_set in entities_starting_set.items():
@@ -717,14 +718,14 @@ def export_tree(
             thisnodefolder = nodesubfolder.get_subfolder(sharded_uuid, create=False, reset_limit=True)
 
             # Make sure the node's repository folder was not deleted
-            src = RepositoryFolder(section=Repository._section_name, uuid=uuid)  # pylint: disable=protected-access
+            src = Repository(uuid=uuid, is_stored=True)
             if not src.exists():
                 raise exceptions.ArchiveExportError(
                     f'Unable to find the repository folder for Node with UUID={uuid} in the local repository'
                 )
 
             # In this way, I copy the content of the folder, and not the folder itself
-            thisnodefolder.insert_path(src=src.abspath, dest_name='.')
+            src.copy_to_folder(thisnodefolder)
 
     close_progress_bar(leave=False)
 
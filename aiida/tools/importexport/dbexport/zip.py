@@ -11,28 +11,34 @@
 # pylint: disable=missing-docstring,redefined-builtin
 import io
 import os
+import shutil
 import zipfile
 
 
 class MyWritingZipFile:
+    """Text handle that streams what is written directly into a file of the zip archive.
+
+    Note that a zip archive can only be written to through a single handle at a time, so no other file can be added
+    while this handle is open.
+    """
 
     def __init__(self, zip_file, fname):
         self._zipfile = zip_file
         self._fname = fname
-        self._buffer = None
+        self._handle = None
 
     def open(self):
-        if self._buffer is not None:
+        if self._handle is not None:
             raise IOError('Cannot open again!')
-        self._buffer = io.StringIO()
+        # The size is not known in advance, so the file has to allow for sizes that require the ZIP64 extensions
+        self._handle = io.TextIOWrapper(self._zipfile.open(self._fname, mode='w', force_zip64=True), encoding='utf8')
 
     def write(self, data):
-        self._buffer.write(data)
+        self._handle.write(data)
 
     def close(self):
-        self._buffer.seek(0)
-        self._zipfile.writestr(self._fname, self._buffer.read())
-        self._buffer = None
+        self._handle.close()
+        self._handle = None
 
     def __enter__(self):
         self.open()
@@ -106,8 +112,31 @@ class ZipFolder:
     # pylint: disable=unused-argument
     def get_subfolder(self, subfolder, create=False, reset_limit=False):
         # reset_limit: ignored
-        # create: ignored, for the time being
-        return ZipFolder(self, subfolder=subfolder)
+        folder = ZipFolder(self, subfolder=subfolder)
+        if create:
+            folder.create()
+        return folder
+
+    def create(self):
+        """Add an entry for this folder to the zip file, such that it is also extracted if it remains empty."""
+        dirname = self._get_internal_path(os.curdir) + '/'
+        if dirname != './' and not self.exists(dirname):
+            self._zipfile.writestr(dirname, b'')
+
+    def create_file_from_filelike(self, filelike, filename, mode='wb', encoding=None):
+        """Stream the content of a filelike object into a new file of the zip file.
+
+        :param filelike: a filelike object whose contents to copy
+        :param filename: the filename for the file that is to be created
+        :param mode: the mode of the filelike object, where text is written with the given encoding
+        :param encoding: the encoding with which text is written
+        """
+        with self._zipfile.open(self._get_internal_path(filename), mode='w', force_zip64=True) as handle:
+            if 'b' in mode:
+                shutil.copyfileobj(filelike, handle)
+            else:
+                with io.TextIOWrapper(handle, encoding=encoding or 'utf8') as text_handle:
+                    shutil.copyfileobj(filelike, text_handle)
 
     def exists(self, path):
         """Check whether path already exists in the ZipFolder"""
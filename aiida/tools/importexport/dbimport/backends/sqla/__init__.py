@@ -10,6 +10,7 @@
 # pylint: disable=too-many-nested-blocks,protected-access,fixme,too-many-arguments,too-many-locals,too-many-branches,too-many-statements
 """ SQLAlchemy-specific import of AiiDA entities """
 
+from contextlib import ExitStack
 from distutils.version import StrictVersion
 import logging
 import os
@@ -18,7 +19,7 @@ import zipfile
 from itertools import chain
 
 from aiida.common import timezone, json
-from aiida.common.folders import SandboxFolder, RepositoryFolder
+from aiida.common.folders import SandboxFolder
 from aiida.common.links import LinkType
 from aiida.common.log import override_log_formatter
 from aiida.common.utils import get_object_from_string
@@ -27,7 +28,7 @@ from aiida.orm.utils.links import link_triple_exists, validate_link
 from aiida.orm.utils._repository import Repository
 
 from aiida.tools.importexport.common import exceptions, get_progress_bar, close_progress_bar
-from aiida.tools.importexport.common.archive import extract_tree, extract_tar, extract_zip
+from aiida.tools.importexport.common.archive import ArchiveReader, extract_tree, extract_tar, read_data
 from aiida.tools.importexport.common.config import DUPL_SUFFIX, EXPORT_VERSION, NODES_EXPORT_SUBFOLDER, BAR_FORMAT
 from aiida.tools.importexport.common.config import (
     NODE_ENTITY_NAME, GROUP_ENTITY_NAME, COMPUTER_ENTITY_NAME, USER_ENTITY_NAME, LOG_ENTITY_NAME, COMMENT_ENTITY_NAME
@@ -58,7 +59,8 @@ def import_data_sqla(
 
     Specific for the SQLAlchemy backend.
     If ``in_path`` is a folder, calls extract_tree; otherwise, tries to detect the compression format
-    (zip, tar.gz, tar.bz2, ...) and calls the correct function.
+    (zip, tar.gz, tar.bz2, ...) and calls the correct function. Zip files are not extracted in their entirety: the
+    repository files of each new node are extracted right before they are moved to the repository.
 
     :param in_path: the path to a file or folder that can be imported in AiiDA.
     :type in_path: str
@@ -99,7 +101,7 @@ def import_data_sqla(
     :rtype: dict
 
     :raises `~aiida.tools.importexport.common.exceptions.ImportValidationError`: if parameters or the contents of
-        `metadata.json` or `data.json` can not be validated.
+        `metadata.json` or the data file can not be validated.
     :raises `~aiida.tools.importexport.common.exceptions.CorruptArchive`: if the provided archive at ``in_path`` is
         corrupted.
     :raises `~aiida.tools.importexport.common.exceptions.IncompatibleArchiveVersionError`: if the provided archive's
@@ -132,14 +134,16 @@ def import_data_sqla(
     # EXTRACT DATA #
     ################
     # The sandbox has to remain open until the end
-    with SandboxFolder() as folder:
+    with SandboxFolder() as folder, ExitStack() as stack:
+        archive_reader = None
         if os.path.isdir(in_path):
             extract_tree(in_path, folder)
         else:
             if tarfile.is_tarfile(in_path):
                 extract_tar(in_path, folder, silent=silent, nodes_export_subfolder=NODES_EXPORT_SUBFOLDER, **kwargs)
             elif zipfile.is_zipfile(in_path):
-                extract_zip(in_path, folder, silent=silent, nodes_export_subfolder=NODES_EXPORT_SUBFOLDER, **kwargs)
+                archive_reader = stack.enter_context(ArchiveReader(in_path))
+                archive_reader.extract_data(folder, silent=silent)
             else:
                 raise exceptions.ImportValidationError(
                     'Unable to detect the input file format, it is neither a '
@@ -153,9 +157,8 @@ def import_data_sqla(
             with open(folder.get_abs_path('metadata.json'), encoding='utf8') as fhandle:
                 metadata = json.load(fhandle)
 
-            IMPORT_LOGGER.debug('CACHING data.json')
-            with open(folder.get_abs_path('data.json'), encoding='utf8') as fhandle:
-                data = json.load(fhandle)
+            IMPORT_LOGGER.debug('CACHING data')
+            data = read_data(folder)
         except IOError as error:
             raise exceptions.CorruptArchive(f'Unable to find the file {error.filename} in the import file or folder')
 
@@ -273,7 +276,7 @@ def import_data_sqla(
             progress_bar = get_progress_bar(total=1, leave=False, disable=silent)
             pbar_base_str = 'Generating list of data - '
 
-            # Get total entities from data.json
+            # Get total entities from the data file
             # To be used with progress bar
             number_of_entities = 0
 
@@ -506,6 +509,8 @@ def import_data_sqla(
 
                         # Before storing entries in the DB, I store the files (if these are nodes).
                         # Note: only for new entries!
+                        if archive_reader:
+                            archive_reader.extract_repository(import_entry_uuid, folder)
                         subfolder = folder.get_subfolder(
                             os.path.join(NODES_EXPORT_SUBFOLDER, export_shard_uuid(import_entry_uuid))
                         )
@@ -514,11 +519,11 @@ def import_data_sqla(
                                 'Unable to find the repository folder for Node with UUID={} in the exported '
                                 'file'.format(import_entry_uuid)
                             )
-                        destdir = RepositoryFolder(section=Repository._section_name, uuid=import_entry_uuid)
+                        destdir = Repository(uuid=import_entry_uuid, is_stored=True)
                         # Replace the folder, possibly destroying existing previous folders, and move the files
                         # (faster if we are on the same filesystem, and in any case the source is a SandboxFolder)
                         progress_bar.set_description_str(f'{pbar_node_base_str}Repository', refresh=True)
-                        destdir.replace_with_folder(subfolder.abspath, move=True, overwrite=True)
+                        destdir.replace_with_tree(subfolder.abspath, move=True)
 
                         # For Nodes, we also have to store Attributes!
                         IMPORT_LOGGER.debug('STORING NEW NODE ATTRIBUTES...')
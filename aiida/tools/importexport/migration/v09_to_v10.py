@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration from v0.9 to v0.10, used by `verdi export migrate` command.
+
+Version 0.10 replaces the single JSON object of the `data.json` file by the `data.jsonl` file, which contains one JSON
+record per line, such that an archive can be written while the database is queried. The content of the records is the
+same as in version 0.9, so this migration only has to update the metadata: the data file in the new layout is written
+by :func:`~aiida.tools.importexport.common.archive.write_data` when the migrated archive is stored.
+"""
+# pylint: disable=invalid-name
+
+from aiida.tools.importexport.migration.utils import verify_metadata_version, update_metadata
+
+
+def migrate_v9_to_v10(metadata, data, *args):  # pylint: disable=unused-argument
+    """Migration of export files from v0.9 to v0.10."""
+    old_version = '0.9'
+    new_version = '0.10'
+
+    verify_metadata_version(metadata, old_version)
+    update_metadata(metadata, new_version)
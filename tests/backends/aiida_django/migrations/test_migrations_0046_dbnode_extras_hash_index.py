@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=import-error,no-name-in-module,invalid-name
+"""Test migration to add an index on the hash that is stored in the extras of the `DbNode` model."""
+from django.db import connection
+
+from .test_migrations_common import TestMigrations
+
+
+class TestNodeExtrasHashIndexMigration(TestMigrations):
+    """Test migration to add an index on the hash that is stored in the extras of the `DbNode` model."""
+
+    migrate_from = '0045_dbgroup_extras'
+    migrate_to = '0046_dbnode_extras_hash_index'
+
+    def test_index(self):
+        """Test that the expression index on the hash in the extras has been created."""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'db_dbnode_extras_aiida_hash_idx'")
+            result = cursor.fetchall()
+
+        self.assertEqual(len(result), 1)
+        self.assertIn('_aiida_hash', result[0][0])
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=import-error,no-name-in-module,invalid-name
+"""Test migration to add the `DbLinkClosure` model."""
+from django.db import connection
+
+from .test_migrations_common import TestMigrations
+
+
+class TestLinkClosureMigration(TestMigrations):
+    """Test migration to add the `DbLinkClosure` model."""
+
+    migrate_from = '0046_dbnode_extras_hash_index'
+    migrate_to = '0047_dblinkclosure'
+
+    def test_table(self):
+        """Test that the table has been created and is empty."""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM db_dblinkclosure')
+            result = cursor.fetchall()
+
+        self.assertEqual(result[0][0], 0)
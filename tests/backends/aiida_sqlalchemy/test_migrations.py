@@ -1747,3 +1747,38 @@ class TestGroupExtrasMigration(TestMigrationsSQLA):
                 self.assertEqual(group.extras, {})
             finally:
                 session.close()
+
+
+class TestNodeExtrasHashIndexMigration(TestMigrationsSQLA):
+    """Test migration to add an index on the hash that is stored in the extras of the `DbNode` model."""
+
+    migrate_from = '0edcdd5a30f0'  # 0edcdd5a30f0_dbgroup_extras.py
+    migrate_to = '3ba1f1f4bc72'  # 3ba1f1f4bc72_dbnode_extras_hash_index.py
+
+    def test_index(self):
+        """Test that the expression index on the hash in the extras has been created."""
+        from sqlalchemy.sql import text  # pylint: disable=import-error,no-name-in-module
+
+        with self.get_session() as session:
+            result = session.execute(
+                text("SELECT indexdef FROM pg_indexes WHERE indexname = 'db_dbnode_extras_aiida_hash_idx'")
+            ).fetchall()
+
+        self.assertEqual(len(result), 1)
+        self.assertIn('_aiida_hash', result[0][0])
+
+
+class TestLinkClosureMigration(TestMigrationsSQLA):
+    """Test migration to add the `DbLinkClosure` table."""
+
+    migrate_from = '3ba1f1f4bc72'  # 3ba1f1f4bc72_dbnode_extras_hash_index.py
+    migrate_to = '5d4c2ad84d9e'  # 5d4c2ad84d9e_dblinkclosure.py
+
+    def test_table(self):
+        """Test that the table has been created and is empty."""
+        from sqlalchemy.sql import text  # pylint: disable=import-error,no-name-in-module
+
+        with self.get_session() as session:
+            result = session.execute(text('SELECT COUNT(*) FROM db_dblinkclosure')).fetchall()
+
+        self.assertEqual(result[0][0], 0)
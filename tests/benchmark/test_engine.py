@@ -14,11 +14,15 @@ The purpose of these tests is to benchmark and compare processes,
 which are executed *via* both a local runner and the daemon.
 """
 import datetime
+import tempfile
 
 from tornado import gen
 import pytest
+import yaml
 
-from aiida.engine import run_get_node, submit, ToContext, while_, WorkChain
+from aiida.engine import calcfunction, run_get_node, submit, ToContext, while_, WorkChain
+from aiida.manage import caching
+from aiida.manage.configuration import get_profile
 from aiida.manage.manager import get_manager
 from aiida.orm import Code, Int
 from aiida.plugins.factories import CalculationFactory
@@ -131,6 +135,49 @@ def test_workchain_local(benchmark, aiida_localhost, workchain, iterations, outg
     assert len(result.node.get_outgoing().all()) == outgoing
 
 
+@calcfunction
+def add_calcfunction(x, y):
+    """A basic calcfunction to add two integers."""
+    return x + y
+
+
+@pytest.fixture
+def caching_config_many_patterns():
+    """Configure caching with many enabled and disabled patterns, as in a production caching configuration."""
+    config = {
+        'default': False,
+        'enabled': [f'aiida.calculations:plugin_{index}.*' for index in range(100)] + [f'{__name__}.*'],
+        'disabled': [f'some.module.function_{index}' for index in range(100)],
+    }
+
+    with tempfile.NamedTemporaryFile() as handle:
+        yaml.dump({get_profile().name: config}, handle, encoding='utf-8')
+        caching.configure(config_file=handle.name)
+
+    yield
+
+    caching.configure()
+
+
+@pytest.mark.parametrize('memoised', (False, True), ids=('not-memoised', 'memoised'))
+@pytest.mark.usefixtures('clear_database_before_test', 'caching_config_many_patterns')
+@pytest.mark.benchmark(group='engine-caching')
+def test_calcfunction_caching_config(benchmark, memoised):
+    """Benchmark the per-launch overhead of resolving the caching configuration for many calcfunction launches."""
+
+    def _run():
+        for _ in range(50):
+            if not memoised:
+                caching._clear_use_cache_memo()  # pylint: disable=protected-access
+            result = run_get_node(add_calcfunction, x=Int(1), y=Int(2))
+        return result
+
+    result = benchmark.pedantic(_run, iterations=1, rounds=5, warmup_rounds=1)
+
+    assert result.node.is_finished_ok
+    assert caching.get_use_cache(identifier=result.node.process_type)
+
+
 @gen.coroutine
 def with_timeout(what, timeout=60):
     """Coroutine return with timeout."""
@@ -17,8 +17,8 @@ from io import StringIO
 
 import pytest
 
-from aiida.common import NotExistent
-from aiida.orm import Data, load_node
+from aiida.common import LinkType, NotExistent
+from aiida.orm import CalculationNode, Data, load_node, store_many
 
 GROUP_NAME = 'node'
 
@@ -79,6 +79,53 @@ def test_store_with_object(benchmark):
     assert node_dict['node'].is_stored, node_dict
 
 
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=100)
+def test_create_with_object(benchmark):
+    """Benchmark for creating a node with a small object in its repository, without storing it."""
+    _, node_dict = benchmark(get_data_node_and_object, store=False)
+    assert node_dict['node'].list_object_names() == ['key'], node_dict
+
+
+def get_calculation_and_outputs(number=100):
+    """A function to create an unstored calculation node with a number of unstored output nodes."""
+    calculation = CalculationNode()
+    outputs = []
+    for index in range(number):
+        data = Data()
+        data.set_attribute_many({str(i): i for i in range(10)})
+        data.add_incoming(calculation, LinkType.CREATE, f'output_{index}')
+        outputs.append(data)
+    return (calculation, outputs), {}
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.benchmark(group=GROUP_NAME)
+def test_store_many(benchmark):
+    """Benchmark for storing a calculation with 100 output nodes,
+    with a few multi-row statements for all nodes and links.
+    """
+
+    def _run(calculation, outputs):
+        return store_many([calculation] + outputs)
+
+    nodes = benchmark.pedantic(_run, setup=get_calculation_and_outputs, iterations=1, rounds=20)
+    assert all(node.is_stored for node in nodes), nodes
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.benchmark(group=GROUP_NAME)
+def test_store_loop(benchmark):
+    """Benchmark for storing a calculation with 100 output nodes,
+    one node at a time, as reference for `test_store_many`.
+    """
+
+    def _run(calculation, outputs):
+        return [node.store() for node in [calculation] + outputs]
+
+    nodes = benchmark.pedantic(_run, setup=get_calculation_and_outputs, iterations=1, rounds=20)
+    assert all(node.is_stored for node in nodes), nodes
+
+
 @pytest.mark.usefixtures('clear_database_before_test')
 @pytest.mark.benchmark(group=GROUP_NAME)
 def test_delete_backend(benchmark):
@@ -128,3 +175,82 @@ def test_delete_with_object(benchmark):
     pk = benchmark.pedantic(_run, setup=get_data_node_and_object, iterations=1, rounds=100, warmup_rounds=1)
     with pytest.raises(NotExistent):
         load_node(pk)
+
+
+def get_data_node_and_large_object(store=True):
+    """A function to create a simple data node, with a large object."""
+    data = Data()
+    data.put_object_from_filelike(StringIO('a' * 10**8), 'key')
+    if store:
+        data.store()
+    return (data,), {}
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.benchmark(group=GROUP_NAME)
+def test_clone_with_large_object(benchmark):
+    """Benchmark for cloning and storing a node with a large object,
+    which shares the content of the object instead of copying it.
+    """
+
+    def _run(node):
+        return node.clone().store()
+
+    clone = benchmark.pedantic(_run, setup=get_data_node_and_large_object, iterations=1, rounds=10)
+    assert clone.is_stored, clone
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.benchmark(group=GROUP_NAME)
+def test_copy_with_large_object(benchmark):
+    """Benchmark for copying the repository of a node with a large object into a new node and storing it,
+    as reference for `test_clone_with_large_object`.
+    """
+
+    def _run(node):
+        copy = Data()
+        copy.put_object_from_tree(node._repository._get_base_folder().abspath)
+        return copy.store()
+
+    copy = benchmark.pedantic(_run, setup=get_data_node_and_large_object, iterations=1, rounds=10)
+    assert copy.is_stored, copy
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('size', (10, 1000, 100000))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=100)
+def test_set_extra(benchmark, size):
+    """Benchmark for setting a single extra of a stored node,
+    for nodes with an increasing number of other extras, which should not affect the cost of the update.
+    """
+    data = Data()
+    data.set_extra_many({str(i): i for i in range(size)})
+    data.store()
+
+    def _run(node):
+        node.set_extra('tag', 'value')
+        return node
+
+    node = benchmark(_run, data)
+    assert node.get_extra('tag') == 'value', node
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('size', (10, 1000, 100000))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=100)
+def test_set_delete_extra_many(benchmark, size):
+    """Benchmark for setting and then deleting a few extras of a stored node,
+    for nodes with an increasing number of other extras, which should not affect the cost of the updates.
+    """
+    data = Data()
+    data.set_extra_many({str(i): i for i in range(size)})
+    data.store()
+    extras = {f'tag_{i}': i for i in range(10)}
+
+    def _run(node):
+        node.set_extra_many(extras)
+        node.delete_extra_many(extras.keys())
+        return node
+
+    node = benchmark(_run, data)
+    assert 'tag_0' not in node.extras_keys(), node
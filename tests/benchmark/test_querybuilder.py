@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=unused-argument
+"""Performance benchmark tests for querying the database.
+
+The purpose of these tests is to benchmark the iteration over large query results,
+both in time and in the peak memory used while iterating.
+"""
+import psutil
+import pytest
+
+from aiida.orm import Data, QueryBuilder, store_many
+
+GROUP_NAME = 'querybuilder'
+NUMBER_OF_NODES = 20000
+
+
+@pytest.fixture(scope='module')
+def large_table(aiida_profile):
+    """Store a large number of nodes with some attributes, which is shared by all benchmarks of this module."""
+    aiida_profile.reset_db()
+    nodes = []
+    for index in range(NUMBER_OF_NODES):
+        node = Data()
+        node.set_attribute_many({str(i): f'{index}-{i}' * 10 for i in range(20)})
+        nodes.append(node)
+    store_many(nodes)
+    yield NUMBER_OF_NODES
+    aiida_profile.reset_db()
+
+
+def iterate_measuring_rss(iterator, sample_every=100):
+    """Consume the iterator and return the number of items and the peak increase in resident memory, in bytes."""
+    process = psutil.Process()
+    baseline = peak = process.memory_info().rss
+    count = 0
+    for count, _ in enumerate(iterator, start=1):
+        if count % sample_every == 0:
+            peak = max(peak, process.memory_info().rss)
+    return count, max(peak, process.memory_info().rss) - baseline
+
+
+@pytest.mark.parametrize('projection', ('id', 'attributes'))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=3)
+def test_iterall(benchmark, large_table, projection):
+    """Benchmark for iterating over the results of a large query in batches,
+    recording the peak increase in resident memory, which should not scale with the number of results.
+    """
+
+    def _run():
+        builder = QueryBuilder().append(Data, project=projection)
+        return iterate_measuring_rss(builder.iterall(batch_size=100))
+
+    count, peak_rss = benchmark.pedantic(_run, iterations=1, rounds=3)
+    benchmark.extra_info['peak_rss_increase'] = peak_rss
+    assert count == large_table
+
+
+@pytest.mark.parametrize('projection', ('id', 'attributes'))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=3)
+def test_iterdict(benchmark, large_table, projection):
+    """Benchmark for iterating over the results of a large query as dictionaries in batches,
+    recording the peak increase in resident memory, which should not scale with the number of results.
+    """
+
+    def _run():
+        builder = QueryBuilder().append(Data, project=projection)
+        return iterate_measuring_rss(builder.iterdict(batch_size=100))
+
+    count, peak_rss = benchmark.pedantic(_run, iterations=1, rounds=3)
+    benchmark.extra_info['peak_rss_increase'] = peak_rss
+    assert count == large_table
+
+
+@pytest.mark.parametrize('cached', (True, False))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=3)
+def test_iterall_entities(benchmark, large_table, monkeypatch, cached):
+    """Benchmark for iterating over the nodes of a large query, which loads the node class of every row,
+    with and without caching the class per type string.
+    """
+    import time
+    from aiida.orm.utils import node
+
+    if not cached:
+        monkeypatch.setattr(node, 'load_node_class', node.load_node_class.__wrapped__)
+
+    def _run():
+        start = time.perf_counter()
+        count = sum(1 for _ in QueryBuilder().append(Data, project='*').iterall(batch_size=100))
+        return count, count / (time.perf_counter() - start)
+
+    count, rows_per_second = benchmark.pedantic(_run, iterations=1, rounds=3)
+    benchmark.extra_info['rows_per_second'] = rows_per_second
+    assert count == large_table
+
+
+def get_deep_graph(depth=500):
+    """Store a chain of calculations of the given depth, each creating the input of the next one."""
+    from aiida.common import LinkType
+    from aiida.orm import CalculationNode
+
+    origin = Data()
+    nodes = [origin]
+    data = origin
+    for index in range(depth):
+        calculation = CalculationNode()
+        calculation.add_incoming(data, link_type=LinkType.INPUT_CALC, link_label=f'input_{index}')
+        data = Data()
+        data.add_incoming(calculation, link_type=LinkType.CREATE, link_label=f'output_{index}')
+        nodes.extend((calculation, data))
+    store_many(nodes)
+    return origin
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('max_depth', (2, None))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=10)
+def test_descendants_depth(benchmark, max_depth):
+    """Benchmark for querying the descendants of the origin of a deep graph, with and without a depth limit,
+    which is applied while the graph is traversed, such that the limited query should not scale with the depth.
+    """
+    origin = get_deep_graph()
+    edge_filters = {'depth': {'<=': max_depth}} if max_depth is not None else None
+
+    def _run():
+        builder = QueryBuilder().append(Data, filters={'id': origin.pk}, tag='origin')
+        builder.append(Data, with_ancestors='origin', edge_filters=edge_filters, project='id')
+        return builder.count()
+
+    count = benchmark(_run)
+    assert count == (1 if max_depth is not None else 500)
@@ -12,6 +12,7 @@
 import enum
 
 from click.testing import CliRunner
+import pytest
 
 from aiida.backends.testbase import AiidaTestCase
 from aiida.cmdline.commands import cmd_database
@@ -170,3 +171,100 @@ class TestVerdiDatabasaIntegrity(AiidaTestCase):
         result = self.cli_runner.invoke(cmd_database.detect_invalid_nodes, [])
         self.assertNotEqual(result.exit_code, 0)
         self.assertIsNotNone(result.exception)
+
+
+class TestVerdiDatabaseClosure(AiidaTestCase):
+    """Tests for `verdi database closure`."""
+
+    def setUp(self):
+        self.cli_runner = CliRunner()
+        data = Data().store()
+        calculation = CalculationNode()
+        calculation.add_incoming(data, link_label='input', link_type=LinkType.INPUT_CALC)
+        calculation.store()
+
+    def tearDown(self):
+        from aiida.manage.database.closure import drop_closure
+        drop_closure()
+        self.reset_database()
+
+    def test_closure(self):
+        """Test building, verifying and dropping the closure."""
+        result = self.cli_runner.invoke(cmd_database.closure_verify, [])
+        self.assertIsNotNone(result.exception)
+        self.assertIn('has not been built', result.output)
+
+        result = self.cli_runner.invoke(cmd_database.closure_build, [])
+        self.assertClickResultNoException(result)
+        self.assertIn('1 pairs', result.output)
+
+        result = self.cli_runner.invoke(cmd_database.closure_verify, [])
+        self.assertClickResultNoException(result)
+
+        result = self.cli_runner.invoke(cmd_database.closure_drop, [])
+        self.assertClickResultNoException(result)
+
+        result = self.cli_runner.invoke(cmd_database.closure_verify, [])
+        self.assertIsNotNone(result.exception)
+
+
+@pytest.mark.parametrize('keep_folders', (True, False))
+def test_migrate_repository(run_cli_command, monkeypatch, tmp_path, keep_folders):
+    """Test `verdi database migrate-repository`."""
+    import collections
+    from aiida.repository.container import CONTAINER_DIRNAME, Container
+    from aiida.repository.migration import LEGACY_NODE_FOLDER, get_legacy_node_folders
+
+    uuid = '0b2c5e9f-2f8a-4a0e-9a3e-1c4d5e6f7a8b'
+    folder = tmp_path / LEGACY_NODE_FOLDER / uuid[:2] / uuid[2:4] / uuid[4:] / 'path'
+    folder.mkdir(parents=True)
+    (folder / 'file.txt').write_bytes(b'content')
+
+    # Migrate the repository of a separate profile, such that the repository of the test profile is not affected
+    profile = collections.namedtuple('Profile', ['name', 'repository_path'])('test', str(tmp_path))
+    daemon_client = collections.namedtuple('DaemonClient', ['is_daemon_running'])(False)
+    monkeypatch.setattr('aiida.manage.configuration.get_profile', lambda: profile)
+    monkeypatch.setattr('aiida.engine.daemon.client.get_daemon_client', lambda: daemon_client)
+
+    options = ['--force', '--keep-folders'] if keep_folders else ['--force']
+    run_cli_command(cmd_database.database_migrate_repository, options)
+
+    container = Container(str(tmp_path / CONTAINER_DIRNAME))
+    assert sorted(container.get_hierarchy(uuid)) == ['path', 'path/file.txt']
+    assert len(get_legacy_node_folders(profile)) == (1 if keep_folders else 0)
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_clean_repository(run_cli_command, monkeypatch, tmp_path):
+    """Test that `verdi database clean-repository` removes the objects of deleted nodes from the object store."""
+    import collections
+    import io
+    from aiida.manage.database.delete.nodes import delete_nodes
+    from aiida.repository.container import Container
+
+    container = Container(str(tmp_path / 'container'))
+    container.init_container()
+
+    daemon_client = collections.namedtuple('DaemonClient', ['is_daemon_running'])(False)
+    monkeypatch.setattr('aiida.engine.daemon.client.get_daemon_client', lambda: daemon_client)
+    monkeypatch.setattr('aiida.orm.utils._repository.get_container', lambda: container)
+    monkeypatch.setattr('aiida.repository.container.get_container', lambda profile=None: container)
+
+    kept = Data()
+    kept.put_object_from_filelike(io.StringIO('kept'), 'file.txt')
+    kept.store()
+
+    deleted = Data()
+    deleted.put_object_from_filelike(io.StringIO('deleted'), 'file.txt')
+    deleted.put_object_from_filelike(io.StringIO('kept'), 'copy.txt')
+    deleted.store()
+
+    assert sum(container.count_objects().values()) == 2
+
+    delete_nodes([deleted.pk], force=True)
+    assert sum(container.count_objects().values()) == 2
+
+    result = run_cli_command(cmd_database.database_clean_repository, ['--force'])
+    assert 'removed 1 unreferenced objects' in result.output
+    assert sum(container.count_objects().values()) == 1
+    assert kept.get_object_content('file.txt') == 'kept'
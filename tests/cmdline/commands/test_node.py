@@ -15,6 +15,7 @@ import errno
 import pathlib
 import tempfile
 import gzip
+from unittest import mock
 
 from click.testing import CliRunner
 
@@ -579,6 +580,78 @@ class TestVerdiRehash(AiidaTestCase):
         self.assertClickResultNoException(result)
         self.assertTrue(f'{expected_node_count} nodes' in result.output)
 
+    def test_rehash_serial(self):
+        """Computing the hashes in this process should store the same hashes as computing them in worker processes."""
+        from aiida.orm import load_node
+
+        self.node_int.clear_hash()
+
+        options = ['-f', '-p', '1', '-b', '2']
+        result = self.cli_runner.invoke(cmd_node.rehash, options)
+        self.assertClickResultNoException(result)
+        self.assertTrue('5 nodes' in result.output)
+        self.assertEqual(load_node(self.node_int.pk).get_extra('_aiida_hash'), self.node_int.get_hash())
+
+    def test_rehash_parallel(self):
+        """Worker processes should load the nodes themselves and store the same hashes as this process computes."""
+        from aiida.orm import load_node
+
+        self.node_int.clear_hash()
+
+        options = ['-f', '-p', '2', '-b', '3']
+        result = self.cli_runner.invoke(cmd_node.rehash, options)
+        self.assertClickResultNoException(result)
+        self.assertTrue('5 nodes' in result.output)
+        self.assertEqual(load_node(self.node_int.pk).get_extra('_aiida_hash'), self.node_int.get_hash())
+
+    def test_rehash_checksums(self):
+        """The checksums of a repository should be recorded for a node that was stored without them."""
+        from aiida.common.hashing import _CHECKSUMS_EXTRA_KEY
+
+        node = orm.Data()
+        node.put_object_from_filelike(io.StringIO('content'), 'sub/file.txt')
+        node.store()
+
+        checksums = node.get_extra(_CHECKSUMS_EXTRA_KEY)
+        node.delete_extra(_CHECKSUMS_EXTRA_KEY)
+
+        try:
+            options = ['-f', '-p', '1', str(node.pk)]
+            result = self.cli_runner.invoke(cmd_node.rehash, options)
+            self.assertClickResultNoException(result)
+
+            loaded = orm.load_node(node.pk)
+            self.assertEqual(loaded.get_extra(_CHECKSUMS_EXTRA_KEY), checksums)
+            self.assertEqual(loaded.get_extra('_aiida_hash'), node.get_hash())
+        finally:
+            orm.Node.objects.delete(node.pk)
+
+    def test_rehash_invalid_processes(self):
+        """A number of worker processes smaller than one should be rejected."""
+        for processes in ['0', '-1']:
+            result = self.cli_runner.invoke(cmd_node.rehash, ['-f', '-p', processes])
+            self.assertIsNotNone(result.exception)
+            self.assertNotEqual(result.exit_code, 0)
+
+    def test_rehash_resume(self):
+        """An interrupted run should be resumed from the checkpoint, unless `--no-resume` is specified."""
+        from aiida.manage.database.rehash import get_rehash_checkpoint, set_rehash_checkpoint
+        from aiida.orm import Data, ProcessNode
+
+        set_rehash_checkpoint((Data, ProcessNode), self.node_bool_false.pk)
+
+        result = self.cli_runner.invoke(cmd_node.rehash, ['-f'])
+        self.assertClickResultNoException(result)
+        self.assertTrue('2 nodes' in result.output)
+        self.assertIsNone(get_rehash_checkpoint((Data, ProcessNode)))
+
+        set_rehash_checkpoint((Data, ProcessNode), self.node_bool_false.pk)
+
+        result = self.cli_runner.invoke(cmd_node.rehash, ['-f', '--no-resume'])
+        self.assertClickResultNoException(result)
+        self.assertTrue('5 nodes' in result.output)
+        self.assertIsNone(get_rehash_checkpoint((Data, ProcessNode)))
+
     def test_rehash_entry_point_no_matches(self):
         """Limiting the queryset by defining explicit entry point, with no nodes should exit with non-zero status."""
         options = ['-f', '-e', 'aiida.data:structure']
@@ -604,6 +677,81 @@ class TestVerdiRehash(AiidaTestCase):
         self.assertIsNotNone(result.exception)
 
 
+class TestVerdiCachingStatistics(AiidaTestCase):
+    """Tests for the ``verdi node caching-statistics`` command."""
+
+    def setUp(self):
+        from aiida.manage.caching_statistics import delete_caching_statistics, reset_caching_statistics
+        reset_caching_statistics()
+        delete_caching_statistics()
+        self.cli_runner = CliRunner()
+
+    def test_caching_statistics(self):
+        """Test that the recorded statistics are shown and deleted with `--reset`."""
+        from aiida.manage.caching_statistics import flush_caching_statistics, load_caching_statistics
+
+        result = self.cli_runner.invoke(cmd_node.caching_statistics, [])
+        self.assertClickResultNoException(result)
+        self.assertIn('no caching statistics', result.output)
+
+        node = orm.Int(1).store()
+
+        # The statistics are only recorded if enabled through the interval option
+        with mock.patch('aiida.manage.caching_statistics.get_statistics_interval', return_value=60):
+            flush_caching_statistics()
+
+        result = self.cli_runner.invoke(cmd_node.caching_statistics, ['--reset'])
+        self.assertClickResultNoException(result)
+        self.assertIn(node.node_type, result.output)
+        self.assertEqual(load_caching_statistics(), {})
+
+
+class TestVerdiSetExtras(AiidaTestCase):
+    """Tests for the ``verdi node set-extras`` command."""
+
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    def test_set_extras(self):
+        """Test setting, merging and deleting extras of the given nodes."""
+        nodes = [orm.Data().store() for _ in range(2)]
+        other = orm.Data().store()
+
+        for node in nodes + [other]:
+            node.set_extra_many({'obsolete': True, 'settings': {'a': 1}})
+
+        options = ['-s', 'tag=value', '-s', 'count=2', '-m', 'settings={"b": 2}', '-d', 'obsolete', '--force']
+        result = self.cli_runner.invoke(cmd_node.node_set_extras, options + [str(node.pk) for node in nodes])
+        self.assertClickResultNoException(result)
+        self.assertIn('updated the extras of 2 nodes', result.output)
+
+        for node in nodes:
+            self.assertEqual(orm.load_node(node.pk).extras, {'tag': 'value', 'count': 2, 'settings': {'a': 1, 'b': 2}})
+
+        self.assertEqual(orm.load_node(other.pk).extras, {'obsolete': True, 'settings': {'a': 1}})
+
+    def test_entry_point(self):
+        """Test updating all nodes of the class identified by an entry point."""
+        integers = [orm.Int(value).store() for value in range(2)]
+        data = orm.Data().store()
+
+        result = self.cli_runner.invoke(cmd_node.node_set_extras, ['-e', 'aiida.data:int', '-s', 'tag=int', '--force'])
+        self.assertClickResultNoException(result)
+
+        for node in integers:
+            self.assertEqual(orm.load_node(node.pk).get_extra('tag'), 'int')
+
+        self.assertNotIn('tag', orm.load_node(data.pk).extras)
+
+    def test_invalid(self):
+        """Test that invalid values are reported."""
+        node = orm.Data().store()
+
+        for options in (['-s', 'tag'], ['-m', 'settings=1'], ['-s', 'tag=1', '-d', 'tag'], []):
+            result = self.cli_runner.invoke(cmd_node.node_set_extras, options + ['--force', str(node.pk)])
+            self.assertIsNotNone(result.exception, options)
+
+
 class TestVerdiDelete(AiidaTestCase):
     """
     Tests for the ``verdi node delete`` command.
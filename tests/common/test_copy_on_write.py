@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the :mod:`aiida.common.copy_on_write` module."""
+import copy
+import json
+
+import pytest
+import yaml
+
+from aiida.common.copy_on_write import CopyOnWriteDict, CopyOnWriteList, copy_on_write
+
+
+@pytest.fixture
+def original():
+    """Return a nested value to be copied."""
+    return {'dict': {'list': [1, {'key': 'value'}]}, 'list': [[1, 2], 3], 'scalar': 1}
+
+
+@pytest.mark.parametrize('value', (1, 1.0, 'string', None, (1, 2)))
+def test_copy_on_write_passthrough(value):
+    """Test that values other than dictionaries and lists are returned as is."""
+    assert copy_on_write(value) is value
+
+
+def test_copy_on_write_types(original):
+    """Test that dictionaries and lists are wrapped, including the nested ones once accessed."""
+    copied = copy_on_write(original)
+    assert isinstance(copied, CopyOnWriteDict)
+    assert isinstance(copied['dict'], CopyOnWriteDict)
+    assert isinstance(copied['dict']['list'], CopyOnWriteList)
+    assert isinstance(copied['list'][0], CopyOnWriteList)
+    assert copied == original
+
+
+def test_mutation_does_not_affect_original(original):
+    """Test that mutating any container reachable through the copy leaves the original untouched."""
+    reference = copy.deepcopy(original)
+    copied = copy_on_write(original)
+
+    copied['scalar'] = 2
+    copied['dict']['list'][1]['key'] = 'changed'
+    copied['dict']['list'].append(4)
+    copied['list'][0].append(3)
+    copied.get('dict')['new'] = True
+
+    for value in copied.values():
+        if isinstance(value, list):
+            value.clear()
+
+    for _, value in copied.items():
+        if isinstance(value, dict):
+            value.pop('list')
+
+    assert original == reference
+
+
+def test_mutations_are_retained(original):
+    """Test that repeated accesses return the same copy, such that mutations of nested values are retained."""
+    copied = copy_on_write(original)
+    copied['dict']['list'].append(4)
+    assert copied['dict'] is copied['dict']
+    assert copied['dict']['list'] == [1, {'key': 'value'}, 4]
+
+
+def test_conversion_to_plain_types(original):
+    """Test that converting to plain dictionaries and lists does not expose the nested values of the original."""
+    reference = copy.deepcopy(original)
+    copied = copy_on_write(original)
+
+    converted = dict(copied)
+    converted['dict']['new'] = True
+    unpacked = {**copied}
+    unpacked['list'][0].append(3)
+
+    for value in copied['list']:
+        if isinstance(value, list):
+            value.append(4)
+
+    assert original == reference
+
+
+def test_serialization(original):
+    """Test that the containers serialize like plain dictionaries and lists."""
+    copied = copy_on_write(original)
+    assert json.loads(json.dumps(copied)) == original
+    assert yaml.safe_load(yaml.safe_dump(copied)) == original
+    assert yaml.safe_load(yaml.dump(copied)) == original
+    assert copy.deepcopy(copied) == original
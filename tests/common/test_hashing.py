@@ -14,6 +14,9 @@ Unittests for aiida.common.hashing:make_hash with hardcoded hash values
 import itertools
 import collections
 from datetime import datetime
+import os
+import time
+from unittest import mock
 import uuid
 
 import numpy as np
@@ -24,7 +27,9 @@ try:
 except ImportError:
     import unittest
 
-from aiida.common.hashing import make_hash, float_to_text
+from aiida.common.hashing import (
+    FILE_TIMESTAMP_RESOLUTION, FileDigestCache, compute_file_digest, make_hash, float_to_text
+)
 from aiida.common.folders import SandboxFolder
 from aiida.backends.testbase import AiidaTestCase
 from aiida.orm import Dict
@@ -210,6 +215,58 @@ class MakeHashTest(unittest.TestCase):
             self.assertNotEqual(make_hash(folder), folder_hash)
             self.assertEqual(make_hash(folder, ignored_folder_content=['file3.npy', 'some_subdir']), folder_hash)
 
+    def test_folder_parallel(self):
+        """Test that hashing the files of a folder with a pool of threads gives the same hash as doing it serially."""
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            for index in range(32):
+                subfolder = folder.get_subfolder(str(index % 3), create=True)
+                with subfolder.open(f'file{index}', 'w') as fhandle:
+                    fhandle.write(str(index) * index)
+
+            self.assertEqual(make_hash(folder, max_workers=1), make_hash(folder, max_workers=4))
+            self.assertEqual(make_hash(folder, max_workers=1), make_hash(folder))
+
+    def test_folder_modified_file(self):
+        """Test that the cached digest of a file is not used after the file has been modified."""
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            with folder.open('file', 'w') as fhandle:
+                fhandle.write('content')
+
+            folder_hash = make_hash(folder)
+
+            with folder.open('file', 'w') as fhandle:
+                fhandle.write('altered')
+
+            self.assertNotEqual(make_hash(folder), folder_hash)
+
+    def test_file_digest_cache(self):
+        """Test that the digest of a file is cached only once its timestamps are no longer recent."""
+        cache = FileDigestCache()
+
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            filepath = folder.get_abs_path('file')
+            with folder.open('file', 'w') as fhandle:
+                fhandle.write('content')
+
+            digest = cache.get_digest(filepath)
+            self.assertEqual(digest, compute_file_digest(filepath))
+            self.assertEqual(len(cache._digests), 0)  # pylint: disable=protected-access
+
+            with mock.patch('time.time', return_value=time.time() + 2 * FILE_TIMESTAMP_RESOLUTION):
+                self.assertEqual(cache.get_digest(filepath), digest)
+                self.assertEqual(len(cache._digests), 1)  # pylint: disable=protected-access
+
+                # Rewrite the file with the same size and restore its modification time, as happens for two writes
+                # within a single tick of the file system clock: only the status change time tells them apart
+                stat = os.stat(filepath)
+                time.sleep(0.01)
+                with folder.open('file', 'w') as fhandle:
+                    fhandle.write('altered')
+                os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+                self.assertEqual(cache.get_digest(filepath), compute_file_digest(filepath))
+                self.assertNotEqual(cache.get_digest(filepath), digest)
+
 
 class CheckDBRoundTrip(AiidaTestCase):
     """
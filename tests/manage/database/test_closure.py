@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name,unused-argument
+"""Tests for the :mod:`aiida.manage.database.closure` module."""
+import pytest
+
+from aiida.common import exceptions
+from aiida.common.links import LinkType
+from aiida.manage.database import closure
+from aiida.orm import CalculationNode, Data, WorkflowNode
+
+
+def get_closure():
+    """Return the pairs of ancestors and descendants that are stored in the closure table."""
+    return {tuple(row) for row in closure.execute_statements('SELECT ancestor_id, descendant_id FROM db_dblinkclosure')}
+
+
+def create_diamond():
+    """Create a graph where a calculation creates two outputs that are both inputs of a second calculation.
+
+    :return: tuple of the input, the first calculation, its two outputs, the second calculation and its output
+    """
+    source = Data().store()
+    calculation = CalculationNode()
+    calculation.add_incoming(source, link_type=LinkType.INPUT_CALC, link_label='input')
+    calculation.store()
+
+    outputs = []
+    for label in ('left', 'right'):
+        output = Data()
+        output.add_incoming(calculation, link_type=LinkType.CREATE, link_label=label)
+        output.store()
+        outputs.append(output)
+
+    final = CalculationNode()
+    for label, output in zip(('left', 'right'), outputs):
+        final.add_incoming(output, link_type=LinkType.INPUT_CALC, link_label=label)
+    final.store()
+
+    result = Data()
+    result.add_incoming(final, link_type=LinkType.CREATE, link_label='result')
+    result.store()
+
+    return source, calculation, outputs[0], outputs[1], final, result
+
+
+@pytest.fixture
+def closure_enabled(clear_database_before_test):
+    """Build the closure for the test and drop it afterwards."""
+    closure.build_closure()
+    yield
+    closure.drop_closure()
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_build_closure():
+    """Test building the closure for existing links and dropping it again."""
+    source, calculation, left, right, final, result = create_diamond()
+    assert not closure.is_closure_enabled()
+    assert not get_closure()
+
+    try:
+        assert closure.build_closure() == 14
+        assert closure.is_closure_enabled()
+        closure.verify_closure()
+        assert (source.pk, result.pk) in get_closure()
+        assert (left.pk, right.pk) not in get_closure()
+        assert (calculation.pk, final.pk) in get_closure()
+    finally:
+        closure.drop_closure()
+
+    assert not closure.is_closure_enabled()
+    assert not get_closure()
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_verify_closure_not_built():
+    """Test that verifying the closure fails as long as it has not been built."""
+    with pytest.raises(exceptions.IntegrityError, match='has not been built'):
+        closure.verify_closure()
+
+
+@pytest.mark.usefixtures('closure_enabled')
+def test_closure_insert():
+    """Test that the closure is updated when links are added, except for links that are not followed."""
+    source, _, _, _, _, result = create_diamond()
+    closure.verify_closure()
+    assert len(get_closure()) == 14
+
+    workflow = WorkflowNode()
+    workflow.add_incoming(source, link_type=LinkType.INPUT_WORK, link_label='input')
+    workflow.store()
+    result.add_incoming(workflow, link_type=LinkType.RETURN, link_label='result')
+
+    closure.verify_closure()
+    assert len(get_closure()) == 14
+
+
+@pytest.mark.usefixtures('closure_enabled')
+def test_closure_delete_links():
+    """Test that the closure is updated when links are deleted, including multiple links in a single statement."""
+    source, calculation, left, right, final, result = create_diamond()
+
+    closure.execute_statements(f'DELETE FROM db_dblink WHERE input_id = {left.pk} AND output_id = {final.pk}')
+    closure.verify_closure()
+    assert (left.pk, result.pk) not in get_closure()
+    assert (source.pk, result.pk) in get_closure()
+
+    closure.execute_statements(f'DELETE FROM db_dblink WHERE output_id IN ({calculation.pk}, {right.pk})')
+    closure.verify_closure()
+    assert (source.pk, result.pk) not in get_closure()
+    assert (right.pk, result.pk) in get_closure()
+
+
+@pytest.mark.usefixtures('closure_enabled')
+def test_closure_delete_nodes():
+    """Test that the closure is updated when nodes are deleted."""
+    from aiida.manage.database.delete.nodes import delete_nodes
+
+    source, calculation, _, _, final, _ = create_diamond()
+    delete_nodes([final.pk], force=True)
+
+    closure.verify_closure()
+    assert len(get_closure()) == 5
+    assert {ancestor for ancestor, _ in get_closure()} == {source.pk, calculation.pk}
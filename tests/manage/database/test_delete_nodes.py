@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name,unused-argument
+"""Tests for the :mod:`aiida.manage.database.delete.nodes` module."""
+import io
+
+import pytest
+
+from aiida.backends import utils as backend_utils
+from aiida.common import exceptions, LinkType
+from aiida.common.folders import RepositoryFolder
+from aiida.manage.database.delete import nodes as delete
+from aiida.orm import CalculationNode, Data, load_node
+from aiida.repository.container import get_container
+
+
+def create_data():
+    """Return a stored data node with a file in its repository."""
+    node = Data()
+    node.put_object_from_filelike(io.StringIO('content'), 'file.txt')
+    return node.store()
+
+
+def has_repository(uuid):
+    """Return whether there are files in the repository for the node with the given UUID."""
+    container = get_container()
+    return RepositoryFolder(section='node', uuid=uuid).exists() or bool(container and container.has_hierarchy(uuid))
+
+
+def assert_deleted(nodes):
+    """Assert that the given nodes no longer exist, neither in the database nor in the repository."""
+    for node in nodes:
+        with pytest.raises(exceptions.NotExistent):
+            load_node(node.pk)
+        assert not has_repository(node.uuid)
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_delete_nodes():
+    """Test that nodes are deleted from the database and from the repository."""
+    nodes = [create_data() for _ in range(3)]
+    kept = create_data()
+    assert all(has_repository(node.uuid) for node in nodes)
+
+    delete.delete_nodes([node.pk for node in nodes] + [-1], force=True)
+
+    assert_deleted(nodes)
+    assert load_node(kept.pk).get_object_content('file.txt') == 'content'
+    assert delete.get_delete_checkpoint() is None
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_delete_nodes_interrupted(monkeypatch):
+    """Test that an interrupted deletion is completed by the next call that is not a dry run, after confirmation."""
+    nodes = [create_data() for _ in range(3)]
+    pks = [node.pk for node in nodes]
+    uuids = [node.uuid for node in nodes]
+    delete_batch = backend_utils.delete_nodes_and_connections
+    batches = []
+
+    def delete_one_batch(batch):
+        if batches:
+            raise KeyboardInterrupt
+        batches.append(batch)
+        delete_batch(batch)
+
+    monkeypatch.setattr(backend_utils, 'delete_nodes_and_connections', delete_one_batch)
+    delete.set_delete_checkpoint(pks, uuids, batch_size=1)
+
+    with pytest.raises(KeyboardInterrupt):
+        delete.complete_deletion()
+
+    # The first batch is deleted entirely, including its files, and is removed from the checkpoint
+    assert batches == [pks[:1]]
+    assert_deleted(nodes[:1])
+    assert all(has_repository(uuid) for uuid in uuids[1:])
+    checkpoint = delete.get_delete_checkpoint()
+    assert checkpoint['count'] == 3
+    assert list(delete.iter_delete_checkpoint(checkpoint)) == list(zip(pks[1:], uuids[1:]))
+
+    monkeypatch.undo()
+
+    # A node that is linked to one of the remaining nodes in the mean time should be deleted as well
+    calculation = CalculationNode()
+    calculation.add_incoming(nodes[2], LinkType.INPUT_CALC, 'input')
+    calculation.store()
+
+    delete.delete_nodes([], dry_run=True)
+    assert load_node(pks[1])
+    assert delete.get_delete_checkpoint() == checkpoint
+
+    monkeypatch.setattr('click.confirm', lambda *args, **kwargs: False)
+    delete.delete_nodes([])
+    assert load_node(pks[1])
+    assert delete.get_delete_checkpoint() == checkpoint
+
+    delete.delete_nodes([], force=True)
+    assert_deleted(nodes + [calculation])
+    assert delete.get_delete_checkpoint() is None
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_delete_checkpoint_batches():
+    """Test that the nodes of a checkpoint are recorded in batches, which are removed with the checkpoint."""
+    from aiida.manage.manager import get_manager
+
+    settings_manager = get_manager().get_backend_manager().get_settings_manager()
+    delete.set_delete_checkpoint([1, 2, 3], ['a', 'b', 'c'], rules={'create_forward': False}, batch_size=2)
+    checkpoint = delete.get_delete_checkpoint()
+
+    assert checkpoint['batches'] == 2
+    assert checkpoint['rules'] == {'create_forward': False}
+    assert list(delete.iter_delete_checkpoint(checkpoint)) == [(1, 'a'), (2, 'b'), (3, 'c')]
+
+    # Replacing the checkpoint removes the batches of the previous one
+    delete.set_delete_checkpoint([4], ['d'])
+    for key in delete.get_delete_checkpoint_batch_keys(checkpoint):
+        with pytest.raises(exceptions.NotExistent):
+            settings_manager.get(key)
+
+    assert list(delete.iter_delete_checkpoint(delete.get_delete_checkpoint())) == [(4, 'd')]
+
+    delete.delete_delete_checkpoint()
+    assert delete.get_delete_checkpoint() is None
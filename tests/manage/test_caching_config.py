@@ -265,3 +265,21 @@ def test_enable_disable_invalid(identifier):
     with pytest.raises(ValueError):
         with disable_caching(identifier=identifier):
             pass
+
+
+def test_use_cache_memoisation(configure_caching):
+    """
+    Check that the memoised decisions of get_use_cache are invalidated whenever the configuration changes.
+    """
+    identifier = 'some_ident'
+    with configure_caching({'default': False, 'enabled': [identifier]}):
+        assert get_use_cache(identifier=identifier)
+        with disable_caching(identifier=identifier):
+            assert not get_use_cache(identifier=identifier)
+        assert get_use_cache(identifier=identifier)
+
+    with configure_caching({'default': False, 'disabled': [identifier]}):
+        assert not get_use_cache(identifier=identifier)
+        with enable_caching():
+            assert get_use_cache(identifier='some_other_ident')
+        assert not get_use_cache(identifier='some_other_ident')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the :mod:`aiida.manage.caching_statistics` module."""
+# pylint: disable=redefined-outer-name
+import io
+from unittest import mock
+
+import pytest
+
+from aiida import orm
+from aiida.engine import calcfunction
+from aiida.manage.caching import enable_caching
+from aiida.manage.caching_statistics import (
+    delete_caching_statistics, flush_caching_statistics, get_caching_statistics, load_caching_statistics,
+    reset_caching_statistics
+)
+
+
+@calcfunction
+def add(x, y):
+    return x + y
+
+
+@pytest.fixture
+def clear_statistics():
+    """Reset the statistics of the current process and delete the recorded statistics before and after the test."""
+    reset_caching_statistics()
+    delete_caching_statistics()
+    yield
+    reset_caching_statistics()
+    delete_caching_statistics()
+
+
+@pytest.mark.usefixtures('clear_database_before_test', 'clear_statistics')
+def test_hits_and_misses():
+    """Test that cache lookups are counted per process type, with the time spent and the number of reused files."""
+    with enable_caching():
+        _, node = add.run_get_node(orm.Int(1), orm.Int(2))
+        _, cached = add.run_get_node(orm.Int(1), orm.Int(2))
+
+    assert cached.get_cache_source() == node.uuid
+
+    counters = get_caching_statistics()[node.process_type]
+    assert counters['hits'] == 1
+    assert counters['misses'] == 1
+    assert counters['stores'] == 2
+    assert counters['hashes'] >= 2
+    assert counters['lookup_time'] > 0
+    assert counters['hit_time'] > 0
+    assert counters['hit_files'] == 1
+
+    assert get_caching_statistics()[orm.Int(1).node_type]['stores'] > 0
+
+
+@pytest.mark.usefixtures('clear_database_before_test', 'clear_statistics')
+def test_flush_and_load():
+    """Test that the recorded statistics are combined and can be deleted."""
+    node = orm.Data()
+    node.put_object_from_filelike(io.StringIO('content'), 'file.txt')
+    node.store()
+
+    # Nothing is recorded unless enabled through the interval option
+    flush_caching_statistics()
+    assert load_caching_statistics() == {}
+
+    with mock.patch('aiida.manage.caching_statistics.get_statistics_interval', return_value=60):
+        flush_caching_statistics()
+
+    assert load_caching_statistics() == get_caching_statistics()
+    assert load_caching_statistics()[node.node_type]['stores'] == 1
+
+    delete_caching_statistics()
+    assert load_caching_statistics() == {}
@@ -749,6 +749,30 @@ class TestBackendNode(AiidaTestCase):
         node.set_extra_many(extras)
         self.assertEqual(set(extras), set(node.extras_keys()))
 
+    def test_extras_partial_update(self):
+        """Test that changing extras of a stored node only updates the changed keys in the database."""
+        node = self.create_node().store()
+        node.set_extra_many({'extra_one': 1, 'extra_two': 2})
+        mtime = node.mtime
+
+        # Changes through another instance of the same node should not be overridden, since only changed keys are sent
+        reloaded = self.backend.nodes.get(node.pk)
+        reloaded.set_extra('extra_three', 3)
+        node.set_extra('extra_one', 'one')
+        reloaded.delete_extra('extra_two')
+
+        self.assertTrue(node.mtime > mtime)
+        self.assertEqual(self.backend.nodes.get(node.pk).extras, {'extra_one': 'one', 'extra_three': 3})
+
+        # Deleting multiple keys of which one does not exist should not delete any of them
+        with self.assertRaises(AttributeError):
+            node.delete_extra_many(['extra_one', 'notexisting'])
+
+        self.assertEqual(self.backend.nodes.get(node.pk).extras, {'extra_one': 'one', 'extra_three': 3})
+
+        node.delete_extra_many(['extra_one', 'extra_three'])
+        self.assertEqual(self.backend.nodes.get(node.pk).extras, {})
+
     def test_extra_flush_specifically(self):
         """Test that changing `extras` only flushes that property and does not affect others like attributes.
 
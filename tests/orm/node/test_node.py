@@ -845,6 +845,149 @@ def test_store_from_cache():
     assert data.get_hash() == clone.get_hash()
 
 
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_get_same_nodes():
+    """Test that the cache sources of multiple nodes are resolved through the hash index."""
+    from aiida.orm import Int
+
+    source = Int(1).store()
+    duplicate = Int(1).store()
+    other = Int(2).store()
+
+    assert [node.pk for node in source.get_all_same_nodes()] == [source.pk, duplicate.pk]
+    assert Int(2)._get_same_node().pk == other.pk  # pylint: disable=protected-access
+    assert Int(3)._get_same_node() is None  # pylint: disable=protected-access
+
+    same_nodes = Node.objects.get_same_nodes([Int(1), Int(2), Int(3), Data()])
+    assert [node.pk if node is not None else None for node in same_nodes] == [source.pk, other.pk, None, None]
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_store_many():
+    """Test that `store_many` stores nodes with the links between them, as well as their hashes and repositories."""
+    from aiida.common.hashing import _HASH_EXTRA_KEY
+    from aiida.orm import store_many
+
+    source = Data().store()
+    calculation = CalculationNode()
+    calculation.add_incoming(source, LinkType.INPUT_CALC, 'input')
+    outputs = []
+
+    for index in range(3):
+        output = Data()
+        output.set_attribute('index', index)
+        output.put_object_from_filelike(io.StringIO(f'content {index}'), 'file')
+        output.add_incoming(calculation, LinkType.CREATE, f'output_{index}')
+        outputs.append(output)
+
+    # The order of the nodes should not matter, as long as the sources of the links are part of the nodes
+    assert store_many(outputs + [calculation, source]) == outputs + [calculation, source]
+    assert all(node.is_stored for node in outputs + [calculation])
+
+    calculation = load_node(calculation.pk)
+    assert calculation.get_incoming().one().node.pk == source.pk
+    labels = sorted(entry.link_label for entry in calculation.get_outgoing().all())
+    assert labels == ['output_0', 'output_1', 'output_2']
+
+    for index, output in enumerate(outputs):
+        loaded = load_node(output.pk)
+        assert loaded.get_attribute('index') == index
+        assert loaded.get_object_content('file') == f'content {index}'
+        assert loaded.get_extra(_HASH_EXTRA_KEY) == loaded.get_hash()
+
+    assert calculation.get_extra(_HASH_EXTRA_KEY) == calculation.get_hash()
+
+    # The source of an incoming link that is neither stored nor one of the nodes, should be detected before storing
+    orphan = Data()
+    orphan.add_incoming(CalculationNode(), LinkType.CREATE, 'output')
+    other = Data()
+
+    with pytest.raises(exceptions.ModificationNotAllowed):
+        store_many([other, orphan])
+
+    assert not other.is_stored
+    assert not orphan.is_stored
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_store_many_rollback(monkeypatch):
+    """Test that the nodes of earlier generations are put back in the unstored state if a later generation fails."""
+    from aiida.orm import Int, QueryBuilder, store_many
+
+    def store(self, with_transaction=True, use_cache=None):
+        return Node.store(self, with_transaction=with_transaction, use_cache=use_cache)
+
+    def store_many_failing(self, nodes, links=None, with_transaction=True):
+        if any(node is output._backend_entity for node in nodes):  # pylint: disable=protected-access
+            raise RuntimeError('failed to store the second generation')
+        return store_many_original(self, nodes, links, with_transaction)
+
+    calculation = CalculationNode()
+    calculation.put_object_from_filelike(io.StringIO('calculation'), 'file')
+    # A class that overrides `store` is stored individually, but should be put back as well
+    individual = Int(1)
+    output = Data()
+    output.put_object_from_filelike(io.StringIO('output'), 'file')
+    output.add_incoming(calculation, LinkType.CREATE, 'output')
+
+    store_many_original = type(calculation.backend.nodes).store_many
+    monkeypatch.setattr(Int, 'store', store)
+    monkeypatch.setattr(type(calculation.backend.nodes), 'store_many', store_many_failing)
+
+    with pytest.raises(RuntimeError):
+        store_many([calculation, individual, output])
+
+    assert not any(node.is_stored for node in [calculation, individual, output])
+    assert QueryBuilder().append(Node).count() == 0
+
+    monkeypatch.undo()
+    store_many([calculation, individual, output])
+
+    assert load_node(individual.pk).value == 1
+    assert load_node(calculation.pk).get_object_content('file') == 'calculation'
+    output = load_node(output.pk)
+    assert output.get_object_content('file') == 'output'
+    assert output.get_incoming().one().node.pk == calculation.pk
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_set_extras_many():
+    """Test that `Node.objects.set_extras_many` patches the extras of nodes selected by ids or a query builder."""
+    from aiida.orm import Int, QueryBuilder
+
+    nodes = [Int(value).store() for value in range(3)]
+    other = Data().store()
+
+    for node in nodes + [other]:
+        node.set_extra_many({'obsolete': True, 'settings': {'a': 1}, 'scalar': 1})
+
+    count = Node.objects.set_extras_many(
+        nodes[:2] + [nodes[2].pk], extras={'tag': 'value'}, keys=['obsolete', 'missing'], merge={
+            'settings': {'b': 2},
+            'scalar': {'c': 3}
+        }
+    )
+    assert count == 3
+
+    for node in nodes:
+        assert load_node(node.pk).extras == {'tag': 'value', 'settings': {'a': 1, 'b': 2}, 'scalar': {'c': 3}}
+
+    assert load_node(other.pk).extras == {'obsolete': True, 'settings': {'a': 1}, 'scalar': 1}
+
+    builder = QueryBuilder().append(Int, filters={'attributes.value': {'>': 0}}, project='id')
+    assert Node.objects.set_extras_many(builder, keys=['tag']) == 2
+    assert [load_node(node.pk).get_extra('tag', None) for node in nodes] == ['value', None, None]
+
+    with pytest.raises(ValueError):
+        Node.objects.set_extras_many([other.pk], extras={'tag': 1}, keys=['tag'])
+
+    with pytest.raises(exceptions.ValidationError):
+        Node.objects.set_extras_many([other.pk], merge={'settings': 1})
+
+    with pytest.raises(ValueError):
+        Node.objects.set_extras_many(QueryBuilder().append(Int, project=['id', 'label']), keys=['a'])
+
+
 @pytest.mark.usefixtures('clear_database_before_test')
 def test_open_wrapper():
     """Test the wrapper around the return value of ``Node.open``.
@@ -14,6 +14,7 @@ import pytest
 
 from aiida import orm
 from aiida.backends.testbase import AiidaTestCase
+from aiida.common.exceptions import InputValidationError
 from aiida.common.links import LinkType
 from aiida.manage import configuration
 
@@ -936,6 +937,51 @@ class QueryBuilderLimitOffsetsTest(AiidaTestCase):
         res = next(zip(*qb.all()))
         self.assertEqual(res, tuple(range(4, 1, -1)))
 
+    def test_after(self):
+        """Test that the pages obtained by seeking past the last row of a page match those obtained with an offset."""
+        nodes = []
+        for i in range(10):
+            node = orm.Data()
+            node.set_attribute('foo', i % 3)
+            nodes.append(node.store())
+
+        pks = [node.pk for node in nodes]
+
+        for order_by in (
+            [{'id': 'asc'}],
+            [{'id': 'desc'}],
+            [{'attributes.foo': {'order': 'desc', 'cast': 'i'}}, {'id': 'asc'}],
+            [{'ctime': 'desc'}, {'id': 'desc'}],
+        ):
+            projection = [list(order.keys())[0] for order in order_by]
+
+            def get_builder(order_by=order_by, projection=projection):
+                builder = orm.QueryBuilder().append(orm.Data, filters={'id': {'in': pks}}, project=projection)
+                return builder.order_by({orm.Data: order_by})
+
+            after = None
+            for offset in range(0, 10, 4):
+                page = get_builder().limit(4).after(after).all()
+                self.assertEqual(page, get_builder().limit(4).offset(offset).all())
+                after = page[-1]
+
+            self.assertEqual(get_builder().after(after).all(), [])
+
+    def test_after_invalid(self):
+        """Test that the values to seek after have to match the ordering."""
+        builder = orm.QueryBuilder().append(orm.Data, project='id').order_by({orm.Data: 'id'})
+        self.assertEqual(builder.queryhelp['after'], None)
+
+        with self.assertRaises(InputValidationError):
+            builder.after(1)
+
+        builder.after([1, 2])
+        self.assertEqual(builder.queryhelp['after'], [1, 2])
+        self.assertEqual(orm.QueryBuilder(**builder.queryhelp).queryhelp['after'], [1, 2])
+
+        with self.assertRaises(InputValidationError):
+            builder.all()
+
 
 class QueryBuilderJoinsTests(AiidaTestCase):
 
@@ -1295,6 +1341,143 @@ class QueryBuilderPath(AiidaTestCase):
         # self.assertTrue(set(next(zip(*qb.all()))), set([5]))
 
 
+class TestQueryBuilderTraversal(AiidaTestCase):
+    """Tests for the options of the recursive traversal of `with_ancestors` and `with_descendants`."""
+
+    def setUp(self):
+        super().setUp()
+        self.clean_db()
+        # A chain d1 -> c1 -> d2 -> c2 -> d3, where d1 is also an input of a workflow that returns it
+        self.d1 = orm.Data().store()
+        self.c1 = orm.CalculationNode()
+        self.c1.add_incoming(self.d1, link_type=LinkType.INPUT_CALC, link_label='input')
+        self.c1.store()
+        self.d2 = orm.Data()
+        self.d2.add_incoming(self.c1, link_type=LinkType.CREATE, link_label='output')
+        self.d2.store()
+        self.c2 = orm.CalculationNode()
+        self.c2.add_incoming(self.d2, link_type=LinkType.INPUT_CALC, link_label='input')
+        self.c2.store()
+        self.d3 = orm.Data()
+        self.d3.add_incoming(self.c2, link_type=LinkType.CREATE, link_label='output')
+        self.d3.store()
+        self.workflow = orm.WorkflowNode()
+        self.workflow.add_incoming(self.d1, link_type=LinkType.INPUT_WORK, link_label='input')
+        self.workflow.store()
+        self.d1.add_incoming(self.workflow, link_type=LinkType.RETURN, link_label='output')
+
+    def get_descendants(self, **kwargs):
+        builder = orm.QueryBuilder().append(orm.Node, filters={'id': self.d1.pk}, tag='origin')
+        builder.append(orm.Node, with_ancestors='origin', project='id', **kwargs)
+        return builder.all(flat=True)
+
+    def test_depth(self):
+        """Test that a filter on the depth bounds the traversal."""
+        self.assertEqual(sorted(self.get_descendants()), sorted([self.c1.pk, self.d2.pk, self.c2.pk, self.d3.pk]))
+        self.assertEqual(sorted(self.get_descendants(edge_filters={'depth': {'<=': 1}})), [self.c1.pk, self.d2.pk])
+        self.assertEqual(self.get_descendants(edge_filters={'depth': {'<': 1}}), [self.c1.pk])
+        self.assertEqual(self.get_descendants(edge_filters={'and': [{'depth': {'>': 1}}, {'depth': 2}]}), [self.c2.pk])
+
+    def test_max_depth(self):
+        """Test the function that determines the maximum depth from the filters on the edge."""
+        # pylint: disable=protected-access
+        get_max_depth = orm.QueryBuilder._get_max_depth
+        self.assertEqual(get_max_depth({}), None)
+        self.assertEqual(get_max_depth({'depth': {'>': 2}}), None)
+        self.assertEqual(get_max_depth({'depth': 3}), 3)
+        self.assertEqual(get_max_depth({'depth': {'<': 3}}), 2)
+        self.assertEqual(get_max_depth({'depth': {'in': [1, 4]}}), 4)
+        self.assertEqual(get_max_depth({'depth': {'<=': 5}, 'and': [{'depth': {'<': 3}}]}), 2)
+        # Non-integer bounds are rounded towards the depths that they include
+        self.assertEqual(get_max_depth({'depth': {'<': 2.5}}), 2)
+        self.assertEqual(get_max_depth({'depth': {'<=': 2.5}}), 2)
+        self.assertEqual(get_max_depth({'depth': {'<': -0.5}}), -1)
+
+    def test_filters(self):
+        """Test that the traversal does not continue through nodes that do not match the traversal filters."""
+        traversal = {'filters': {'id': {'!==': self.c2.pk}}}
+        self.assertEqual(sorted(self.get_descendants(traversal=traversal)), [self.c1.pk, self.d2.pk])
+
+    def test_link_types(self):
+        """Test that other link types can be followed, also if these form a cycle."""
+        traversal = {'link_types': [LinkType.INPUT_WORK, 'return']}
+        self.assertEqual(sorted(self.get_descendants(traversal=traversal)), [self.workflow.pk])
+
+        traversal = {'link_types': ['input_calc', 'create', 'input_work', 'return']}
+        descendants = self.get_descendants(traversal=traversal)
+        self.assertEqual(set(descendants), {self.c1.pk, self.d2.pk, self.c2.pk, self.d3.pk, self.workflow.pk})
+
+    def test_distinct(self):
+        """Test that nodes reached through multiple walks of the same depth are only returned once if requested."""
+        origin = orm.Data().store()
+        calculation = orm.CalculationNode()
+        calculation.add_incoming(origin, link_type=LinkType.INPUT_CALC, link_label='input')
+        calculation.store()
+        final = orm.CalculationNode()
+        for label in ('output_a', 'output_b'):
+            output = orm.Data()
+            output.add_incoming(calculation, link_type=LinkType.CREATE, link_label=label)
+            output.store()
+            final.add_incoming(output, link_type=LinkType.INPUT_CALC, link_label=label)
+        final.store()
+
+        for distinct, expected in ((False, 2), (True, 1)):
+            builder = orm.QueryBuilder().append(orm.Node, filters={'id': origin.pk}, tag='origin')
+            builder.append(orm.Node, with_ancestors='origin', project='id', traversal={'distinct': distinct})
+            self.assertEqual(builder.all(flat=True).count(final.pk), expected)
+
+    def test_invalid(self):
+        """Test that invalid traversal options are rejected."""
+        builder = orm.QueryBuilder().append(orm.Node, tag='origin')
+        with self.assertRaises(InputValidationError):
+            builder.append(orm.Node, with_incoming='origin', traversal={'distinct': True})
+        with self.assertRaises(InputValidationError):
+            builder.append(orm.Node, with_ancestors='origin', traversal={'unknown': True})
+        with self.assertRaises(InputValidationError):
+            builder.append(orm.Node, with_ancestors='origin', traversal={'link_types': ['unknown']})
+
+    def test_queryhelp(self):
+        """Test that the traversal options are part of the queryhelp."""
+        builder = orm.QueryBuilder().append(orm.Node, filters={'id': self.d1.pk}, tag='origin')
+        builder.append(orm.Node, with_ancestors='origin', traversal={'link_types': LinkType.INPUT_CALC})
+        self.assertEqual(builder.queryhelp['path'][-1]['traversal'], {'link_types': ['input_calc']})
+        self.assertEqual(orm.QueryBuilder(**builder.queryhelp).count(), 1)
+
+    def test_closure(self):
+        """Test that the closure returns the same ancestors and descendants as the walk, whether it is built or not."""
+        from aiida.manage.database.closure import build_closure, drop_closure
+
+        def get_ancestors(**kwargs):
+            builder = orm.QueryBuilder().append(orm.Node, filters={'id': self.d3.pk}, tag='origin')
+            builder.append(orm.Node, with_descendants='origin', project='id', **kwargs)
+            return sorted(builder.all(flat=True))
+
+        descendants = sorted(self.get_descendants())
+        ancestors = get_ancestors()
+
+        self.assertEqual(sorted(self.get_descendants(traversal={'closure': True})), descendants)
+        self.assertEqual(get_ancestors(traversal={'closure': True}), ancestors)
+
+        try:
+            build_closure()
+            self.assertEqual(sorted(self.get_descendants(traversal={'closure': True})), descendants)
+            self.assertEqual(get_ancestors(traversal={'closure': True}), ancestors)
+        finally:
+            drop_closure()
+
+    def test_closure_invalid(self):
+        """Test that the closure cannot be combined with other traversal options or with filters on the edge."""
+        builder = orm.QueryBuilder().append(orm.Node, tag='origin')
+        with self.assertRaises(InputValidationError):
+            builder.append(orm.Node, with_ancestors='origin', traversal={'closure': True, 'link_types': 'create'})
+        with self.assertRaises(InputValidationError):
+            builder.append(orm.Node, with_ancestors='origin', traversal={'closure': True, 'filters': {'id': 1}})
+        with self.assertRaises(InputValidationError):
+            self.get_descendants(traversal={'closure': True}, edge_filters={'depth': 1})
+        with self.assertRaises(InputValidationError):
+            self.get_descendants(traversal={'closure': True}, edge_project='path')
+
+
 class TestConsistency(AiidaTestCase):
 
     def test_create_node_and_query(self):
@@ -1314,6 +1497,15 @@ class TestConsistency(AiidaTestCase):
         self.assertEqual(idx, 99)  # pylint: disable=undefined-loop-variable
         self.assertTrue(len(orm.QueryBuilder().append(orm.Node, project=['id', 'label']).all(batch_size=10)) > 99)
 
+    def test_iterall_batches(self):
+        """Test that results fetched in batches smaller than the number of results are all returned, in order."""
+        pks = [orm.Data().store().pk for _ in range(25)]
+
+        builder = orm.QueryBuilder().append(orm.Data, filters={'id': {'in': pks}}, project='id', tag='data')
+        builder.order_by({'data': 'id'})
+        self.assertEqual([pk for pk, in builder.iterall(batch_size=4)], sorted(pks))
+        self.assertEqual([row['data']['id'] for row in builder.iterdict(batch_size=4)], sorted(pks))
+
     def test_len_results(self):
         """
         Test whether the len of results matches the count returned.
@@ -8,11 +8,14 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 """Tests for the `Node` utils."""
+import warnings
+
 import pytest
 
 from aiida.backends.testbase import AiidaTestCase
 from aiida.orm import Data
 from aiida.orm.utils.node import load_node_class
+from aiida.plugins.entry_point import clear_entry_point_cache
 
 
 class TestLoadNodeClass(AiidaTestCase):
@@ -20,6 +23,7 @@ class TestLoadNodeClass(AiidaTestCase):
 
     def test_load_node_class_fallback(self):
         """Verify that `load_node_class` will fall back to `Data` class if entry point cannot be loaded."""
+        clear_entry_point_cache()
         loaded_class = load_node_class('data.some.non.existing.plugin.')
         self.assertEqual(loaded_class, Data)
 
@@ -27,3 +31,20 @@ class TestLoadNodeClass(AiidaTestCase):
         with pytest.warns(UserWarning):
             loaded_class = load_node_class('__main__.SubData.')
         self.assertEqual(loaded_class, Data)
+
+    def test_load_node_class_cache(self):
+        """Verify that `load_node_class` caches the class per type string until the entry point cache is cleared."""
+        clear_entry_point_cache()
+        self.assertEqual(load_node_class('data.dict.Dict.'), load_node_class('data.dict.Dict.'))
+        self.assertEqual(load_node_class.cache_info().hits, 1)
+
+        # The fallback is cached as well, such that the warning is only emitted once
+        with pytest.warns(UserWarning):
+            load_node_class('__main__.SubData.')
+        with warnings.catch_warnings(record=True) as record:
+            warnings.simplefilter('always')
+            load_node_class('__main__.SubData.')
+        self.assertEqual(len(record), 0)
+
+        clear_entry_point_cache()
+        self.assertEqual(load_node_class.cache_info().currsize, 0)
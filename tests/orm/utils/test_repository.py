@@ -8,13 +8,14 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 """Tests for the `Repository` utility class."""
+import io
 import os
 import shutil
 import tempfile
 
 from aiida.backends.testbase import AiidaTestCase
 from aiida.common.exceptions import ModificationNotAllowed
-from aiida.orm import Node, Data
+from aiida.orm import Node, Data, load_node
 from aiida.repository import File, FileType
 
 
@@ -190,3 +191,95 @@ class TestRepository(AiidaTestCase):
         self.assertEqual(sorted(node.list_object_names('subdir')), ['a.txt', 'b.txt', 'nested'])
 
         self.assertRaises(ModificationNotAllowed, node._repository.erase)  # pylint: disable=protected-access
+
+    def test_clone(self):
+        """Test that `clone` shares the content of files, which are unshared again when they are modified."""
+        node = Data()
+        node.put_object_from_tree(self.tempdir, '')
+        node.store()
+
+        clone = node.clone()
+        self.assertEqual(sorted(clone.list_object_names()), ['c.txt', 'subdir'])
+        self.assertEqual(clone.get_object_content('c.txt'), self.get_file_content('c.txt'))
+
+        # pylint: disable=protected-access
+        source_path = node._repository._get_base_folder().get_abs_path('c.txt')
+        clone_path = clone._repository._get_base_folder().get_abs_path('c.txt')
+        self.assertTrue(os.path.samefile(source_path, clone_path))
+
+        clone.put_object_from_filelike(io.StringIO('modified'), 'c.txt')
+
+        self.assertFalse(os.path.samefile(source_path, clone_path))
+        self.assertEqual(node.get_object_content('c.txt'), self.get_file_content('c.txt'))
+        self.assertEqual(clone.get_object_content('c.txt'), 'modified')
+
+        clone.store()
+        key = os.path.join('subdir', 'a.txt')
+        self.assertEqual(clone.get_object_content(key), self.get_file_content(key))
+
+    def test_checksums(self):
+        """Test that the checksums recorded when writing objects give the same hash as reading the repository."""
+        from aiida.common.hashing import _CHECKSUMS_EXTRA_KEY, make_hash
+
+        node = Data()
+        node.put_object_from_tree(self.tempdir, '')
+        node.put_object_from_tree(self.tempdir, 'tree', contents_only=False)
+        node.put_object_from_filelike(io.StringIO('text'), os.path.join('nested', 'text.txt'))
+        node.put_object_from_filelike(io.BytesIO(b'binary'), 'binary.dat', mode='wb')
+        node.delete_object(os.path.join('subdir', 'a.txt'))
+        node.store()
+
+        # pylint: disable=protected-access
+        checksums = node.get_extra(_CHECKSUMS_EXTRA_KEY)
+        folder_hash = make_hash(node._repository._get_base_folder())
+        self.assertEqual(make_hash(node._repository.get_hashable()), folder_hash)
+        self.assertEqual(sorted(checksums), [
+            'binary.dat', 'c.txt', 'nested', 'nested/text.txt', 'subdir', 'subdir/b.txt', 'subdir/nested',
+            'subdir/nested/deep.txt', 'tree', 'tree/c.txt', 'tree/subdir', 'tree/subdir/a.txt', 'tree/subdir/b.txt',
+            'tree/subdir/nested', 'tree/subdir/nested/deep.txt'
+        ])
+
+        loaded = load_node(node.pk)
+        self.assertEqual(loaded._repository.get_checksums(), checksums)
+        self.assertEqual(make_hash(loaded._repository.get_hashable()), folder_hash)
+        self.assertEqual(loaded.get_hash(), node.get_hash())
+
+    def test_objects_in_memory(self):
+        """Test that small objects of an unstored node are kept in memory, without creating a sandbox folder."""
+        from aiida.common.hashing import make_hash
+
+        node = Data()
+        node.put_object_from_filelike(io.StringIO('text'), os.path.join('nested', 'text.txt'))
+        node.put_object_from_filelike(io.BytesIO(b'binary'), 'binary.dat', mode='wb')
+
+        # pylint: disable=protected-access
+        self.assertIsNone(node._repository._temp_folder)
+        self.assertEqual(node.list_object_names(), ['binary.dat', 'nested'])
+        self.assertEqual(node.get_object('nested'), File('nested', FileType.DIRECTORY))
+        self.assertEqual(node.get_object_content(os.path.join('nested', 'text.txt')), 'text')
+        self.assertEqual(node.get_object_content('binary.dat', mode='rb'), b'binary')
+
+        with self.assertRaises(FileNotFoundError):
+            node.list_objects('missing')
+
+        node.delete_object('binary.dat')
+        hashable = make_hash(node._repository.get_hashable())
+        node.store()
+
+        self.assertIsNone(node._repository._temp_folder)
+        self.assertEqual(make_hash(node._repository._get_base_folder()), hashable)
+        self.assertEqual(load_node(node.pk).get_object_content(os.path.join('nested', 'text.txt')), 'text')
+
+    def test_objects_in_memory_sandbox(self):
+        """Test that objects kept in memory are written to the sandbox folder once it is needed."""
+        node = Data()
+        node.put_object_from_filelike(io.StringIO('text'), 'text.txt')
+        node.put_object_from_tree(self.tempdir, 'tree')
+
+        # pylint: disable=protected-access
+        self.assertIsNotNone(node._repository._temp_folder)
+        self.assertEqual(node.list_object_names(), ['text.txt', 'tree'])
+        self.assertEqual(node.get_object_content('text.txt'), 'text')
+
+        node.store()
+        self.assertEqual(load_node(node.pk).get_object_content('text.txt'), 'text')
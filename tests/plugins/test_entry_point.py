@@ -10,7 +10,9 @@
 """Tests for the :py:mod:`~aiida.plugins.entry_point` module."""
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.plugins.entry_point import validate_registered_entry_points
+from aiida.plugins.entry_point import (
+    clear_entry_point_cache, get_entry_point_class_index, get_entry_point_from_class, validate_registered_entry_points
+)
 
 
 class TestEntryPoint(AiidaTestCase):
@@ -20,3 +22,16 @@ class TestEntryPoint(AiidaTestCase):
     def test_validate_registered_entry_points():
         """Test the `validate_registered_entry_points` function."""
         validate_registered_entry_points()
+
+    def test_get_entry_point_from_class(self):
+        """Test the `get_entry_point_from_class` function, which uses the cached class index."""
+        clear_entry_point_cache()
+
+        group, entry_point = get_entry_point_from_class('aiida.orm.nodes.data.dict', 'Dict')
+        self.assertEqual(group, 'aiida.data')
+        self.assertEqual(entry_point.name, 'dict')
+        self.assertEqual(get_entry_point_from_class('aiida.orm.nodes.data.dict', 'NonExistent'), (None, None))
+        self.assertEqual(get_entry_point_class_index.cache_info().currsize, 1)
+
+        clear_entry_point_cache()
+        self.assertEqual(get_entry_point_class_index.cache_info().currsize, 0)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the :mod:`aiida.repository.container` module."""
+import collections
+import io
+import os
+
+import pytest
+
+from aiida import orm
+from aiida.common.utils import get_new_uuid
+from aiida.orm.utils._repository import Repository
+from aiida.repository import File, FileType
+from aiida.repository.container import CONTAINER_DIRNAME, Container, get_container
+from aiida.tools.importexport import export, import_data
+
+
+@pytest.fixture
+def container(tmp_path):
+    """Return an initialised container with a small pack threshold so both loose and packed objects are tested."""
+    container = Container(str(tmp_path / 'container'))
+    container.init_container(pack_threshold=16)
+    return container
+
+
+@pytest.fixture
+def file_tree(tmp_path):
+    """Create a small file tree and return its absolute path."""
+    dirpath = tmp_path / 'tree'
+    (dirpath / 'sub' / 'empty').mkdir(parents=True)
+    (dirpath / 'small.txt').write_bytes(b'small')
+    (dirpath / 'sub' / 'large.txt').write_bytes(b'large' * 10)
+    (dirpath / 'sub' / 'copy.txt').write_bytes(b'small')
+    return str(dirpath)
+
+
+def test_init_container(container):
+    """Test that a container cannot be initialised twice."""
+    assert container.is_initialised
+
+    with pytest.raises(FileExistsError):
+        container.init_container()
+
+
+@pytest.mark.parametrize('content', (b'', b'small', b'large' * 10))
+def test_add_object(container, content):
+    """Test adding objects below and above the pack threshold."""
+    key = container.add_object(io.BytesIO(content))
+
+    assert container.has_object(key)
+    assert container.get_object_content(key) == content
+    assert container.add_object(io.BytesIO(content)) == key
+
+
+def test_deduplication(container, file_tree):
+    """Test that identical files are stored only once."""
+    entries = container.add_objects_from_tree(file_tree)
+
+    assert entries['small.txt'] == entries['sub/copy.txt']
+    assert entries['sub'] is None
+    assert entries['sub/empty'] is None
+    assert container.count_objects() == {'loose': 1, 'packed': 1}
+
+
+def test_hierarchy(container, file_tree):
+    """Test setting, listing, copying and deleting the virtual hierarchy of a node."""
+    entries = container.add_objects_from_tree(file_tree)
+    container.set_hierarchy('uuid', entries, 'path')
+
+    assert container.has_hierarchy('uuid')
+    assert container.get_hierarchy('uuid', 'path') == entries
+    assert [name for name, _ in container.list_directory('uuid', 'path/sub')] == ['copy.txt', 'empty', 'large.txt']
+    assert container.get_entry('uuid', 'path/sub') == (True, None)
+    assert container.get_entry('uuid', 'path/small.txt') == (True, entries['small.txt'])
+    assert container.get_entry('uuid', 'path/missing') == (False, None)
+
+    hierarchy = container.get_hierarchy('uuid')
+    container.copy_hierarchy('uuid', 'clone')
+    container.delete_hierarchy('uuid', 'path/sub')
+
+    assert sorted(container.get_hierarchy('uuid')) == ['path', 'path/small.txt']
+    assert container.get_hierarchy('clone') == hierarchy
+
+
+def test_export_hierarchy(container, file_tree, tmp_path):
+    """Test writing the virtual hierarchy of a node to disk."""
+    container.set_hierarchy('uuid', container.add_objects_from_tree(file_tree))
+
+    target = str(tmp_path / 'target')
+    container.export_hierarchy('uuid', target)
+
+    assert sorted(os.listdir(target)) == ['small.txt', 'sub']
+    assert sorted(os.listdir(os.path.join(target, 'sub'))) == ['copy.txt', 'empty', 'large.txt']
+    with open(os.path.join(target, 'sub', 'large.txt'), 'rb') as handle:
+        assert handle.read() == b'large' * 10
+
+
+def test_clean(container, file_tree):
+    """Test that only objects that are no longer referenced are removed."""
+    entries = container.add_objects_from_tree(file_tree)
+    container.set_hierarchy('uuid', entries)
+    container.set_hierarchy('other', {'small.txt': entries['small.txt']})
+
+    assert container.clean() == 0
+
+    container.delete_hierarchy('uuid')
+
+    assert container.clean() == 1
+    assert container.count_objects() == {'loose': 0, 'packed': 1}
+
+
+def test_get_container(tmp_path, monkeypatch):
+    """Test that a container that is initialised by another process after it was first looked up is found."""
+    containers = {}
+    monkeypatch.setattr('aiida.repository.container._CONTAINERS', containers)
+    profile = collections.namedtuple('Profile', ['repository_path'])(str(tmp_path))
+
+    assert get_container(profile) is None
+
+    # The container registers itself when initialised in this interpreter, which is not the case for another process
+    Container(str(tmp_path / CONTAINER_DIRNAME)).init_container()
+    containers.clear()
+
+    container = get_container(profile)
+    assert container.is_initialised
+    assert get_container(profile) is container
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_node_repository_lookup(container, monkeypatch):
+    """Test that the container is only looked up once the repository of a node is stored."""
+    calls = []
+
+    def get_container_mock():
+        calls.append(None)
+        return container
+
+    monkeypatch.setattr('aiida.orm.utils._repository.get_container', get_container_mock)
+
+    node = orm.Data()
+    node.put_object_from_filelike(io.StringIO('content'), 'text.txt')
+    assert node.get_object_content('text.txt') == 'content'
+    assert not calls
+
+    node.store()
+    assert node.get_object_content('text.txt') == 'content'
+    assert len(calls) == 1
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_node_repository(container, file_tree, monkeypatch):
+    """Test that the repository of a stored node is served from the container when it has been initialised."""
+    monkeypatch.setattr('aiida.orm.utils._repository.get_container', lambda: container)
+
+    node = orm.Data()
+    node.put_object_from_tree(file_tree)
+    node.put_object_from_filelike(io.StringIO('content'), 'text.txt')
+    node.store()
+
+    assert container.has_hierarchy(node.uuid)
+    assert not node._repository._repo_folder.exists()  # pylint: disable=protected-access
+    assert node.list_object_names() == ['small.txt', 'sub', 'text.txt']
+    assert node.list_objects('sub') == [
+        File('copy.txt', FileType.FILE),
+        File('empty', FileType.DIRECTORY),
+        File('large.txt', FileType.FILE)
+    ]
+    assert node.get_object('sub') == File('sub', FileType.DIRECTORY)
+    assert node.get_object_content('text.txt') == 'content'
+    assert node.get_object_content(os.path.join('sub', 'large.txt'), mode='rb') == b'large' * 10
+
+    loaded = orm.load_node(node.pk)
+    assert loaded.get_object_content('small.txt') == 'small'
+    assert loaded.get_hash() == node.get_hash()
+
+    node.delete_object('sub', force=True)
+    assert node.list_object_names() == ['small.txt', 'text.txt']
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_export_import(aiida_profile, container, file_tree, tmp_path, monkeypatch):
+    """Test that nodes with and without files are exported from and imported into an initialised container."""
+    monkeypatch.setattr('aiida.orm.utils._repository.get_container', lambda: container)
+
+    empty = orm.Int(1).store()
+    node = orm.Data()
+    node.put_object_from_tree(file_tree)
+    node.store()
+
+    assert not container.has_hierarchy(empty.uuid)
+
+    filename = str(tmp_path / 'export.aiida')
+    export([empty, node], filename=filename, silent=True)
+
+    aiida_profile.reset_db()
+    container.delete_hierarchies([empty.uuid, node.uuid])
+    container.clean()
+    assert container.count_objects() == {'loose': 0, 'packed': 0}
+
+    import_data(filename, silent=True)
+
+    assert orm.load_node(empty.uuid).value == 1
+    assert orm.load_node(empty.uuid).list_object_names() == []
+
+    loaded = orm.load_node(node.uuid)
+    assert loaded.list_object_names() == ['small.txt', 'sub']
+    assert loaded.get_object_content(os.path.join('sub', 'large.txt'), mode='rb') == b'large' * 10
+    assert container.has_hierarchy(node.uuid)
+
+
+@pytest.mark.parametrize('in_memory', (True, False))
+def test_repository_base_path(container, file_tree, monkeypatch, in_memory):
+    """Test that the base path of a repository is applied exactly once to the paths of its objects in the container."""
+    monkeypatch.setattr('aiida.orm.utils._repository.get_container', lambda: container)
+
+    uuid = get_new_uuid()
+    repository = Repository(uuid=uuid, is_stored=False, base_path='raw_input')
+    repository.put_object_from_filelike(io.StringIO('content'), 'text.txt')
+
+    if not in_memory:
+        # Writing a tree requires the sandbox folder, such that the repository is stored from the folder
+        repository.put_object_from_tree(file_tree, 'tree')
+
+    repository.store()
+
+    hierarchy = container.get_hierarchy(uuid)
+    assert 'raw_input/text.txt' in hierarchy
+    assert not any(path.startswith('raw_input/raw_input') for path in hierarchy)
+    assert repository.get_object_content('text.txt') == 'content'
+
+    if not in_memory:
+        assert 'raw_input/tree/sub/large.txt' in hierarchy
+        assert repository.get_object_content('tree/sub/large.txt', mode='rb') == b'large' * 10
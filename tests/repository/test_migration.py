@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the :mod:`aiida.repository.migration` module."""
+import collections
+import os
+
+import pytest
+
+from aiida.repository.container import CONTAINER_DIRNAME, Container
+from aiida.repository.migration import LEGACY_NODE_FOLDER, get_legacy_node_folders, migrate_repository
+
+Profile = collections.namedtuple('Profile', ['name', 'repository_path'])
+
+UUIDS = ('0b2c5e9f-2f8a-4a0e-9a3e-1c4d5e6f7a8b', '0b2cf1a2-3b4c-4d5e-8f9a-0b1c2d3e4f5a')
+
+
+@pytest.fixture
+def profile(tmp_path):
+    """Return a profile whose repository contains the folders of two nodes with the same content."""
+    for uuid in UUIDS:
+        folder = tmp_path / LEGACY_NODE_FOLDER / uuid[:2] / uuid[2:4] / uuid[4:] / 'path'
+        (folder / 'sub').mkdir(parents=True)
+        (folder / 'file.txt').write_bytes(b'content')
+
+    return Profile('test', str(tmp_path))
+
+
+def test_get_legacy_node_folders(profile):
+    """Test that the node folders are listed with the UUID of their node."""
+    folders = get_legacy_node_folders(profile)
+
+    assert [uuid for uuid, _ in folders] == sorted(UUIDS)
+    assert all(os.path.isdir(folder) for _, folder in folders)
+    assert get_legacy_node_folders(Profile('empty', os.path.join(profile.repository_path, 'empty'))) == []
+
+
+def test_migrate_repository(profile):
+    """Test that the node folders are moved into the container and that the emptied shard folders are removed."""
+    assert sorted(migrate_repository(profile)) == sorted(UUIDS)
+
+    container = Container(os.path.join(profile.repository_path, CONTAINER_DIRNAME))
+    assert container.is_initialised
+
+    for uuid in UUIDS:
+        hierarchy = container.get_hierarchy(uuid)
+        assert sorted(hierarchy) == ['path', 'path/file.txt', 'path/sub']
+        assert container.get_object_content(hierarchy['path/file.txt']) == b'content'
+
+    assert container.count_objects() == {'loose': 0, 'packed': 1}
+    assert get_legacy_node_folders(profile) == []
+    assert os.listdir(os.path.join(profile.repository_path, LEGACY_NODE_FOLDER)) == []
+
+
+def test_migrate_repository_keep_folders(profile):
+    """Test that the node folders can be kept and that the migration can be run again."""
+    assert sorted(migrate_repository(profile, remove_folders=False)) == sorted(UUIDS)
+    assert len(get_legacy_node_folders(profile)) == len(UUIDS)
+
+    # Running the migration again replaces the hierarchies instead of duplicating them
+    assert sorted(migrate_repository(profile)) == sorted(UUIDS)
+
+    container = Container(os.path.join(profile.repository_path, CONTAINER_DIRNAME))
+    assert sorted(container.get_hierarchy(UUIDS[0])) == ['path', 'path/file.txt', 'path/sub']
+    assert get_legacy_node_folders(profile) == []
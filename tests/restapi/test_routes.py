@@ -436,6 +436,61 @@ class RESTApiTestSuite(RESTApiTestCase):
             self, 'computers', '/computers/page/2?offset=2&limit=1&orderby=+id', expected_errormsg=expected_error
         )
 
+    def test_computers_list_after(self):
+        """
+        Get the list of computers page by page, passing the cursor returned with
+        each page to get the next one.
+        """
+        url = f'{self.get_url_prefix()}/computers?limit=2&orderby=+id'
+
+        with self.app.test_client() as client:
+            response = client.get(url)
+            cursor = response.headers['X-Next-Cursor']
+            self.assertIn('X-Next-Cursor', response.headers['Access-Control-Expose-Headers'])
+
+        RESTApiTestCase.process_test(
+            self, 'computers', f'/computers?limit=2&orderby=+id&after={cursor}', expected_range=[2, 4]
+        )
+
+    def test_nodes_list_after(self):
+        """
+        The pages that are requested with a cursor are the same as those requested with an offset,
+        also when ordering by a datetime in descending order.
+        """
+        with self.app.test_client() as client:
+            url = f'{self.get_url_prefix()}/nodes?limit=2&orderby=-ctime'
+            cursor = client.get(url).headers['X-Next-Cursor']
+
+            url = f'{self.get_url_prefix()}/nodes?limit=2&orderby=-ctime&after={cursor}'
+            after_nodes = json.loads(client.get(url).data)['data']['nodes']
+
+            url = f'{self.get_url_prefix()}/nodes?limit=2&offset=2&orderby=-ctime'
+            offset_nodes = json.loads(client.get(url).data)['data']['nodes']
+
+        self.assertEqual([node['uuid'] for node in after_nodes], [node['uuid'] for node in offset_nodes])
+
+    def test_computers_list_after_invalid(self):
+        """
+        A cursor can not be combined with an offset, nor be used for a different ordering.
+        """
+        url = f'{self.get_url_prefix()}/computers?limit=2&orderby=+id'
+
+        with self.app.test_client() as client:
+            cursor = client.get(url).headers['X-Next-Cursor']
+
+        expected_error = 'after key is incompatible with offset and with requesting a specific page'
+        RESTApiTestCase.process_test(
+            self, 'computers', f'/computers?offset=2&orderby=+id&after={cursor}', expected_errormsg=expected_error
+        )
+
+        expected_error = 'the cursor passed as after was created for a different ordering'
+        RESTApiTestCase.process_test(
+            self, 'computers', f'/computers?orderby=-id&after={cursor}', expected_errormsg=expected_error
+        )
+
+        expected_error = 'the value of after is not a valid cursor'
+        RESTApiTestCase.process_test(self, 'computers', '/computers?after=invalid', expected_errormsg=expected_error)
+
     def test_complist_pagelimitoffset_perpage(self):
         """
         If we use the page, limit, offset and perpage at same time, it
@@ -653,6 +653,27 @@ class TestAiidaGraphExplorer(AiidaTestCase):
         }
         self.assertEqual(obtained, expected)
 
+    def test_edges_compact(self):
+        """
+        Testing that the nodes and links found with compact baskets are the same as with the default baskets.
+        """
+        nodes = self._create_basic_graph()
+
+        for starting_node, relationship in (('data_i', 'with_incoming'), ('data_o', 'with_outgoing')):
+            results = []
+            for compact in (False, True):
+                basket = Basket(nodes=[nodes[starting_node].id], compact=compact)
+                queryb = orm.QueryBuilder()
+                queryb.append(orm.Node, tag='nodes_in_set')
+                queryb.append(orm.Node, **{relationship: 'nodes_in_set'})
+                uprule = UpdateRule(queryb, max_iterations=np.inf, track_edges=True)
+                results.append(uprule.run(basket.copy()))
+
+            self.assertTrue(results[1]['nodes'].compact)
+            self.assertTrue(results[1]['nodes_nodes'].compact)
+            self.assertEqual(results[0]['nodes'].keyset, results[1]['nodes'].keyset)
+            self.assertEqual(results[0]['nodes_nodes'].keyset, results[1]['nodes_nodes'].keyset)
+
     def test_empty_input(self):
         """
         Testing empty input.
@@ -739,3 +760,59 @@ class TestAiidaEntitySet(AiidaTestCase):
 
         aes0_copy -= aes0
         self.assertEqual(aes0_copy.keyset, set())
+
+    def test_compact(self):
+        """Test that compact sets behave like the default sets, also when they are combined."""
+        for compact_other in (False, True):
+            aes0 = AiidaEntitySet(orm.Node, compact=True)
+            aes0.set_entities([5, 1, 3, 3])
+            aes1 = AiidaEntitySet(orm.Node, compact=compact_other)
+            aes1.set_entities([3, 7])
+
+            self.assertEqual(len(aes0), 3)
+            self.assertEqual(aes0.keyarray.tolist(), [1, 3, 5])
+            self.assertEqual((aes0 + aes1).keyset, {1, 3, 5, 7})
+            self.assertEqual((aes0 - aes1).keyset, {1, 5})
+            self.assertEqual((aes1 - aes0).keyset, {7})
+            self.assertTrue((aes0 + aes1).compact)
+            self.assertIn(3, aes0)
+            self.assertNotIn(4, aes0)
+            self.assertNotIn(7, aes0)
+
+            aes0_copy = aes0.copy()
+            aes0_copy += aes1
+            aes0_copy -= aes0
+            self.assertEqual(aes0_copy.keyset, {7})
+            self.assertEqual(aes0_copy, aes1 - aes0)
+
+            aes0.add_entities([9])
+            self.assertEqual(aes0.keyset, {1, 3, 5, 9})
+            aes0.empty()
+            self.assertEqual(len(aes0), 0)
+            self.assertEqual(aes0.keyset, set())
+
+    def test_compact_edges(self):
+        """Test that compact edge sets restore the edges, including their strings, when they are converted to sets."""
+        from aiida.orm.utils.links import LinkQuadruple
+
+        links = [
+            LinkQuadruple(1, 2, LinkType.INPUT_CALC.value, 'structure'),
+            LinkQuadruple(2, 3, LinkType.CREATE.value, 'result'),
+            LinkQuadruple(1, 4, LinkType.INPUT_CALC.value, 'structure'),
+        ]
+
+        des0 = DirectedEdgeSet(orm.Node, orm.Node, compact=True)
+        des0.set_entities(links[:2])
+        des1 = DirectedEdgeSet(orm.Node, orm.Node)
+        des1.set_entities(links[1:])
+
+        self.assertEqual(des0.keyset, set(links[:2]))
+        self.assertEqual((des0 + des1).keyset, set(links))
+        self.assertEqual((des0 - des1).keyset, {links[0]})
+        self.assertIn(links[0], des0)
+        self.assertNotIn(links[2], des0)
+        self.assertTrue(all(isinstance(link, LinkQuadruple) for link in des0.keyset))
+
+        groups_nodes = DirectedEdgeSet(orm.Group, orm.Node, compact=True)
+        groups_nodes.set_entities([GroupNodeEdge(1, 2), GroupNodeEdge(1, 2), GroupNodeEdge(3, 2)])
+        self.assertEqual(groups_nodes.keyset, {GroupNodeEdge(1, 2), GroupNodeEdge(3, 2)})
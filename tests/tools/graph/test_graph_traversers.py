@@ -411,3 +411,81 @@ class TestTraverseGraph(AiidaTestCase):
 
         with self.assertRaises(ValueError):
             _ = get_nodes_delete([nodes_dict['data_o'].pk], create_backward=False)
+
+
+class TestTraverseGraphDatabase(AiidaTestCase):
+    """Test the database engine of traverse_graph against the default engine."""
+
+    def test_engines_consistent(self):
+        """Test that both engines return the same nodes and links for any rules and number of iterations."""
+        nodes_dict = create_minimal_graph()
+
+        rule_sets = [
+            ([LinkType.INPUT_CALC, LinkType.RETURN], [LinkType.CALL_CALC, LinkType.CALL_WORK]),
+            ([LinkType.INPUT_WORK], [LinkType.CREATE, LinkType.INPUT_CALC]),
+            ([LinkType.CREATE, LinkType.CALL_CALC], []),
+            ([], [LinkType.RETURN, LinkType.INPUT_WORK]),
+            ([], []),
+        ]
+
+        for node in nodes_dict.values():
+            for links_forward, links_backward in rule_sets:
+                for max_iterations in (None, 0, 1, 2):
+                    results = [
+                        traverse_graph([node.pk],
+                                       max_iterations=max_iterations,
+                                       get_links=True,
+                                       links_forward=links_forward,
+                                       links_backward=links_backward,
+                                       engine=engine) for engine in ('python', 'database')
+                    ]
+                    self.assertEqual(results[0], results[1])
+
+    def test_database_engine(self):
+        """Test the results and errors of the database engine."""
+        from aiida.common.exceptions import NotExistent
+        from aiida.orm.utils.links import LinkQuadruple
+
+        nodes_dict = create_minimal_graph()
+        data_i = nodes_dict['data_i'].pk
+        calc_0 = nodes_dict['calc_0'].pk
+        data_o = nodes_dict['data_o'].pk
+
+        results = traverse_graph([data_i],
+                                 get_links=True,
+                                 links_forward=[LinkType.INPUT_CALC, LinkType.CREATE],
+                                 engine='database')
+        self.assertEqual(results['nodes'], {data_i, calc_0, data_o})
+        self.assertEqual(
+            results['links'], {
+                LinkQuadruple(data_i, calc_0, LinkType.INPUT_CALC.value, 'inpcalc'),
+                LinkQuadruple(calc_0, data_o, LinkType.CREATE.value, 'create0'),
+            }
+        )
+
+        results = traverse_graph([data_i], links_forward=[LinkType.INPUT_CALC], engine='database')
+        self.assertEqual(results, {'nodes': {data_i, calc_0}, 'links': None})
+
+        with self.assertRaises(NotExistent):
+            traverse_graph([data_i, -1], engine='database')
+
+        # The failed traversal is rolled back, such that the temporary table can be created again
+        self.assertEqual(traverse_graph([data_i], engine='database')['nodes'], {data_i})
+
+        with self.assertRaises(ValueError):
+            traverse_graph([data_i], engine='invalid')
+
+    def test_delete_threshold(self):
+        """Test that get_nodes_delete expands the graph in the database for large inputs."""
+        from unittest.mock import patch
+        from aiida.tools.graph import graph_traversers
+
+        nodes_dict = create_minimal_graph()
+        expected_nodes = get_nodes_delete([nodes_dict['data_i'].pk])['nodes']
+
+        traverse_database = graph_traversers._traverse_graph_database  # pylint: disable=protected-access
+
+        with patch.object(graph_traversers, 'DATABASE_ENGINE_THRESHOLD', 0):
+            with patch.object(graph_traversers, '_traverse_graph_database', wraps=traverse_database) as mocked:
+                self.assertEqual(get_nodes_delete([nodes_dict['data_i'].pk])['nodes'], expected_nodes)
+                self.assertEqual(mocked.call_count, 1)
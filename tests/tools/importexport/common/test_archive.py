@@ -7,11 +7,19 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
-"""Tests for the Archive class."""
+"""Tests for the Archive and ArchiveReader classes."""
+import os
+import struct
+import tempfile
+import zipfile
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.common.exceptions import InvalidOperation
-from aiida.tools.importexport import Archive, CorruptArchive
+from aiida.common import json
+from aiida.common.exceptions import InvalidOperation, NotExistent
+from aiida.common.folders import SandboxFolder
+from aiida.tools.importexport import Archive, ArchiveReader, CorruptArchive
+from aiida.tools.importexport.common.config import NODES_EXPORT_SUBFOLDER
+from aiida.tools.importexport.common.utils import export_shard_uuid
 
 from tests.utils.archives import get_archive_file
 
@@ -38,3 +46,95 @@ class TestCommonArchive(AiidaTestCase):
         with self.assertRaises(CorruptArchive):
             with Archive(filepath) as archive:
                 archive.version_format  # pylint: disable=pointless-statement
+
+    def test_inspect_without_unpacking(self):
+        """Verify that the meta data and the data statistics of a zip archive are read without unpacking it."""
+        filepath = get_archive_file('export_v0.10_simple.aiida', filepath='export/migrate')
+        with Archive(filepath) as archive:
+            self.assertEqual(archive.version_format, '0.10')
+            self.assertEqual(archive.get_data_statistics()['nodes'], len(archive.data['export_data']['Node']))
+            self.assertFalse(archive.unpacked)
+
+
+class TestArchiveReader(AiidaTestCase):
+    """Tests for the :py:class:`~aiida.tools.importexport.common.archive.ArchiveReader` class."""
+
+    def setUp(self):
+        super().setUp()
+        self.filepath = get_archive_file('export_v0.10_simple.aiida', filepath='export/migrate')
+
+    def get_node_uuid(self, reader):
+        """Return the UUID of a node in the archive with files in its repository."""
+        for fields in reader.data['export_data']['Node'].values():
+            if reader.list_repository(fields['uuid']):
+                return fields['uuid']
+        return self.fail('the archive contains no node with repository files')
+
+    def test_unsupported_format(self):
+        """Verify that constructing a reader for a tar archive raises a `CorruptArchive` exception."""
+        filepath = get_archive_file('empty.aiida', filepath='export/migrate')
+        with self.assertRaises(CorruptArchive):
+            ArchiveReader(filepath)
+
+    def test_data(self):
+        """Verify that the data of an archive is read in either data file layout."""
+        filepath = get_archive_file('export_v0.9_simple.aiida', filepath='export/migrate')
+        with ArchiveReader(self.filepath) as reader, ArchiveReader(filepath) as legacy_reader:
+            self.assertEqual(reader.version_format, '0.10')
+            self.assertEqual(legacy_reader.version_format, '0.9')
+            self.assertEqual(reader.data, legacy_reader.data)
+            self.assertEqual(reader.get_data_statistics(), legacy_reader.get_data_statistics())
+
+    def test_node_lookup(self):
+        """Verify that the fields, attributes and extras of a single node are looked up by UUID."""
+        with ArchiveReader(self.filepath) as reader:
+            data = reader.data
+            for pk, fields in data['export_data']['Node'].items():
+                self.assertEqual(reader.get_node(fields['uuid']), (int(pk), fields))
+                self.assertEqual(reader.get_node_attributes(fields['uuid']), data['node_attributes'].get(pk, {}))
+                self.assertEqual(reader.get_node_extras(fields['uuid']), data['node_extras'].get(pk, {}))
+
+            with self.assertRaises(NotExistent):
+                reader.get_node_attributes('non-existent')
+
+    def test_repository(self):
+        """Verify that the repository files of a single node are listed, opened and extracted."""
+        with ArchiveReader(self.filepath) as reader:
+            uuid = self.get_node_uuid(reader)
+            filenames = reader.list_repository(uuid)
+
+            with reader.open_repository_file(uuid, filenames[0]) as handle:
+                content = handle.read()
+
+            with self.assertRaises(NotExistent):
+                reader.open_repository_file(uuid, 'non-existent')
+
+            with SandboxFolder() as folder:
+                reader.extract_repository(uuid, folder)
+                subfolder = folder.get_subfolder(os.path.join(NODES_EXPORT_SUBFOLDER, export_shard_uuid(uuid)))
+                with open(subfolder.get_abs_path(filenames[0]), 'rb') as handle:
+                    self.assertEqual(handle.read(), content)
+                self.assertEqual(folder.get_content_list(), [NODES_EXPORT_SUBFOLDER])
+
+    def test_corrupt_archive(self):
+        """Verify that reading a corrupt zip file raises a `CorruptArchive` exception."""
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'archive.aiida')
+
+            with zipfile.ZipFile(filepath, 'w', compression=zipfile.ZIP_DEFLATED) as handle:
+                handle.writestr('metadata.json', json.dumps({'export_version': '0.10', 'padding': 'x' * 1000}))
+                info = handle.getinfo('metadata.json')
+
+            # Overwrite the compressed content of the member, leaving the headers and the central directory intact
+            with open(filepath, 'r+b') as handle:
+                handle.seek(info.header_offset + 26)
+                name_length, extra_length = struct.unpack('<HH', handle.read(4))
+                handle.seek(name_length + extra_length + 2, os.SEEK_CUR)
+                handle.write(b'\xff' * 8)
+
+            with ArchiveReader(filepath) as reader:
+                with self.assertRaises(CorruptArchive):
+                    reader.metadata  # pylint: disable=pointless-statement
+
+                with SandboxFolder() as folder, self.assertRaises(CorruptArchive):
+                    reader.extract_data(folder)
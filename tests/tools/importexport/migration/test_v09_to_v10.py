@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Test export file migration from export version 0.9 to 0.10"""
+import os
+
+from aiida.common.folders import SandboxFolder
+from aiida.tools.importexport.common.archive import read_data, write_data
+from aiida.tools.importexport.common.config import DATA_FILENAME, LEGACY_DATA_FILENAME
+from aiida.tools.importexport.migration.utils import verify_metadata_version
+from aiida.tools.importexport.migration.v09_to_v10 import migrate_v9_to_v10
+
+from tests.utils.archives import get_json_files
+from . import ArchiveMigrationTest
+
+
+class TestMigrate(ArchiveMigrationTest):
+    """Tests specific for this archive migration."""
+
+    def test_migrate(self):
+        """Test the migration on the test archive and the data file that is written for the migrated archive."""
+        metadata, data = get_json_files('export_v0.9_simple.aiida', **self.core_archive)
+        verify_metadata_version(metadata, version='0.9')
+
+        with SandboxFolder() as folder:
+            write_data(folder, metadata, data)
+            self.assertTrue(os.path.isfile(folder.get_abs_path(LEGACY_DATA_FILENAME)))
+            self.assertEqual(read_data(folder), data)
+
+            migrate_v9_to_v10(metadata, data)
+            verify_metadata_version(metadata, version='0.10')
+
+            write_data(folder, metadata, data)
+            self.assertTrue(os.path.isfile(folder.get_abs_path(DATA_FILENAME)))
+            self.assertFalse(os.path.isfile(folder.get_abs_path(LEGACY_DATA_FILENAME)))
+            self.assertEqual(read_data(folder), data)
+
+    def test_migrated_archive(self):
+        """Test that the migrated test archive has the same content as the archive in the new format."""
+        metadata_old, data_old = get_json_files('export_v0.9_simple.aiida', **self.core_archive)
+        metadata_new, data_new = get_json_files('export_v0.10_simple.aiida', **self.core_archive)
+
+        migrate_v9_to_v10(metadata_old, data_old)
+
+        self.assertEqual(metadata_old['export_version'], metadata_new['export_version'])
+        self.assertEqual(data_old, data_new)
@@ -14,11 +14,12 @@ import tarfile
 
 from aiida import orm
 from aiida.backends.testbase import AiidaTestCase
-from aiida.common import json
 from aiida.common.folders import SandboxFolder
 from aiida.common.links import LinkType
 from aiida.common.utils import get_new_uuid
 from aiida.tools.importexport import import_data, export
+from aiida.tools.importexport.common.archive import DataFileWriter
+from aiida.tools.importexport.common.config import DATA_FILENAME
 from aiida.tools.importexport.common.exceptions import DanglingLinkError
 
 from tests.utils.configuration import with_temp_dir
@@ -52,18 +53,14 @@ class TestLinks(AiidaTestCase):
         with tarfile.open(filename, 'r:gz', format=tarfile.PAX_FORMAT) as tar:
             tar.extractall(unpack.abspath)
 
-        with open(unpack.get_abs_path('data.json'), 'r', encoding='utf8') as fhandle:
-            data = json.load(fhandle)
-        data['links_uuid'].append({
-            'output': struct.uuid,
-            # note: this uuid is supposed to not be in the DB:
-            'input': get_new_uuid(),
-            'label': 'parent',
-            'type': LinkType.CREATE.value
-        })
-
-        with open(unpack.get_abs_path('data.json'), 'wb') as fhandle:
-            json.dump(data, fhandle)
+        with open(unpack.get_abs_path(DATA_FILENAME), 'a', encoding='utf8') as fhandle:
+            DataFileWriter(fhandle).write_link({
+                'output': struct.uuid,
+                # note: this uuid is supposed to not be in the DB:
+                'input': get_new_uuid(),
+                'label': 'parent',
+                'type': LinkType.CREATE.value
+            })
 
         with tarfile.open(filename, 'w:gz', format=tarfile.PAX_FORMAT) as tar:
             tar.add(unpack.abspath, arcname='')
@@ -628,17 +625,13 @@ class TestLinks(AiidaTestCase):
         with tarfile.open(filename, 'r:gz', format=tarfile.PAX_FORMAT) as tar:
             tar.extractall(unpack.abspath)
 
-        with open(unpack.get_abs_path('data.json'), 'r', encoding='utf8') as fhandle:
-            data = json.load(fhandle)
-        data['links_uuid'].append({
-            'output': calc.uuid,
-            'input': struct.uuid,
-            'label': 'input',
-            'type': LinkType.INPUT_CALC.value
-        })
-
-        with open(unpack.get_abs_path('data.json'), 'wb') as fhandle:
-            json.dump(data, fhandle)
+        with open(unpack.get_abs_path(DATA_FILENAME), 'a', encoding='utf8') as fhandle:
+            DataFileWriter(fhandle).write_link({
+                'output': calc.uuid,
+                'input': struct.uuid,
+                'label': 'input',
+                'type': LinkType.INPUT_CALC.value
+            })
 
         with tarfile.open(filename, 'w:gz', format=tarfile.PAX_FORMAT) as tar:
             tar.add(unpack.abspath, arcname='')
@@ -95,6 +95,50 @@ class TestSimple(AiidaTestCase):
             for k in attrs[uuid].keys():
                 self.assertEqual(attrs[uuid][k], node.get_attribute(k))
 
+    @with_temp_dir
+    def test_data_file(self, temp_dir):
+        """Test that the database content is exported to the data file one record per line."""
+        import io
+        import zipfile
+
+        from aiida.tools.importexport import Archive
+        from aiida.tools.importexport.common.config import DATA_FILENAME, LEGACY_DATA_FILENAME
+
+        nodes = []
+        for value in range(3):
+            node = orm.Int(value)
+            node.put_object_from_filelike(io.StringIO(str(value)), 'sub/file.txt')
+            nodes.append(node.store())
+
+        group = orm.Group(label='group').store()
+        group.add_nodes(nodes)
+        uuids = [node.uuid for node in nodes]
+
+        filename = os.path.join(temp_dir, 'export.aiida')
+        export([group], filename=filename, silent=True)
+
+        with zipfile.ZipFile(filename) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertNotIn(LEGACY_DATA_FILENAME, archive.namelist())
+            with archive.open(DATA_FILENAME) as fhandle:
+                records = [json.loads(line.decode('utf8')) for line in fhandle]
+
+        sections = {record[0] for record in records}
+        self.assertEqual(sections, {'export_data', 'node_attributes', 'node_extras', 'groups_uuid'})
+
+        with Archive(filename) as archive:
+            node_uuids = {fields['uuid'] for fields in archive.data['export_data']['Node'].values()}
+            self.assertEqual(node_uuids, set(uuids))
+            self.assertEqual(sorted(archive.data['groups_uuid'][group.uuid]), sorted(uuids))
+            self.assertEqual(len(archive.data['export_data']['User']), 1)
+
+        self.clean_db()
+        self.create_user()
+        import_data(filename, silent=True)
+
+        for value, uuid in enumerate(uuids):
+            self.assertEqual(orm.load_node(uuid).get_object_content('sub/file.txt'), str(value))
+
     def test_check_for_export_format_version(self):
         """Test the check for the export format version."""
         # Creating a folder for the import/export files
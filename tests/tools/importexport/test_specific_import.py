@@ -326,6 +326,7 @@ class TestSpecificImport(AiidaTestCase):
         from aiida.common.folders import SandboxFolder
         from tests.utils.archives import get_archive_file
         from aiida.tools.importexport.common.archive import extract_zip
+        from aiida.tools.importexport.common.config import DATA_FILENAME
 
         archive = get_archive_file('arithmetic.add.aiida', filepath='calcjob')
 
@@ -334,7 +335,7 @@ class TestSpecificImport(AiidaTestCase):
 
             # Make sure the JSON files and the nodes subfolder was correctly extracted (is present),
             # then try to import it by passing the extracted folder to the import function.
-            for name in {'metadata.json', 'data.json', 'nodes'}:
+            for name in {'metadata.json', DATA_FILENAME, 'nodes'}:
                 self.assertTrue(os.path.exists(os.path.join(temp_dir.abspath, name)))
 
             # Get list of all folders in extracted archive
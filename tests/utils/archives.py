@@ -15,7 +15,7 @@ import zipfile
 
 from aiida.common import json
 from aiida.common.exceptions import NotExistent
-from aiida.tools.importexport.common.archive import extract_tar, extract_zip
+from aiida.tools.importexport.common.archive import extract_tar, extract_zip, read_data, write_data
 from aiida.common.folders import SandboxFolder
 from tests.static import STATIC_DIR
 
@@ -81,7 +81,7 @@ def import_archive(archive, filepath=None, external_module=None):
 
 
 def get_json_files(archive, silent=True, filepath=None, external_module=None):
-    """Get metadata.json and data.json from an exported AiiDA archive
+    """Get the content of metadata.json and of the data file from an exported AiiDA archive
 
     :param archive: the relative filename of the archive
     :param silent: Whether or not the extraction should be silent
@@ -101,14 +101,13 @@ def get_json_files(archive, silent=True, filepath=None, external_module=None):
             raise ValueError('invalid file format, expected either a zip archive or gzipped tarball')
 
         try:
-            with open(folder.get_abs_path('data.json'), 'r', encoding='utf8') as fhandle:
-                data = json.load(fhandle)
+            data = read_data(folder)
             with open(folder.get_abs_path('metadata.json'), 'r', encoding='utf8') as fhandle:
                 metadata = json.load(fhandle)
-        except IOError:
-            raise NotExistent(f'export archive does not contain the required file {fhandle.filename}')
+        except IOError as exception:
+            raise NotExistent(f'export archive does not contain the required file {exception.filename}')
 
-    # Return metadata.json and data.json
+    # Return the content of metadata.json and of the data file
     return metadata, data
 
 
@@ -132,19 +131,17 @@ def migrate_archive(input_file, output_file, silent=True):
             raise ValueError('invalid file format, expected either a zip archive or gzipped tarball')
 
         try:
-            with open(folder.get_abs_path('data.json'), 'r', encoding='utf8') as fhandle:
-                data = json.load(fhandle)
+            data = read_data(folder)
             with open(folder.get_abs_path('metadata.json'), 'r', encoding='utf8') as fhandle:
                 metadata = json.load(fhandle)
-        except IOError:
-            raise NotExistent(f'export archive does not contain the required file {fhandle.filename}')
+        except IOError as exception:
+            raise NotExistent(f'export archive does not contain the required file {exception.filename}')
 
         # Migrate
         migrate_recursively(metadata, data, folder)
 
         # Write json files
-        with open(folder.get_abs_path('data.json'), 'wb') as fhandle:
-            json.dump(data, fhandle, indent=4)
+        write_data(folder, metadata, data)
 
         with open(folder.get_abs_path('metadata.json'), 'wb') as fhandle:
             json.dump(metadata, fhandle, indent=4)